@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+音频格式基准测试
+对同一本书分别使用不同的段落格式/合并格式运行整书转换（含合并），比较总CPU时间和磁盘占用
+
+示例:
+    python -m benchmarks.bench_formats --chapters 20 --chapter-chars 3000
+"""
+import shutil
+import sys
+
+from loguru import logger
+
+from benchmarks.bench_pipeline import build_parser, run_benchmark
+
+# (段落格式, 合并格式)
+FORMAT_PLANS = [
+    ('mp3', 'mp3'),  # Edge默认：合并时解码所有MP3再重新编码
+    ('wav', 'mp3'),  # 直接读取采样数据，只编码一次
+    ('wav', 'wav'),  # 直接拼接采样数据，不经过编解码
+    ('pcm', 'pcm'),  # 同上，无文件头
+]
+
+
+def main():
+    parser = build_parser()
+    parser.description = "音频格式基准测试（回环TTS引擎）"
+    args = parser.parse_args()
+    args.merge = True
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="ERROR")
+
+    has_ffmpeg = shutil.which("ffmpeg") is not None
+
+    print("=" * 72)
+    print(f"  音频格式基准测试 ({args.chapters} 章 x {args.chapter_chars} 字)")
+    print("=" * 72)
+    print(f"{'段落格式':<8}{'合并格式':<8}{'墙钟(秒)':>10}{'CPU(秒)':>10}{'磁盘(MB)':>10}  备注")
+
+    for segment_format, merge_format in FORMAT_PLANS:
+        if merge_format == 'mp3' and not has_ffmpeg:
+            print(f"{segment_format:<12}{merge_format:<12}{'-':>10}{'-':>10}{'-':>10}  跳过（需要ffmpeg）")
+            continue
+
+        args.format = segment_format
+        args.merge_format = merge_format
+        result = run_benchmark(args)
+        shutil.rmtree(result['work_dir'], ignore_errors=True)
+        note = "" if result['merged'] else "合并失败"
+        print(
+            f"{segment_format:<12}{merge_format:<12}"
+            f"{result['wall_seconds']:>10.2f}{result['cpu_seconds']:>10.2f}"
+            f"{result['output_bytes'] / 1024 / 1024:>10.1f}  {note}"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+"""
+音频合并基准测试
+对同一批段落比较 merge_files 选择的直接拼接方式与原来的pydub合并（整本解码到内存后一次导出）的耗时和内存峰值：
+
+- mp3: 与 edge-tts 输出参数相同的MP3段落（24kHz 48kbps 单声道），比较按帧拼接、
+  逐个解码后送入一个编码进程（流式）与pydub解码重编码（后两者需要ffmpeg）
+- wav: 24kHz 16bit 单声道WAV段落，比较直接拼接采样数据与pydub合并（不需要ffmpeg）
+
+示例:
+    python -m benchmarks.bench_merge --segments 500 --segment-seconds 20
+    python -m benchmarks.bench_merge --input-format wav --segments 200
+"""
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from pathlib import Path
+from typing import Callable
+
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modules.audio_processor import AudioMerger, AudioSplitter  # noqa: E402
+from modules.audio_processor.mp3_frames import make_silence  # noqa: E402
+
+
+def generate_segments(
+    work_dir: Path,
+    count: int,
+    seconds: float,
+    input_format: str = 'mp3',
+    seed: int = 0
+) -> list:
+    """
+    生成段落文件（MP3为静音帧，帧结构与真实段落相同；WAV为非静音的锯齿波）
+
+    Args:
+        work_dir: 输出目录
+        count: 段落数
+        seconds: 平均时长(秒)
+        input_format: 段落格式 (mp3/wav)
+        seed: 随机种子
+
+    Returns:
+        文件路径列表
+    """
+    rng = random.Random(seed)
+    files = []
+    for index in range(count):
+        path = work_dir / f"{index:05d}.{input_format}"
+        duration = seconds * rng.uniform(0.5, 1.5)
+        if input_format == 'mp3':
+            path.write_bytes(make_silence(duration * 1000))
+        else:
+            frames = int(24000 * duration)
+            with wave.open(str(path), 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(24000)
+                wav_file.writeframes(bytes(i % 251 for i in range(frames * 2)))
+        files.append(str(path))
+    return files
+
+
+def run_merge(merge: Callable[[Path], bool], output_path: Path) -> dict:
+    """
+    合并两次：第一次测量耗时，第二次用 tracemalloc 测量Python内存峰值（跟踪内存分配会拖慢合并）
+
+    Args:
+        merge: 合并函数，参数为输出文件路径，返回是否成功
+        output_path: 输出文件
+
+    Returns:
+        测量结果
+    """
+    start = time.perf_counter()
+    success = merge(output_path)
+    wall = time.perf_counter() - start
+
+    tracemalloc.start()
+    merge(output_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'success': success,
+        'wall_seconds': wall,
+        'peak_mb': peak / 1024 / 1024,
+        'output_mb': output_path.stat().st_size / 1024 / 1024 if success else 0.0,
+        'duration_seconds': AudioSplitter.get_duration_ms(str(output_path)) / 1000 if success else 0.0,
+    }
+
+
+def merge_methods(files: list, input_format: str, silence_ms: int) -> list:
+    """
+    参与比较的合并方式
+
+    Args:
+        files: 段落文件列表
+        input_format: 段落格式（输出格式相同）
+        silence_ms: 段落间静音(毫秒)
+
+    Returns:
+        [(名称, 合并函数, 是否需要ffmpeg), ...]
+    """
+    def merger(stream_copy: bool = True, streaming: bool = True) -> AudioMerger:
+        return AudioMerger(add_silence=silence_ms > 0, silence_duration=silence_ms,
+                           stream_copy=stream_copy, streaming=streaming)
+
+    def via_merge_files(stream_copy: bool, streaming: bool) -> Callable[[Path], bool]:
+        return lambda output: merger(stream_copy, streaming).merge_files(
+            files, str(output), format=input_format, show_progress=False)
+
+    def via_pydub(output: Path) -> bool:
+        # 原来的合并方式：跳过所有直接拼接的路径
+        return merger()._merge_pydub(files, output, input_format, 24000, False)
+
+    if input_format == 'mp3':
+        return [
+            ('按帧拼接', via_merge_files(True, True), False),
+            ('流式解码', via_merge_files(False, True), True),
+            ('pydub解码', via_pydub, True),
+        ]
+    return [
+        ('直接拼接', via_merge_files(True, True), False),
+        ('pydub解码', via_pydub, False),
+    ]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="音频合并基准测试")
+    parser.add_argument("--input-format", choices=['mp3', 'wav'], default='mp3', help="段落格式（输出格式相同）")
+    parser.add_argument("--segments", type=int, default=300, help="段落数")
+    parser.add_argument("--segment-seconds", type=float, default=20.0, help="段落平均时长(秒)")
+    parser.add_argument("--silence-ms", type=int, default=500, help="段落间静音(毫秒)")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--verbose", action="store_true", help="显示详细日志")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="ERROR")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_merge_"))
+    try:
+        files = generate_segments(work_dir, args.segments, args.segment_seconds, args.input_format, args.seed)
+        hours = sum(AudioSplitter.get_duration_ms(f) for f in files) / 1000 / 3600
+
+        print("=" * 72)
+        print(f"  音频合并基准测试 ({args.segments} 段 {args.input_format}, 共 {hours:.1f} 小时)")
+        print("=" * 72)
+        print(f"{'合并方式':<14}{'耗时(秒)':>10}{'内存峰值(MB)':>14}{'输出(MB)':>10}{'时长(秒)':>10}  备注")
+
+        has_ffmpeg = shutil.which("ffmpeg") is not None
+        for index, (label, merge, needs_ffmpeg) in enumerate(merge_methods(files, args.input_format, args.silence_ms)):
+            if needs_ffmpeg and not has_ffmpeg:
+                print(f"{label:<14}{'-':>10}{'-':>14}{'-':>10}{'-':>10}  跳过（需要ffmpeg）")
+                continue
+            result = run_merge(merge, work_dir / f"merged_{index}.{args.input_format}")
+            note = "" if result['success'] else "合并失败"
+            print(
+                f"{label:<14}{result['wall_seconds']:>10.2f}{result['peak_mb']:>14.1f}"
+                f"{result['output_mb']:>10.1f}{result['duration_seconds']:>10.0f}  {note}"
+            )
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+任务排序基准测试
+离线模拟 max_workers 个并发槽位按顺序领取段落（与 TaskManager 的工作协程相同），
+比较文件顺序(FIFO)、时长模型预测的最长优先(LPT)和按真实耗时排序(理想LPT)的整批完成时间
+
+示例:
+    python -m benchmarks.bench_ordering --segments 400 --workers 4
+    python -m benchmarks.bench_ordering --long-at-end --trials 20
+"""
+import argparse
+import heapq
+import random
+import sys
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.duration_model import DurationModel  # noqa: E402
+
+
+class _Segment:
+    """模拟段落（只需要 text 用于预测）"""
+
+    def __init__(self, chars: int, latency_ms: float):
+        self.text = "字" * chars
+        self.latency_ms = latency_ms
+
+
+def generate_segments(rng: random.Random, count: int, args) -> List[_Segment]:
+    """
+    生成段落：大部分为普通段落，少数为长段落（长对话/大段描写）
+
+    Args:
+        rng: 随机数生成器
+        count: 段落数
+        args: 命令行参数
+
+    Returns:
+        段落列表（文件顺序）
+    """
+    segments = []
+    for _ in range(count):
+        if rng.random() < args.long_ratio:
+            chars = rng.randint(args.max_chars // 2, args.max_chars)
+        else:
+            chars = rng.randint(10, args.max_chars // 8)
+        latency = (args.latency_ms + args.latency_per_char_ms * chars) * rng.lognormvariate(0, args.latency_jitter)
+        segments.append(_Segment(chars, latency))
+    if args.long_at_end:
+        # 最坏情况：长段落集中在书的末尾
+        segments.sort(key=lambda segment: len(segment.text))
+    return segments
+
+
+def makespan(order: List[_Segment], workers: int) -> float:
+    """
+    模拟按顺序领取任务的整批完成时间
+
+    Args:
+        order: 执行顺序
+        workers: 并发数
+
+    Returns:
+        完成时间(秒)
+    """
+    free_at = [0.0] * workers
+    for segment in order:
+        start = heapq.heappop(free_at)
+        heapq.heappush(free_at, start + segment.latency_ms / 1000.0)
+    return max(free_at)
+
+
+def run_benchmark(args) -> dict:
+    """
+    运行模拟
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        各排序方式的平均完成时间及下界
+    """
+    rng = random.Random(args.seed)
+    totals = {'fifo': 0.0, 'lpt_model': 0.0, 'lpt_oracle': 0.0, 'lower_bound': 0.0}
+    for _ in range(args.trials):
+        # 用历史任务拟合时长模型（与 TaskManager 记录的样本相同：字数 -> 合成延迟）
+        model = DurationModel(min_samples=args.history)
+        for segment in generate_segments(rng, args.history, args):
+            model.observe(len(segment.text), latency_ms=segment.latency_ms)
+
+        segments = generate_segments(rng, args.segments, args)
+        totals['fifo'] += makespan(segments, args.workers)
+        totals['lpt_model'] += makespan(model.order_longest_first(segments), args.workers)
+        totals['lpt_oracle'] += makespan(sorted(segments, key=lambda s: -s.latency_ms), args.workers)
+        work = sum(segment.latency_ms for segment in segments) / 1000.0
+        longest = max(segment.latency_ms for segment in segments) / 1000.0
+        totals['lower_bound'] += max(work / args.workers, longest)
+    return {name: value / args.trials for name, value in totals.items()}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="任务排序基准测试（离线模拟）")
+    parser.add_argument("--segments", type=int, default=300, help="每批段落数")
+    parser.add_argument("--workers", type=int, default=4, help="并发数")
+    parser.add_argument("--max-chars", type=int, default=2000, help="最长段落字数")
+    parser.add_argument("--long-ratio", type=float, default=0.05, help="长段落比例")
+    parser.add_argument("--long-at-end", action="store_true", help="长段落集中在末尾（最坏情况）")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="每请求固定延迟(毫秒)")
+    parser.add_argument("--latency-per-char-ms", type=float, default=15.0, help="每字符延迟(毫秒)")
+    parser.add_argument("--latency-jitter", type=float, default=0.3, help="延迟对数正态抖动")
+    parser.add_argument("--history", type=int, default=200, help="拟合时长模型的历史样本数")
+    parser.add_argument("--trials", type=int, default=10, help="模拟次数（取平均）")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    result = run_benchmark(args)
+    fifo = result['fifo']
+
+    print("=" * 60)
+    print(f"  任务排序基准测试 ({args.segments} 段 x {args.trials} 次, {args.workers} 并发)")
+    print("=" * 60)
+    print(f"{'排序方式':<16}{'完成时间(秒)':>12}{'相对FIFO':>10}")
+    for name, label in (('fifo', '文件顺序 FIFO'), ('lpt_model', '模型预测 LPT'),
+                        ('lpt_oracle', '真实耗时 LPT'), ('lower_bound', '理论下界')):
+        print(f"{label:<16}{result[name]:>12.1f}{result[name] / fifo:>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
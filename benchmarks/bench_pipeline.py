@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+"""
+整书转换基准测试
+使用回环TTS引擎离线运行完整的 NovelToAudio.convert 流程，得到可复现的吞吐量数据
+
+示例:
+    python -m benchmarks.bench_pipeline --chapters 50 --chapter-chars 3000
+    python -m benchmarks.bench_pipeline --novel test_novel.txt --latency-ms 0 --merge
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+from loguru import logger
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from novel_to_audio import NovelToAudio  # noqa: E402
+
+
+# 合成小说用的句子素材
+_SENTENCES = [
+    "夜色渐深，城外的风从山谷里吹来，带着一丝凉意。",
+    "他抬起头，看见远处的灯火一盏接一盏地亮了起来。",
+    "“你真的要走吗？”她轻声问道。",
+    "“嗯。”",
+    "马车在石板路上颠簸着，车轮发出单调的声响。",
+    "没有人知道那天晚上究竟发生了什么，只有那封信被留在了桌上。",
+    "“等等！”",
+    "雨水顺着屋檐滴落，在青石台阶上溅起细小的水花。",
+    "他沉默了很久，终于开口说出了埋藏在心底多年的秘密。",
+    "“好。”",
+]
+
+
+def generate_novel(path: Path, chapters: int, chapter_chars: int, seed: int = 0):
+    """
+    生成确定性的合成小说
+
+    Args:
+        path: 输出路径
+        chapters: 章节数
+        chapter_chars: 每章大约字数
+        seed: 随机种子
+    """
+    rng = random.Random(seed)
+    lines = []
+    for index in range(1, chapters + 1):
+        lines.append(f"第{index}章 测试章节{index}")
+        length = 0
+        while length < chapter_chars:
+            paragraph = "".join(rng.choice(_SENTENCES) for _ in range(rng.randint(1, 6)))
+            lines.append(paragraph)
+            length += len(paragraph)
+        lines.append("")
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def _cpu_seconds() -> float:
+    """本进程及已结束子进程（如ffmpeg）的CPU时间"""
+    cpu = time.process_time()
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += usage.ru_utime + usage.ru_stime
+    return cpu
+
+
+def run_benchmark(args) -> dict:
+    """
+    运行基准测试
+
+    Args:
+        args: 命令行参数
+
+    Returns:
+        基准测试结果
+    """
+    work_dir = Path(tempfile.mkdtemp(prefix="bench_pipeline_"))
+
+    if args.novel:
+        novel_path = Path(args.novel)
+    else:
+        novel_path = work_dir / "bench_novel.txt"
+        generate_novel(novel_path, args.chapters, args.chapter_chars, args.seed)
+
+    config = {
+        'tts': {
+            'default_engine': 'loopback',
+            'loopback': {
+                'output_format': args.format,
+                'latency_ms': args.latency_ms,
+                'latency_per_char_ms': args.latency_per_char_ms,
+                'latency_jitter': args.latency_jitter,
+                'tail_rate': args.tail_rate,
+                'tail_latency_ms': args.tail_latency_ms,
+                'failure_rate': args.failure_rate,
+                'seed': args.seed,
+            }
+        },
+        'performance': {'max_workers': args.workers},
+        'output': {'base_dir': str(work_dir / 'output')},
+    }
+    if args.hedge:
+        config['tts']['hedging'] = {'enable': True, 'percentile': args.hedge_percentile, 'min_samples': 10}
+
+    config['audio'] = {'output_format': args.merge_format or args.format}
+
+    config_path = work_dir / "bench_config.yaml"
+    with open(config_path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+
+    converter = NovelToAudio(config_path=str(config_path))
+
+    start = time.perf_counter()
+    cpu_start = _cpu_seconds()
+    result = converter.convert(str(novel_path), merge=args.merge)
+    wall = time.perf_counter() - start
+    cpu = _cpu_seconds() - cpu_start
+
+    # 对冲模式下回环引擎被包装在 HedgedTTSEngine 中
+    stats = converter.tts_engine.get_stats()
+    engine = getattr(converter.tts_engine, 'engines', [converter.tts_engine])[0]
+
+    tasks = converter.task_manager.tasks
+    total_chars = sum(len(task.text) for task in tasks)
+    audio_seconds = sum(engine.get_audio_duration_ms(task.text) for task in tasks) / 1000.0
+
+    return {
+        'tasks': result['tasks_total'],
+        'completed': result['tasks_completed'],
+        'failed': result['tasks_failed'],
+        'requests': engine.get_stats()['requests'],
+        'hedges': stats.get('hedges', 0),
+        'retries': result['retries'],
+        'synthesis_seconds': result['elapsed_seconds'],
+        'latency_p50_ms': result['latency_ms']['p50'] or 0.0,
+        'latency_p99_ms': result['latency_ms']['p99'] or 0.0,
+        'wall_seconds': wall,
+        'cpu_seconds': cpu,
+        'tasks_per_second': result['tasks_total'] / wall if wall else 0.0,
+        'chars_per_second': total_chars / wall if wall else 0.0,
+        'realtime_factor': audio_seconds / wall if wall else 0.0,
+        'merged': bool(result['merged_file']) and Path(result['merged_file']).exists(),
+        'output_bytes': sum(f.stat().st_size for f in Path(result['output_dir']).iterdir() if f.is_file()),
+        'work_dir': str(work_dir),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """创建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="整书转换基准测试（回环TTS引擎）")
+    parser.add_argument("--novel", help="小说文件路径（不指定则生成合成小说）")
+    parser.add_argument("--chapters", type=int, default=20, help="合成小说章节数")
+    parser.add_argument("--chapter-chars", type=int, default=3000, help="合成小说每章字数")
+    parser.add_argument("--workers", type=int, default=4, help="最大并发数")
+    parser.add_argument("--format", default="mp3", choices=['mp3', 'wav', 'pcm'], help="段落音频格式")
+    parser.add_argument("--merge-format", choices=['mp3', 'wav', 'pcm'], help="合并文件格式（默认与段落相同）")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="每请求固定延迟(毫秒)")
+    parser.add_argument("--latency-per-char-ms", type=float, default=0.5, help="每字符延迟(毫秒)")
+    parser.add_argument("--latency-jitter", type=float, default=0.3, help="延迟对数正态抖动")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="长尾卡顿概率")
+    parser.add_argument("--tail-latency-ms", type=float, default=10000.0, help="长尾额外延迟(毫秒)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="失败概率")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    parser.add_argument("--hedge", action="store_true", help="启用对冲请求")
+    parser.add_argument("--hedge-percentile", type=float, default=95.0, help="对冲触发分位数")
+    parser.add_argument("--merge", action="store_true", help="合并音频（mp3需要ffmpeg）")
+    parser.add_argument("--verbose", action="store_true", help="显示详细日志")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    if not args.verbose:
+        logger.remove()
+        logger.add(sys.stderr, level="WARNING")
+
+    result = run_benchmark(args)
+
+    print("=" * 60)
+    print("  整书转换基准测试结果")
+    print("=" * 60)
+    print(f"任务数:       {result['completed']}/{result['tasks']} 成功, {result['failed']} 失败")
+    print(f"请求数:       {result['requests']} (对冲 {result['hedges']}, 重试 {result['retries']})")
+    print(f"合成耗时:     {result['synthesis_seconds']:.2f} 秒")
+    print(f"任务延迟:     p50 {result['latency_p50_ms']:.0f}ms / p99 {result['latency_p99_ms']:.0f}ms")
+    print(f"墙钟时间:     {result['wall_seconds']:.2f} 秒")
+    print(f"CPU时间:      {result['cpu_seconds']:.2f} 秒（含子进程）")
+    print(f"任务吞吐:     {result['tasks_per_second']:.1f} 任务/秒")
+    print(f"字符吞吐:     {result['chars_per_second']:.0f} 字符/秒")
+    print(f"实时倍率:     {result['realtime_factor']:.1f}x")
+    print(f"工作目录:     {result['work_dir']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,7 @@ from loguru import logger
 import sys
 
 from novel_to_audio import NovelToAudio
+from core.segment_calibration import DEFAULT_SIZES
 
 
 # 配置日志
@@ -51,8 +52,12 @@ def cli():
 @click.option('--output', '-o', help='输出目录', type=click.Path())
 @click.option('--voice', '-v', help='音色选择 (xiaoxiao, yunxi, xiaoyi等)')
 @click.option('--merge/--no-merge', default=False, help='是否合并所有章节为单个文件')
+@click.option('--resume/--no-resume', default=True, help='是否跳过上次中断前已完成的段落')
+@click.option('--start-chapter', type=int, help='从该章节开始优先合成（边听边合成）')
+@click.option('--distributed/--local', default=None, help='通过Redis任务队列交给工作进程合成（默认使用配置）')
+@click.option('--shard', help='静态分片 i/n：只合成按字数均衡划分的第i份章节（之后用 assemble 合并）')
 @click.option('--config', '-c', help='配置文件路径', type=click.Path())
-def convert(novel_path, output, voice, merge, config):
+def convert(novel_path, output, voice, merge, resume, start_chapter, distributed, shard, config):
     """
     转换TXT小说为MP3有声读物
 
@@ -63,6 +68,8 @@ def convert(novel_path, output, voice, merge, config):
     示例:
         python cli.py convert "三体.txt" -v xiaoxiao --merge
         python cli.py convert "novel.txt" -o ./output
+        python cli.py convert "novel.txt" --start-chapter 500
+        python cli.py convert "novel.txt" --shard 2/8
     """
     try:
         click.echo("=" * 60)
@@ -77,7 +84,11 @@ def convert(novel_path, output, voice, merge, config):
             novel_path=novel_path,
             output_dir=output,
             merge=merge,
-            voice=voice
+            voice=voice,
+            resume=resume,
+            start_chapter=start_chapter,
+            distributed=distributed,
+            shard=shard
         )
 
         # 显示结果
@@ -88,10 +99,27 @@ def convert(novel_path, output, voice, merge, config):
         click.echo(f"📊 统计:")
         click.echo(f"   - 章节数: {result['chapters']}")
         click.echo(f"   - 音频文件: {result['tasks_completed']}/{result['tasks_total']}")
+        click.echo(f"   - 合成耗时: {result['elapsed_seconds']:.1f}秒 (p99: {result['latency_ms']['p99'] or 0:.0f}ms)")
+
+        if result.get('resumed'):
+            click.echo(f"   - 断点续传: 跳过 {result['resumed']} 个已完成段落")
+
+        if result.get('retries'):
+            click.echo(f"   - 重试: {result['retries']} 次 (预算拒绝 {result['retries_denied']} 次)")
+
+        engine_stats = result.get('engine_stats') or {}
+        if 'hedges' in engine_stats:
+            click.echo(f"   - 对冲请求: {engine_stats['hedges']} (胜出 {engine_stats['hedge_wins']}, 故障转移 {engine_stats['failovers']})")
 
         if result['merged_file']:
             click.echo(f"🎵 合并文件: {result['merged_file']}")
 
+        if result.get('shard_manifest'):
+            click.echo(f"🧩 分片清单: {result['shard_manifest']}")
+
+        if result.get('subtitle_files'):
+            click.echo(f"📝 字幕文件: {len(result['subtitle_files'])} 个")
+
         if result['tasks_failed'] > 0:
             click.echo(f"⚠️  失败: {result['tasks_failed']} 个任务", err=True)
 
@@ -100,25 +128,178 @@ def convert(novel_path, output, voice, merge, config):
         sys.exit(1)
 
 
+@cli.command()
+@click.argument('novel_paths', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--output', '-o', help='输出目录', type=click.Path())
+@click.option('--voice', '-v', help='音色选择')
+@click.option('--merge/--no-merge', default=False, help='是否把每本书合并为单个文件')
+@click.option('--resume/--no-resume', default=True, help='是否跳过上次中断前已完成的段落')
+@click.option('--share', 'shares', multiple=True, help='书籍份额 书名=权重（可重复），未指定的书份额为1')
+@click.option('--config', '-c', help='配置文件路径', type=click.Path())
+def batch(novel_paths, output, voice, merge, resume, shares, config):
+    """
+    同时转换多本小说，各书按份额公平地共享并发
+
+    \b
+    NOVEL_PATHS: 小说文件路径（可多个）
+
+    \b
+    示例:
+        python cli.py batch "三体.txt" "球状闪电.txt"
+        python cli.py batch a.txt b.txt c.txt --share a=3 --share b=1
+    """
+    try:
+        share_map = {}
+        for item in shares:
+            book, _, weight = item.partition('=')
+            if not book or not weight:
+                raise click.BadParameter(f"份额格式应为 书名=权重: {item}")
+            share_map[book] = float(weight)
+
+        converter = NovelToAudio(config_path=config)
+        result = converter.convert_many(
+            list(novel_paths), output_dir=output, merge=merge, voice=voice, resume=resume, shares=share_map
+        )
+
+        click.echo("\n" + "=" * 60)
+        click.echo(f"  ✅ 批量转换完成: {result['tasks_completed']}/{result['tasks_total']} 个段落, "
+                   f"耗时 {result['elapsed_seconds']:.1f}秒")
+        click.echo("=" * 60)
+        for book, stats in result['books'].items():
+            wait = stats.get('wait_ms') or {}
+            click.echo(f"📖 {book} (份额 {stats['share']:g})")
+            click.echo(f"   - 段落: {stats.get('completed', 0)}/{stats.get('tasks', 0)}, "
+                       f"吞吐: {stats.get('chars_per_second', 0):.0f} 字/秒")
+            click.echo(f"   - 排队等待: p50 {wait.get('p50') or 0:.0f}ms, p90 {wait.get('p90') or 0:.0f}ms")
+            if stats.get('merged_file'):
+                click.echo(f"   - 合并文件: {stats['merged_file']}")
+
+        if result['tasks_failed'] > 0:
+            click.echo(f"⚠️  失败: {result['tasks_failed']} 个任务", err=True)
+
+    except Exception as e:
+        click.echo(f"❌ 批量转换失败: {e}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 @click.option('--config', '-c', help='配置文件路径', type=click.Path())
-def voices(config):
+@click.option('--refresh', is_flag=True, help='强制从网络刷新音色目录缓存')
+def voices(config, refresh):
     """
     列出所有可用的TTS音色
 
     \b
     示例:
         python cli.py voices
+        python cli.py voices --refresh
     """
     try:
         converter = NovelToAudio(config_path=config)
-        converter.list_voices()
+        converter.list_voices(refresh=refresh)
 
     except Exception as e:
         click.echo(f"❌ 获取音色列表失败: {e}", err=True)
         sys.exit(1)
 
 
+@cli.command()
+@click.option('--voice', '-v', help='音色选择')
+@click.option('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES), help='测量的段落字数（逗号分隔）')
+@click.option('--repeats', default=3, type=int, help='每个长度的请求次数')
+@click.option('--max-latency', default=10.0, type=float, help='单个段落的延迟上限(秒)')
+@click.option('--save/--no-save', default=True, help='是否把结果写入配置文件')
+@click.option('--config', '-c', help='配置文件路径', type=click.Path())
+def calibrate(voice, sizes, repeats, max_latency, save, config):
+    """
+    测量引擎的请求开销，为当前引擎/音色选择段落长度
+
+    \b
+    示例:
+        python cli.py calibrate
+        python cli.py calibrate -v yunxi --max-latency 5 --repeats 5
+    """
+    try:
+        converter = NovelToAudio(config_path=config)
+        size_list = tuple(int(size) for size in sizes.split(',') if size.strip())
+        click.echo(f"📏 校准段落长度: {len(size_list)} 种长度 x {repeats} 次")
+        result = converter.calibrate_segment_length(
+            sizes=size_list, repeats=repeats, max_latency=max_latency, voice=voice, save=save
+        )
+
+        click.echo(f"\n{'字数':>6}{'延迟中位数(ms)':>16}{'字/秒':>10}")
+        for size in sorted({chars for chars, _ in result.samples}):
+            latencies = sorted(latency for chars, latency in result.samples if chars == size)
+            middle = latencies[len(latencies) // 2]
+            click.echo(f"{size:>6}{middle:>16.0f}{size * 1000 / middle:>10.1f}")
+        click.echo(f"\n固定开销: {result.overhead_ms:.0f}ms, 每字: {result.per_char_ms:.2f}ms")
+        click.echo(f"✅ 段落长度: {result.segment_length} 字 "
+                   f"(预计延迟 {result.predict_latency_ms(result.segment_length) / 1000:.1f}秒, "
+                   f"{result.chars_per_second:.0f} 字/秒/并发)")
+        if save:
+            click.echo(f"   已写入配置 text.segment_lengths: {converter.config.config_path}")
+
+    except Exception as e:
+        click.echo(f"❌ 校准失败: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('book_name')
+@click.option('--output', '-o', help='共享输出根目录（与协调进程的输出目录相同）', type=click.Path())
+@click.option('--exit-when-empty', is_flag=True, help='队列为空时退出')
+@click.option('--config', '-c', help='配置文件路径', type=click.Path())
+def worker(book_name, output, exit_when_empty, config):
+    """
+    作为分布式工作进程合成指定书籍的段落
+
+    \b
+    BOOK_NAME: 书名（小说文件名去掉扩展名，即任务队列名）
+
+    \b
+    示例:
+        python cli.py convert "三体.txt" --distributed
+        python cli.py worker 三体 -o /mnt/shared/output
+    """
+    try:
+        converter = NovelToAudio(config_path=config)
+        click.echo(f"🛠️  工作进程启动: {book_name}")
+        converter.run_worker(book_name, output_dir=output, exit_when_empty=exit_when_empty)
+
+    except KeyboardInterrupt:
+        click.echo("\n⏹️  工作进程已停止")
+    except Exception as e:
+        click.echo(f"❌ 工作进程失败: {e}", err=True)
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument('book_dir', type=click.Path(exists=True, file_okay=False))
+@click.option('--output', '-o', help='合并后的文件路径（默认 <书名>_完整版.<格式>）', type=click.Path())
+@click.option('--config', '-c', help='配置文件路径', type=click.Path())
+def assemble(book_dir, output, config):
+    """
+    校验分片清单并合并各分片的音频
+
+    \b
+    BOOK_DIR: 书籍输出目录（先把各分片机器上该目录的内容复制到一起）
+
+    \b
+    示例:
+        python cli.py convert "三体.txt" --shard 1/4   # 在4台机器上分别运行 1/4 ... 4/4
+        python cli.py assemble ./data/output/三体
+    """
+    try:
+        converter = NovelToAudio(config_path=config)
+        result = converter.assemble(book_dir, output_file=output)
+        click.echo(f"\n✅ 合并成功: {result['merged_file']}")
+        click.echo(f"   - 分片: {result['shards']}, 章节: {result['chapters']}, 音频文件: {result['audio_files']}")
+
+    except Exception as e:
+        click.echo(f"❌ 合并失败: {e}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 @click.argument('audio_path', type=click.Path(exists=True))
 @click.option('--speed', '-s', default=1.0, type=float, help='播放速度 (0.5-2.0)')
@@ -247,6 +428,88 @@ def merge(audio_files, output_path, silence):
         sys.exit(1)
 
 
+@cli.command()
+@click.argument('snapshot_path', required=False, type=click.Path())
+@click.option('--format', '-f', 'output_format', type=click.Choice(['table', 'json', 'prometheus']),
+              default='table', help='输出格式')
+@click.option('--config', '-c', help='配置文件路径', type=click.Path())
+def stats(snapshot_path, output_format, config):
+    """
+    查看最近一次转换的运行指标
+
+    \b
+    SNAPSHOT_PATH: 指标快照文件（默认使用配置中的 metrics.json_path）
+
+    \b
+    示例:
+        python cli.py stats
+        python cli.py stats logs/metrics.json -f prometheus
+    """
+    try:
+        import json
+        from core import ConfigManager
+        from core.metrics import load_snapshot, snapshot_to_prometheus, summarize_snapshot
+
+        if snapshot_path is None:
+            snapshot_path = ConfigManager(config).get('metrics.json_path', '')
+        if not snapshot_path:
+            click.echo("❌ 未配置 metrics.json_path，请在配置中启用JSON快照或指定 SNAPSHOT_PATH", err=True)
+            sys.exit(1)
+        if not Path(snapshot_path).exists():
+            click.echo(f"❌ 指标快照不存在: {snapshot_path}（先运行一次 convert）", err=True)
+            sys.exit(1)
+
+        snapshot = load_snapshot(snapshot_path)
+
+        if output_format == 'json':
+            click.echo(json.dumps(snapshot, ensure_ascii=False, indent=2))
+            return
+        if output_format == 'prometheus':
+            click.echo(snapshot_to_prometheus(snapshot), nl=False)
+            return
+
+        def ms(seconds):
+            return f"{seconds * 1000:.0f}ms" if seconds is not None else "-"
+
+        summary = summarize_snapshot(snapshot)
+        click.echo(f"📈 运行指标: {snapshot_path}")
+        click.echo("=" * 60)
+
+        click.echo("⏱️  处理阶段:")
+        for stage, data in summary['stages'].items():
+            click.echo(f"   - {stage:<18} {data['count']:>5} 次  共 {data['total_seconds']:.2f}秒  p50 {ms(data['p50'])}")
+
+        tasks = summary['tasks']
+        click.echo("🧩 任务:")
+        click.echo(f"   - 完成 {tasks['completed']:.0f} | 失败 {tasks['failed']:.0f} | 断点续传 {tasks['resumed']:.0f} | 重试 {tasks['retries']:.0f}")
+        click.echo(f"   - 吞吐: {tasks['chars_per_second']:.1f} 字符/秒")
+        click.echo(f"   - 队列深度: {tasks['queue_depth']:.0f} | 合成中: {tasks['in_flight']:.0f}")
+        if tasks['segment']:
+            click.echo(f"   - 段落耗时: p50 {ms(tasks['segment']['p50'])} | p99 {ms(tasks['segment']['p99'])}")
+
+        click.echo("🔊 TTS引擎:")
+        for engine, data in summary['engines'].items():
+            click.echo(
+                f"   - {engine}: 成功 {data['success']:.0f} | 失败 {data['failure']:.0f} | 取消 {data['cancelled']:.0f}"
+                f" | 进行中 {data['in_flight']:.0f} | p50 {ms(data['p50'])} | p99 {ms(data['p99'])}"
+            )
+
+        if summary['caches']:
+            click.echo("🗂️  缓存命中率:")
+            for cache, data in summary['caches'].items():
+                rate = f"{data['hit_rate']:.1%}" if data['hit_rate'] is not None else "-"
+                click.echo(f"   - {cache}: {rate} ({data['hit']:.0f}/{data['hit'] + data['miss']:.0f})")
+
+        if summary['bytes_written']:
+            click.echo("💾 写出字节数:")
+            for component, size in summary['bytes_written'].items():
+                click.echo(f"   - {component}: {size / 1024 / 1024:.2f} MB")
+
+    except Exception as e:
+        click.echo(f"❌ 读取运行指标失败: {e}", err=True)
+        sys.exit(1)
+
+
 @cli.command()
 def config_show():
     """
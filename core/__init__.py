@@ -3,5 +3,15 @@
 """
 from .config_manager import ConfigManager
 from .task_manager import TaskManager
+from .latency_tracker import LatencyHistogram, LatencyTracker
+from .loop_runner import LoopRunner, get_loop_runner, run_sync
+from .retry_policy import RetryBudget, RetryPolicy
+from .deadline_policy import DeadlinePolicy, StragglerDetector
+from .duration_model import DurationModel
+from .job_journal import JobJournal
+from .play_ahead import PlayAheadScheduler
+from .fair_share import FairShareScheduler
+from .progress_events import ProgressEventStream
+from .metrics import MetricsRegistry, get_registry
 
-__all__ = ['ConfigManager', 'TaskManager']
+__all__ = ['ConfigManager', 'TaskManager', 'LatencyTracker', 'LatencyHistogram', 'LoopRunner', 'get_loop_runner', 'run_sync', 'RetryBudget', 'RetryPolicy', 'DeadlinePolicy', 'StragglerDetector', 'DurationModel', 'JobJournal', 'PlayAheadScheduler', 'FairShareScheduler', 'ProgressEventStream', 'MetricsRegistry', 'get_registry']
@@ -0,0 +1,128 @@
+"""
+截止时间与慢任务策略
+按文本长度为每次合成尝试设置截止时间；运行时间远超已观测延迟分布的任务视为慢任务（straggler），
+发出一份推测执行的副本，先成功者胜出
+"""
+from typing import Optional
+
+from .latency_tracker import LatencyTracker
+
+
+class StragglerDetector:
+    """
+    慢任务检测器
+
+    按每字符延迟的分位数估计任务的预期耗时；短文本的耗时主要是固定开销，
+    因此阈值不低于整体延迟的同一分位数
+    """
+
+    def __init__(self, percentile: float = 95.0, factor: float = 2.0, min_samples: int = 20):
+        """
+        初始化慢任务检测器
+
+        Args:
+            percentile: 参考的延迟分位数
+            factor: 超过预期耗时的倍数后视为慢任务
+            min_samples: 样本数不足时不判定慢任务
+        """
+        self.percentile = percentile
+        self.factor = factor
+        self.latency = LatencyTracker(min_samples=min_samples)
+        self.latency_per_char = LatencyTracker(min_samples=min_samples)
+
+    def record(self, latency_ms: float, char_count: int):
+        """
+        记录一次成功合成的耗时
+
+        Args:
+            latency_ms: 耗时(毫秒)
+            char_count: 文本字符数
+        """
+        self.latency.record(latency_ms)
+        self.latency_per_char.record(latency_ms / max(1, char_count))
+
+    def threshold(self, char_count: int) -> Optional[float]:
+        """
+        计算慢任务阈值
+
+        Args:
+            char_count: 文本字符数
+
+        Returns:
+            运行超过该时间(秒)视为慢任务，样本不足时返回None
+        """
+        per_char = self.latency_per_char.percentile(self.percentile)
+        overall = self.latency.percentile(self.percentile)
+        if per_char is None or overall is None:
+            return None
+        return self.factor * max(per_char * char_count, overall) / 1000.0
+
+
+class DeadlinePolicy:
+    """截止时间与推测执行策略"""
+
+    def __init__(
+        self,
+        base_seconds: float = 30.0,
+        seconds_per_char: float = 0.1,
+        speculate: bool = True,
+        straggler_percentile: float = 95.0,
+        straggler_factor: float = 2.0,
+        min_samples: int = 20,
+        max_speculative: int = 2,
+        recheck_seconds: float = 1.0
+    ):
+        """
+        初始化策略
+
+        Args:
+            base_seconds: 截止时间的固定部分(秒)，0则不设截止时间
+            seconds_per_char: 每字符增加的截止时间(秒)
+            speculate: 是否对慢任务发出推测执行的副本
+            straggler_percentile: 慢任务判定参考的延迟分位数
+            straggler_factor: 超过预期耗时的倍数后视为慢任务
+            min_samples: 开始判定慢任务前需要的成功样本数
+            max_speculative: 同时运行的推测副本上限（副本不占用工作协程，但会增加引擎负载）
+            recheck_seconds: 样本不足或副本已满时重新检查慢任务的间隔(秒)
+        """
+        self.base_seconds = base_seconds
+        self.seconds_per_char = seconds_per_char
+        self.speculate = speculate
+        self.straggler_percentile = straggler_percentile
+        self.straggler_factor = straggler_factor
+        self.min_samples = min_samples
+        self.max_speculative = max(0, max_speculative)
+        self.recheck_seconds = recheck_seconds
+
+    def deadline(self, char_count: int) -> Optional[float]:
+        """
+        计算一次合成尝试的截止时间
+
+        Args:
+            char_count: 文本字符数
+
+        Returns:
+            截止时间(秒)，未启用时返回None
+        """
+        if self.base_seconds <= 0:
+            return None
+        return self.base_seconds + self.seconds_per_char * char_count
+
+    def new_detector(self) -> StragglerDetector:
+        """
+        为一个任务批次创建慢任务检测器
+
+        Returns:
+            StragglerDetector实例
+        """
+        return StragglerDetector(self.straggler_percentile, self.straggler_factor, self.min_samples)
+
+
+if __name__ == '__main__':
+    # 测试代码
+    policy = DeadlinePolicy(min_samples=5)
+    detector = policy.new_detector()
+    for chars in (100, 200, 300, 400, 500):
+        detector.record(chars * 10.0, chars)
+    print("截止时间(500字):", policy.deadline(500))
+    print("慢任务阈值(50字/500字):", detector.threshold(50), detector.threshold(500))
@@ -0,0 +1,658 @@
+"""
+分布式任务队列
+协调进程把段落任务写入Redis，多台机器上的工作进程领取任务、合成并回报结果。
+领取的任务带可见性超时（租约），工作进程崩溃或失联后租约过期，任务自动回到待执行队列。
+
+Redis键（前缀为 novel:<队列名>）:
+    :tasks     hash  任务ID -> 任务JSON
+    :pending   list  待执行的任务ID
+    :leases    zset  已领取的任务ID -> 租约到期时间戳
+    :attempts  hash  任务ID -> 领取次数
+    :done      hash  任务ID -> 最终结果JSON（completed/failed）
+    :results   list  尚未被协调进程读取的结果JSON
+    :job       hash  任务批次参数（音色、语速等）和批次指纹
+"""
+import asyncio
+import functools
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from loguru import logger
+
+
+# 领取任务：取出待执行的任务ID并登记租约、增加领取次数，在Redis中一步完成，
+# 不存在“已取出但还没有租约”的中间状态（否则 requeue_lost 会把它重新入队，导致重复执行）
+# KEYS: pending, done, tasks, leases, attempts  ARGV: 租约到期时间戳
+# 返回 {任务ID, 任务JSON, 领取次数}，队列为空时返回nil
+CLAIM_SCRIPT = """
+while true do
+    local task_id = redis.call('LPOP', KEYS[1])
+    if not task_id then
+        return nil
+    end
+    if redis.call('HEXISTS', KEYS[2], task_id) == 0 then
+        local raw = redis.call('HGET', KEYS[3], task_id)
+        if raw then
+            redis.call('ZADD', KEYS[4], ARGV[1], task_id)
+            local attempt = redis.call('HINCRBY', KEYS[5], task_id, 1)
+            return {task_id, raw, attempt}
+        end
+    end
+end
+"""
+
+
+def _claim_in_memory(db: 'InMemoryRedis', keys: List[str], args: List) -> Optional[List]:
+    """CLAIM_SCRIPT 的Python实现（InMemoryRedis 在持有锁时调用）"""
+    pending, done, tasks, leases, attempts = keys
+    while True:
+        task_id = db.lpop(pending)
+        if task_id is None:
+            return None
+        if db.hget(done, task_id) is not None:
+            continue  # 重复入队的已结束任务
+        raw = db.hget(tasks, task_id)
+        if raw is not None:
+            db.zadd(leases, {task_id: float(args[0])})
+            return [task_id, raw, db.hincrby(attempts, task_id, 1)]
+
+
+class InMemoryRedis:
+    """
+    进程内的Redis替身，只实现任务队列用到的命令（线程安全）
+
+    用于测试和单机调试，行为与 redis.Redis(decode_responses=True) 一致；
+    Lua脚本由 SCRIPTS 中注册的Python实现代替，执行期间持有锁（与Redis执行脚本一样是原子的）
+    """
+
+    SCRIPTS: Dict[str, Callable] = {}
+
+    def __init__(self):
+        """初始化空数据库"""
+        self._data: Dict[str, Any] = {}
+        self._lock = threading.RLock()
+
+    def _get(self, key: str, factory):
+        value = self._data.get(key)
+        if value is None:
+            value = self._data[key] = factory()
+        return value
+
+    def ping(self) -> bool:
+        return True
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(1 for key in keys if self._data.pop(key, None) is not None)
+
+    # list
+    def rpush(self, key: str, *values) -> int:
+        with self._lock:
+            items = self._get(key, list)
+            items.extend(str(value) for value in values)
+            return len(items)
+
+    def lpop(self, key: str) -> Optional[str]:
+        with self._lock:
+            items = self._data.get(key)
+            if not items:
+                return None
+            value = items.pop(0)
+            if not items:
+                del self._data[key]
+            return value
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key) or [])
+
+    def lrange(self, key: str, start: int, end: int) -> List[str]:
+        with self._lock:
+            items = self._data.get(key) or []
+            return list(items[start:] if end == -1 else items[start:end + 1])
+
+    # hash
+    def hset(self, key: str, field: str = None, value=None, mapping: Dict = None) -> int:
+        with self._lock:
+            table = self._get(key, dict)
+            updates = dict(mapping or {})
+            if field is not None:
+                updates[field] = value
+            added = sum(1 for name in updates if str(name) not in table)
+            table.update({str(name): str(val) for name, val in updates.items()})
+            return added
+
+    def hsetnx(self, key: str, field: str, value) -> int:
+        with self._lock:
+            table = self._get(key, dict)
+            if str(field) in table:
+                return 0
+            table[str(field)] = str(value)
+            return 1
+
+    def hdel(self, key: str, *fields) -> int:
+        with self._lock:
+            table = self._data.get(key) or {}
+            return sum(1 for field in fields if table.pop(str(field), None) is not None)
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        with self._lock:
+            return (self._data.get(key) or {}).get(str(field))
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._data.get(key) or {})
+
+    def hkeys(self, key: str) -> List[str]:
+        with self._lock:
+            return list(self._data.get(key) or {})
+
+    def hlen(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key) or {})
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            table = self._get(key, dict)
+            value = int(table.get(str(field), 0)) + amount
+            table[str(field)] = str(value)
+            return value
+
+    # sorted set
+    def zadd(self, key: str, mapping: Dict, xx: bool = False) -> int:
+        with self._lock:
+            members = self._get(key, dict)
+            added = 0
+            for member, score in mapping.items():
+                if xx and str(member) not in members:
+                    continue
+                added += str(member) not in members
+                members[str(member)] = float(score)
+            if not members:
+                del self._data[key]
+            return added
+
+    def zrem(self, key: str, *members) -> int:
+        with self._lock:
+            table = self._data.get(key) or {}
+            return sum(1 for member in members if table.pop(str(member), None) is not None)
+
+    def zrangebyscore(self, key: str, min_score, max_score, start: int = None, num: int = None) -> List[str]:
+        with self._lock:
+            low = float('-inf') if min_score == '-inf' else float(min_score)
+            high = float('inf') if max_score == '+inf' else float(max_score)
+            items = sorted(
+                (score, member) for member, score in (self._data.get(key) or {}).items() if low <= score <= high
+            )
+            members = [member for _, member in items]
+            if start is not None and num is not None:
+                members = members[start:start + num]
+            return members
+
+    def zscore(self, key: str, member: str) -> Optional[float]:
+        with self._lock:
+            return (self._data.get(key) or {}).get(str(member))
+
+    def zcard(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key) or {})
+
+    # script
+    def register_script(self, script: str) -> Callable:
+        implementation = self.SCRIPTS[script]
+
+        def run(keys=(), args=(), client=None):
+            with self._lock:
+                return implementation(self, list(keys), list(args))
+        return run
+
+    def close(self):
+        pass
+
+
+InMemoryRedis.SCRIPTS[CLAIM_SCRIPT] = _claim_in_memory
+
+
+class RedisWorkQueue:
+    """带可见性超时的可靠任务队列"""
+
+    def __init__(
+        self,
+        client,
+        name: str,
+        visibility_timeout: float = 300.0,
+        max_attempts: int = 3
+    ):
+        """
+        初始化任务队列
+
+        Args:
+            client: redis.Redis(decode_responses=True)、已连接的 utils.db_client.RedisClient 或 InMemoryRedis
+            name: 队列名（每本书一个队列）
+            visibility_timeout: 租约时长(秒)，工作进程在此时间内没有续约则任务重新入队
+            max_attempts: 单个任务最多领取次数（含租约过期后的重新领取）
+        """
+        # utils.db_client.RedisClient 把 redis 连接放在 client 属性上
+        self.redis = getattr(client, 'client', None) or client
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.prefix = f"novel:{name}"
+        self._claim_script = self.redis.register_script(CLAIM_SCRIPT)
+
+    def _key(self, suffix: str) -> str:
+        return f"{self.prefix}:{suffix}"
+
+    # ---- 协调进程 ----
+
+    def push(self, tasks: Iterable[Dict]) -> int:
+        """
+        写入任务（已存在的任务ID会被跳过，协调进程重启后可重复调用）
+
+        Args:
+            tasks: 任务字典，必须包含 task_id
+
+        Returns:
+            新写入的任务数
+        """
+        count = 0
+        for task in tasks:
+            task_id = str(task['task_id'])
+            if self.redis.hsetnx(self._key('tasks'), task_id, json.dumps(task, ensure_ascii=False)):
+                self.redis.rpush(self._key('pending'), task_id)
+                count += 1
+        logger.info(f"任务队列 {self.name}: 写入 {count} 个任务")
+        return count
+
+    def set_job_info(self, info: Dict):
+        """
+        保存任务批次参数（工作进程据此设置音色、语速等）
+
+        Args:
+            info: 参数字典
+        """
+        self.redis.hset(self._key('job'), mapping={key: json.dumps(value) for key, value in info.items()})
+
+    def start_job(self, info: Dict, fingerprint: str, resume: bool = True) -> bool:
+        """
+        开始或继续一个任务批次（协调进程在写入任务前调用）
+
+        resume为False，或批次指纹（音色、语速、分段等）与队列中记录的不同时清空队列，所有任务重新合成；
+        否则保留已完成的结果，上次最终失败的任务重新入队
+
+        Args:
+            info: 任务批次参数（见 set_job_info）
+            fingerprint: 批次指纹
+            resume: 是否继续上次的进度
+
+        Returns:
+            是否清空了队列
+        """
+        previous = self.get_job_info().get('fingerprint')
+        reset = not resume or previous != fingerprint
+        if reset:
+            if self.redis.hlen(self._key('tasks')):
+                reason = "不继续上次进度" if not resume else "批次参数或分段已变化"
+                logger.info(f"任务队列 {self.name}: {reason}，清空队列重新合成")
+            self.clear()
+        else:
+            self._requeue_failed()
+        self.set_job_info({**info, 'fingerprint': fingerprint})
+        return reset
+
+    def _requeue_failed(self) -> int:
+        """把最终失败的任务重新入队（领取次数清零）"""
+        count = 0
+        for task_id, raw in self.redis.hgetall(self._key('done')).items():
+            if json.loads(raw).get('status') == 'failed':
+                self.redis.hdel(self._key('done'), task_id)
+                self.redis.hdel(self._key('attempts'), task_id)
+                self.redis.rpush(self._key('pending'), task_id)
+                count += 1
+        if count:
+            logger.info(f"任务队列 {self.name}: {count} 个失败任务重新入队")
+        return count
+
+    def get_job_info(self) -> Dict:
+        """
+        读取任务批次参数
+
+        Returns:
+            参数字典
+        """
+        return {key: json.loads(value) for key, value in self.redis.hgetall(self._key('job')).items()}
+
+    def pop_results(self, limit: int = 1000) -> List[Dict]:
+        """
+        读取新的任务结果
+
+        Args:
+            limit: 最多读取条数
+
+        Returns:
+            结果列表
+        """
+        results = []
+        for _ in range(limit):
+            raw = self.redis.lpop(self._key('results'))
+            if raw is None:
+                break
+            results.append(json.loads(raw))
+        return results
+
+    def finished(self) -> Dict[str, Dict]:
+        """
+        读取所有已结束任务的最终结果（协调进程重启后用于恢复进度）
+
+        Returns:
+            {任务ID: 结果}
+        """
+        return {task_id: json.loads(raw) for task_id, raw in self.redis.hgetall(self._key('done')).items()}
+
+    def requeue_expired(self) -> int:
+        """
+        把租约过期的任务放回待执行队列
+
+        Returns:
+            重新入队的任务数
+        """
+        count = 0
+        for task_id in self.redis.zrangebyscore(self._key('leases'), '-inf', time.time()):
+            # zrem 成功的一方负责重新入队，避免多个进程重复入队
+            if self.redis.zrem(self._key('leases'), task_id):
+                if self.redis.hget(self._key('done'), task_id) is None:
+                    logger.warning(f"任务 {task_id} 租约过期，重新入队")
+                    self._retry_or_fail(task_id, "租约过期")
+                    count += 1
+        return count
+
+    def requeue_lost(self) -> int:
+        """
+        把既不在待执行队列、也没有租约且尚未结束的任务重新入队
+        （协调进程在写入任务和加入待执行队列之间退出时会出现；领取任务是原子的，不会产生这种状态）
+
+        Returns:
+            重新入队的任务数
+        """
+        known = set(self.redis.hkeys(self._key('tasks')))
+        accounted = set(self.redis.hkeys(self._key('done')))
+        accounted |= set(self.redis.lrange(self._key('pending'), 0, -1))
+        accounted |= set(self.redis.zrangebyscore(self._key('leases'), '-inf', '+inf'))
+        lost = sorted(known - accounted)
+        for task_id in lost:
+            self.redis.rpush(self._key('pending'), task_id)
+        if lost:
+            logger.warning(f"任务队列 {self.name}: 找回 {len(lost)} 个丢失的任务")
+        return len(lost)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        队列状态
+
+        Returns:
+            {total, pending, leased, done}
+        """
+        return {
+            'total': self.redis.hlen(self._key('tasks')),
+            'pending': self.redis.llen(self._key('pending')),
+            'leased': self.redis.zcard(self._key('leases')),
+            'done': self.redis.hlen(self._key('done'))
+        }
+
+    def clear(self):
+        """删除队列的所有数据"""
+        self.redis.delete(*[self._key(suffix) for suffix in
+                            ('tasks', 'pending', 'leases', 'attempts', 'done', 'results', 'job')])
+
+    # ---- 工作进程 ----
+
+    def claim(self) -> Optional[Dict]:
+        """
+        领取一个任务并登记租约
+
+        Returns:
+            任务字典（附带 attempt 字段），队列为空时返回None
+        """
+        self.requeue_expired()
+        claimed = self._claim_script(
+            keys=[self._key(suffix) for suffix in ('pending', 'done', 'tasks', 'leases', 'attempts')],
+            args=[time.time() + self.visibility_timeout]
+        )
+        if not claimed:
+            return None
+        task_id, raw, attempt = claimed
+        task = json.loads(raw)
+        task['attempt'] = int(attempt)
+        return task
+
+    def extend_lease(self, task_id) -> bool:
+        """
+        续约（合成耗时较长时由工作进程定期调用）
+
+        Args:
+            task_id: 任务ID
+
+        Returns:
+            租约是否仍然有效
+        """
+        if self.redis.zscore(self._key('leases'), str(task_id)) is None:
+            return False
+        self.redis.zadd(self._key('leases'), {str(task_id): time.time() + self.visibility_timeout}, xx=True)
+        return True
+
+    def complete(self, task_id, result: Optional[Dict] = None) -> bool:
+        """
+        报告任务成功
+
+        Args:
+            task_id: 任务ID
+            result: 附加结果信息
+
+        Returns:
+            是否被采纳（任务已被其他工作进程完成时返回False）
+        """
+        return self._finish(str(task_id), {**(result or {}), 'status': 'completed'})
+
+    def fail(self, task_id, error: str, retryable: bool = True, result: Optional[Dict] = None) -> bool:
+        """
+        报告任务失败（可重试且未超过最多次数时重新入队）
+
+        Args:
+            task_id: 任务ID
+            error: 错误信息
+            retryable: 是否可重试
+            result: 附加结果信息
+
+        Returns:
+            是否为最终失败
+        """
+        task_id = str(task_id)
+        self.redis.zrem(self._key('leases'), task_id)
+        if retryable:
+            return self._retry_or_fail(task_id, error, result)
+        return self._finish(task_id, {**(result or {}), 'status': 'failed', 'error': error})
+
+    def _retry_or_fail(self, task_id: str, error: str, result: Optional[Dict] = None) -> bool:
+        """领取次数未用完时重新入队，否则记为最终失败"""
+        attempts = int(self.redis.hget(self._key('attempts'), task_id) or 0)
+        if attempts < self.max_attempts:
+            self.redis.rpush(self._key('pending'), task_id)
+            return False
+        return self._finish(task_id, {**(result or {}), 'status': 'failed', 'error': error})
+
+    def _finish(self, task_id: str, result: Dict) -> bool:
+        """写入最终结果（每个任务只采纳第一次结果）"""
+        self.redis.zrem(self._key('leases'), task_id)
+        result = {**result, 'task_id': task_id,
+                  'attempts': int(self.redis.hget(self._key('attempts'), task_id) or 0)}
+        payload = json.dumps(result, ensure_ascii=False)
+        if not self.redis.hsetnx(self._key('done'), task_id, payload):
+            return False
+        self.redis.rpush(self._key('results'), payload)
+        return True
+
+
+class DistributedWorker:
+    """从任务队列领取段落并合成的工作进程"""
+
+    def __init__(
+        self,
+        work_queue: RedisWorkQueue,
+        tts_engine,
+        output_root: str,
+        max_workers: int = 4,
+        poll_interval: float = 1.0,
+        worker_id: Optional[str] = None
+    ):
+        """
+        初始化工作进程
+
+        Args:
+            work_queue: 任务队列
+            tts_engine: TTS引擎实例
+            output_root: 共享输出目录（任务中的相对路径基于此目录）
+            max_workers: 并发合成数
+            poll_interval: 队列为空时的轮询间隔(秒)
+            worker_id: 工作进程标识（默认 主机名:进程号）
+        """
+        self.queue = work_queue
+        self.tts_engine = tts_engine
+        self.output_root = Path(output_root)
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.completed_count = 0
+        self.failed_count = 0
+        self._stop = False
+
+    def stop(self):
+        """处理完进行中的任务后停止"""
+        self._stop = True
+
+    def apply_job_info(self):
+        """按任务批次参数设置音色和语速等"""
+        info = self.queue.get_job_info()
+        if info.get('voice'):
+            self.tts_engine.set_voice(info['voice'])
+        for key, setter in (('rate', 'set_rate'), ('volume', 'set_volume'), ('pitch', 'set_pitch')):
+            if info.get(key) is not None:
+                getattr(self.tts_engine, setter)(info[key])
+
+    def resolve_path(self, output_path: str) -> Path:
+        """任务中的相对输出路径转换为本机路径"""
+        path = Path(output_path)
+        return path if path.is_absolute() else self.output_root / path
+
+    async def run_async(self, exit_when_empty: bool = False):
+        """
+        运行工作进程
+
+        Args:
+            exit_when_empty: 队列为空且没有进行中的任务时退出（否则持续轮询直到 stop）
+        """
+        logger.info(f"工作进程 {self.worker_id} 启动 (并发: {self.max_workers})")
+        loop = asyncio.get_running_loop()
+
+        async def call(func, *args):
+            """Redis命令是阻塞调用，放到线程池中执行，不阻塞同一事件循环中的合成和续约"""
+            return await loop.run_in_executor(None, functools.partial(func, *args))
+
+        await call(self.apply_job_info)
+        active = {'count': 0}
+
+        async def heartbeat(task_id, synthesis: asyncio.Future, lease: Dict):
+            """合成期间定期续约；租约已失效（任务已重新入队给其他工作进程）时放弃本次合成"""
+            while True:
+                await asyncio.sleep(self.queue.visibility_timeout / 3)
+                if not await call(self.queue.extend_lease, task_id):
+                    lease['lost'] = True
+                    synthesis.cancel()
+                    return
+
+        async def worker():
+            while not self._stop:
+                task = await call(self.queue.claim)
+                if task is None:
+                    if exit_when_empty and active['count'] == 0:
+                        return
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                active['count'] += 1
+                task_id = task['task_id']
+                output_file = self.resolve_path(task['output_path'])
+                # 先写临时文件，确认租约仍然有效后再替换，失去租约的旧领取者不会覆盖新领取者的结果
+                part_name = f"{output_file.stem}.{uuid.uuid4().hex[:8]}.part{output_file.suffix}"
+                partial = output_file.with_name(part_name)
+                lease = {'lost': False}
+                start = time.monotonic()
+                try:
+                    output_file.parent.mkdir(parents=True, exist_ok=True)
+                    synthesis = asyncio.ensure_future(self.tts_engine.synthesize(task['text'], str(partial)))
+                    keeper = asyncio.ensure_future(heartbeat(task_id, synthesis, lease))
+                    try:
+                        success = await synthesis
+                        error = None if success else "合成失败"
+                    except asyncio.CancelledError:
+                        if not lease['lost']:
+                            synthesis.cancel()
+                            raise
+                        success, error = False, "租约失效"
+                    finally:
+                        keeper.cancel()
+                except asyncio.CancelledError:
+                    partial.unlink(missing_ok=True)
+                    raise
+                except Exception as e:
+                    success, error = False, str(e)
+                finally:
+                    active['count'] -= 1
+
+                if lease['lost'] or (success and not await call(self.queue.extend_lease, task_id)):
+                    partial.unlink(missing_ok=True)
+                    logger.warning(f"任务 {task_id} 的租约已失效，放弃本次结果（任务已交给其他工作进程）")
+                    continue
+
+                result = {'worker': self.worker_id, 'elapsed': time.monotonic() - start}
+                if success:
+                    os.replace(partial, output_file)
+                    await call(self.queue.complete, task_id, result)
+                    self.completed_count += 1
+                else:
+                    partial.unlink(missing_ok=True)
+                    if await call(functools.partial(self.queue.fail, task_id, error, result=result)):
+                        self.failed_count += 1
+                    logger.warning(f"任务 {task_id} 第{task['attempt']}次失败: {error}")
+
+        await asyncio.gather(*[worker() for _ in range(self.max_workers)])
+        logger.info(f"工作进程 {self.worker_id} 退出: 完成 {self.completed_count}, 失败 {self.failed_count}")
+
+    def run(self, exit_when_empty: bool = False):
+        """
+        同步运行工作进程（阻塞）
+
+        Args:
+            exit_when_empty: 队列为空时退出
+        """
+        from .loop_runner import run_sync
+        run_sync(self.run_async(exit_when_empty))
+
+
+if __name__ == '__main__':
+    # 测试代码
+    demo_queue = RedisWorkQueue(InMemoryRedis(), "demo", visibility_timeout=0.1)
+    demo_queue.push({'task_id': i, 'text': f"段落{i}", 'output_path': f"{i}.mp3"} for i in range(3))
+
+    first = demo_queue.claim()
+    time.sleep(0.2)  # 租约过期，任务重新入队
+    print("领取:", first['task_id'], demo_queue.stats())
+    item = demo_queue.claim()
+    while item is not None:
+        demo_queue.complete(item['task_id'])
+        item = demo_queue.claim()
+    print("结果:", [r['task_id'] for r in demo_queue.pop_results()], demo_queue.stats())
@@ -0,0 +1,252 @@
+"""
+段落时长模型
+按音色/语速分别用一元线性回归拟合 字数 -> 合成延迟、字数 -> 音频时长，拟合结果保存在JSON文件中，
+下次转换时用于预测每个段落的合成耗时（最长优先排序）
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from loguru import logger
+
+
+MODEL_VERSION = 1
+
+# 没有历史数据时的默认值：固定延迟300ms + 每字20ms，正常语速每秒约4个汉字
+DEFAULT_LATENCY = (300.0, 20.0)
+DEFAULT_SECONDS_PER_CHAR = 0.25
+
+
+class LinearFit:
+    """在线一元线性回归（只保存累加量，可合并、可持久化）"""
+
+    def __init__(self, n: int = 0, sx: float = 0.0, sy: float = 0.0, sxx: float = 0.0, sxy: float = 0.0):
+        self.n = n
+        self.sx = sx
+        self.sy = sy
+        self.sxx = sxx
+        self.sxy = sxy
+
+    def add(self, x: float, y: float):
+        """
+        加入一个样本
+
+        Args:
+            x: 自变量（字数）
+            y: 因变量
+        """
+        self.n += 1
+        self.sx += x
+        self.sy += y
+        self.sxx += x * x
+        self.sxy += x * y
+
+    def coefficients(self) -> Optional[Tuple[float, float]]:
+        """
+        最小二乘系数
+
+        Returns:
+            (截距, 斜率)，没有样本时返回None；字数全部相同时退化为过原点的比例关系
+        """
+        if self.n == 0:
+            return None
+        variance = self.n * self.sxx - self.sx * self.sx
+        if variance <= 1e-9 * max(1.0, self.sxx):
+            return 0.0, self.sy / self.sx if self.sx else 0.0
+        slope = (self.n * self.sxy - self.sx * self.sy) / variance
+        intercept = (self.sy - slope * self.sx) / self.n
+        if slope < 0:
+            # 字数越多耗时越少不合理（样本太少或噪声太大），改用均值
+            return self.sy / self.n, 0.0
+        return intercept, slope
+
+    def predict(self, x: float) -> Optional[float]:
+        """预测（没有样本时返回None）"""
+        coefficients = self.coefficients()
+        if coefficients is None:
+            return None
+        intercept, slope = coefficients
+        return max(0.0, intercept + slope * x)
+
+    def to_dict(self) -> Dict:
+        return {'n': self.n, 'sx': self.sx, 'sy': self.sy, 'sxx': self.sxx, 'sxy': self.sxy}
+
+
+class DurationModel:
+    """
+    段落时长模型
+
+    预测时优先使用相同音色和语速的拟合；样本不足时使用所有音色的汇总拟合
+    （音频时长先按语速折算到1倍速再汇总）；仍不足时使用默认值
+    """
+
+    POOLED = "*"
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, min_samples: int = 20):
+        """
+        初始化时长模型
+
+        Args:
+            path: 模型文件路径（None则只在内存中使用），文件存在时加载历史拟合
+            min_samples: 某个音色的样本数达到后才使用它自己的拟合
+        """
+        self.path = Path(path) if path else None
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._latency: Dict[str, LinearFit] = {}
+        self._audio: Dict[str, LinearFit] = {}
+        if self.path and self.path.exists():
+            self._load()
+
+    @staticmethod
+    def key(voice: str, rate: float) -> str:
+        """拟合的键（音色@语速）"""
+        return f"{voice}@{rate:g}"
+
+    def observe(
+        self,
+        chars: int,
+        latency_ms: Optional[float] = None,
+        audio_seconds: Optional[float] = None,
+        voice: str = "",
+        rate: float = 1.0
+    ):
+        """
+        记录一个已完成段落（线程安全）
+
+        Args:
+            chars: 字数
+            latency_ms: 合成延迟(毫秒)
+            audio_seconds: 音频时长(秒)
+            voice: 音色
+            rate: 语速
+        """
+        key = self.key(voice, rate)
+        with self._lock:
+            if latency_ms is not None:
+                self._latency.setdefault(key, LinearFit()).add(chars, latency_ms)
+                self._latency.setdefault(self.POOLED, LinearFit()).add(chars, latency_ms)
+            if audio_seconds is not None:
+                self._audio.setdefault(key, LinearFit()).add(chars, audio_seconds)
+                self._audio.setdefault(self.POOLED, LinearFit()).add(chars, audio_seconds * rate)
+
+    def samples(self, voice: Optional[str] = None, rate: float = 1.0) -> int:
+        """
+        延迟样本数
+
+        Args:
+            voice: 音色（None则返回所有音色的总数）
+            rate: 语速
+
+        Returns:
+            样本数
+        """
+        key = self.POOLED if voice is None else self.key(voice, rate)
+        with self._lock:
+            fit = self._latency.get(key)
+            return fit.n if fit else 0
+
+    def predict(self, chars: int, voice: str = "", rate: float = 1.0) -> Tuple[float, float]:
+        """
+        预测段落的合成延迟和音频时长
+
+        Args:
+            chars: 字数
+            voice: 音色
+            rate: 语速
+
+        Returns:
+            (合成延迟(毫秒), 音频时长(秒))
+        """
+        key = self.key(voice, rate)
+        with self._lock:
+            latency_fit = self._pick(self._latency, key)
+            latency = latency_fit.predict(chars) if latency_fit else None
+            audio_fit = self._pick(self._audio, key)
+            audio = audio_fit.predict(chars) if audio_fit else None
+            if audio is not None and audio_fit is self._audio.get(self.POOLED):
+                audio /= rate or 1.0
+        if latency is None:
+            latency = DEFAULT_LATENCY[0] + DEFAULT_LATENCY[1] * chars
+        if audio is None:
+            audio = DEFAULT_SECONDS_PER_CHAR * chars / (rate or 1.0)
+        return latency, audio
+
+    def _pick(self, fits: Dict[str, LinearFit], key: str) -> Optional[LinearFit]:
+        """选择拟合：自己的样本足够则用自己的，否则用汇总拟合（调用方持有锁）"""
+        for candidate in (key, self.POOLED):
+            fit = fits.get(candidate)
+            if fit is not None and fit.n >= self.min_samples:
+                return fit
+        return None
+
+    def order_longest_first(self, tasks: Iterable, voice: str = "", rate: float = 1.0) -> List:
+        """
+        按预测的合成延迟从长到短排列任务（最长处理时间优先 LPT）
+
+        并发执行时长段落先开始，末尾只剩短段落，整批完成时间更接近 总耗时 / 并发数；
+        预测相同的任务保持原顺序。渐进分段的短段落（metadata 含 progressive）按原顺序排在最前面，
+        它们决定第一段音频的等待时间，不能被排到队尾
+
+        Args:
+            tasks: 任务列表（TTSTask）
+            voice: 音色
+            rate: 语速
+
+        Returns:
+            排序后的任务列表
+        """
+        tasks = list(tasks)
+        ramp = [task for task in tasks if getattr(task, 'metadata', {}).get('progressive')]
+        rest = [task for task in tasks if not getattr(task, 'metadata', {}).get('progressive')]
+        predicted = {id(task): self.predict(len(task.text), voice, rate)[0] for task in rest}
+        return ramp + sorted(rest, key=lambda task: -predicted[id(task)])
+
+    def save(self) -> Optional[Path]:
+        """
+        保存拟合结果（先写临时文件再替换）
+
+        Returns:
+            模型文件路径，未配置路径时返回None
+        """
+        if self.path is None:
+            return None
+        with self._lock:
+            data = {
+                'version': MODEL_VERSION,
+                'latency_ms': {key: fit.to_dict() for key, fit in self._latency.items()},
+                'audio_seconds': {key: fit.to_dict() for key, fit in self._audio.items()},
+            }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp_path.replace(self.path)
+        return self.path
+
+    def _load(self):
+        """加载拟合结果（文件损坏或版本不符时从头开始）"""
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+            if data.get('version') != MODEL_VERSION:
+                raise ValueError(f"不支持的版本: {data.get('version')}")
+            self._latency = {key: LinearFit(**fit) for key, fit in data.get('latency_ms', {}).items()}
+            self._audio = {key: LinearFit(**fit) for key, fit in data.get('audio_seconds', {}).items()}
+            logger.debug(f"时长模型: {self.path} ({self.samples()} 个样本)")
+        except Exception as e:
+            logger.warning(f"时长模型加载失败，重新拟合: {e}")
+            self._latency, self._audio = {}, {}
+
+
+if __name__ == '__main__':
+    # 测试代码
+    from .task_manager import TTSTask
+
+    model = DurationModel(min_samples=3)
+    for chars in (20, 50, 100, 200, 400):
+        model.observe(chars, latency_ms=200 + 8 * chars, audio_seconds=0.22 * chars, voice="晓晓")
+    for chars in (10, 100, 1000):
+        latency, audio = model.predict(chars, voice="晓晓")
+        print(f"{chars} 字: 延迟 {latency:.0f}ms, 音频 {audio:.1f}秒")
+    print("1.5倍速 100 字（汇总拟合）:", model.predict(100, voice="云希", rate=1.5))
+    demo_tasks = [TTSTask(i, "字" * n, f"{i}.mp3") for i, n in enumerate((30, 400, 5, 120))]
+    print([task.task_id for task in model.order_longest_first(demo_tasks, voice="晓晓")])
@@ -0,0 +1,148 @@
+"""
+多书公平调度
+多本书同时排队时按配置的份额轮流取任务（赤字轮询 DRR），所有书共享 TaskManager 的全局并发上限；
+每本书每轮获得 quantum * 份额 的字数额度，字数越多的段落消耗越多额度，因此各书的合成字数按份额分配
+"""
+import threading
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, Iterator, Optional
+from loguru import logger
+
+from .task_manager import TTSTask
+
+
+class FairShareScheduler:
+    """
+    按份额在多本书之间轮流取任务的任务源
+
+    作为 TaskManager.execute_async 的 source 使用，任务的 metadata['book'] 标记所属书籍；
+    书籍可以在执行过程中继续加入（在所有队列取空之前）
+    """
+
+    def __init__(self, shares: Optional[Dict[str, float]] = None, quantum: int = 500, default_share: float = 1.0):
+        """
+        初始化调度器
+
+        Args:
+            shares: 书名 -> 份额（未配置的书使用 default_share）
+            quantum: 份额为1的书每轮获得的字数额度
+            default_share: 默认份额
+        """
+        self.shares = dict(shares or {})
+        self.quantum = max(1, quantum)
+        self.default_share = default_share
+
+        self._lock = threading.Lock()
+        self._queues: Dict[str, Deque[TTSTask]] = OrderedDict()
+        self._deficit: Dict[str, float] = {}
+        self._issued: Dict[str, int] = {}
+        self._granted = False  # 队首的书本轮是否已获得额度
+        self._total = 0
+
+    def share_of(self, book: str) -> float:
+        """书籍的份额"""
+        return max(0.0, self.shares.get(book, self.default_share))
+
+    def add_book(self, book: str, tasks: Iterable[TTSTask], share: Optional[float] = None):
+        """
+        加入一本书的任务（线程安全）
+
+        Args:
+            book: 书名
+            tasks: 任务列表（按合成顺序）
+            share: 份额（None则使用 shares 中的配置或默认份额）
+        """
+        with self._lock:
+            if share is not None:
+                self.shares[book] = share
+            queue = self._queues.setdefault(book, deque())
+            self._deficit.setdefault(book, 0.0)
+            self._issued.setdefault(book, 0)
+            for task in tasks:
+                task.metadata['book'] = book
+                queue.append(task)
+                self._total += 1
+        logger.info(f"加入调度: {book} (份额 {self.share_of(book):g}, {len(queue)} 个任务)")
+
+    @property
+    def remaining(self) -> int:
+        """尚未交给执行队列的任务数"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        各书籍的调度状态
+
+        Returns:
+            书名 -> {share, issued, queued}
+        """
+        with self._lock:
+            return {
+                book: {'share': self.share_of(book), 'issued': self._issued[book], 'queued': len(queue)}
+                for book, queue in self._queues.items()
+            }
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __iter__(self) -> Iterator[TTSTask]:
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            yield task
+
+    def _next_task(self) -> Optional[TTSTask]:
+        """赤字轮询：队首的书额度足够时取一个任务，否则补充额度后轮到下一本书"""
+        with self._lock:
+            # 份额为0的书只在其他书都取空后才执行
+            active = [book for book, queue in self._queues.items() if queue]
+            if not active:
+                return None
+            if all(self.share_of(book) == 0 for book in active):
+                book = active[0]
+                return self._issue(book)
+
+            while True:
+                book = next(iter(self._queues))
+                queue = self._queues[book]
+                if not queue:
+                    self._deficit[book] = 0.0
+                    self._rotate()
+                    continue
+                if not self._granted:
+                    self._deficit[book] += self.quantum * self.share_of(book)
+                    self._granted = True
+                cost = self._cost(queue[0])
+                if cost <= self._deficit[book]:
+                    self._deficit[book] -= cost
+                    return self._issue(book)
+                self._rotate()
+
+    def _issue(self, book: str) -> TTSTask:
+        """交出书籍队首的任务"""
+        self._issued[book] += 1
+        task = self._queues[book].popleft()
+        if not self._queues[book]:
+            self._deficit[book] = 0.0
+        return task
+
+    def _rotate(self):
+        """队首的书移到队尾，下一本书开始新一轮"""
+        book, queue = self._queues.popitem(last=False)
+        self._queues[book] = queue
+        self._granted = False
+
+    @staticmethod
+    def _cost(task: TTSTask) -> int:
+        """任务消耗的额度（字数）"""
+        return max(1, len(task.text))
+
+
+if __name__ == '__main__':
+    # 测试代码
+    scheduler = FairShareScheduler(shares={'书A': 2, '书B': 1}, quantum=10)
+    scheduler.add_book('书A', [TTSTask(i, "字" * 10, f"a{i}.mp3") for i in range(6)])
+    scheduler.add_book('书B', [TTSTask(i, "字" * 10, f"b{i}.mp3") for i in range(6)])
+    print([task.metadata['book'] for task in scheduler])
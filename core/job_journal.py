@@ -0,0 +1,207 @@
+"""
+任务日志
+用SQLite持久化每个任务的身份哈希、状态和输出文件校验信息，
+转换中断后再次运行时跳过已完成且校验通过的段落
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_key TEXT PRIMARY KEY,
+    task_id INTEGER,
+    status TEXT NOT NULL,
+    outputs TEXT NOT NULL,
+    attempts INTEGER DEFAULT 0,
+    error TEXT,
+    updated_at REAL
+)
+"""
+
+
+class JobJournal:
+    """可断点续传的任务日志"""
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 200,
+        flush_interval: float = 2.0,
+        verify_checksum: bool = False
+    ):
+        """
+        初始化任务日志
+
+        Args:
+            db_path: SQLite数据库路径
+            batch_size: 缓冲多少条记录后批量写入
+            flush_interval: 距上次写入超过该时间(秒)时也会写入
+            verify_checksum: 是否记录并校验输出文件的校验和（否则只校验文件大小）
+        """
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.verify_checksum = verify_checksum
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 任务在后台事件循环线程中记录，连接需要跨线程使用
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._pending: List[tuple] = []
+        self._last_flush = time.monotonic()
+        logger.debug(f"任务日志: {self.db_path}")
+
+    @staticmethod
+    def task_key(text: str, output_path: str, fingerprint: str = "") -> str:
+        """
+        计算任务身份哈希
+
+        Args:
+            text: 任务文本
+            output_path: 输出路径
+            fingerprint: 引擎/参数指纹（音色、语速、格式等变化时任务需要重新合成）
+
+        Returns:
+            十六进制哈希
+        """
+        digest = hashlib.sha1()
+        for part in (fingerprint, output_path, text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def load_completed(self) -> Dict[str, List[Dict]]:
+        """
+        读取所有已完成任务
+
+        Returns:
+            {任务哈希: 输出文件信息列表}
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute("SELECT task_key, outputs FROM tasks WHERE status = 'completed'").fetchall()
+        return {key: json.loads(outputs) for key, outputs in rows}
+
+    def verify(self, outputs: List[Dict]) -> bool:
+        """
+        校验输出文件与记录一致
+
+        Args:
+            outputs: 输出文件信息列表 [{path, size, checksum}, ...]
+
+        Returns:
+            是否全部存在且未被修改
+        """
+        for output in outputs:
+            path = Path(output['path'])
+            if not path.exists() or path.stat().st_size != output['size']:
+                return False
+            if self.verify_checksum and output.get('checksum') and self._checksum(path) != output['checksum']:
+                return False
+        return True
+
+    def record(
+        self,
+        task_key: str,
+        task_id: int,
+        status: str,
+        output_paths: List[str],
+        attempts: int = 0,
+        error: Optional[str] = None
+    ):
+        """
+        记录任务状态（缓冲后批量写入）
+
+        Args:
+            task_key: 任务身份哈希
+            task_id: 任务ID
+            status: 任务状态
+            output_paths: 输出文件列表（完成时记录大小和校验和）
+            attempts: 尝试次数
+            error: 错误信息
+        """
+        outputs = []
+        if status == 'completed':
+            for output_path in output_paths:
+                path = Path(output_path)
+                exists = path.exists()
+                # 文件缺失时记录为-1，下次运行时校验必然失败而重新合成
+                outputs.append({
+                    'path': str(path),
+                    'size': path.stat().st_size if exists else -1,
+                    'checksum': self._checksum(path) if self.verify_checksum and exists else None
+                })
+
+        with self._lock:
+            self._pending.append((task_key, task_id, status, json.dumps(outputs), attempts, error, time.time()))
+            due = (
+                len(self._pending) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """把缓冲的记录写入数据库"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO tasks "
+                "(task_key, task_id, status, outputs, attempts, error, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                pending
+            )
+            self._conn.commit()
+            self._last_flush = time.monotonic()
+
+    def clear(self):
+        """清空日志"""
+        with self._lock:
+            self._pending = []
+            self._conn.execute("DELETE FROM tasks")
+            self._conn.commit()
+
+    def close(self):
+        """写入剩余记录并关闭数据库"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _checksum(path: Path) -> str:
+        """计算文件校验和"""
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+
+if __name__ == '__main__':
+    # 测试代码
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audio = Path(tmp) / "001_00.mp3"
+        audio.write_bytes(b"\xff" * 100)
+
+        journal = JobJournal(str(Path(tmp) / "journal.sqlite"), verify_checksum=True)
+        key = journal.task_key("测试文本", str(audio), "edge|xiaoxiao")
+        journal.record(key, 0, 'completed', [str(audio)])
+
+        completed = journal.load_completed()
+        print("已完成:", len(completed), "校验:", journal.verify(completed[key]))
+        journal.close()
@@ -0,0 +1,145 @@
+"""
+延迟统计器
+LatencyTracker 在滑动窗口内统计请求延迟的分位数（用于对冲/推测等随引擎状态变化的阈值）；
+LatencyHistogram 统计全部样本的分位数（用于整批任务的汇总），内存占用与样本数无关
+"""
+import math
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyTracker:
+    """滑动窗口延迟统计器"""
+
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        """
+        初始化延迟统计器
+
+        Args:
+            window: 保留最近多少个样本
+            min_samples: 样本数不足时不给出分位数
+        """
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self.count = 0
+
+    def record(self, latency_ms: float):
+        """
+        记录一次延迟
+
+        Args:
+            latency_ms: 延迟(毫秒)
+        """
+        self.samples.append(latency_ms)
+        self.count += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        计算分位数
+
+        Args:
+            p: 百分位 (0 - 100)
+
+        Returns:
+            分位数(毫秒)，样本不足时返回None
+        """
+        if len(self.samples) < max(1, self.min_samples):
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self) -> Dict:
+        """
+        获取统计摘要（忽略最小样本数限制）
+
+        Returns:
+            包含 count, p50, p90, p99, max 的字典
+        """
+        if not self.samples:
+            return {'count': self.count, 'p50': None, 'p90': None, 'p99': None, 'max': None}
+
+        ordered = sorted(self.samples)
+
+        def pick(p):
+            return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+        return {
+            'count': self.count,
+            'p50': pick(50),
+            'p90': pick(90),
+            'p99': pick(99),
+            'max': ordered[-1]
+        }
+
+
+class LatencyHistogram:
+    """全量延迟统计器（对数分桶，分位数的相对误差不超过 precision）"""
+
+    def __init__(self, precision: float = 0.01):
+        """
+        初始化延迟统计器
+
+        Args:
+            precision: 分位数的相对误差上限（每个分桶的上下界之比为 1 + 2 * precision）
+        """
+        self._log_growth = math.log1p(2 * precision)
+        self._counts: Dict[int, int] = {}
+        self._zeros = 0
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, latency_ms: float):
+        """
+        记录一次延迟
+
+        Args:
+            latency_ms: 延迟(毫秒)
+        """
+        if latency_ms <= 0:
+            self._zeros += 1
+        else:
+            index = math.floor(math.log(latency_ms) / self._log_growth)
+            self._counts[index] = self._counts.get(index, 0) + 1
+        self.count += 1
+        self.min = latency_ms if self.min is None else min(self.min, latency_ms)
+        self.max = latency_ms if self.max is None else max(self.max, latency_ms)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        计算分位数（与 LatencyTracker 相同的取位规则，返回所在分桶的几何中点）
+
+        Args:
+            p: 百分位 (0 - 100)
+
+        Returns:
+            分位数(毫秒)，没有样本时返回None
+        """
+        if not self.count:
+            return None
+        rank = min(self.count - 1, int(round(p / 100.0 * (self.count - 1))))
+        if rank < self._zeros:
+            return 0.0
+        seen = self._zeros
+        for index in sorted(self._counts):
+            seen += self._counts[index]
+            if seen > rank:
+                value = math.exp((index + 0.5) * self._log_growth)
+                return min(self.max, max(self.min, value))
+        return self.max
+
+    def summary(self) -> Dict:
+        """
+        获取统计摘要
+
+        Returns:
+            包含 count, p50, p90, p99, max 的字典
+        """
+        return {
+            'count': self.count,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'max': self.max
+        }
@@ -0,0 +1,173 @@
+"""
+后台事件循环
+所有同步入口共享一个常驻后台线程中的事件循环，避免每次调用都创建/销毁循环，
+也避免在已有运行中事件循环的线程（如GUI、Jupyter）里调用 run_until_complete 报错
+"""
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Optional, TypeVar
+from loguru import logger
+
+T = TypeVar('T')
+
+
+class LoopRunner:
+    """常驻后台线程的事件循环"""
+
+    def __init__(self, name: str = "async-loop"):
+        """
+        初始化后台事件循环（首次提交任务时才启动线程）
+
+        Args:
+            name: 线程名称
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """后台事件循环（必要时启动）"""
+        self._ensure_started()
+        return self._loop
+
+    def _ensure_started(self):
+        """启动后台线程"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+
+            ready = threading.Event()
+
+            def run():
+                self._loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(self._loop)
+                ready.set()
+                try:
+                    self._loop.run_forever()
+                finally:
+                    self._loop.close()
+
+            self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+            self._thread.start()
+            ready.wait()
+            logger.debug(f"后台事件循环已启动: {self.name}")
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        """
+        提交协程到后台事件循环
+
+        Args:
+            coro: 协程
+
+        Returns:
+            concurrent.futures.Future
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        在后台事件循环中运行协程并阻塞等待结果
+
+        Args:
+            coro: 协程
+            timeout: 超时时间(秒)，None表示一直等待
+
+        Returns:
+            协程返回值
+        """
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("不能在后台事件循环线程中同步等待，请直接 await")
+
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+    def in_loop_thread(self) -> bool:
+        """当前是否处于后台事件循环线程"""
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def stop(self, timeout: float = 5.0):
+        """
+        停止后台事件循环（取消未完成的任务）
+
+        Args:
+            timeout: 等待线程退出的时间(秒)
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+
+            async def shutdown():
+                tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+            try:
+                asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result(timeout)
+            except Exception:
+                pass
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._thread = None
+            logger.debug(f"后台事件循环已停止: {self.name}")
+
+
+_shared_runner: Optional[LoopRunner] = None
+_shared_lock = threading.Lock()
+
+
+def get_loop_runner() -> LoopRunner:
+    """
+    获取进程内共享的后台事件循环
+
+    Returns:
+        LoopRunner实例
+    """
+    global _shared_runner
+    if _shared_runner is None:
+        with _shared_lock:
+            if _shared_runner is None:
+                _shared_runner = LoopRunner(name="novel-reader-loop")
+                atexit.register(_shared_runner.stop)
+    return _shared_runner
+
+
+def run_sync(coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+    """
+    在共享后台事件循环中同步运行协程
+
+    Args:
+        coro: 协程
+        timeout: 超时时间(秒)
+
+    Returns:
+        协程返回值
+    """
+    return get_loop_runner().run(coro, timeout)
+
+
+if __name__ == '__main__':
+    # 测试代码
+    async def demo(value):
+        await asyncio.sleep(0.1)
+        return value * 2
+
+    print(run_sync(demo(21)))
+
+    async def nested():
+        # 在运行中的事件循环里也可以安全地调用同步入口
+        return run_sync(demo(1))
+
+    print(asyncio.run(nested()))
@@ -0,0 +1,509 @@
+"""
+指标统计
+轻量的计数器/仪表/直方图注册表，各模块在模块级定义指标并在运行时更新，
+可导出为Prometheus文本格式（textfile collector）或JSON快照
+"""
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+# 默认直方图分桶（秒）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0
+)
+
+
+class _Metric:
+    """指标基类：按标签值分组保存样本"""
+
+    TYPE = ""
+
+    def __init__(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()):
+        """
+        初始化指标
+
+        Args:
+            name: 指标名称
+            help_text: 说明
+            labelnames: 标签名列表
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        """标签字典转换为分组键"""
+        unknown = set(labels) - set(self.labelnames)
+        if unknown:
+            raise ValueError(f"指标 {self.name} 不支持标签: {sorted(unknown)}")
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        """分组键转换为标签字典"""
+        return dict(zip(self.labelnames, key))
+
+    def reset(self):
+        """清空样本"""
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    """只增不减的计数器"""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        """
+        增加计数
+
+        Args:
+            amount: 增量（不能为负）
+            **labels: 标签值
+        """
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        """当前计数"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[Dict]:
+        """导出样本"""
+        with self._lock:
+            return [{'labels': self._labels(key), 'value': value} for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    """可增可减的仪表"""
+
+    TYPE = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels):
+        """增加数值"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        """减少数值"""
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        """设置数值"""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        """统计进行中的操作数（进入时+1，退出时-1）"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """分桶直方图"""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        初始化直方图
+
+        Args:
+            name: 指标名称
+            help_text: 说明
+            labelnames: 标签名列表
+            buckets: 分桶上界（升序，自动追加+Inf）
+        """
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """
+        记录一个观测值
+
+        Args:
+            value: 观测值
+            **labels: 标签值
+        """
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = {'counts': [0] * (len(self.buckets) + 1), 'sum': 0.0, 'count': 0}
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            data['counts'][index] += 1
+            data['sum'] += value
+            data['count'] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """记录代码块耗时(秒)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Dict]:
+        """导出样本（分桶为累计计数）"""
+        with self._lock:
+            samples = []
+            for key, data in self._values.items():
+                cumulative, buckets = 0, []
+                for bound, count in zip(list(self.buckets) + [math.inf], data['counts']):
+                    cumulative += count
+                    buckets.append(['+Inf' if bound == math.inf else bound, cumulative])
+                samples.append({
+                    'labels': self._labels(key),
+                    'count': data['count'],
+                    'sum': data['sum'],
+                    'buckets': buckets
+                })
+            return samples
+
+
+def histogram_quantile(buckets: List[List], q: float) -> Optional[float]:
+    """
+    按累计分桶估算分位数（桶内线性插值，落在+Inf桶时返回最后一个有限上界）
+
+    Args:
+        buckets: 累计分桶 [[上界, 累计计数], ...]
+        q: 分位数 (0-1)
+
+    Returns:
+        估算值，没有样本时返回None
+    """
+    if not buckets or not buckets[-1][1]:
+        return None
+    rank = q * buckets[-1][1]
+    lower_bound, lower_count = 0.0, 0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == '+Inf':
+                return lower_bound
+            if count == lower_count:
+                return float(bound)
+            return lower_bound + (bound - lower_bound) * (rank - lower_count) / (count - lower_count)
+        lower_bound, lower_count = float(bound), count
+    return lower_bound
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self):
+        """初始化注册表"""
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        """同名指标只创建一次（模块重复导入时返回已有指标）"""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"指标 {name} 已以不同类型或标签注册")
+            return metric
+
+    def counter(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()) -> Counter:
+        """获取或创建计数器"""
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str = "", labelnames: Sequence[str] = ()) -> Gauge:
+        """获取或创建仪表"""
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str = "",
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """获取或创建直方图"""
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        """按名称获取指标"""
+        return self._metrics.get(name)
+
+    def reset(self):
+        """清空所有指标的样本（指标定义保留）"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+    def snapshot(self) -> Dict:
+        """
+        导出JSON快照
+
+        Returns:
+            {'generated_at': 时间戳, 'metrics': {名称: {type, help, samples}}}
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        return {
+            'generated_at': time.time(),
+            'metrics': {
+                name: {'type': metric.TYPE, 'help': metric.help, 'samples': metric.samples()}
+                for name, metric in metrics
+            }
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        导出Prometheus文本格式
+
+        Returns:
+            文本内容
+        """
+        return snapshot_to_prometheus(self.snapshot())
+
+    def write(self, path: Union[str, Path]) -> Path:
+        """
+        写出指标文件（.json为JSON快照，其他扩展名为Prometheus文本格式）
+
+        先写临时文件再替换，避免采集方读到写了一半的文件
+
+        Args:
+            path: 输出路径
+
+        Returns:
+            输出路径
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() == '.json':
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        else:
+            content = self.to_prometheus()
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(content, encoding='utf-8')
+        tmp_path.replace(path)
+        return path
+
+
+def snapshot_to_prometheus(snapshot: Dict) -> str:
+    """
+    把JSON快照转换为Prometheus文本格式
+
+    Args:
+        snapshot: MetricsRegistry.snapshot() 的结果
+
+    Returns:
+        文本内容
+    """
+    lines = []
+    for name, data in snapshot['metrics'].items():
+        if data['help']:
+            lines.append(f"# HELP {name} {_escape_help(data['help'])}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        for sample in data['samples']:
+            labels = sample['labels']
+            if data['type'] == 'histogram':
+                for bound, count in sample['buckets']:
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape_help(text: str) -> str:
+    """转义HELP文本"""
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """格式化标签"""
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value) -> str:
+    """格式化样本值"""
+    if value == '+Inf' or value == math.inf:
+        return '+Inf'
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def load_snapshot(path: Union[str, Path]) -> Dict:
+    """
+    读取JSON快照
+
+    Args:
+        path: 快照路径
+
+    Returns:
+        快照字典
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def summarize_snapshot(snapshot: Dict) -> Dict:
+    """
+    把JSON快照整理为便于展示的摘要
+
+    Args:
+        snapshot: MetricsRegistry.snapshot() 的结果
+
+    Returns:
+        {stages, engines, tasks, caches, bytes_written}
+    """
+    metrics = snapshot.get('metrics', {})
+
+    def samples(name: str) -> List[Dict]:
+        return metrics.get(name, {}).get('samples', [])
+
+    def value(name: str, **labels) -> float:
+        return sum(
+            sample['value'] for sample in samples(name)
+            if all(sample['labels'].get(k) == v for k, v in labels.items())
+        )
+
+    def latency(sample: Dict) -> Dict:
+        return {
+            'count': sample['count'],
+            'total_seconds': sample['sum'],
+            'p50': histogram_quantile(sample['buckets'], 0.5),
+            'p99': histogram_quantile(sample['buckets'], 0.99)
+        }
+
+    stages = {sample['labels']['stage']: latency(sample) for sample in samples('stage_duration_seconds')}
+
+    engines: Dict[str, Dict] = {}
+    for sample in samples('tts_request_seconds'):
+        engine = sample['labels']['engine']
+        engines[engine] = {
+            **latency(sample),
+            'success': value('tts_requests_total', engine=engine, outcome='success'),
+            'failure': value('tts_requests_total', engine=engine, outcome='failure'),
+            'cancelled': value('tts_requests_total', engine=engine, outcome='cancelled'),
+            'in_flight': value('tts_requests_in_flight', engine=engine),
+            'characters': value('tts_characters_total', engine=engine)
+        }
+
+    segment = samples('task_segment_seconds')
+    tasks = {
+        'completed': value('tasks_finished_total', status='completed'),
+        'failed': value('tasks_finished_total', status='failed'),
+        'resumed': value('tasks_finished_total', status='resumed'),
+        'retries': value('task_retries_total'),
+        'queue_depth': value('task_queue_depth'),
+        'in_flight': value('tasks_in_flight'),
+        'chars_per_second': value('synthesis_chars_per_second'),
+        'segment': latency(segment[0]) if segment else None
+    }
+
+    caches: Dict[str, Dict] = {}
+    for sample in samples('cache_requests_total'):
+        entry = caches.setdefault(sample['labels']['cache'], {'hit': 0.0, 'miss': 0.0})
+        entry[sample['labels']['result']] = entry.get(sample['labels']['result'], 0.0) + sample['value']
+    for entry in caches.values():
+        lookups = entry['hit'] + entry['miss']
+        entry['hit_rate'] = entry['hit'] / lookups if lookups else None
+
+    bytes_written = {sample['labels']['component']: sample['value'] for sample in samples('bytes_written_total')}
+
+    return {
+        'stages': stages,
+        'engines': engines,
+        'tasks': tasks,
+        'caches': caches,
+        'bytes_written': bytes_written
+    }
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    获取进程内共享的指标注册表
+
+    Returns:
+        MetricsRegistry实例
+    """
+    return _registry
+
+
+# 各模块共用的指标
+STAGE_DURATION = _registry.histogram('stage_duration_seconds', '各处理阶段耗时(秒)', ('stage',))
+BYTES_WRITTEN = _registry.counter('bytes_written_total', '写出的音频字节数', ('component',))
+CACHE_REQUESTS = _registry.counter('cache_requests_total', '缓存查询次数', ('cache', 'result'))
+
+
+def time_stage(stage: str):
+    """
+    记录处理阶段耗时（可用作 with 语句或函数装饰器）
+
+    Args:
+        stage: 阶段名称
+
+    Returns:
+        上下文管理器
+    """
+    return STAGE_DURATION.time(stage=stage)
+
+
+def record_cache(cache: str, hit: bool):
+    """
+    记录一次缓存查询
+
+    Args:
+        cache: 缓存名称
+        hit: 是否命中
+    """
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+if __name__ == '__main__':
+    # 测试代码
+    registry = MetricsRegistry()
+    requests = registry.counter('demo_requests_total', '请求数', ('engine',))
+    latency = registry.histogram('demo_latency_seconds', '请求耗时', ('engine',))
+
+    for ms in (12, 40, 80, 300, 1200):
+        requests.inc(engine='loopback')
+        latency.observe(ms / 1000, engine='loopback')
+
+    print(registry.to_prometheus())
+    sample = registry.snapshot()['metrics']['demo_latency_seconds']['samples'][0]
+    print("p50:", histogram_quantile(sample['buckets'], 0.5))
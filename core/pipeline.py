@@ -0,0 +1,176 @@
+"""
+分阶段流水线
+后处理步骤（章节合并、音量标准化、格式转换、写标签等）各自在线程中运行，
+阶段之间用有界队列连接：上游某个条目就绪后立即进入下一阶段，下游处理不过来时上游阻塞等待
+"""
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+from loguru import logger
+
+from .metrics import get_registry
+
+
+_metrics = get_registry()
+STAGE_SECONDS = _metrics.histogram('pipeline_stage_seconds', '流水线各阶段单个条目的处理耗时(秒)', ('stage',))
+STAGE_QUEUE_DEPTH = _metrics.gauge('pipeline_queue_depth', '流水线各阶段等待处理的条目数', ('stage',))
+STAGE_ITEMS = _metrics.counter('pipeline_items_total', '流水线各阶段处理的条目数', ('stage', 'outcome'))
+
+_STOP = object()
+
+
+@dataclass
+class PipelineStage:
+    """流水线阶段"""
+    name: str  # 阶段名称
+    func: Callable[[Any], Any]  # 处理函数，返回值交给下一阶段（返回None则不再向下传递）
+    workers: int = 1  # 并行线程数
+
+
+class StagedPipeline:
+    """由有界队列连接的多阶段流水线"""
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int = 4, name: str = "pipeline"):
+        """
+        初始化流水线
+
+        Args:
+            stages: 阶段列表（按处理顺序）
+            queue_size: 每个阶段输入队列的容量
+            name: 流水线名称（用于线程名和日志）
+        """
+        if not stages:
+            raise ValueError("流水线至少需要一个阶段")
+        self.stages = stages
+        self.name = name
+        self._queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+        self._threads: List[threading.Thread] = []
+        self._running = [stage.workers for stage in stages]
+        self._lock = threading.Lock()
+        self.results: List[Any] = []
+        self.failures: List[Dict[str, Any]] = []  # 处理失败的条目 {stage, item, error}
+        self.stats: Dict[str, Dict[str, float]] = {
+            stage.name: {'processed': 0, 'failed': 0, 'seconds': 0.0} for stage in stages
+        }
+        self._started = False
+        self._closed = False
+
+    def start(self):
+        """启动所有阶段的工作线程"""
+        if self._started:
+            return
+        self._started = True
+        for index, stage in enumerate(self.stages):
+            for n in range(max(1, stage.workers)):
+                thread = threading.Thread(
+                    target=self._run_stage, args=(index,), name=f"{self.name}-{stage.name}-{n}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, item: Any, timeout: Optional[float] = None):
+        """
+        提交一个条目（第一阶段队列已满时阻塞，形成背压）
+
+        Args:
+            item: 条目
+            timeout: 最长等待时间(秒)，超时抛出 queue.Full
+        """
+        if self._closed:
+            raise RuntimeError("流水线已关闭")
+        self.start()
+        self._queues[0].put(item, timeout=timeout)
+        STAGE_QUEUE_DEPTH.set(self._queues[0].qsize(), stage=self.stages[0].name)
+
+    def close(self, timeout: Optional[float] = None) -> List[Any]:
+        """
+        不再接收新条目，等待已提交的条目全部处理完
+
+        Args:
+            timeout: 每个线程的最长等待时间(秒)
+
+        Returns:
+            最后一个阶段的输出列表
+        """
+        if not self._closed:
+            self._closed = True
+            self.start()
+            for _ in range(max(1, self.stages[0].workers)):
+                self._queues[0].put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout)
+        return self.results
+
+    def _run_stage(self, index: int):
+        """阶段工作线程：取条目、处理、交给下一阶段"""
+        stage = self.stages[index]
+        inbox = self._queues[index]
+        outbox = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                break
+            STAGE_QUEUE_DEPTH.set(inbox.qsize(), stage=stage.name)
+
+            start = time.perf_counter()
+            try:
+                output = stage.func(item)
+            except Exception as e:
+                logger.error(f"流水线阶段 {stage.name} 处理失败: {e}")
+                self._record(stage.name, time.perf_counter() - start, failed=True)
+                with self._lock:
+                    self.failures.append({'stage': stage.name, 'item': item, 'error': str(e)})
+                continue
+            self._record(stage.name, time.perf_counter() - start, failed=False)
+
+            if output is None:
+                continue
+            if outbox is not None:
+                # 下游队列已满时在此阻塞，背压逐级传递到 submit
+                outbox.put(output)
+                STAGE_QUEUE_DEPTH.set(outbox.qsize(), stage=self.stages[index + 1].name)
+            else:
+                with self._lock:
+                    self.results.append(output)
+
+        # 本阶段最后一个线程退出时通知下一阶段
+        with self._lock:
+            self._running[index] -= 1
+            last = self._running[index] == 0
+        if last and outbox is not None:
+            for _ in range(max(1, self.stages[index + 1].workers)):
+                outbox.put(_STOP)
+
+    def _record(self, stage_name: str, seconds: float, failed: bool):
+        """记录阶段处理统计"""
+        with self._lock:
+            stats = self.stats[stage_name]
+            stats['failed' if failed else 'processed'] += 1
+            stats['seconds'] += seconds
+        STAGE_SECONDS.observe(seconds, stage=stage_name)
+        STAGE_ITEMS.inc(stage=stage_name, outcome='failure' if failed else 'success')
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+if __name__ == '__main__':
+    # 测试代码
+    pipeline = StagedPipeline([
+        PipelineStage("merge", lambda n: (time.sleep(0.05), n)[1], workers=2),
+        PipelineStage("convert", lambda n: (time.sleep(0.05), n * 10)[1]),
+    ], queue_size=2)
+
+    begin = time.perf_counter()
+    with pipeline:
+        for chapter in range(6):
+            pipeline.submit(chapter)
+    print("结果:", sorted(pipeline.results), f"耗时: {time.perf_counter() - begin:.2f}秒")
+    print("统计:", pipeline.stats)
@@ -0,0 +1,119 @@
+"""
+边听边合成调度
+按读者当前的阅读位置决定任务顺序：先合成阅读位置之后的N个段落，再按书籍顺序在后台补齐其余段落；
+阅读位置可以在执行过程中随时调整，未开始的任务会立即按新位置重新排序
+"""
+import bisect
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple
+from loguru import logger
+
+from .task_manager import TTSTask
+
+
+class PlayAheadScheduler:
+    """
+    阅读位置优先的任务源
+
+    作为 TaskManager.execute_async 的 source 使用：工作协程每取一个任务，
+    调度器就按最新的阅读位置选出下一个任务。已进入执行队列的任务不会被撤回，
+    因此重新排序的滞后最多为执行队列长度（TaskManager 的 queue_size）个任务
+    """
+
+    def __init__(self, tasks: Iterable[TTSTask], window: int = 20):
+        """
+        初始化调度器
+
+        Args:
+            tasks: 任务列表（按 metadata 中的 chapter_index/segment_index 排序，缺失时按 task_id）
+            window: 阅读位置之后优先合成的段落数
+        """
+        self.window = max(1, window)
+        self._tasks: List[TTSTask] = sorted(tasks, key=self._task_position)
+        self._positions: List[Tuple[int, int]] = [self._task_position(task) for task in self._tasks]
+        self._issued = [False] * len(self._tasks)
+        self._issued_count = 0
+
+        self._lock = threading.Lock()
+        self._window_start = 0  # 阅读位置对应的任务下标
+        self._window_cursor = 0  # 窗口内下一个待检查的任务下标
+        self._background_cursor = 0  # 后台补齐时下一个待检查的任务下标
+
+    @staticmethod
+    def _task_position(task: TTSTask) -> Tuple[int, int]:
+        """任务在书中的位置 (章节序号, 段落序号)"""
+        metadata = task.metadata or {}
+        if 'chapter_index' in metadata:
+            return metadata['chapter_index'], metadata.get('segment_index', 0)
+        return task.task_id, 0
+
+    def set_reading_position(self, chapter_index: int, segment_index: int = 0):
+        """
+        设置阅读位置（线程安全，可在执行过程中从其他线程调用）
+
+        Args:
+            chapter_index: 章节序号
+            segment_index: 章节内的段落序号
+        """
+        with self._lock:
+            start = bisect.bisect_left(self._positions, (chapter_index, segment_index))
+            self._window_start = start
+            self._window_cursor = start
+        logger.info(f"阅读位置: 第{chapter_index}章 第{segment_index}段，优先合成之后的 {self.window} 个段落")
+
+    @property
+    def remaining(self) -> int:
+        """尚未交给执行队列的任务数"""
+        with self._lock:
+            return len(self._tasks) - self._issued_count
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def __iter__(self) -> Iterator[TTSTask]:
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            yield task
+
+    def _next_task(self) -> Optional[TTSTask]:
+        """按当前阅读位置选出下一个任务"""
+        with self._lock:
+            index = self._take(self._window_cursor, min(self._window_start + self.window, len(self._tasks)))
+            if index is not None:
+                self._window_cursor = index + 1
+            else:
+                self._window_cursor = self._window_start + self.window
+                index = self._take(self._background_cursor, len(self._tasks))
+                if index is None:
+                    return None
+                self._background_cursor = index + 1
+
+            self._issued[index] = True
+            self._issued_count += 1
+            return self._tasks[index]
+
+    def _take(self, start: int, end: int) -> Optional[int]:
+        """在 [start, end) 中找到第一个尚未交出的任务下标"""
+        for index in range(start, end):
+            if not self._issued[index]:
+                return index
+        return None
+
+
+if __name__ == '__main__':
+    # 测试代码
+    demo_tasks = [
+        TTSTask(i, f"段落{i}", f"{i}.mp3", metadata={'chapter_index': i // 3, 'segment_index': i % 3})
+        for i in range(30)
+    ]
+    scheduler = PlayAheadScheduler(demo_tasks, window=4)
+    scheduler.set_reading_position(5)
+
+    order = []
+    for demo_task in scheduler:
+        order.append(demo_task.task_id)
+        if len(order) == 6:
+            scheduler.set_reading_position(8)
+    print("执行顺序:", order)
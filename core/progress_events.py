@@ -0,0 +1,254 @@
+"""
+进度事件流
+TaskManager 在执行过程中发布任务开始/完成/失败、章节完成和批次统计事件；
+发布只是一次加锁的追加，事件按固定间隔合并后推送给订阅者，订阅者处理得慢不会拖慢合成
+
+订阅者可以在任意线程中同步读取（get），也可以在自己的事件循环中 async for 读取
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, List, Optional
+from loguru import logger
+
+
+# 事件类型
+JOB_STARTED = "job_started"
+JOB_STATS = "job_stats"
+JOB_FINISHED = "job_finished"
+TASK_STARTED = "task_started"
+TASK_FINISHED = "task_finished"
+TASK_FAILED = "task_failed"
+CHAPTER_COMPLETED = "chapter_completed"
+
+# 高频事件在一个推送间隔内合并为一条（保留最后一条，count 为合并的条数）
+COALESCED_TYPES = (TASK_STARTED, TASK_FINISHED)
+
+
+@dataclass
+class ProgressEvent:
+    """进度事件"""
+    type: str  # 事件类型
+    data: Dict = field(default_factory=dict)  # 事件内容
+    timestamp: float = field(default_factory=time.time)
+    count: int = 1  # 合并的事件条数
+
+    def to_dict(self) -> Dict:
+        """转换为字典（便于序列化为JSON推送给Web客户端）"""
+        return {'type': self.type, 'data': self.data, 'timestamp': self.timestamp, 'count': self.count}
+
+
+class Subscription:
+    """事件订阅（有界缓冲区，满了丢弃最旧的事件）"""
+
+    def __init__(self, stream: 'ProgressEventStream', maxsize: int = 1000):
+        """
+        初始化订阅
+
+        Args:
+            stream: 所属事件流
+            maxsize: 缓冲区容量
+        """
+        self._stream = stream
+        self._items: Deque[ProgressEvent] = deque()
+        self._maxsize = max(1, maxsize)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._waiter: Optional[asyncio.Future] = None
+        self.dropped = 0
+
+    def _deliver(self, events: List[ProgressEvent]):
+        """推送一批事件（由事件流在刷新时调用）"""
+        with self._cond:
+            if self._closed:
+                return
+            for event in events:
+                if len(self._items) >= self._maxsize:
+                    self._items.popleft()
+                    self.dropped += 1
+                self._items.append(event)
+            self._cond.notify_all()
+            self._wake_async()
+
+    def _wake_async(self):
+        """唤醒等待中的 async for（调用方持有锁）"""
+        waiter, loop = self._waiter, self._loop
+        if waiter is not None and loop is not None:
+            self._waiter = None
+            loop.call_soon_threadsafe(lambda: waiter.done() or waiter.set_result(None))
+
+    def get(self, timeout: Optional[float] = None) -> Optional[ProgressEvent]:
+        """
+        同步读取下一个事件
+
+        Args:
+            timeout: 最长等待时间(秒)，None则一直等待
+
+        Returns:
+            事件，超时或订阅已关闭时返回None
+        """
+        with self._cond:
+            if not self._items and not self._closed:
+                self._cond.wait(timeout)
+            return self._items.popleft() if self._items else None
+
+    def drain(self) -> List[ProgressEvent]:
+        """
+        取出缓冲区中的全部事件（不等待）
+
+        Returns:
+            事件列表
+        """
+        with self._cond:
+            events = list(self._items)
+            self._items.clear()
+            return events
+
+    def close(self):
+        """取消订阅"""
+        self._stream.unsubscribe(self)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            self._wake_async()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> ProgressEvent:
+        while True:
+            with self._cond:
+                if self._items:
+                    return self._items.popleft()
+                if self._closed:
+                    raise StopAsyncIteration
+                self._loop = asyncio.get_running_loop()
+                self._waiter = self._loop.create_future()
+                waiter = self._waiter
+            await waiter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ProgressEventStream:
+    """合并推送的进度事件流"""
+
+    def __init__(self, interval: float = 0.5):
+        """
+        初始化事件流
+
+        Args:
+            interval: 推送间隔(秒)，间隔内的高频事件合并为一条
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._pending: List[ProgressEvent] = []
+        self._coalesced: Dict[str, ProgressEvent] = {}
+        self._subscribers: List[Subscription] = []
+        self._stats_provider: Optional[Callable[[], Dict]] = None
+
+    def subscribe(self, maxsize: int = 1000) -> Subscription:
+        """
+        订阅事件
+
+        Args:
+            maxsize: 订阅缓冲区容量
+
+        Returns:
+            Subscription实例（用完后调用 close）
+        """
+        subscription = Subscription(self, maxsize)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """取消订阅"""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def has_subscribers(self) -> bool:
+        """是否有订阅者（没有订阅者时发布方可以跳过构造事件）"""
+        return bool(self._subscribers)
+
+    def publish(self, event_type: str, **data):
+        """
+        发布事件（线程安全，不等待订阅者）
+
+        Args:
+            event_type: 事件类型
+            **data: 事件内容
+        """
+        if not self._subscribers:
+            return
+        event = ProgressEvent(event_type, data)
+        with self._lock:
+            if event_type in COALESCED_TYPES:
+                previous = self._coalesced.get(event_type)
+                if previous is not None:
+                    event.count += previous.count
+                self._coalesced[event_type] = event
+            else:
+                self._pending.append(event)
+
+    def set_stats_provider(self, provider: Optional[Callable[[], Dict]]):
+        """
+        设置批次统计的来源，每次推送时附带一条 job_stats 事件
+
+        Args:
+            provider: 返回统计字典的函数，None则不推送统计
+        """
+        self._stats_provider = provider
+
+    def flush(self):
+        """把积累的事件推送给订阅者（由执行方按 interval 定期调用）"""
+        with self._lock:
+            events = self._pending + list(self._coalesced.values())
+            self._pending = []
+            self._coalesced = {}
+            subscribers = list(self._subscribers)
+        if not subscribers:
+            return
+
+        provider = self._stats_provider
+        if provider is not None:
+            try:
+                events.append(ProgressEvent(JOB_STATS, provider()))
+            except Exception as e:
+                logger.debug(f"批次统计获取失败: {e}")
+        if not events:
+            return
+        events.sort(key=lambda event: event.timestamp)
+        for subscription in subscribers:
+            subscription._deliver(events)
+
+    async def run_flusher(self):
+        """定期推送的协程（由执行方在批次执行期间运行，取消后做最后一次推送）"""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                self.flush()
+        finally:
+            self.flush()
+
+
+if __name__ == '__main__':
+    # 测试代码
+    stream = ProgressEventStream(interval=0.1)
+    with stream.subscribe() as sub:
+        stream.publish(JOB_STARTED, total=100)
+        for task_id in range(100):
+            stream.publish(TASK_FINISHED, task_id=task_id)
+        stream.publish(CHAPTER_COMPLETED, chapter_index=1)
+        stream.flush()
+        for item in sub.drain():
+            print(item.to_dict())
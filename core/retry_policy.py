@@ -0,0 +1,149 @@
+"""
+重试策略
+指数退避 + 完全抖动，只重试可恢复的错误，并用任务级重试预算防止引擎故障时的重试风暴
+"""
+import asyncio
+import random
+from typing import Optional, Tuple, Type
+
+
+# 默认可重试的异常类型（网络/超时类错误）；引擎返回False视为可重试的合成失败
+DEFAULT_RETRYABLE_ERRORS: Tuple[Type[BaseException], ...] = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+)
+
+
+class RetryBudget:
+    """
+    重试预算（令牌桶）
+
+    每发出一个首次请求存入 ratio 个令牌，每次重试消耗一个令牌；
+    引擎整体故障时重试总量被限制在首次请求数的 ratio 倍以内
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 10):
+        """
+        初始化重试预算
+
+        Args:
+            ratio: 重试请求占首次请求的最大比例
+            min_retries: 初始令牌数，保证小任务也能重试
+        """
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.tokens = float(min_retries)
+        self.denied = 0
+
+    def record_request(self):
+        """记录一次首次请求"""
+        self.tokens += self.ratio
+
+    def try_spend(self) -> bool:
+        """
+        尝试消耗一个重试令牌
+
+        Returns:
+            是否允许重试
+        """
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        self.denied += 1
+        return False
+
+
+class RetryPolicy:
+    """重试策略"""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        budget_ratio: float = 0.2,
+        min_budget: int = 10,
+        retryable_errors: Tuple[Type[BaseException], ...] = DEFAULT_RETRYABLE_ERRORS,
+        seed: Optional[int] = None
+    ):
+        """
+        初始化重试策略
+
+        Args:
+            max_attempts: 单个任务最多尝试次数（含首次），1表示不重试
+            base_delay: 退避基础时间(秒)
+            max_delay: 退避上限(秒)
+            budget_ratio: 重试预算比例（重试数/首次请求数）
+            min_budget: 每个任务批次的初始重试预算
+            retryable_errors: 可重试的异常类型
+            seed: 抖动随机种子（None则不固定）
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.min_budget = min_budget
+        self.retryable_errors = retryable_errors
+        self._random = random.Random(seed)
+
+    def new_budget(self) -> RetryBudget:
+        """
+        为一个任务批次创建重试预算
+
+        Returns:
+            RetryBudget实例
+        """
+        return RetryBudget(self.budget_ratio, self.min_budget)
+
+    def is_retryable(self, error: Optional[BaseException]) -> bool:
+        """
+        判断错误是否可重试
+
+        Args:
+            error: 异常（None表示引擎返回了失败）
+
+        Returns:
+            是否可重试
+        """
+        return error is None or isinstance(error, self.retryable_errors)
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次尝试失败后的等待时间（完全抖动）
+
+        Args:
+            attempt: 已尝试次数（从1开始）
+
+        Returns:
+            等待时间(秒)
+        """
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return self._random.uniform(0, ceiling)
+
+    def next_delay(self, attempt: int, error: Optional[BaseException], budget: RetryBudget) -> Optional[float]:
+        """
+        判断失败后是否重试
+
+        Args:
+            attempt: 已尝试次数（从1开始）
+            error: 异常（None表示引擎返回了失败）
+            budget: 当前批次的重试预算
+
+        Returns:
+            重试前的等待时间(秒)，不重试时返回None
+        """
+        if attempt >= self.max_attempts or not self.is_retryable(error):
+            return None
+        if not budget.try_spend():
+            return None
+        return self.backoff(attempt)
+
+
+if __name__ == '__main__':
+    # 测试代码
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5)
+    demo_budget = policy.new_budget()
+    for n in range(1, 6):
+        print(n, policy.next_delay(n, None, demo_budget))
+    print("ValueError可重试:", policy.is_retryable(ValueError()))
@@ -0,0 +1,237 @@
+"""
+段落长度校准
+对TTS引擎发送不同长度的请求，测量延迟并拟合 延迟 = 固定开销 + 每字耗时 * 字数，
+在延迟上限内选出吞吐量（字/秒）接近最优的段落长度；结果按 引擎/音色 保存在配置中，
+TextProcessor 分段时自动使用
+"""
+import asyncio
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from statistics import median
+from typing import Dict, List, Optional, Sequence, Tuple
+from loguru import logger
+
+from .duration_model import LinearFit
+from .loop_runner import run_sync
+
+
+DEFAULT_SIZES = (50, 100, 200, 400, 800, 1200)
+
+# 没有提供语料时使用的句子（每次请求取不同位置的文本，避免命中合成缓存）
+_CORPUS = (
+    "夜色渐深，城外的风从山谷里吹来，带着一丝凉意。他抬起头，看见远处的灯火一盏接一盏地亮了起来。"
+    "“你真的要走吗？”她轻声问道。马车在石板路上颠簸着，车轮发出单调的声响。"
+    "没有人知道那天晚上究竟发生了什么，只有那封信被留在了桌上。雨水顺着屋檐滴落，在青石台阶上溅起细小的水花。"
+    "他沉默了很久，终于开口说出了埋藏在心底多年的秘密。"
+)
+
+
+def segment_length_key(engine: str, voice: str) -> str:
+    """
+    校准结果在配置中的键
+
+    Args:
+        engine: 引擎类型（tts.default_engine）
+        voice: 音色
+
+    Returns:
+        "引擎/音色"
+    """
+    return f"{engine}/{voice}"
+
+
+@dataclass
+class CalibrationResult:
+    """校准结果"""
+    segment_length: int  # 选出的段落长度(字符)
+    overhead_ms: float  # 每次请求的固定开销(毫秒)
+    per_char_ms: float  # 每字符耗时(毫秒)
+    chars_per_second: float  # 选出的长度下单个并发槽位的预计吞吐(字/秒)
+    max_latency_ms: float  # 延迟上限(毫秒)
+    samples: List[Tuple[int, float]] = field(default_factory=list)  # (字数, 延迟毫秒)
+
+    def predict_latency_ms(self, chars: int) -> float:
+        """按拟合的开销模型预测延迟"""
+        return self.overhead_ms + self.per_char_ms * chars
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def sample_text(corpus: str, size: int, offset: int) -> str:
+    """
+    从语料中截取指定长度的文本（语料不够长时循环使用）
+
+    Args:
+        corpus: 语料
+        size: 字数
+        offset: 起始位置
+
+    Returns:
+        文本
+    """
+    repeated = corpus * (size // len(corpus) + 2)
+    start = offset % len(corpus)
+    return repeated[start:start + size]
+
+
+def choose_segment_length(
+    samples: Sequence[Tuple[int, float]],
+    max_latency_ms: float,
+    efficiency: float = 0.95,
+    min_length: int = 20
+) -> CalibrationResult:
+    """
+    根据测量结果选择段落长度
+
+    按拟合的开销模型，段落越长吞吐越高但延迟也越高：先确定延迟上限内允许的最长段落，
+    再选出吞吐达到该长度 efficiency 倍的最短段落（再加长收益很小，段落短则出声快、重试代价小）。
+    测量到的吞吐在某个长度之后下降时（引擎对长文本变慢），最长段落不超过该长度
+
+    Args:
+        samples: (字数, 延迟毫秒) 列表
+        max_latency_ms: 单次请求的延迟上限(毫秒)
+        efficiency: 相对最高吞吐的比例
+        min_length: 最短段落长度
+
+    Returns:
+        CalibrationResult
+    """
+    if not samples:
+        raise ValueError("没有有效的测量结果")
+    fit = LinearFit()
+    for chars, latency in samples:
+        fit.add(chars, latency)
+    overhead, per_char = fit.coefficients()
+    overhead = max(0.0, overhead)
+
+    # 实测吞吐（各长度的延迟中位数）
+    by_size: Dict[int, List[float]] = {}
+    for chars, latency in samples:
+        by_size.setdefault(chars, []).append(latency)
+    measured = {size: size * 1000.0 / max(1e-6, median(latencies)) for size, latencies in by_size.items()}
+    longest = max(measured)
+    best_measured = max(measured, key=measured.get)
+    if best_measured < longest and measured[longest] < measured[best_measured] * efficiency:
+        longest = best_measured
+
+    if per_char > 0:
+        longest = min(longest, int((max_latency_ms - overhead) / per_char))
+    longest = max(min_length, longest)
+
+    def throughput(chars: float) -> float:
+        return chars * 1000.0 / max(1e-6, overhead + per_char * chars)
+
+    # 吞吐 L / (a + bL) 随 L 单调递增，解 L / (a + bL) = t 得 L = a*t / (1 - b*t)
+    target = throughput(longest) * efficiency / 1000.0
+    if overhead > 0 and per_char * target < 1:
+        length = int(min(longest, max(min_length, overhead * target / (1 - per_char * target))))
+    else:
+        length = longest
+    # 取整到10字
+    length = max(min_length, min(longest, round(length, -1)))
+
+    return CalibrationResult(
+        segment_length=length,
+        overhead_ms=overhead,
+        per_char_ms=per_char,
+        chars_per_second=throughput(length),
+        max_latency_ms=max_latency_ms,
+        samples=list(samples)
+    )
+
+
+async def measure_latencies(
+    tts_engine,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeats: int = 3,
+    corpus: Optional[str] = None,
+    concurrency: int = 1
+) -> List[Tuple[int, float]]:
+    """
+    测量各长度请求的合成延迟
+
+    Args:
+        tts_engine: TTS引擎实例（需提供 async synthesize(text, output_path)）
+        sizes: 请求字数列表
+        repeats: 每个长度的请求次数
+        corpus: 语料（None则使用内置句子）
+        concurrency: 同时进行的请求数（与实际转换的并发数一致时结果更准确）
+
+    Returns:
+        成功请求的 (字数, 延迟毫秒) 列表
+    """
+    corpus = corpus or _CORPUS
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    extension = getattr(getattr(tts_engine, 'config', None), 'output_format', None) or 'mp3'
+    samples: List[Tuple[int, float]] = []
+
+    with tempfile.TemporaryDirectory(prefix="calibrate_") as work_dir:
+        async def measure(index: int, size: int):
+            text = sample_text(corpus, size, offset=index * 37)
+            output_path = str(Path(work_dir) / f"{index:04d}.{extension}")
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    success = await tts_engine.synthesize(text, output_path)
+                except Exception as e:
+                    logger.warning(f"校准请求失败 ({size} 字): {e}")
+                    return
+                latency = (time.monotonic() - start) * 1000
+            if success:
+                samples.append((len(text), latency))
+                logger.debug(f"校准: {len(text)} 字 -> {latency:.0f}ms")
+
+        # 各长度交替发送，避免引擎状态（预热、限流）只影响某一个长度
+        plan = [size for _ in range(repeats) for size in sizes]
+        await asyncio.gather(*(measure(index, size) for index, size in enumerate(plan)))
+    return samples
+
+
+def calibrate(
+    tts_engine,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    repeats: int = 3,
+    max_latency_ms: float = 10000.0,
+    efficiency: float = 0.95,
+    corpus: Optional[str] = None,
+    concurrency: int = 1
+) -> CalibrationResult:
+    """
+    校准段落长度（同步，在共享的后台事件循环中执行）
+
+    Args:
+        tts_engine: TTS引擎实例
+        sizes: 请求字数列表
+        repeats: 每个长度的请求次数
+        max_latency_ms: 单次请求的延迟上限(毫秒)
+        efficiency: 相对最高吞吐的比例
+        corpus: 语料（None则使用内置句子）
+        concurrency: 同时进行的请求数
+
+    Returns:
+        CalibrationResult
+
+    Raises:
+        RuntimeError: 所有请求都失败
+    """
+    samples = run_sync(measure_latencies(tts_engine, sizes, repeats, corpus, concurrency))
+    if not samples:
+        raise RuntimeError("校准失败：所有请求都失败了")
+    result = choose_segment_length(samples, max_latency_ms, efficiency)
+    logger.info(
+        f"校准完成: 固定开销 {result.overhead_ms:.0f}ms, 每字 {result.per_char_ms:.2f}ms, "
+        f"段落长度 {result.segment_length} 字 (预计 {result.chars_per_second:.0f} 字/秒/并发)"
+    )
+    return result
+
+
+if __name__ == '__main__':
+    # 测试代码：固定开销800ms、每字5ms的引擎
+    demo_samples = [(size, 800 + 5 * size) for size in DEFAULT_SIZES for _ in range(3)]
+    for bound in (10000, 3000):
+        demo = choose_segment_length(demo_samples, max_latency_ms=bound)
+        print(f"延迟上限 {bound}ms: 段落长度 {demo.segment_length} 字, "
+              f"{demo.chars_per_second:.0f} 字/秒, 预计延迟 {demo.predict_latency_ms(demo.segment_length):.0f}ms")
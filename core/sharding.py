@@ -0,0 +1,225 @@
+"""
+静态分片
+把一本书按章节拆分给多台机器各自合成（convert --shard i/n），不需要共享队列；
+每个分片写出分片清单，全部完成后由 assemble 校验清单并合并
+"""
+import hashlib
+import heapq
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+from loguru import logger
+
+
+MANIFEST_DIR = "shards"
+MANIFEST_VERSION = 1
+
+
+def parse_shard_spec(spec: str) -> Tuple[int, int]:
+    """
+    解析分片参数
+
+    Args:
+        spec: "i/n" 形式，i 从1开始
+
+    Returns:
+        (分片序号, 分片总数)
+    """
+    try:
+        index, count = (int(part) for part in str(spec).split('/'))
+    except ValueError:
+        raise ValueError(f"分片参数格式应为 i/n: {spec}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"分片序号超出范围: {spec}")
+    return index, count
+
+
+def plan_shards(chapter_chars: Dict[int, int], shard_count: int) -> List[List[int]]:
+    """
+    按字数均衡地把章节分配到各分片
+
+    最长处理时间优先（LPT）：章节按字数从多到少依次分给当前字数最少的分片；
+    只依赖章节字数，相同的输入在每台机器上得到相同的分配
+
+    Args:
+        chapter_chars: 章节序号 -> 字数
+        shard_count: 分片总数
+
+    Returns:
+        每个分片的章节序号列表（已排序）
+    """
+    heap = [(0, shard) for shard in range(shard_count)]
+    shards: List[List[int]] = [[] for _ in range(shard_count)]
+    for chapter_index in sorted(chapter_chars, key=lambda index: (-chapter_chars[index], index)):
+        load, shard = heapq.heappop(heap)
+        shards[shard].append(chapter_index)
+        heapq.heappush(heap, (load + chapter_chars[chapter_index], shard))
+    return [sorted(chapters) for chapters in shards]
+
+
+def plan_fingerprint(chapter_chars: Dict[int, int], shard_count: int) -> str:
+    """
+    分片方案指纹（章节划分或分片数不同的清单不能合并）
+
+    Args:
+        chapter_chars: 章节序号 -> 字数
+        shard_count: 分片总数
+
+    Returns:
+        指纹字符串
+    """
+    content = json.dumps([shard_count, sorted(chapter_chars.items())])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+@dataclass
+class ShardManifest:
+    """分片清单"""
+    book: str  # 书名
+    shard_index: int  # 分片序号（从1开始）
+    shard_count: int  # 分片总数
+    plan: str  # 分片方案指纹
+    chapters: List[int]  # 本分片的章节序号
+    total_chapters: int  # 全书（有合成任务的）章节数
+    chars: int = 0  # 本分片字数
+    completed: int = 0  # 成功的任务数
+    failed: int = 0  # 失败的任务数
+    files: List[Dict] = field(default_factory=list)  # 段落音频 {chapter_index, segment_index, path, size}
+    created_at: float = field(default_factory=time.time)
+    version: int = MANIFEST_VERSION
+
+    @staticmethod
+    def path_for(book_dir: Union[str, Path], shard_index: int, shard_count: int) -> Path:
+        """
+        分片清单路径
+
+        Args:
+            book_dir: 书籍输出目录
+            shard_index: 分片序号
+            shard_count: 分片总数
+
+        Returns:
+            清单文件路径
+        """
+        return Path(book_dir) / MANIFEST_DIR / f"shard-{shard_index:03d}-of-{shard_count:03d}.json"
+
+    def save(self, book_dir: Union[str, Path]) -> Path:
+        """
+        写出清单（先写临时文件再替换）
+
+        Args:
+            book_dir: 书籍输出目录
+
+        Returns:
+            清单文件路径
+        """
+        path = self.path_for(book_dir, self.shard_index, self.shard_count)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(asdict(self), ensure_ascii=False, indent=2), encoding='utf-8')
+        tmp_path.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'ShardManifest':
+        """
+        读取清单
+
+        Args:
+            path: 清单文件路径
+
+        Returns:
+            ShardManifest实例
+        """
+        data = json.loads(Path(path).read_text(encoding='utf-8'))
+        if data.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"不支持的分片清单版本: {path}")
+        return cls(**data)
+
+
+def validate_shards(book_dir: Union[str, Path]) -> List[ShardManifest]:
+    """
+    校验书籍目录下的全部分片清单
+
+    检查：分片齐全且属于同一分片方案、章节互不重叠且覆盖全书、没有失败的任务、
+    清单中的音频文件存在且大小一致
+
+    Args:
+        book_dir: 书籍输出目录（各分片的输出已复制到该目录）
+
+    Returns:
+        按分片序号排序的清单列表
+
+    Raises:
+        ValueError: 校验失败（消息中列出全部问题）
+    """
+    book_dir = Path(book_dir)
+    paths = sorted((book_dir / MANIFEST_DIR).glob("shard-*.json"))
+    if not paths:
+        raise ValueError(f"没有找到分片清单: {book_dir / MANIFEST_DIR}")
+
+    manifests = [ShardManifest.load(path) for path in paths]
+    problems = []
+
+    plans = {(manifest.plan, manifest.shard_count) for manifest in manifests}
+    if len(plans) > 1:
+        raise ValueError(f"分片清单来自不同的分片方案: {sorted(plans)}")
+    shard_count = manifests[0].shard_count
+
+    present = {manifest.shard_index for manifest in manifests}
+    missing = sorted(set(range(1, shard_count + 1)) - present)
+    if missing:
+        problems.append(f"缺少分片: {', '.join(f'{index}/{shard_count}' for index in missing)}")
+
+    seen: Dict[int, int] = {}
+    for manifest in manifests:
+        label = f"分片 {manifest.shard_index}/{shard_count}"
+        if manifest.failed:
+            problems.append(f"{label} 有 {manifest.failed} 个失败的任务，请重新运行该分片")
+        for chapter_index in manifest.chapters:
+            if chapter_index in seen:
+                problems.append(f"章节 {chapter_index} 同时属于分片 {seen[chapter_index]} 和 {manifest.shard_index}")
+            seen[chapter_index] = manifest.shard_index
+        for entry in manifest.files:
+            path = book_dir / entry['path']
+            if not path.exists():
+                problems.append(f"{label} 缺少文件: {entry['path']}")
+            elif path.stat().st_size != entry['size']:
+                problems.append(f"{label} 文件大小不一致: {entry['path']}")
+
+    if not missing and len(seen) != manifests[0].total_chapters:
+        problems.append(f"分片章节数 {len(seen)} 与全书章节数 {manifests[0].total_chapters} 不一致")
+
+    if problems:
+        for problem in problems:
+            logger.error(problem)
+        raise ValueError(f"分片校验失败 ({len(problems)} 个问题): {problems[0]}")
+
+    logger.info(f"✓ 分片校验通过: {shard_count} 个分片, {len(seen)} 个章节")
+    return sorted(manifests, key=lambda manifest: manifest.shard_index)
+
+
+def ordered_files(manifests: List[ShardManifest], book_dir: Union[str, Path]) -> List[str]:
+    """
+    按章节和段落顺序排列各分片的音频文件
+
+    Args:
+        manifests: 分片清单列表
+        book_dir: 书籍输出目录
+
+    Returns:
+        音频文件路径列表
+    """
+    entries = [entry for manifest in manifests for entry in manifest.files]
+    entries.sort(key=lambda entry: (entry['chapter_index'], entry['segment_index']))
+    return [str(Path(book_dir) / entry['path']) for entry in entries]
+
+
+if __name__ == '__main__':
+    # 测试代码
+    demo_chars = {1: 9000, 2: 3000, 3: 3000, 4: 2500, 5: 500, 6: 8000, 7: 4000}
+    for shard, chapters in enumerate(plan_shards(demo_chars, 3), 1):
+        print(f"分片 {shard}/3: 章节 {chapters}, 字数 {sum(demo_chars[c] for c in chapters)}")
+    print("方案指纹:", plan_fingerprint(demo_chars, 3))
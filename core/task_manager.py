@@ -3,14 +3,42 @@
 管理TTS合成任务的执行
 """
 import asyncio
+import hashlib
+import inspect
+import os
+import time
 from pathlib import Path
-from typing import List, Dict, Optional, Callable
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from loguru import logger
 from tqdm import tqdm
 
+from .deadline_policy import DeadlinePolicy
+from .duration_model import DurationModel
+from .latency_tracker import LatencyHistogram
+from .loop_runner import run_sync
+from .job_journal import JobJournal
+from .metrics import STAGE_DURATION, get_registry, record_cache
+from .progress_events import (
+    CHAPTER_COMPLETED, JOB_FINISHED, JOB_STARTED, TASK_FAILED, TASK_FINISHED, TASK_STARTED, ProgressEventStream
+)
+from .retry_policy import RetryPolicy
+
+
+_metrics = get_registry()
+SEGMENT_SECONDS = _metrics.histogram('task_segment_seconds', '段落合成耗时(秒，含引擎排队，不含重试等待)')
+QUEUE_DEPTH = _metrics.gauge('task_queue_depth', '待执行队列中的任务数')
+TASKS_IN_FLIGHT = _metrics.gauge('tasks_in_flight', '正在合成的任务数')
+TASKS_FINISHED = _metrics.counter('tasks_finished_total', '结束的任务数', ('status',))
+TASK_RETRIES = _metrics.counter('task_retries_total', '任务重试次数')
+CHARS_PER_SECOND = _metrics.gauge('synthesis_chars_per_second', '最近一次执行的合成吞吐(字符/秒)')
+DEADLINES_EXCEEDED = _metrics.counter('task_deadline_exceeded_total', '超过截止时间被取消的合成尝试数')
+SPECULATIONS = _metrics.counter('task_speculations_total', '慢任务推测执行次数', ('outcome',))
+BOOK_CHARS = _metrics.counter('book_chars_synthesized_total', '各书籍合成的字数', ('book',))
+BOOK_QUEUE_WAIT = _metrics.histogram('book_queue_wait_seconds', '各书籍任务从开始执行到首次合成的等待时间(秒)', ('book',))
+
 
 class TaskStatus(Enum):
     """任务状态"""
@@ -30,23 +58,53 @@ class TTSTask:
     chapter_title: str = ""
     status: TaskStatus = TaskStatus.PENDING
     error: Optional[str] = None
+    attempts: int = 0  # 已尝试次数（含重试）
     metadata: Dict = field(default_factory=dict)
 
 
 class TaskManager:
     """任务管理器"""
 
-    def __init__(self, max_workers: int = 4):
+    def __init__(
+        self,
+        max_workers: int = 4,
+        capture_timing: bool = False,
+        retry_policy: Optional[RetryPolicy] = None,
+        journal: Optional[JobJournal] = None,
+        queue_size: int = 0,
+        deadline_policy: Optional[DeadlinePolicy] = None,
+        events: Optional[ProgressEventStream] = None,
+        duration_model: Optional[DurationModel] = None
+    ):
         """
         初始化任务管理器
 
         Args:
             max_workers: 最大并发数
+            capture_timing: 合成时是否同时保存词边界时间轴文件（需引擎支持）
+            retry_policy: 失败重试策略（None则使用默认策略）
+            journal: 任务日志（设置后跳过日志中已完成且校验通过的任务）
+            queue_size: 待执行队列长度（0则等于最大并发数），队列越短，任务源的调整生效越快
+            deadline_policy: 截止时间与慢任务推测执行策略（None则使用默认策略）
+            events: 进度事件流（None则创建默认的事件流，可通过 events.subscribe() 订阅）
+            duration_model: 段落时长模型（设置后记录每个成功段落的合成延迟，用于后续的最长优先排序）
         """
         self.max_workers = max_workers
+        self.capture_timing = capture_timing
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.journal = journal
+        self.queue_size = queue_size
+        self.deadline_policy = deadline_policy or DeadlinePolicy()
+        self.events = events or ProgressEventStream()
+        self.duration_model = duration_model
+        self.retry_count = 0
+        self.retries_denied = 0
         self.tasks: List[TTSTask] = []
         self.completed_count = 0
         self.failed_count = 0
+        self.cancelled_count = 0
+        self.latency = LatencyHistogram()
+        self._control: Optional[Dict] = None  # 正在执行的批次的控制句柄（事件循环、暂停事件等）
         logger.info(f"任务管理器初始化 (最大并发: {max_workers})")
 
     def add_task(
@@ -104,109 +162,788 @@ class TaskManager:
         logger.info(f"批量添加 {count} 个任务")
         return count
 
+    @staticmethod
+    def iter_tasks(task_list: Iterable[Dict]) -> Iterator[TTSTask]:
+        """
+        把任务字典流惰性地转换为任务对象（配合 execute_async 的 source 参数使用）
+
+        Args:
+            task_list: 任务字典的可迭代对象，字段同 add_tasks_batch
+
+        Yields:
+            任务对象
+        """
+        for index, task_data in enumerate(task_list):
+            yield TTSTask(
+                task_id=task_data.get('task_id', index),
+                text=task_data['text'],
+                output_path=task_data['output_path'],
+                chapter_title=task_data.get('chapter_title', ''),
+                metadata=task_data.get('metadata', {})
+            )
+
     async def execute_async(
         self,
         tts_engine,
         progress_callback: Optional[Callable] = None,
-        show_progress: bool = True
+        show_progress: bool = True,
+        source: Optional[Iterable[TTSTask]] = None
     ) -> Dict:
         """
         异步执行所有任务
 
+        固定数量的工作协程从有界队列中取任务，生产者按需从任务源拉取任务，
+        内存占用与任务总数无关，任务源也可以在执行过程中继续产生任务
+
         Args:
             tts_engine: TTS引擎实例
-            progress_callback: 进度回调函数
+            progress_callback: 进度回调函数（可以返回awaitable，等待期间该工作协程不领取新任务）
             show_progress: 是否显示进度条
+            source: 任务源（可迭代对象/生成器），None则执行 self.tasks
+
+        执行过程中的任务/章节/批次统计事件发布到 self.events，按其推送间隔合并后推送给订阅者
 
         Returns:
             执行结果统计
         """
-        logger.info(f"开始执行 {len(self.tasks)} 个任务...")
+        if source is None:
+            source = self.tasks
+        total = len(source) if hasattr(source, '__len__') else None
+
+        logger.info(f"开始执行 {total if total is not None else '流式'} 个任务...")
         self.completed_count = 0
         self.failed_count = 0
+        self.cancelled_count = 0
+        self.retry_count = 0
+        self.latency = LatencyHistogram()
+        budget = self.retry_policy.new_budget()
+        detector = self.deadline_policy.new_detector()
+        # 时长模型按音色/语速分别拟合（包装引擎没有配置时按默认值记录）
+        engine_config = getattr(tts_engine, 'config', None)
+        voice = getattr(engine_config, 'voice', "")
+        rate = getattr(engine_config, 'rate', 1.0)
+        job_start = time.monotonic()
+
+        journal_completed = self.journal.load_completed() if self.journal else {}
+        fingerprint = self._engine_fingerprint(tts_engine) if self.journal else ""
+        journal_keys: Dict[int, str] = {}
 
         # 创建进度条
-        pbar = tqdm(total=len(self.tasks), desc="合成进度") if show_progress else None
+        pbar = tqdm(total=total, desc="合成进度") if show_progress else None
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size or self.max_workers)
+        state = {
+            'produced': 0, 'outstanding': 0, 'resumed': 0, 'chars': 0, 'producer_done': False,
+            'deadline_exceeded': 0, 'speculating': 0, 'speculative': 0, 'speculative_wins': 0,
+            'busy': 0, 'cancelled': False
+        }
+        all_done = asyncio.Event()
+        retry_timers: Set[asyncio.Task] = set()
+        # 已从队列取出但尚未结束的任务、等待重试的任务（取消时标记为 CANCELLED）
+        claimed: Dict[int, TTSTask] = {}
+        retry_waiting: Dict[int, TTSTask] = {}
+
+        # 暂停/恢复/取消的控制句柄，pause()/resume()/cancel() 通过 call_soon_threadsafe 在本事件循环中操作
+        resume_event = asyncio.Event()
+        resume_event.set()
+
+        def request_cancel(drain: bool):
+            """停止开始新任务；drain为False时立即结束，正在合成的任务随工作协程一起被取消"""
+            state['cancelled'] = True
+            resume_event.set()
+            if not drain or state['busy'] == 0:
+                all_done.set()
 
-        # 使用信号量限制并发
-        semaphore = asyncio.Semaphore(self.max_workers)
+        self._control = {
+            'loop': asyncio.get_running_loop(),
+            'resume': resume_event,
+            'cancel': request_cancel
+        }
+        books: Dict[str, Dict] = {}
+
+        def book_entry(task: TTSTask) -> Optional[Dict]:
+            """任务所属书籍的统计（metadata 中没有 book 时返回None）"""
+            book = task.metadata.get('book')
+            if book is None:
+                return None
+            if book not in books:
+                books[book] = {
+                    'tasks': 0, 'completed': 0, 'failed': 0, 'chars': 0,
+                    'first_start': None, 'last_end': None, 'wait': LatencyHistogram()
+                }
+            return books[book]
+
+        # 章节完成事件：按 (书名, 章节序号) 统计 self.tasks 中每个章节尚未结束的任务数
+        chapter_remaining: Dict[Tuple, int] = {}
+        for known in self.tasks:
+            if 'chapter_index' in known.metadata:
+                key = (known.metadata.get('book'), known.metadata['chapter_index'])
+                chapter_remaining[key] = chapter_remaining.get(key, 0) + 1
+
+        def publish_finished(task: TTSTask):
+            """发布任务结束事件，章节的最后一个任务结束时发布章节完成事件"""
+            if not self.events.has_subscribers:
+                return
+            chapter_index = task.metadata.get('chapter_index')
+            if task.status == TaskStatus.COMPLETED:
+                self.events.publish(TASK_FINISHED, task_id=task.task_id, chapter_index=chapter_index,
+                                    output_path=task.output_path)
+            else:
+                self.events.publish(TASK_FAILED, task_id=task.task_id, chapter_index=chapter_index, error=task.error)
+            key = (task.metadata.get('book'), chapter_index)
+            if key in chapter_remaining:
+                chapter_remaining[key] -= 1
+                if chapter_remaining[key] == 0:
+                    self.events.publish(CHAPTER_COMPLETED, book=key[0], chapter_index=chapter_index,
+                                        title=task.chapter_title)
 
-        async def execute_single_task(task: TTSTask):
-            """执行单个任务"""
-            async with semaphore:
+        def job_stats() -> Dict:
+            """批次统计快照（随每次事件推送附带）"""
+            elapsed = time.monotonic() - job_start
+            return {
+                'total': total if total is not None else state['produced'],
+                'completed': self.completed_count,
+                'failed': self.failed_count,
+                'resumed': state['resumed'],
+                'in_flight': state['busy'],
+                'queued': queue.qsize(),
+                'retries': self.retry_count,
+                'chars': state['chars'],
+                'elapsed_seconds': elapsed,
+                'chars_per_second': state['chars'] / elapsed if elapsed else 0.0,
+                'paused': not resume_event.is_set()
+            }
+
+        async def finish(task: TTSTask):
+            """任务结束（成功/最终失败/从日志恢复）"""
+            journal_keys.pop(id(task), None)
+            publish_finished(task)
+            entry = book_entry(task)
+            if entry is not None:
+                entry['tasks'] += 1
+                entry['completed' if task.status == TaskStatus.COMPLETED else 'failed'] += 1
+                entry['last_end'] = time.monotonic()
+            if pbar:
+                pbar.update(1)
+            if progress_callback:
                 try:
-                    task.status = TaskStatus.RUNNING
+                    outcome = progress_callback(task)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+                except Exception as e:
+                    logger.error(f"进度回调失败: {e}")
+
+        def settle():
+            """生产者已结束且没有未完成任务时通知结束"""
+            if state['producer_done'] and state['outstanding'] == 0:
+                all_done.set()
+
+        async def producer():
+            """按需从任务源拉取任务放入队列"""
+            try:
+                for task in source:
+                    state['produced'] += 1
 
-                    # 确保输出目录存在
-                    Path(task.output_path).parent.mkdir(parents=True, exist_ok=True)
+                    # 从任务日志恢复：跳过已完成且输出文件校验通过的任务
+                    if self.journal:
+                        key = self.journal.task_key(task.text, task.output_path, fingerprint)
+                        completed = journal_completed.pop(key, None)
+                        resumed = completed is not None and self.journal.verify(completed)
+                        record_cache('journal', resumed)
+                        if resumed:
+                            task.status = TaskStatus.COMPLETED
+                            task.error = None
+                            self.completed_count += 1
+                            state['resumed'] += 1
+                            TASKS_FINISHED.inc(status='resumed')
+                            await finish(task)
+                            continue
+                        journal_keys[id(task)] = key
 
-                    # 执行TTS合成
-                    success = await tts_engine.synthesize(task.text, task.output_path)
+                    task.status = TaskStatus.PENDING
+                    state['outstanding'] += 1
+                    # 每个首次请求为重试预算存入令牌，预算随任务量增长
+                    budget.record_request()
+                    await queue.put((task, 1))
+                    QUEUE_DEPTH.set(queue.qsize())
+            finally:
+                state['producer_done'] = True
+                settle()
 
-                    if success:
-                        task.status = TaskStatus.COMPLETED
-                        self.completed_count += 1
+        async def requeue_later(task: TTSTask, attempt: int, delay: float):
+            """退避结束后重新入队（等待期间不占用工作协程）"""
+            await asyncio.sleep(delay)
+            await queue.put((task, attempt))
+            retry_waiting.pop(id(task), None)
+            QUEUE_DEPTH.set(queue.qsize())
+
+        async def send_request(text: str, output_path: str) -> bool:
+            """向引擎发出一次请求"""
+            if self.capture_timing:
+                return await tts_engine.synthesize_with_timing(text, output_path)
+            return await tts_engine.synthesize(text, output_path)
+
+        async def race(task: TTSTask) -> bool:
+            """
+            执行一次合成；运行超过慢任务阈值时发出推测副本写入临时文件，
+            先成功者胜出，另一个被取消
+            """
+            primary = asyncio.ensure_future(send_request(task.text, task.output_path))
+            # 打包任务由引擎按输出路径拆分，不能写入临时文件
+            if not self.deadline_policy.speculate or task.metadata.get('packed_segments'):
+                return await primary
+
+            # 样本不足或推测副本已满时定期重新检查，任务开始时的判断可能在运行中变化
+            started = time.monotonic()
+            threshold = None
+            try:
+                while not primary.done():
+                    threshold = detector.threshold(len(task.text))
+                    elapsed = time.monotonic() - started
+                    if threshold is not None and elapsed >= threshold:
+                        if state['speculating'] < self.deadline_policy.max_speculative:
+                            break
+                        wait = self.deadline_policy.recheck_seconds
                     else:
-                        task.status = TaskStatus.FAILED
-                        task.error = "合成失败"
-                        self.failed_count += 1
+                        wait = self.deadline_policy.recheck_seconds if threshold is None else threshold - elapsed
+                    await asyncio.wait({primary}, timeout=wait)
+            except asyncio.CancelledError:
+                primary.cancel()
+                raise
+            if primary.done():
+                return primary.result()
+
+            final = Path(task.output_path)
+            spec_path = final.with_name(f"{final.stem}.speculative{final.suffix}")
+            spec = asyncio.ensure_future(send_request(task.text, str(spec_path)))
+            state['speculating'] += 1
+            state['speculative'] += 1
+            logger.debug(f"任务 {task.task_id} 运行超过 {threshold:.1f}秒，发出推测副本")
+
+            winner = None
+            try:
+                contenders = {primary, spec}
+                while contenders and winner is None:
+                    done, contenders = await asyncio.wait(contenders, return_when=asyncio.FIRST_COMPLETED)
+                    for finished in done:
+                        if not finished.cancelled() and finished.exception() is None and finished.result():
+                            winner = finished
+                            break
+            finally:
+                state['speculating'] -= 1
+                # 先等失败者退出，再移动胜出者的文件，避免失败者继续写入最终路径
+                for contender in (primary, spec):
+                    if not contender.done():
+                        contender.cancel()
+                await asyncio.gather(primary, spec, return_exceptions=True)
+                if winner is spec:
+                    os.replace(spec_path, final)
+                    spec_timing = spec_path.with_name(spec_path.name + ".timing.json")
+                    if spec_timing.exists():
+                        os.replace(spec_timing, final.with_name(final.name + ".timing.json"))
+                for leftover in (spec_path, spec_path.with_name(spec_path.name + ".timing.json")):
+                    if leftover.exists():
+                        leftover.unlink()
+
+            SPECULATIONS.inc(outcome='won' if winner is spec else 'lost')
+            if winner is spec:
+                state['speculative_wins'] += 1
+            if winner is not None:
+                return True
+            # 两者都失败：按主请求的结果处理（抛出其异常）
+            return primary.result()
+
+        async def synthesize_once(task: TTSTask) -> Tuple[bool, Optional[Exception]]:
+            """执行一次合成尝试（受截止时间限制），返回 (是否成功, 异常)"""
+            task.attempts += 1
+            task_start = time.monotonic()
+            deadline = self.deadline_policy.deadline(len(task.text))
+            try:
+                # 确保输出目录存在
+                Path(task.output_path).parent.mkdir(parents=True, exist_ok=True)
+
+                with TASKS_IN_FLIGHT.track_inprogress():
+                    success = await asyncio.wait_for(race(task), deadline)
+            except asyncio.TimeoutError as e:
+                if deadline is None or time.monotonic() - task_start < deadline:
+                    return False, e
+                state['deadline_exceeded'] += 1
+                DEADLINES_EXCEEDED.inc()
+                return False, asyncio.TimeoutError(f"合成超过截止时间 {deadline:.1f}秒")
+            except Exception as e:
+                return False, e
 
+            if success:
+                elapsed = time.monotonic() - task_start
+                self.latency.record(elapsed * 1000)
+                detector.record(elapsed * 1000, len(task.text))
+                if self.duration_model is not None:
+                    self.duration_model.observe(len(task.text), latency_ms=elapsed * 1000, voice=voice, rate=rate)
+                SEGMENT_SECONDS.observe(elapsed)
+                state['chars'] += len(task.text)
+                entry = book_entry(task)
+                if entry is not None:
+                    entry['chars'] += len(task.text)
+                    BOOK_CHARS.inc(len(task.text), book=task.metadata['book'])
+            return success, None
+
+        async def run_task(task: TTSTask, attempt: int) -> bool:
+            """执行一次尝试，返回任务是否已结束（False表示已安排重试）"""
+            task.status = TaskStatus.RUNNING
+            if self.events.has_subscribers:
+                self.events.publish(TASK_STARTED, task_id=task.task_id, attempt=attempt,
+                                    chapter_index=task.metadata.get('chapter_index'))
+            entry = book_entry(task)
+            if entry is not None and attempt == 1:
+                # 排队等待：从本次执行开始到首次合成开始（任务源按调度策略决定各书的先后）
+                now = time.monotonic()
+                entry['wait'].record((now - job_start) * 1000)
+                BOOK_QUEUE_WAIT.observe(now - job_start, book=task.metadata['book'])
+                if entry['first_start'] is None:
+                    entry['first_start'] = now
+            success, error = await synthesize_once(task)
+
+            if success:
+                task.status = TaskStatus.COMPLETED
+                task.error = None
+                self.completed_count += 1
+                TASKS_FINISHED.inc(status='completed')
+                self._journal_record(journal_keys, task)
+                return True
+
+            task.error = str(error) if error else "合成失败"
+            delay = self.retry_policy.next_delay(attempt, error, budget)
+            if delay is not None:
+                self.retry_count += 1
+                TASK_RETRIES.inc()
+                task.status = TaskStatus.PENDING
+                logger.debug(f"任务 {task.task_id} 第{attempt}次尝试失败，{delay:.2f}秒后重试: {task.error}")
+                retry_waiting[id(task)] = task
+                timer = asyncio.ensure_future(requeue_later(task, attempt + 1, delay))
+                retry_timers.add(timer)
+                timer.add_done_callback(retry_timers.discard)
+                return False
+
+            task.status = TaskStatus.FAILED
+            self.failed_count += 1
+            TASKS_FINISHED.inc(status='failed')
+            self._journal_record(journal_keys, task)
+            if error:
+                logger.error(f"任务 {task.task_id} 失败: {error}")
+            return True
+
+        async def worker():
+            """工作协程：循环取任务执行，单个任务出错不影响其他任务"""
+            while True:
+                task, attempt = await queue.get()
+                QUEUE_DEPTH.set(queue.qsize())
+                claimed[id(task)] = task
+                # 暂停期间不开始新任务
+                await resume_event.wait()
+                if state['cancelled']:
+                    return
+
+                state['busy'] += 1
+                try:
+                    ended = await run_task(task, attempt)
                 except Exception as e:
                     task.status = TaskStatus.FAILED
                     task.error = str(e)
                     self.failed_count += 1
+                    TASKS_FINISHED.inc(status='failed')
                     logger.error(f"任务 {task.task_id} 失败: {e}")
-
+                    ended = True
                 finally:
-                    if pbar:
-                        pbar.update(1)
-                    if progress_callback:
-                        progress_callback(task)
+                    state['busy'] -= 1
+                claimed.pop(id(task), None)
 
-        # 并发执行所有任务
-        await asyncio.gather(*[execute_single_task(task) for task in self.tasks])
+                if ended:
+                    await finish(task)
+                    state['outstanding'] -= 1
+                    settle()
+                if state['cancelled']:
+                    # 排空模式：最后一个正在合成的任务结束后停止
+                    if state['busy'] == 0:
+                        all_done.set()
+                    return
 
-        if pbar:
-            pbar.close()
+        # 固定数量的工作协程
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.max_workers)]
+        producer_task = asyncio.ensure_future(producer())
+        done_waiter = asyncio.ensure_future(all_done.wait())
+        self.events.set_stats_provider(job_stats)
+        self.events.publish(JOB_STARTED, total=total)
+        flusher = asyncio.ensure_future(self.events.run_flusher())
+        try:
+            await asyncio.wait({producer_task, done_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not state['cancelled']:
+                await producer_task
+                await done_waiter
+        finally:
+            self._control = None
+            for pending in [producer_task, done_waiter, *workers, *retry_timers]:
+                pending.cancel()
+            await asyncio.gather(producer_task, done_waiter, *workers, *retry_timers, return_exceptions=True)
+            if state['cancelled']:
+                self._mark_cancelled(tts_engine, claimed, retry_waiting, queue)
+            # 停止定期推送（最后一次推送包含最终的批次统计）
+            flusher.cancel()
+            await asyncio.gather(flusher, return_exceptions=True)
+            self.events.set_stats_provider(None)
+            if self.journal:
+                self.journal.flush()
+            if pbar:
+                pbar.close()
+            QUEUE_DEPTH.set(0)
+
+        total = state['produced']
+        elapsed = time.monotonic() - job_start
+        STAGE_DURATION.observe(elapsed, stage='synthesis')
+        CHARS_PER_SECOND.set(state['chars'] / elapsed if elapsed else 0.0)
 
         # 统计结果
         result = {
-            'total': len(self.tasks),
+            'total': total,
             'completed': self.completed_count,
             'failed': self.failed_count,
-            'success_rate': self.completed_count / len(self.tasks) if self.tasks else 0
+            'success_rate': self.completed_count / total if total else 0,
+            'elapsed_seconds': elapsed,
+            'latency_ms': self.latency.summary(),
+            'retries': self.retry_count,
+            'retries_denied': budget.denied,
+            'resumed': state['resumed'],
+            'cancelled': self.cancelled_count,
+            'deadline_exceeded': state['deadline_exceeded'],
+            'speculative': state['speculative'],
+            'speculative_wins': state['speculative_wins'],
+            'books': {book: self._book_summary(entry) for book, entry in books.items()}
         }
+        self.retries_denied = budget.denied
 
-        logger.success(f"任务执行完成: {self.completed_count}/{len(self.tasks)} 成功")
+        self.events.publish(JOB_FINISHED, **{key: value for key, value in result.items() if key != 'books'})
+        self.events.flush()
+
+        if state['resumed']:
+            logger.info(f"从任务日志恢复: 跳过 {state['resumed']} 个已完成任务")
+        if state['cancelled']:
+            logger.warning(f"任务执行已取消: {self.completed_count}/{total} 成功, {self.cancelled_count} 个任务已取消")
+        else:
+            logger.success(f"任务执行完成: {self.completed_count}/{total} 成功")
         return result
 
+    def _mark_cancelled(self, tts_engine, claimed: Dict[int, TTSTask], retry_waiting: Dict[int, TTSTask], queue):
+        """
+        把取消时尚未结束的任务标记为 CANCELLED，并释放引擎资源
+
+        正在合成的任务被中断后删除其不完整的输出文件；任务日志中没有这些任务的记录，
+        再次执行时会重新合成
+        """
+        leftovers = {**claimed, **retry_waiting}
+        while not queue.empty():
+            task, _ = queue.get_nowait()
+            leftovers[id(task)] = task
+        for task in self.tasks:
+            if task.status in (TaskStatus.PENDING, TaskStatus.RUNNING):
+                leftovers[id(task)] = task
+
+        for task in leftovers.values():
+            if task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED):
+                continue
+            if task.status == TaskStatus.RUNNING:
+                for path in self._task_outputs(task):
+                    Path(path).unlink(missing_ok=True)
+            task.status = TaskStatus.CANCELLED
+            task.error = "已取消"
+            self.cancelled_count += 1
+            TASKS_FINISHED.inc(status='cancelled')
+
+        # 立即释放连接、进程池等资源（引擎在下一次合成时按需重新创建）
+        close = getattr(tts_engine, 'close', None)
+        if callable(close):
+            try:
+                close(wait=False)
+            except Exception as e:
+                logger.warning(f"释放引擎资源失败: {e}")
+
+    def pause(self) -> bool:
+        """
+        暂停正在执行的批次（线程安全）：正在合成的任务继续完成，之后不再开始新任务
+
+        Returns:
+            是否有正在执行的批次
+        """
+        return self._send_control(lambda control: control['resume'].clear(), "任务执行已暂停")
+
+    def resume(self) -> bool:
+        """
+        恢复已暂停的批次（线程安全）
+
+        Returns:
+            是否有正在执行的批次
+        """
+        return self._send_control(lambda control: control['resume'].set(), "任务执行已恢复")
+
+    def cancel(self, drain: bool = False) -> bool:
+        """
+        取消正在执行的批次（线程安全）
+
+        未开始的任务标记为 CANCELLED，执行方法返回已有的结果统计
+
+        Args:
+            drain: True则等正在合成的任务完成后结束，False则立即中断正在合成的任务
+
+        Returns:
+            是否有正在执行的批次
+        """
+        return self._send_control(lambda control: control['cancel'](drain), "正在取消任务执行...")
+
+    @property
+    def paused(self) -> bool:
+        """正在执行的批次是否处于暂停状态"""
+        control = self._control
+        return control is not None and not control['resume'].is_set()
+
+    def _send_control(self, action: Callable[[Dict], None], message: str) -> bool:
+        """在执行批次的事件循环中执行控制操作"""
+        control = self._control
+        if control is None:
+            return False
+        control['loop'].call_soon_threadsafe(action, control)
+        logger.info(message)
+        return True
+
+    @staticmethod
+    def _book_summary(entry: Dict) -> Dict:
+        """单本书的执行统计：任务数、合成字数、吞吐(字符/秒)和排队等待(毫秒)"""
+        busy = 0.0
+        if entry['first_start'] is not None and entry['last_end'] is not None:
+            busy = entry['last_end'] - entry['first_start']
+        return {
+            'tasks': entry['tasks'],
+            'completed': entry['completed'],
+            'failed': entry['failed'],
+            'chars': entry['chars'],
+            'elapsed_seconds': busy,
+            'chars_per_second': entry['chars'] / busy if busy else 0.0,
+            'wait_ms': entry['wait'].summary()
+        }
+
     def execute_sync(
         self,
         tts_engine,
         progress_callback: Optional[Callable] = None,
-        show_progress: bool = True
+        show_progress: bool = True,
+        source: Optional[Iterable[TTSTask]] = None
     ) -> Dict:
         """
         同步执行所有任务
 
+        任务在共享的后台事件循环线程中执行，progress_callback 和任务源的迭代也在该线程中进行
+
         Args:
             tts_engine: TTS引擎实例
             progress_callback: 进度回调
             show_progress: 是否显示进度
+            source: 任务源（可迭代对象/生成器），None则执行 self.tasks
 
         Returns:
             执行结果统计
         """
-        # 创建事件循环
+        # 在共享的后台事件循环中执行
+        return run_sync(self.execute_async(tts_engine, progress_callback, show_progress, source))
+
+    def execute_distributed(
+        self,
+        work_queue,
+        output_root: Optional[str] = None,
+        progress_callback: Optional[Callable] = None,
+        chapter_callback: Optional[Callable[[int, List[TTSTask]], None]] = None,
+        show_progress: bool = True,
+        poll_interval: float = 1.0,
+        timeout: Optional[float] = None
+    ) -> Dict:
+        """
+        把任务交给分布式任务队列，由其他机器上的工作进程合成，本进程只收集结果
+
+        协调进程重启后再次调用会跳过队列中已存在的任务，并从队列恢复已结束任务的结果
+
+        Args:
+            work_queue: RedisWorkQueue实例
+            output_root: 共享输出目录，该目录下的输出路径以相对路径下发给工作进程
+            progress_callback: 进度回调函数
+            chapter_callback: 章节回调 (章节序号, 章节任务列表)，章节的所有任务结束后立即调用
+            show_progress: 是否显示进度条
+            poll_interval: 没有新结果时的轮询间隔(秒)
+            timeout: 最长等待时间(秒)，None则一直等待
+
+        Returns:
+            执行结果统计（同 execute_async）
+        """
+        total = len(self.tasks)
+        logger.info(f"分布式执行 {total} 个任务 (队列: {work_queue.name})")
+        self.completed_count = 0
+        self.failed_count = 0
+        self.retry_count = 0
+        self.latency = LatencyHistogram()
+        job_start = time.monotonic()
+        root = Path(output_root).resolve() if output_root else None
+
+        tasks_by_id = {str(task.task_id): task for task in self.tasks}
+        chapter_remaining: Dict[int, int] = {}
+        for task in self.tasks:
+            chapter_index = task.metadata.get('chapter_index')
+            if chapter_index is not None:
+                chapter_remaining[chapter_index] = chapter_remaining.get(chapter_index, 0) + 1
+
+        def payload(task: TTSTask) -> Dict:
+            output_path = Path(task.output_path)
+            if root is not None:
+                try:
+                    output_path = output_path.resolve().relative_to(root)
+                except ValueError:
+                    pass
+            return {
+                'task_id': task.task_id,
+                'text': task.text,
+                'output_path': output_path.as_posix(),
+                'chapter_title': task.chapter_title,
+                'chapter_index': task.metadata.get('chapter_index')
+            }
+
+        pbar = tqdm(total=total, desc="分布式合成") if show_progress else None
+        settled: Set[str] = set()
+
+        def settle(result: Dict):
+            """处理一个任务的最终结果"""
+            task = tasks_by_id.get(str(result['task_id']))
+            if task is None or str(task.task_id) in settled:
+                return
+            settled.add(str(task.task_id))
+            task.attempts = result.get('attempts', 1)
+            self.retry_count += max(0, task.attempts - 1)
+            if result['status'] == 'completed':
+                task.status = TaskStatus.COMPLETED
+                task.error = None
+                self.completed_count += 1
+                if result.get('elapsed') is not None:
+                    self.latency.record(result['elapsed'] * 1000)
+                    SEGMENT_SECONDS.observe(result['elapsed'])
+            else:
+                task.status = TaskStatus.FAILED
+                task.error = result.get('error')
+                self.failed_count += 1
+                logger.error(f"任务 {task.task_id} 失败: {task.error}")
+            TASKS_FINISHED.inc(status=task.status.value)
+
+            if pbar:
+                pbar.update(1)
+            if progress_callback:
+                try:
+                    progress_callback(task)
+                except Exception as e:
+                    logger.error(f"进度回调失败: {e}")
+
+            chapter_index = task.metadata.get('chapter_index')
+            if chapter_index in chapter_remaining:
+                chapter_remaining[chapter_index] -= 1
+                if chapter_remaining[chapter_index] == 0 and chapter_callback:
+                    chapter_tasks = [t for t in self.tasks if t.metadata.get('chapter_index') == chapter_index]
+                    try:
+                        chapter_callback(chapter_index, chapter_tasks)
+                    except Exception as e:
+                        logger.error(f"章节 {chapter_index} 回调失败: {e}")
+
         try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            work_queue.push(payload(task) for task in self.tasks)
 
-        return loop.run_until_complete(
-            self.execute_async(tts_engine, progress_callback, show_progress)
-        )
+            # 恢复上次协调进程退出前已结束的任务
+            for result in work_queue.finished().values():
+                settle(result)
+            resumed = len(settled)
+
+            idle_polls = 0
+            while len(settled) < total:
+                results = work_queue.pop_results()
+                for result in results:
+                    settle(result)
+                if results:
+                    idle_polls = 0
+                    continue
+
+                idle_polls += 1
+                work_queue.requeue_expired()
+                if idle_polls % 10 == 0:
+                    work_queue.requeue_lost()
+                if timeout is not None and time.monotonic() - job_start > timeout:
+                    logger.warning(f"分布式执行超时，{total - len(settled)} 个任务未完成")
+                    break
+                time.sleep(poll_interval)
+        finally:
+            if pbar:
+                pbar.close()
+
+        elapsed = time.monotonic() - job_start
+        STAGE_DURATION.observe(elapsed, stage='synthesis')
+        result = {
+            'total': total,
+            'completed': self.completed_count,
+            'failed': self.failed_count,
+            'success_rate': self.completed_count / total if total else 0,
+            'elapsed_seconds': elapsed,
+            'latency_ms': self.latency.summary(),
+            'retries': self.retry_count,
+            'retries_denied': 0,
+            'resumed': resumed
+        }
+        logger.success(f"分布式执行完成: {self.completed_count}/{total} 成功")
+        return result
+
+    def _engine_fingerprint(self, tts_engine) -> str:
+        """引擎与合成参数指纹，参数变化后日志中的旧结果不再有效"""
+        config = getattr(tts_engine, 'config', None)
+        parts = [tts_engine.get_engine_name(), f"timing={self.capture_timing}"]
+        if config is not None:
+            parts += [str(config.voice), str(config.rate), str(config.volume), str(config.pitch), str(config.output_format)]
+        return "|".join(parts)
+
+    def job_fingerprint(self, tts_engine) -> str:
+        """
+        任务批次指纹：合成参数和所有任务的文本、输出路径（分段变化后指纹随之变化）
+
+        Args:
+            tts_engine: TTS引擎实例
+
+        Returns:
+            十六进制摘要
+        """
+        digest = hashlib.sha1(self._engine_fingerprint(tts_engine).encode('utf-8'))
+        for task in self.tasks:
+            digest.update(f"\0{task.task_id}\0{task.output_path}\0{task.text}".encode('utf-8'))
+        return digest.hexdigest()
+
+    @staticmethod
+    def _task_outputs(task: TTSTask) -> List[str]:
+        """任务产生的音频文件（打包任务为各成员文件）"""
+        members = task.metadata.get('packed_segments')
+        if members:
+            return [member['output_path'] for member in members]
+        return [task.output_path]
+
+    def _journal_record(self, journal_keys: Dict[int, str], task: TTSTask):
+        """把任务结果写入任务日志"""
+        if not self.journal:
+            return
+        try:
+            self.journal.record(
+                journal_keys[id(task)],
+                task.task_id,
+                task.status.value,
+                self._task_outputs(task),
+                attempts=task.attempts,
+                error=task.error
+            )
+        except Exception as e:
+            logger.warning(f"任务日志写入失败: {e}")
 
     def get_failed_tasks(self) -> List[TTSTask]:
         """获取失败的任务"""
@@ -255,6 +992,9 @@ class TaskManager:
         self.tasks.clear()
         self.completed_count = 0
         self.failed_count = 0
+        self.cancelled_count = 0
+        self.retry_count = 0
+        self.retries_denied = 0
         logger.info("任务已清空")
 
     def get_summary(self) -> Dict:
@@ -272,7 +1012,11 @@ class TaskManager:
             'total_tasks': len(self.tasks),
             'status_breakdown': status_count,
             'completed_count': self.completed_count,
-            'failed_count': self.failed_count
+            'failed_count': self.failed_count,
+            'cancelled_count': self.cancelled_count,
+            'retry_count': self.retry_count,
+            'retries_denied': self.retries_denied,
+            'max_attempts': max((task.attempts for task in self.tasks), default=0)
         }
 
 
@@ -5,5 +5,8 @@ from .audio_player import AudioPlayer
 from .audio_merger import AudioMerger
 from .audio_normalizer import AudioNormalizer
 from .format_converter import FormatConverter
+from .audio_splitter import AudioSplitter
+from .audio_tagger import AudioTagger
+from .subtitle_writer import SubtitleWriter, SubtitleCue
 
-__all__ = ['AudioPlayer', 'AudioMerger', 'AudioNormalizer', 'FormatConverter']
+__all__ = ['AudioPlayer', 'AudioMerger', 'AudioNormalizer', 'FormatConverter', 'AudioSplitter', 'AudioTagger', 'SubtitleWriter', 'SubtitleCue']
@@ -2,43 +2,91 @@
 音频合并器
 支持合并多个音频文件为单个文件
 """
+import json
+import shutil
+import subprocess
+import tempfile
+import wave
 from pydub import AudioSegment
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from loguru import logger
 from tqdm import tqdm
 
+from core.metrics import BYTES_WRITTEN, get_registry, time_stage
+from .audio_splitter import AudioSplitter
+from .mp3_frames import iter_frames, make_silence, skip_id3v2
+
+
+# ffmpeg 生成同格式静音时使用的编码器（按 ffprobe 的 codec_name）
+_SILENCE_ENCODERS = {
+    'mp3': 'libmp3lame', 'aac': 'aac', 'opus': 'libopus', 'vorbis': 'libvorbis', 'flac': 'flac', 'alac': 'alac'
+}
+
+# 流式合并时每次读写的数据量（解码进程的输出按块转发给编码进程）
+_STREAM_CHUNK = 64 * 1024
+
+# 采样宽度对应的ffmpeg裸PCM格式
+_RAW_FORMATS = {1: 'u8', 2: 's16le', 3: 's24le', 4: 's32le'}
+
+
+FILES_MERGED = get_registry().counter('audio_files_merged_total', '合并的音频文件数', ('path',))
+
 
 class AudioMerger:
     """音频合并器"""
 
-    def __init__(self, add_silence: bool = True, silence_duration: int = 500):
+    def __init__(
+        self,
+        add_silence: bool = True,
+        silence_duration: int = 500,
+        stream_copy: bool = True,
+        streaming: bool = True
+    ):
         """
         初始化音频合并器
 
         Args:
             add_silence: 是否在音频间添加静音
             silence_duration: 静音时长(毫秒)
+            stream_copy: 输入与输出格式相同时直接拼接压缩数据（MP3按帧拼接，其他格式使用ffmpeg concat），
+                不解码、不重新编码；False则不直接拼接
+            streaming: 需要解码时逐个文件解码为PCM，按块送入同一个编码进程（需要ffmpeg），
+                内存占用与书的长度无关；False则用pydub把全部音频解码到内存后再编码
         """
         self.add_silence = add_silence
         self.silence_duration = silence_duration
+        self.stream_copy = stream_copy
+        self.streaming = streaming
+        # 最近一次合并中各文件在输出音频中的起始时间 [(文件, 偏移毫秒), ...]
+        self.last_offsets: List[Tuple[str, float]] = []
         logger.info(f"音频合并器初始化 (静音间隔: {silence_duration}ms)")
 
+    @time_stage('merge_audio')
     def merge_files(
         self,
         audio_files: List[str],
         output_path: str,
         format: str = "mp3",
-        show_progress: bool = True
+        show_progress: bool = True,
+        pcm_sample_rate: int = 24000
     ) -> bool:
         """
         合并多个音频文件
 
+        输入全部为WAV/PCM且输出也是WAV/PCM时直接拼接采样数据，不经过pydub；
+        输入与输出同为MP3时按帧拼接，其他相同格式使用ffmpeg concat -c copy（stream_copy 启用时），
+        内存占用与单个文件相当，耗时与文件总大小成正比；
+        WAV/PCM输入导出为其他格式时只需一次编码，无需解码；
+        格式或采样参数不同、无法直接拼接时，逐个文件解码并转换为统一的采样参数后送入一个编码进程
+        （streaming 启用且有ffmpeg时），内存占用为几MB，与书的长度无关
+
         Args:
             audio_files: 音频文件路径列表
             output_path: 输出文件路径
             format: 输出格式
             show_progress: 是否显示进度条
+            pcm_sample_rate: 裸PCM(16bit单声道)的采样率
 
         Returns:
             是否成功
@@ -50,44 +98,566 @@ class AudioMerger:
 
             logger.info(f"开始合并 {len(audio_files)} 个音频文件")
 
-            # 初始化合并音频
-            combined = AudioSegment.empty()
+            output_path = Path(output_path)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            self.last_offsets = []
 
-            # 创建静音片段
-            silence = AudioSegment.silent(duration=self.silence_duration) if self.add_silence else None
+            if format in ('wav', 'pcm') and all(Path(f).suffix.lower() in ('.wav', '.pcm') for f in audio_files):
+                params = self._pcm_params(audio_files, pcm_sample_rate)
+                if params is not None:
+                    return self._merge_pcm(audio_files, output_path, format, params, show_progress)
+                logger.debug("输入音频参数不一致，使用pydub合并")
 
-            # 合并音频
-            iterator = tqdm(audio_files, desc="合并音频") if show_progress else audio_files
+            suffixes = {Path(f).suffix.lower() for f in audio_files}
+            if self.stream_copy and suffixes == {f'.{format}'}:
+                if format == 'mp3':
+                    merged = self._merge_mp3(audio_files, output_path, show_progress)
+                else:
+                    merged = self._merge_ffmpeg_concat(audio_files, output_path, show_progress)
+                if merged is not None:
+                    return merged
+                logger.debug("输入音频参数不一致或没有ffmpeg，无法直接拼接")
+
+            if self.streaming:
+                merged = self._merge_streaming(audio_files, output_path, format, pcm_sample_rate, show_progress)
+                if merged is not None:
+                    return merged
+                logger.debug("没有ffmpeg或无法读取输入音频参数，使用pydub合并")
+
+            return self._merge_pydub(audio_files, output_path, format, pcm_sample_rate, show_progress)
+
+        except Exception as e:
+            logger.error(f"音频合并失败: {e}")
+            return False
+
+    def _merge_pydub(
+        self,
+        audio_files: List[str],
+        output_path: Path,
+        format: str,
+        pcm_sample_rate: int,
+        show_progress: bool
+    ) -> bool:
+        """用pydub把全部音频解码到内存中拼接后一次导出（其他方式都不可用时使用）"""
+        # 初始化合并音频
+        combined = AudioSegment.empty()
+
+        # 创建静音片段
+        silence = AudioSegment.silent(duration=self.silence_duration) if self.add_silence else None
+
+        # 合并音频
+        iterator = tqdm(audio_files, desc="合并音频") if show_progress else audio_files
+
+        for i, audio_file in enumerate(iterator):
+            if not Path(audio_file).exists():
+                logger.warning(f"文件不存在，跳过: {audio_file}")
+                continue
+
+            # 加载音频
+            audio = self._load(audio_file, pcm_sample_rate)
+
+            # 添加到合并音频
+            self.last_offsets.append((audio_file, float(len(combined))))
+            combined += audio
+
+            # 添加静音（除了最后一个）
+            if silence and i < len(audio_files) - 1:
+                combined += silence
+
+        # 导出
+        if format == 'pcm':
+            output_path.write_bytes(combined.raw_data)
+        else:
+            combined.export(str(output_path), format=format)
+
+        FILES_MERGED.inc(len(self.last_offsets), path='pydub')
+        BYTES_WRITTEN.inc(output_path.stat().st_size, component='merge')
+        duration = len(combined) / 1000.0
+        logger.success(f"音频合并完成: {output_path} (时长: {duration:.1f}秒)")
+        return True
+
+    @staticmethod
+    def _load(audio_file: str, pcm_sample_rate: int) -> AudioSegment:
+        """加载音频，WAV/PCM直接读取采样数据，其他格式由pydub解码"""
+        suffix = Path(audio_file).suffix.lower()
+        if suffix == '.pcm':
+            return AudioSegment(
+                data=Path(audio_file).read_bytes(),
+                sample_width=2,
+                frame_rate=pcm_sample_rate,
+                channels=1
+            )
+        if suffix == '.wav':
+            return AudioSegment.from_wav(audio_file)
+        return AudioSegment.from_file(audio_file)
+
+    @staticmethod
+    def _pcm_params(audio_files: List[str], pcm_sample_rate: int) -> Optional[Tuple[int, int, int]]:
+        """
+        读取WAV/PCM文件的采样参数
 
+        Returns:
+            (声道数, 采样宽度, 采样率)，各文件参数不一致时返回None
+        """
+        params = set()
+        for audio_file in audio_files:
+            if not Path(audio_file).exists():
+                continue
+            if Path(audio_file).suffix.lower() == '.pcm':
+                params.add((1, 2, pcm_sample_rate))
+            else:
+                with wave.open(audio_file, 'rb') as wav_file:
+                    params.add((wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()))
+        if len(params) > 1:
+            return None
+        return params.pop() if params else (1, 2, pcm_sample_rate)
+
+    def _merge_pcm(
+        self,
+        audio_files: List[str],
+        output_path: Path,
+        format: str,
+        params: Tuple[int, int, int],
+        show_progress: bool
+    ) -> bool:
+        """逐个文件拼接采样数据写入输出，内存占用与单个文件相当"""
+        channels, sample_width, sample_rate = params
+        frame_size = channels * sample_width
+        silence_frames = int(self.silence_duration * sample_rate / 1000) if self.add_silence else 0
+        silence = b"\x00" * (silence_frames * frame_size)
+        total_frames = 0
+
+        if format == 'wav':
+            target = wave.open(str(output_path), 'wb')
+            target.setnchannels(channels)
+            target.setsampwidth(sample_width)
+            target.setframerate(sample_rate)
+            write = target.writeframes
+        else:
+            target = open(output_path, 'wb')
+            write = target.write
+
+        try:
+            iterator = tqdm(audio_files, desc="合并音频") if show_progress else audio_files
             for i, audio_file in enumerate(iterator):
                 if not Path(audio_file).exists():
                     logger.warning(f"文件不存在，跳过: {audio_file}")
                     continue
 
-                # 加载音频
-                audio = AudioSegment.from_file(audio_file)
+                if Path(audio_file).suffix.lower() == '.pcm':
+                    data = Path(audio_file).read_bytes()
+                else:
+                    with wave.open(audio_file, 'rb') as source:
+                        data = source.readframes(source.getnframes())
 
-                # 添加到合并音频
-                combined += audio
+                self.last_offsets.append((audio_file, total_frames * 1000.0 / sample_rate))
+                write(data)
+                total_frames += len(data) // frame_size
 
-                # 添加静音（除了最后一个）
                 if silence and i < len(audio_files) - 1:
-                    combined += silence
+                    write(silence)
+                    total_frames += silence_frames
+        finally:
+            target.close()
 
-            # 导出
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+        FILES_MERGED.inc(len(self.last_offsets), path='pcm')
+        BYTES_WRITTEN.inc(output_path.stat().st_size, component='merge')
+        logger.success(f"音频合并完成: {output_path} (时长: {total_frames / sample_rate:.1f}秒)")
+        return True
 
-            combined.export(str(output_path), format=format)
+    def _merge_mp3(self, audio_files: List[str], output_path: Path, show_progress: bool) -> Optional[bool]:
+        """
+        按帧拼接MP3（去掉各文件的ID3标签和Xing/Info头帧，静音帧只生成一次）
+
+        Returns:
+            是否成功，各文件采样率/声道数不一致时返回None（改用pydub）
+        """
+        existing = [f for f in audio_files if Path(f).exists()]
+        stream = None
+        for audio_file in existing:
+            with open(audio_file, 'rb') as f:
+                f.seek(skip_id3v2(f.read(10)))
+                header = next((h for _, h in iter_frames(f.read(16 * 1024))), None)
+            if header is None:
+                continue
+            if stream is None:
+                stream = header
+            elif (header.sample_rate, header.channels) != (stream.sample_rate, stream.channels):
+                return None
+        if stream is None:
+            logger.error("没有可合并的MP3音频帧")
+            return False
+
+        silence = b""
+        silence_ms = 0.0
+        if self.add_silence and self.silence_duration > 0:
+            silence = make_silence(self.silence_duration, stream.sample_rate, stream.bitrate, stream.channels)
+            silence_ms = sum(h.duration_ms for _, h in iter_frames(silence))
+
+        position = 0.0
+        with open(output_path, 'wb') as target:
+            iterator = tqdm(audio_files, desc="合并音频") if show_progress else audio_files
+            for i, audio_file in enumerate(iterator):
+                if not Path(audio_file).exists():
+                    logger.warning(f"文件不存在，跳过: {audio_file}")
+                    continue
+
+                data = Path(audio_file).read_bytes()
+                self.last_offsets.append((audio_file, position))
+                for index, (offset, header) in enumerate(iter_frames(data)):
+                    frame = data[offset:offset + header.frame_length]
+                    if index == 0 and any(tag in frame[:48] for tag in (b'Xing', b'Info', b'VBRI')):
+                        # VBR头帧记录的是单个文件的帧数和时长，拼接后会误导播放器
+                        continue
+                    target.write(frame)
+                    position += header.duration_ms
+
+                if silence and i < len(audio_files) - 1:
+                    target.write(silence)
+                    position += silence_ms
+
+        FILES_MERGED.inc(len(self.last_offsets), path='mp3_frames')
+        BYTES_WRITTEN.inc(output_path.stat().st_size, component='merge')
+        logger.success(f"音频合并完成: {output_path} (时长: {position / 1000:.1f}秒)")
+        return True
+
+    @staticmethod
+    def _probe(audio_file: str) -> Optional[Dict]:
+        """
+        用ffprobe读取第一个音频流的参数
+
+        Returns:
+            {codec_name, sample_rate, channels, duration}，读取失败时返回None
+        """
+        try:
+            completed = subprocess.run(
+                ['ffprobe', '-v', 'error', '-select_streams', 'a:0',
+                 '-show_entries', 'stream=codec_name,sample_rate,channels:format=duration',
+                 '-of', 'json', audio_file],
+                capture_output=True, check=True, timeout=60
+            )
+            info = json.loads(completed.stdout)
+            stream = info['streams'][0]
+            return {
+                'codec_name': stream['codec_name'],
+                'sample_rate': int(stream['sample_rate']),
+                'channels': int(stream['channels']),
+                'duration': float(info['format']['duration']),
+            }
+        except Exception as e:
+            logger.debug(f"ffprobe 读取失败: {audio_file} ({e})")
+            return None
+
+    def _merge_ffmpeg_concat(self, audio_files: List[str], output_path: Path, show_progress: bool) -> Optional[bool]:
+        """
+        使用ffmpeg concat分离器以 -c copy 拼接（静音按相同编码参数只编码一次）
+
+        -c copy 要求所有文件的编码、采样率和声道数相同，因此先用ffprobe检查每个文件
+        （同时得到各文件时长，用于记录偏移）
+
+        Returns:
+            是否成功，没有ffmpeg/ffprobe或各文件参数不一致时返回None（改用pydub）
+        """
+        if not shutil.which('ffmpeg') or not shutil.which('ffprobe'):
+            return None
 
-            duration = len(combined) / 1000.0
-            logger.success(f"音频合并完成: {output_path} (时长: {duration:.1f}秒)")
-            return True
+        existing = [f for f in audio_files if Path(f).exists()]
+        for missing in sorted(set(audio_files) - set(existing)):
+            logger.warning(f"文件不存在，跳过: {missing}")
+        iterator = tqdm(existing, desc="检查音频") if show_progress else existing
+        probes = [self._probe(f) for f in iterator]
+        if not probes or any(probe is None for probe in probes):
+            return None
+        stream_params = {(p['codec_name'], p['sample_rate'], p['channels']) for p in probes}
+        if len(stream_params) > 1:
+            return None
+        codec, sample_rate, channels = stream_params.pop()
+
+        with tempfile.TemporaryDirectory(prefix="merge_") as work_dir:
+            silence_path = None
+            silence_ms = 0.0
+            if self.add_silence and self.silence_duration > 0 and len(existing) > 1:
+                encoder = _SILENCE_ENCODERS.get(codec)
+                if encoder is None:
+                    return None
+                silence_path = Path(work_dir) / f"silence{output_path.suffix}"
+                layout = 'mono' if channels == 1 else 'stereo'
+                subprocess.run(
+                    ['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi',
+                     '-i', f'anullsrc=r={sample_rate}:cl={layout}',
+                     '-t', f'{self.silence_duration / 1000:.3f}', '-c:a', encoder, str(silence_path)],
+                    capture_output=True, check=True
+                )
+                silence_probe = self._probe(str(silence_path))
+                silence_ms = silence_probe['duration'] * 1000 if silence_probe else float(self.silence_duration)
+
+            def quote(path) -> str:
+                return "'" + str(Path(path).resolve()).replace("'", "'\\''") + "'"
+
+            lines = []
+            position = 0.0
+            for i, (audio_file, probe) in enumerate(zip(existing, probes)):
+                self.last_offsets.append((audio_file, position))
+                lines.append(f"file {quote(audio_file)}")
+                position += probe['duration'] * 1000
+                if silence_path and i < len(existing) - 1:
+                    lines.append(f"file {quote(silence_path)}")
+                    position += silence_ms
+
+            list_path = Path(work_dir) / "concat.txt"
+            list_path.write_text("\n".join(lines) + "\n", encoding='utf-8')
+            completed = subprocess.run(
+                ['ffmpeg', '-v', 'error', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_path),
+                 '-c', 'copy', str(output_path)],
+                capture_output=True
+            )
+            if completed.returncode != 0:
+                logger.error(f"ffmpeg 拼接失败: {completed.stderr.decode('utf-8', 'replace').strip()}")
+                return False
+
+        FILES_MERGED.inc(len(self.last_offsets), path='ffmpeg_concat')
+        BYTES_WRITTEN.inc(output_path.stat().st_size, component='merge')
+        logger.success(f"音频合并完成: {output_path} (时长: {position / 1000:.1f}秒)")
+        return True
+
+    @staticmethod
+    def _source_params(audio_file: str, pcm_sample_rate: int) -> Optional[Tuple[int, int, int]]:
+        """
+        读取单个文件的采样参数（WAV读文件头，MP3读第一帧帧头，其他格式使用ffprobe）
 
+        Returns:
+            (声道数, 采样宽度, 采样率)，读取失败时返回None；压缩格式的采样宽度按16bit计
+            （与pydub解码结果一致）
+        """
+        suffix = Path(audio_file).suffix.lower()
+        try:
+            if suffix == '.pcm':
+                return 1, 2, pcm_sample_rate
+            if suffix == '.wav':
+                with wave.open(audio_file, 'rb') as wav_file:
+                    return wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate()
+            if suffix == '.mp3':
+                with open(audio_file, 'rb') as f:
+                    f.seek(skip_id3v2(f.read(10)))
+                    header = next((h for _, h in iter_frames(f.read(16 * 1024))), None)
+                if header is not None:
+                    return header.channels, 2, header.sample_rate
         except Exception as e:
-            logger.error(f"音频合并失败: {e}")
+            logger.debug(f"读取音频参数失败: {audio_file} ({e})")
+            return None
+        probe = AudioMerger._probe(audio_file)
+        return (probe['channels'], 2, probe['sample_rate']) if probe else None
+
+    def _stream_params(
+        self,
+        sources: List[Tuple[int, int, int]],
+        insert_silence: bool
+    ) -> Tuple[int, int, int]:
+        """
+        合并结果的采样参数：与pydub拼接时的规则相同，各项取所有输入中的最大值
+        （pydub的静音片段为11025Hz单声道16bit，也参与取最大值）
+
+        Args:
+            sources: 各输入的 (声道数, 采样宽度, 采样率)
+            insert_silence: 是否插入静音
+
+        Returns:
+            (声道数, 采样宽度, 采样率)
+        """
+        if insert_silence:
+            sources = list(sources) + [(1, 2, 11025)]
+        return (
+            max(params[0] for params in sources),
+            max(params[1] for params in sources),
+            max(params[2] for params in sources)
+        )
+
+    @staticmethod
+    def _iter_pcm(
+        audio_file: str,
+        source: Tuple[int, int, int],
+        target: Tuple[int, int, int]
+    ) -> Iterator[bytes]:
+        """
+        按块读出转换为目标采样参数的PCM数据
+
+        WAV/PCM参数与目标相同时直接读取采样数据，否则由ffmpeg解码、重采样并转换声道数和采样宽度，
+        从管道按块读取
+
+        Args:
+            audio_file: 音频文件路径
+            source: 文件的 (声道数, 采样宽度, 采样率)
+            target: 目标 (声道数, 采样宽度, 采样率)
+
+        Yields:
+            PCM数据块
+        """
+        suffix = Path(audio_file).suffix.lower()
+        if source == target and suffix == '.wav':
+            with wave.open(audio_file, 'rb') as wav_file:
+                frames = _STREAM_CHUNK // (target[0] * target[1])
+                while True:
+                    data = wav_file.readframes(frames)
+                    if not data:
+                        return
+                    yield data
+        if source == target and suffix == '.pcm':
+            with open(audio_file, 'rb') as f:
+                while True:
+                    data = f.read(_STREAM_CHUNK)
+                    if not data:
+                        return
+                    yield data
+
+        channels, sample_width, sample_rate = target
+        raw_format = _RAW_FORMATS[sample_width]
+        command = ['ffmpeg', '-v', 'error', '-nostdin']
+        if suffix == '.pcm':
+            command += ['-f', 's16le', '-ar', str(source[2]), '-ac', '1']
+        command += ['-i', audio_file, '-f', raw_format, '-acodec', f'pcm_{raw_format}',
+                    '-ac', str(channels), '-ar', str(sample_rate), 'pipe:1']
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr)
+            finished = False
+            try:
+                while True:
+                    data = process.stdout.read(_STREAM_CHUNK)
+                    if not data:
+                        break
+                    yield data
+                finished = True
+            finally:
+                process.stdout.close()
+                if not finished:
+                    # 合并中途出错，不再读取
+                    process.kill()
+                returncode = process.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                message = stderr.read().decode('utf-8', 'replace').strip()
+                raise RuntimeError(f"解码失败: {audio_file} ({message})")
+
+    def _merge_streaming(
+        self,
+        audio_files: List[str],
+        output_path: Path,
+        format: str,
+        pcm_sample_rate: int,
+        show_progress: bool
+    ) -> Optional[bool]:
+        """
+        流式合并：逐个文件解码为统一采样参数的PCM，插入静音后写入一个常驻的编码进程
+        （WAV/PCM输出直接写文件），任何时候内存中只有一个数据块
+
+        Returns:
+            是否成功，没有ffmpeg或无法读取某个输入的采样参数时返回None（改用pydub）
+        """
+        if not shutil.which('ffmpeg'):
+            return None
+
+        existing = [f for f in audio_files if Path(f).exists()]
+        sources = {}
+        for audio_file in existing:
+            params = self._source_params(audio_file, pcm_sample_rate)
+            if params is None:
+                return None
+            sources[audio_file] = params
+        if not sources:
+            logger.error("没有可合并的音频文件")
             return False
 
+        silence_enabled = self.add_silence and self.silence_duration > 0 and len(audio_files) > 1
+        channels, sample_width, sample_rate = self._stream_params(list(sources.values()), silence_enabled)
+        frame_size = channels * sample_width
+        silence_frames = int(self.silence_duration * sample_rate / 1000) if silence_enabled else 0
+        # 8bit PCM 为无符号数，静音是 0x80
+        silence = (b"\x80" if sample_width == 1 else b"\x00") * (silence_frames * frame_size)
+
+        encoder = None
+        encoder_log = None
+        if format == 'wav':
+            target = wave.open(str(output_path), 'wb')
+            target.setnchannels(channels)
+            target.setsampwidth(sample_width)
+            target.setframerate(sample_rate)
+            write = target.writeframes
+        elif format == 'pcm':
+            target = open(output_path, 'wb')
+            write = target.write
+        else:
+            raw_format = _RAW_FORMATS[sample_width]
+            encoder_log = tempfile.TemporaryFile()
+            encoder = subprocess.Popen(
+                ['ffmpeg', '-v', 'error', '-y', '-f', raw_format, '-ar', str(sample_rate), '-ac', str(channels),
+                 '-i', 'pipe:0', '-f', format, str(output_path)],
+                stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=encoder_log
+            )
+            target = encoder.stdin
+            write = target.write
+
+        total_bytes = 0
+        try:
+            iterator = tqdm(audio_files, desc="合并音频") if show_progress else audio_files
+            for i, audio_file in enumerate(iterator):
+                if audio_file not in sources:
+                    logger.warning(f"文件不存在，跳过: {audio_file}")
+                    continue
+
+                self.last_offsets.append((audio_file, total_bytes // frame_size * 1000.0 / sample_rate))
+                # 块的边界不一定对齐采样帧，按字节数累计
+                for chunk in self._iter_pcm(audio_file, sources[audio_file], (channels, sample_width, sample_rate)):
+                    write(chunk)
+                    total_bytes += len(chunk)
+
+                if silence and i < len(audio_files) - 1:
+                    write(silence)
+                    total_bytes += len(silence)
+        except BrokenPipeError:
+            # 编码进程提前退出，下面报告它的错误
+            pass
+        finally:
+            try:
+                target.close()
+            except BrokenPipeError:
+                pass
+            if encoder is not None:
+                encoder.wait()
+
+        if encoder is not None:
+            encoder_log.seek(0)
+            message = encoder_log.read().decode('utf-8', 'replace').strip()
+            encoder_log.close()
+            if encoder.returncode != 0:
+                logger.error(f"ffmpeg 编码失败: {message}")
+                return False
+
+        FILES_MERGED.inc(len(self.last_offsets), path='streaming')
+        BYTES_WRITTEN.inc(output_path.stat().st_size, component='merge')
+        duration = total_bytes / frame_size / sample_rate
+        logger.success(f"音频合并完成: {output_path} (时长: {duration:.1f}秒)")
+        return True
+
+    def estimate_offsets(self, audio_files: List[str]) -> List[Tuple[str, float]]:
+        """
+        不解码音频，按文件头计算各文件在合并结果中的起始时间（与 merge_files 的拼接方式一致）
+
+        Args:
+            audio_files: 音频文件路径列表
+
+        Returns:
+            [(文件, 偏移毫秒), ...]，不存在的文件被跳过
+        """
+        offsets = []
+        position = 0.0
+        for i, audio_file in enumerate(audio_files):
+            if not Path(audio_file).exists():
+                continue
+            offsets.append((audio_file, position))
+            position += AudioSplitter.get_duration_ms(audio_file)
+            if self.add_silence and i < len(audio_files) - 1:
+                position += self.silence_duration
+        return offsets
+
     def merge_chapters(
         self,
         chapter_audios: List[dict],
@@ -0,0 +1,114 @@
+"""
+音频切分器
+按时间点把一个音频文件切分成多个文件
+"""
+import wave
+from pathlib import Path
+from typing import List
+from loguru import logger
+
+from .mp3_frames import get_duration_ms, split_frames
+
+
+class AudioSplitter:
+    """音频切分器"""
+
+    @staticmethod
+    def split_file(
+        input_path: str,
+        cut_points_ms: List[float],
+        output_paths: List[str],
+        pcm_sample_rate: int = 24000
+    ) -> bool:
+        """
+        按时间点切分音频文件
+
+        MP3在帧边界切分，WAV/PCM按采样点切分，均不经过解码和重新编码；
+        其他格式使用pydub（需要ffmpeg）
+
+        Args:
+            input_path: 输入文件路径
+            cut_points_ms: 升序排列的切分时间点(毫秒)
+            output_paths: 输出文件路径列表（长度为切分点数+1）
+            pcm_sample_rate: 裸PCM(16bit单声道)的采样率
+
+        Returns:
+            是否成功
+        """
+        try:
+            if len(output_paths) != len(cut_points_ms) + 1:
+                raise ValueError("输出文件数必须等于切分点数+1")
+
+            audio_format = Path(input_path).suffix[1:].lower()
+            for output_path in output_paths:
+                Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+            if audio_format == 'mp3':
+                pieces = split_frames(Path(input_path).read_bytes(), cut_points_ms)
+                for piece, output_path in zip(pieces, output_paths):
+                    Path(output_path).write_bytes(piece)
+
+            elif audio_format == 'wav':
+                AudioSplitter._split_wav(input_path, cut_points_ms, output_paths)
+
+            elif audio_format == 'pcm':
+                data = Path(input_path).read_bytes()
+                bounds = [0] + [int(cut * pcm_sample_rate / 1000) * 2 for cut in cut_points_ms] + [len(data)]
+                for i, output_path in enumerate(output_paths):
+                    Path(output_path).write_bytes(data[bounds[i]:bounds[i + 1]])
+
+            else:
+                from pydub import AudioSegment
+                audio = AudioSegment.from_file(input_path)
+                bounds = [0] + [int(cut) for cut in cut_points_ms] + [len(audio)]
+                for i, output_path in enumerate(output_paths):
+                    audio[bounds[i]:bounds[i + 1]].export(output_path, format=audio_format)
+
+            logger.debug(f"音频切分完成: {input_path} -> {len(output_paths)} 个文件")
+            return True
+
+        except Exception as e:
+            logger.error(f"音频切分失败: {e}")
+            return False
+
+    @staticmethod
+    def _split_wav(input_path: str, cut_points_ms: List[float], output_paths: List[str]):
+        """按采样点切分WAV文件"""
+        with wave.open(input_path, 'rb') as source:
+            params = source.getparams()
+            frames = source.readframes(params.nframes)
+
+        frame_size = params.sampwidth * params.nchannels
+        total = len(frames) // frame_size
+        bounds = [0] + [min(total, int(cut * params.framerate / 1000)) for cut in cut_points_ms] + [total]
+
+        for i, output_path in enumerate(output_paths):
+            with wave.open(output_path, 'wb') as target:
+                target.setparams(params)
+                target.writeframes(frames[bounds[i] * frame_size:bounds[i + 1] * frame_size])
+
+    @staticmethod
+    def get_duration_ms(input_path: str, pcm_sample_rate: int = 24000) -> float:
+        """
+        获取音频文件时长
+
+        MP3按帧头累计、WAV读文件头、PCM按字节数计算，均不解码；其他格式使用pydub
+
+        Args:
+            input_path: 音频文件路径
+            pcm_sample_rate: 裸PCM(16bit单声道)的采样率
+
+        Returns:
+            时长(毫秒)
+        """
+        audio_format = Path(input_path).suffix[1:].lower()
+        if audio_format == 'mp3':
+            return get_duration_ms(Path(input_path).read_bytes())
+        if audio_format == 'wav':
+            with wave.open(input_path, 'rb') as wav_file:
+                return wav_file.getnframes() * 1000.0 / wav_file.getframerate()
+        if audio_format == 'pcm':
+            return Path(input_path).stat().st_size / 2 * 1000.0 / pcm_sample_rate
+
+        from pydub import AudioSegment
+        return float(len(AudioSegment.from_file(input_path)))
@@ -0,0 +1,82 @@
+"""
+音频标签写入器
+为章节音频写入标题、专辑、作者等元数据（MP3/WAV使用ID3，OGG/FLAC/M4A使用各自的标签格式）
+"""
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+
+import mutagen
+from mutagen.id3 import TALB, TCON, TIT2, TPE1, TRCK
+from mutagen.wave import WAVE
+
+
+# 标签名 -> ID3帧（WAV不支持mutagen的简易标签接口，直接写ID3帧）
+_ID3_FRAMES = {
+    'title': TIT2,
+    'album': TALB,
+    'artist': TPE1,
+    'genre': TCON,
+    'tracknumber': TRCK,
+}
+
+
+class AudioTagger:
+    """音频标签写入器"""
+
+    @staticmethod
+    def write_tags(
+        audio_path: str,
+        title: Optional[str] = None,
+        album: Optional[str] = None,
+        artist: Optional[str] = None,
+        genre: Optional[str] = None,
+        track: Optional[int] = None
+    ) -> bool:
+        """
+        写入音频标签
+
+        Args:
+            audio_path: 音频路径
+            title: 标题
+            album: 专辑（书名）
+            artist: 作者/演播者
+            genre: 流派
+            track: 音轨序号（章节序号）
+
+        Returns:
+            是否成功（格式不支持标签时返回False）
+        """
+        tags: Dict[str, str] = {
+            key: str(value) for key, value in (
+                ('title', title), ('album', album), ('artist', artist), ('genre', genre), ('tracknumber', track)
+            ) if value is not None
+        }
+        try:
+            audio = mutagen.File(audio_path, easy=True)
+            if audio is None:
+                logger.debug(f"格式不支持标签，跳过: {Path(audio_path).name}")
+                return False
+            if audio.tags is None:
+                audio.add_tags()
+
+            if isinstance(audio, WAVE):
+                for key, value in tags.items():
+                    audio.tags.add(_ID3_FRAMES[key](encoding=3, text=value))
+            else:
+                for key, value in tags.items():
+                    audio[key] = value
+            audio.save()
+            return True
+
+        except Exception as e:
+            logger.error(f"写入标签失败: {audio_path} ({e})")
+            return False
+
+
+if __name__ == '__main__':
+    # 测试代码
+    import sys
+    if len(sys.argv) > 1:
+        AudioTagger.write_tags(sys.argv[1], title="第一章", album="测试小说", artist="AI配音", track=1)
+        print(mutagen.File(sys.argv[1]).tags)
@@ -0,0 +1,228 @@
+"""
+MP3帧工具
+在帧级别解析和生成MPEG Layer III音频，无需解码器（ffmpeg）
+"""
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+
+# 比特率表 (kbps)，索引为帧头中的4位比特率索引
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],  # MPEG-1 Layer III
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],      # MPEG-2/2.5 Layer III
+}
+
+# 采样率表 (Hz)，键为版本: 1=MPEG-1, 2=MPEG-2, 25=MPEG-2.5
+_SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    25: [11025, 12000, 8000],
+}
+
+# 帧头版本位 -> 版本
+_VERSION_BITS = {0b00: 25, 0b10: 2, 0b11: 1}
+
+
+@dataclass
+class MP3FrameHeader:
+    """MP3帧头信息"""
+    version: int  # 1=MPEG-1, 2=MPEG-2, 25=MPEG-2.5
+    bitrate: int  # 比特率(kbps)
+    sample_rate: int  # 采样率(Hz)
+    channels: int  # 声道数
+    padding: int  # 填充字节
+    frame_length: int  # 帧长度(字节，含帧头)
+
+    @property
+    def samples(self) -> int:
+        """每帧采样数"""
+        return 1152 if self.version == 1 else 576
+
+    @property
+    def duration_ms(self) -> float:
+        """帧时长(毫秒)"""
+        return self.samples * 1000.0 / self.sample_rate
+
+
+def parse_frame_header(header: bytes) -> Optional[MP3FrameHeader]:
+    """
+    解析MP3帧头（仅支持Layer III）
+
+    Args:
+        header: 至少4字节的帧头数据
+
+    Returns:
+        帧头信息，不是合法帧头时返回None
+    """
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version = _VERSION_BITS.get((header[1] >> 3) & 0x03)
+    layer = (header[1] >> 1) & 0x03
+    if version is None or layer != 0b01:
+        return None
+
+    bitrate_index = (header[2] >> 4) & 0x0F
+    sample_rate_index = (header[2] >> 2) & 0x03
+    if bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = _BITRATES[1 if version == 1 else 2][bitrate_index]
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (header[2] >> 1) & 0x01
+    channels = 1 if (header[3] >> 6) == 0b11 else 2
+
+    coefficient = 144 if version == 1 else 72
+    frame_length = coefficient * bitrate * 1000 // sample_rate + padding
+
+    return MP3FrameHeader(
+        version=version,
+        bitrate=bitrate,
+        sample_rate=sample_rate,
+        channels=channels,
+        padding=padding,
+        frame_length=frame_length
+    )
+
+
+def skip_id3v2(data: bytes) -> int:
+    """
+    跳过文件开头的ID3v2标签
+
+    Args:
+        data: MP3数据
+
+    Returns:
+        第一个音频字节的偏移
+    """
+    if len(data) >= 10 and data[:3] == b'ID3':
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def iter_frames(data: bytes) -> Iterator[Tuple[int, MP3FrameHeader]]:
+    """
+    遍历MP3数据中的所有帧
+
+    Args:
+        data: MP3数据
+
+    Yields:
+        (帧偏移, 帧头信息)
+    """
+    pos = skip_id3v2(data)
+    end = len(data)
+
+    while pos + 4 <= end:
+        header = parse_frame_header(data[pos:pos + 4])
+        if header is None or pos + header.frame_length > end:
+            # 非帧数据（如ID3v1标签或损坏字节），向后重新同步
+            pos += 1
+            continue
+        yield pos, header
+        pos += header.frame_length
+
+
+def get_duration_ms(data: bytes) -> float:
+    """
+    计算MP3数据的时长
+
+    Args:
+        data: MP3数据
+
+    Returns:
+        时长(毫秒)
+    """
+    return sum(header.duration_ms for _, header in iter_frames(data))
+
+
+def make_silence(
+    duration_ms: float,
+    sample_rate: int = 24000,
+    bitrate: int = 48,
+    channels: int = 1
+) -> bytes:
+    """
+    生成静音MP3帧
+
+    帧头之后全部为0：side info中part2_3_length为0，解码结果为静音
+
+    Args:
+        duration_ms: 时长(毫秒)，向上取整到整帧
+        sample_rate: 采样率(Hz)
+        bitrate: 比特率(kbps)
+        channels: 声道数 (1或2)
+
+    Returns:
+        MP3数据
+    """
+    version = next(v for v, rates in _SAMPLE_RATES.items() if sample_rate in rates)
+    version_bits = next(bits for bits, v in _VERSION_BITS.items() if v == version)
+    bitrate_index = _BITRATES[1 if version == 1 else 2].index(bitrate)
+    sample_rate_index = _SAMPLE_RATES[version].index(sample_rate)
+
+    samples = 1152 if version == 1 else 576
+    coefficient = 144 if version == 1 else 72
+    frame_count = int(-(-duration_ms * sample_rate // (samples * 1000)))
+
+    byte1 = 0xE0 | (version_bits << 3) | (0b01 << 1) | 0x01
+    channel_bits = 0b11 if channels == 1 else 0b00
+
+    frames = bytearray()
+    remainder = 0
+    for _ in range(frame_count):
+        # 44.1kHz等采样率下帧长不是整数，用填充位分摊余数
+        remainder += coefficient * bitrate * 1000 % sample_rate
+        padding = 0
+        if remainder >= sample_rate:
+            remainder -= sample_rate
+            padding = 1
+
+        frame_length = coefficient * bitrate * 1000 // sample_rate + padding
+        byte2 = (bitrate_index << 4) | (sample_rate_index << 2) | (padding << 1)
+        byte3 = channel_bits << 6
+        frames += bytes([0xFF, byte1, byte2, byte3])
+        frames += bytes(frame_length - 4)
+
+    return bytes(frames)
+
+
+def split_frames(data: bytes, cut_points_ms: List[float]) -> List[bytes]:
+    """
+    在帧边界处切分MP3数据（不解码、不重新编码）
+
+    每个切分点落在时间上最近的帧边界。由于比特池(bit reservoir)的存在，
+    切分后第一帧可能有几毫秒的解码瑕疵，因此切分点应选在停顿处。
+
+    Args:
+        data: MP3数据
+        cut_points_ms: 升序排列的切分时间点(毫秒)
+
+    Returns:
+        切分后的MP3数据列表（长度为切分点数+1）
+    """
+    pieces = []
+    cuts = list(cut_points_ms)
+    piece_start = None
+    elapsed_ms = 0.0
+
+    for offset, header in iter_frames(data):
+        if piece_start is None:
+            piece_start = offset
+        # 帧的中点越过切分点时，在该帧之前切分
+        while cuts and elapsed_ms + header.duration_ms / 2 > cuts[0]:
+            pieces.append(data[piece_start:offset])
+            piece_start = offset
+            cuts.pop(0)
+        elapsed_ms += header.duration_ms
+        end = offset + header.frame_length
+
+    if piece_start is None:
+        return [b''] * (len(cut_points_ms) + 1)
+
+    pieces.append(data[piece_start:end])
+    # 切分点超出音频时长时补空片段
+    pieces.extend(b'' for _ in cuts)
+    return pieces
@@ -0,0 +1,315 @@
+"""
+字幕与时间轴生成器
+读写合成时保存的逐段词边界文件（<音频文件>.timing.json），
+按合并偏移量把时间轴拼接为章节级/整书级的 LRC、SRT、JSON 文件
+"""
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+from loguru import logger
+
+from .audio_splitter import AudioSplitter
+
+
+# 时间轴文件后缀（附加在音频文件名之后）
+TIMING_SUFFIX = ".timing.json"
+
+# 句子结束标点，字幕按句切分
+SENTENCE_ENDINGS = "。！？!?…；;\n"
+
+# 句末可以跟随的收尾标点
+_CLOSING_PUNCTUATION = "”’\"'）)」』"
+
+
+@dataclass
+class SubtitleCue:
+    """字幕条目"""
+    start_ms: float  # 开始时间(毫秒)
+    end_ms: float  # 结束时间(毫秒)
+    text: str  # 文本
+
+
+def timing_path(audio_path: str) -> Path:
+    """
+    获取音频文件对应的时间轴文件路径
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        时间轴文件路径
+    """
+    audio_path = Path(audio_path)
+    return audio_path.with_name(audio_path.name + TIMING_SUFFIX)
+
+
+def save_timing(audio_path: str, text: str, boundaries: Iterable) -> bool:
+    """
+    保存段落的词边界时间轴
+
+    Args:
+        audio_path: 音频文件路径
+        text: 段落文本
+        boundaries: 词边界列表（WordBoundary 或包含 offset_ms/duration_ms/text 的字典）
+
+    Returns:
+        是否成功
+    """
+    words = []
+    for boundary in boundaries:
+        if isinstance(boundary, dict):
+            words.append(boundary)
+        else:
+            words.append({
+                'offset_ms': boundary.offset_ms,
+                'duration_ms': boundary.duration_ms,
+                'text': boundary.text
+            })
+
+    try:
+        with open(timing_path(audio_path), 'w', encoding='utf-8') as f:
+            json.dump({'text': text, 'words': words}, f, ensure_ascii=False)
+        return True
+
+    except Exception as e:
+        logger.warning(f"时间轴保存失败: {e}")
+        return False
+
+
+def load_timing(audio_path: str) -> Optional[Dict]:
+    """
+    读取段落的词边界时间轴
+
+    Args:
+        audio_path: 音频文件路径
+
+    Returns:
+        {'text': 段落文本, 'words': 词边界字典列表}，文件不存在或损坏时返回None
+    """
+    path = timing_path(audio_path)
+    try:
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    except Exception as e:
+        logger.warning(f"时间轴读取失败 ({path}): {e}")
+        return None
+
+
+class SubtitleWriter:
+    """字幕生成器"""
+
+    SUPPORTED_FORMATS = ('lrc', 'srt', 'json')
+
+    def __init__(self, formats: Sequence[str] = SUPPORTED_FORMATS):
+        """
+        初始化字幕生成器
+
+        Args:
+            formats: 输出格式列表 (lrc, srt, json)
+        """
+        unknown = set(formats) - set(self.SUPPORTED_FORMATS)
+        if unknown:
+            raise ValueError(f"不支持的字幕格式: {', '.join(sorted(unknown))}")
+        self.formats = list(formats)
+
+    @staticmethod
+    def build_cues(text: str, words: List[Dict], offset_ms: float = 0.0) -> List[SubtitleCue]:
+        """
+        把段落的词边界按句子合并为字幕条目
+
+        Args:
+            text: 段落文本
+            words: 词边界字典列表（时间相对于段落开头）
+            offset_ms: 段落在时间轴上的起始偏移(毫秒)
+
+        Returns:
+            字幕条目列表
+        """
+        # 句子在文本中的结束位置
+        sentence_ends = []
+        i = 0
+        while i < len(text):
+            if text[i] in SENTENCE_ENDINGS:
+                # 吸收连续的句末标点和收尾引号（换行之后的引号属于下一句）
+                while text[i] != '\n' and i + 1 < len(text) and (
+                    text[i + 1] in SENTENCE_ENDINGS or text[i + 1] in _CLOSING_PUNCTUATION
+                ):
+                    i += 1
+                sentence_ends.append(i + 1)
+            i += 1
+        if not sentence_ends or sentence_ends[-1] < len(text):
+            sentence_ends.append(len(text))
+
+        cues = []
+        sentence_start = 0
+        sentence_index = 0
+        current: Optional[SubtitleCue] = None
+        cursor = 0
+
+        def close(end_pos: int):
+            nonlocal current
+            if current is not None:
+                current.text = text[sentence_start:end_pos].strip()
+                if current.text:
+                    cues.append(current)
+            current = None
+
+        for word in words:
+            found = text.find(word['text'], cursor)
+            if found < 0:
+                continue
+            cursor = found + len(word['text'])
+
+            while found >= sentence_ends[sentence_index]:
+                close(sentence_ends[sentence_index])
+                sentence_start = sentence_ends[sentence_index]
+                sentence_index += 1
+
+            start = offset_ms + word['offset_ms']
+            end = start + word['duration_ms']
+            if current is None:
+                current = SubtitleCue(start_ms=start, end_ms=end, text="")
+            else:
+                current.end_ms = max(current.end_ms, end)
+
+        close(sentence_ends[sentence_index] if current is not None else len(text))
+        return cues
+
+    def build_timeline(self, segments: List[Dict]) -> Dict:
+        """
+        按偏移量拼接多个段落的时间轴
+
+        Args:
+            segments: 段落列表 [{audio_path, offset_ms, text}, ...]，
+                没有时间轴文件的段落整体作为一条字幕（时长可用 duration_ms 指定，否则读取音频文件）
+
+        Returns:
+            {'cues': 字幕条目列表, 'words': 绝对时间的词边界列表}
+        """
+        cues: List[SubtitleCue] = []
+        words: List[Dict] = []
+
+        for segment in segments:
+            offset = segment['offset_ms']
+            timing = load_timing(segment['audio_path'])
+
+            if timing is None or not timing.get('words'):
+                text = (timing or {}).get('text') or segment.get('text', '')
+                duration = segment.get('duration_ms')
+                if duration is None:
+                    duration = AudioSplitter.get_duration_ms(segment['audio_path'])
+                if text.strip():
+                    cues.append(SubtitleCue(start_ms=offset, end_ms=offset + duration, text=text.strip()))
+                continue
+
+            cues.extend(self.build_cues(timing['text'], timing['words'], offset))
+            words.extend(
+                {
+                    'offset_ms': round(offset + word['offset_ms'], 1),
+                    'duration_ms': round(word['duration_ms'], 1),
+                    'text': word['text']
+                }
+                for word in timing['words']
+            )
+
+        return {'cues': cues, 'words': words}
+
+    def write(
+        self,
+        timeline: Dict,
+        output_stem: str,
+        title: str = "",
+        chapters: Optional[List[Dict]] = None,
+        include_words: bool = True
+    ) -> List[str]:
+        """
+        写出字幕文件
+
+        Args:
+            timeline: build_timeline() 的返回值
+            output_stem: 输出路径（不含扩展名）
+            title: 标题
+            chapters: 章节起点列表 [{title, start_ms}, ...]（仅写入JSON）
+            include_words: JSON中是否包含逐词时间轴
+
+        Returns:
+            生成的文件路径列表
+        """
+        output_stem = Path(output_stem)
+        output_stem.parent.mkdir(parents=True, exist_ok=True)
+        cues = timeline['cues']
+        written = []
+
+        for audio_format in self.formats:
+            path = output_stem.with_name(f"{output_stem.name}.{audio_format}")
+            if audio_format == 'lrc':
+                content = self.to_lrc(cues, title)
+            elif audio_format == 'srt':
+                content = self.to_srt(cues)
+            else:
+                content = self.to_json(timeline, title, chapters, include_words)
+
+            path.write_text(content, encoding='utf-8')
+            written.append(str(path))
+
+        logger.debug(f"字幕已生成: {output_stem} ({len(cues)} 条)")
+        return written
+
+    @staticmethod
+    def to_lrc(cues: List[SubtitleCue], title: str = "") -> str:
+        """生成LRC歌词格式"""
+        lines = [f"[ti:{title}]"] if title else []
+        for cue in cues:
+            minutes, seconds = divmod(cue.start_ms / 1000.0, 60)
+            lines.append(f"[{int(minutes):02d}:{seconds:05.2f}]{cue.text.replace(chr(10), ' ')}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def to_srt(cues: List[SubtitleCue]) -> str:
+        """生成SRT字幕格式"""
+        def stamp(ms: float) -> str:
+            ms = int(round(ms))
+            hours, ms = divmod(ms, 3600000)
+            minutes, ms = divmod(ms, 60000)
+            seconds, ms = divmod(ms, 1000)
+            return f"{hours:02d}:{minutes:02d}:{seconds:02d},{ms:03d}"
+
+        blocks = []
+        for index, cue in enumerate(cues, 1):
+            blocks.append(f"{index}\n{stamp(cue.start_ms)} --> {stamp(cue.end_ms)}\n{cue.text}\n")
+        return "\n".join(blocks)
+
+    @staticmethod
+    def to_json(
+        timeline: Dict,
+        title: str = "",
+        chapters: Optional[List[Dict]] = None,
+        include_words: bool = True
+    ) -> str:
+        """生成JSON时间轴（供阅读界面高亮和跳转）"""
+        data = {
+            'title': title,
+            'chapters': chapters or [],
+            'cues': [
+                {'start_ms': round(cue.start_ms, 1), 'end_ms': round(cue.end_ms, 1), 'text': cue.text}
+                for cue in timeline['cues']
+            ]
+        }
+        if include_words:
+            data['words'] = timeline['words']
+        return json.dumps(data, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    # 测试代码
+    writer = SubtitleWriter()
+    demo_words = [
+        {'offset_ms': 100 + 200 * i, 'duration_ms': 180, 'text': char}
+        for i, char in enumerate("夜色渐深他抬起头")
+    ]
+    for demo_cue in writer.build_cues("夜色渐深。他抬起头。", demo_words):
+        print(demo_cue)
@@ -7,6 +7,11 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 from loguru import logger
 
+from core.metrics import get_registry, time_stage
+
+
+CHAPTERS_PARSED = get_registry().counter('chapters_parsed_total', '解析出的章节数')
+
 
 @dataclass
 class Chapter:
@@ -44,6 +49,7 @@ class ChapterParser:
         # 编译正则表达式
         self.compiled_patterns = [re.compile(p, re.MULTILINE) for p in self.patterns]
 
+    @time_stage('parse_chapters')
     def parse(self, text: str) -> List[Chapter]:
         """
         解析文本，提取章节
@@ -72,6 +78,7 @@ class ChapterParser:
         # 提取章节内容
         chapters = self._extract_chapters(text, chapter_positions)
 
+        CHAPTERS_PARSED.inc(len(chapters))
         logger.success(f"成功解析 {len(chapters)} 个章节")
         return chapters
 
@@ -7,6 +7,11 @@ from pathlib import Path
 from typing import Dict, Optional
 from loguru import logger
 
+from core.metrics import get_registry, time_stage
+
+
+INPUT_BYTES = get_registry().counter('input_bytes_read_total', '读取的小说文件字节数')
+
 
 class EncodingDetector:
     """文本编码检测器"""
@@ -31,12 +36,13 @@ class EncodingDetector:
             if not file_path.exists():
                 raise FileNotFoundError(f"文件不存在: {file_path}")
 
-            # 读取文件样本
-            with open(file_path, 'rb') as f:
-                raw_data = f.read(sample_size)
+            with time_stage('detect_encoding'):
+                # 读取文件样本
+                with open(file_path, 'rb') as f:
+                    raw_data = f.read(sample_size)
 
-            # 使用chardet检测
-            result = chardet.detect(raw_data)
+                # 使用chardet检测
+                result = chardet.detect(raw_data)
             encoding = result['encoding']
             confidence = result['confidence']
 
@@ -99,8 +105,10 @@ class EncodingDetector:
                 encoding = detection_result['encoding']
 
             # 读取文件
-            with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
-                content = f.read()
+            with time_stage('read_file'):
+                with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+                    content = f.read()
+            INPUT_BYTES.inc(Path(file_path).stat().st_size)
 
             logger.success(f"成功读取文件: {file_path} (编码: {encoding})")
             return content
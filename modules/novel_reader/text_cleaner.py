@@ -6,6 +6,11 @@ import re
 from typing import List
 from loguru import logger
 
+from core.metrics import get_registry, time_stage
+
+
+CHARS_REMOVED = get_registry().counter('text_chars_removed_total', '清洗时移除的字符数')
+
 
 class TextCleaner:
     """文本清洗器"""
@@ -34,6 +39,7 @@ class TextCleaner:
         self.remove_annotations = remove_annotations
         self.remove_ads = remove_ads
 
+    @time_stage('clean_text')
     def clean(self, text: str) -> str:
         """
         清洗文本
@@ -68,6 +74,7 @@ class TextCleaner:
         text = self._normalize_whitespace(text)
 
         cleaned_length = len(text)
+        CHARS_REMOVED.inc(max(0, original_length - cleaned_length))
         logger.success(f"文本清洗完成，清理了 {original_length - cleaned_length} 字符")
 
         return text
@@ -2,6 +2,8 @@
 文本处理器
 整合编码检测、文本清洗、章节解析等功能
 """
+import re
+from collections import deque
 from pathlib import Path
 from typing import List, Dict, Optional
 from loguru import logger
@@ -11,6 +13,30 @@ from .text_cleaner import TextCleaner
 from .chapter_parser import ChapterParser, Chapter
 
 
+# 句末标点（含其后的引号/括号）
+_SENTENCE_END = re.compile(r'[。！？!?…；;]+[”’」』）)]*')
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    按句末标点切分句子（标点保留在句子末尾）
+
+    Args:
+        text: 文本
+
+    Returns:
+        句子列表（拼接后与原文相同）
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return sentences
+
+
 class TextProcessor:
     """文本处理器 - 统一处理小说文本的入口"""
 
@@ -20,7 +46,10 @@ class TextProcessor:
         remove_annotations: bool = True,
         remove_ads: bool = True,
         custom_chapter_pattern: Optional[str] = None,
-        max_segment_length: int = 500
+        max_segment_length: int = 500,
+        progressive: bool = False,
+        first_segment_length: int = 40,
+        segment_growth: float = 2.0
     ):
         """
         初始化文本处理器
@@ -31,9 +60,15 @@ class TextProcessor:
             remove_ads: 是否移除广告
             custom_chapter_pattern: 自定义章节模式
             max_segment_length: 最大段落长度（字符数）
+            progressive: 是否启用渐进分段（起始章节开头使用短段落，缩短第一段音频的等待时间）
+            first_segment_length: 渐进分段的第一个段落长度上限
+            segment_growth: 渐进分段每个段落长度上限的增长倍数
         """
         self.encoding = encoding
         self.max_segment_length = max_segment_length
+        self.progressive = progressive
+        self.first_segment_length = first_segment_length
+        self.segment_growth = segment_growth
 
         # 初始化子模块
         self.encoding_detector = EncodingDetector()
@@ -85,28 +120,46 @@ class TextProcessor:
             'summary': summary
         }
 
-    def split_long_chapter(self, chapter: Chapter) -> List[Dict]:
+    def split_long_chapter(self, chapter: Chapter, size_schedule: Optional[List[int]] = None) -> List[Dict]:
         """
         将过长的章节分割成多个段落
 
         Args:
             chapter: 章节对象
+            size_schedule: 前几个段落各自的长度上限（之后使用 max_segment_length），
+                上限小于 max_segment_length 的段落在句末标点处切分
 
         Returns:
             段落列表，每个段落包含 {text, index}
         """
         content = chapter.content
         segments = []
+        schedule = size_schedule or []
 
-        # 先按自然段落分割
-        paragraphs = self.text_cleaner.split_paragraphs(content)
+        # 先按自然段落分割（待处理单元: (文本, 与前文的连接符)）
+        pending = deque((para, "\n") for para in self.text_cleaner.split_paragraphs(content))
 
         current_segment = ""
         segment_index = 0
 
-        for para in paragraphs:
+        def limit() -> int:
+            """当前段落的长度上限"""
+            return schedule[segment_index] if segment_index < len(schedule) else self.max_segment_length
+
+        while pending:
+            para, separator = pending.popleft()
+
+            # 渐进段落：超过上限的自然段按句子拆开，逐句累积
+            if limit() < len(para) and limit() < self.max_segment_length:
+                sentences = split_sentences(para)
+                if len(sentences) > 1:
+                    pending.extendleft(reversed(
+                        [(sentence, separator if i == 0 else "") for i, sentence in enumerate(sentences)]
+                    ))
+                    continue
+
             # 如果单个段落就超过限制，需要强制分割
-            if len(para) > self.max_segment_length:
+            if len(para) > limit():
                 # 先保存当前累积的段落
                 if current_segment:
                     segments.append({
@@ -118,16 +171,18 @@ class TextProcessor:
                     current_segment = ""
 
                 # 分割超长段落
-                for i in range(0, len(para), self.max_segment_length):
+                while para:
+                    size = limit()
                     segments.append({
-                        'text': para[i:i + self.max_segment_length],
+                        'text': para[:size],
                         'index': segment_index,
                         'chapter_title': chapter.title
                     })
                     segment_index += 1
+                    para = para[size:]
             else:
                 # 检查加上这个段落是否会超限
-                if len(current_segment) + len(para) + 1 > self.max_segment_length:
+                if len(current_segment) + len(para) + len(separator) > limit():
                     # 保存当前段落，开始新段落
                     if current_segment:
                         segments.append({
@@ -139,7 +194,7 @@ class TextProcessor:
                     current_segment = para
                 else:
                     # 累积段落
-                    current_segment += "\n" + para if current_segment else para
+                    current_segment += separator + para if current_segment else para
 
         # 保存最后的段落
         if current_segment:
@@ -152,12 +207,32 @@ class TextProcessor:
         logger.info(f"章节 '{chapter.title}' 分割为 {len(segments)} 个段落")
         return segments
 
-    def prepare_for_tts(self, chapters: List[Chapter]) -> List[Dict]:
+    def progressive_schedule(self) -> List[int]:
+        """
+        渐进分段的长度上限序列：从 first_segment_length 开始按 growth 倍数增长，直到 max_segment_length
+
+        Returns:
+            各段落的长度上限（不含 max_segment_length 本身），未启用渐进分段时为空
+        """
+        if not self.progressive or self.first_segment_length >= self.max_segment_length:
+            return []
+        schedule = []
+        size = float(max(1, self.first_segment_length))
+        while size < self.max_segment_length:
+            schedule.append(int(size))
+            size *= max(1.1, self.segment_growth)
+        return schedule
+
+    def prepare_for_tts(self, chapters: List[Chapter], start_chapter: Optional[int] = None) -> List[Dict]:
         """
         准备用于TTS的文本段落列表
 
+        启用渐进分段时，起始章节开头的段落很短（很快合成出第一段音频），之后逐步增大到
+        max_segment_length；分段只取决于文本、起始章节和分段参数，相同输入得到相同的段落划分
+
         Args:
             chapters: 章节列表
+            start_chapter: 起始章节序号（渐进分段从该章节开始，None则为第一个章节）
 
         Returns:
             TTS任务列表，每个任务包含：
@@ -166,22 +241,31 @@ class TextProcessor:
             - segment_index: 段落序号
             - text: 文本内容
             - task_id: 唯一任务ID
+            - progressive: 渐进分段的短段落（仅这些段落包含该键）
         """
         tts_tasks = []
         task_id = 0
 
+        schedule = self.progressive_schedule()
+        if start_chapter is None and chapters:
+            start_chapter = chapters[0].index
+
         for chapter in chapters:
-            segments = self.split_long_chapter(chapter)
+            segments = self.split_long_chapter(chapter, schedule if chapter.index == start_chapter else None)
 
             for seg in segments:
-                tts_tasks.append({
+                task = {
                     'task_id': task_id,
                     'chapter_index': chapter.index,
                     'chapter_title': chapter.title,
                     'segment_index': seg['index'],
                     'text': seg['text'],
                     'char_count': len(seg['text'])
-                })
+                }
+                if chapter.index == start_chapter and seg['index'] < len(schedule):
+                    # 渐进分段的短段落（不参与短段落打包，否则又会合并成长请求）
+                    task['progressive'] = True
+                tts_tasks.append(task)
                 task_id += 1
 
         logger.info(f"生成 {len(tts_tasks)} 个TTS任务")
@@ -219,7 +303,9 @@ class TextProcessor:
 
 if __name__ == '__main__':
     # 测试代码
-    processor = TextProcessor()
+    processor = TextProcessor(progressive=True)
+    print(f"渐进分段长度上限: {processor.progressive_schedule()}")
+    print(split_sentences("“你真的要走吗？”她轻声问道。他没有回答"))
 
     # 示例：处理小说文件
     # result = processor.load_novel("test_novel.txt")
@@ -1,7 +1,14 @@
 """
 TTS引擎模块
 """
-from .base_tts import BaseTTS, TTSConfig, VoiceInfo
+from .base_tts import BaseTTS, TTSConfig, VoiceInfo, WordBoundary
 from .local_tts.edge_tts_engine import EdgeTTSEngine
+from .local_tts.pyttsx3_engine import Pyttsx3Engine
+from .local_tts.loopback_engine import LoopbackTTSEngine
+from .packing_tts import PackingTTSEngine
+from .hedged_tts import HedgedTTSEngine
 
-__all__ = ['BaseTTS', 'TTSConfig', 'VoiceInfo', 'EdgeTTSEngine']
+__all__ = [
+    'BaseTTS', 'TTSConfig', 'VoiceInfo', 'WordBoundary',
+    'EdgeTTSEngine', 'Pyttsx3Engine', 'LoopbackTTSEngine', 'PackingTTSEngine', 'HedgedTTSEngine'
+]
@@ -2,10 +2,56 @@
 TTS引擎基类
 定义统一的TTS接口
 """
+import asyncio
+import functools
+import time
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence, Tuple
 from pathlib import Path
+from loguru import logger
+
+from core.loop_runner import run_sync
+from core.metrics import BYTES_WRITTEN, get_registry
+
+
+_metrics = get_registry()
+TTS_REQUESTS = _metrics.counter('tts_requests_total', 'TTS合成请求数', ('engine', 'outcome'))
+TTS_IN_FLIGHT = _metrics.gauge('tts_requests_in_flight', '正在进行的TTS合成请求数', ('engine',))
+TTS_REQUEST_SECONDS = _metrics.histogram('tts_request_seconds', 'TTS合成请求耗时(秒)', ('engine',))
+TTS_CHARACTERS = _metrics.counter('tts_characters_total', '成功合成的字符数', ('engine',))
+
+
+def metered_synthesis(method):
+    """
+    为引擎的合成方法记录请求数、进行中请求数、耗时、字符数和写出字节数
+
+    被装饰的方法签名为 (self, text, output_path)，返回 False/None 视为失败
+    """
+    @functools.wraps(method)
+    async def wrapper(self, text: str, output_path: str, *args, **kwargs):
+        engine = self.get_engine_name()
+        start = time.perf_counter()
+        outcome = 'failure'
+        try:
+            with TTS_IN_FLIGHT.track_inprogress(engine=engine):
+                result = await method(self, text, output_path, *args, **kwargs)
+            if result is not None and result is not False:
+                outcome = 'success'
+            return result
+        except asyncio.CancelledError:
+            # 对冲请求中落败的一方会被取消
+            outcome = 'cancelled'
+            raise
+        finally:
+            TTS_REQUESTS.inc(engine=engine, outcome=outcome)
+            TTS_REQUEST_SECONDS.observe(time.perf_counter() - start, engine=engine)
+            if outcome == 'success':
+                TTS_CHARACTERS.inc(len(text), engine=engine)
+                output_file = Path(output_path)
+                if output_file.exists():
+                    BYTES_WRITTEN.inc(output_file.stat().st_size, component='tts')
+    return wrapper
 
 
 @dataclass
@@ -17,6 +63,14 @@ class VoiceInfo:
     description: str = ""  # 描述
 
 
+@dataclass
+class WordBoundary:
+    """词边界时间信息"""
+    offset_ms: float  # 词在音频中的起始时间(毫秒)
+    duration_ms: float  # 词的持续时间(毫秒)
+    text: str  # 词文本
+
+
 @dataclass
 class TTSConfig:
     """TTS配置"""
@@ -30,14 +84,39 @@ class TTSConfig:
 class BaseTTS(ABC):
     """TTS引擎基类"""
 
+    # 引擎能否在合成的同时返回词边界时间
+    SUPPORTS_BOUNDARIES = False
+
+    # 引擎能直接输出的音频格式，第一个为首选格式
+    SUPPORTED_FORMATS = ['mp3']
+
     def __init__(self, config: Optional[TTSConfig] = None):
         """
         初始化TTS引擎
 
         Args:
-            config: TTS配置
+            config: TTS配置，output_format 会被协商为引擎支持的格式
         """
         self.config = config or TTSConfig(voice="default")
+        self.config.output_format = self.negotiate_format(self.config.output_format)
+
+    def negotiate_format(self, requested: Optional[str]) -> str:
+        """
+        协商输出格式
+
+        Args:
+            requested: 期望的格式（None则使用首选格式）
+
+        Returns:
+            引擎实际输出的格式
+        """
+        formats = self.SUPPORTED_FORMATS
+        if requested:
+            requested = requested.lower()
+            if requested in formats:
+                return requested
+            logger.warning(f"{type(self).__name__} 不支持输出 {requested}，改用 {formats[0]}")
+        return formats[0]
 
     @abstractmethod
     async def synthesize(self, text: str, output_path: str) -> bool:
@@ -53,10 +132,52 @@ class BaseTTS(ABC):
         """
         pass
 
+    async def synthesize_with_boundaries(self, text: str, output_path: str) -> Optional[List[WordBoundary]]:
+        """
+        合成语音并返回词边界时间（异步）
+
+        不支持边界事件的引擎返回空列表
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            词边界列表，合成失败返回None
+        """
+        success = await self.synthesize(text, output_path)
+        return [] if success else None
+
+    async def synthesize_with_timing(self, text: str, output_path: str) -> bool:
+        """
+        合成语音，并在同一次请求中保存词边界时间轴文件（<输出文件>.timing.json）
+
+        不支持词边界的引擎只合成音频
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            是否成功
+        """
+        if not self.SUPPORTS_BOUNDARIES:
+            return await self.synthesize(text, output_path)
+
+        from ..audio_processor.subtitle_writer import save_timing
+
+        boundaries = await self.synthesize_with_boundaries(text, output_path)
+        if boundaries is None:
+            return False
+        save_timing(output_path, text, boundaries)
+        return True
+
     def synthesize_sync(self, text: str, output_path: str) -> bool:
         """
         合成语音（同步）
 
+        在共享的后台事件循环中执行，可以在已有运行中事件循环的线程里调用
+
         Args:
             text: 要合成的文本
             output_path: 输出文件路径
@@ -64,14 +185,53 @@ class BaseTTS(ABC):
         Returns:
             是否成功
         """
-        import asyncio
-        try:
-            loop = asyncio.get_event_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+        return run_sync(self.synthesize(text, output_path))
+
+    async def synthesize_many(
+        self,
+        items: Sequence[Tuple[str, str]],
+        max_concurrency: int = 4
+    ) -> List[bool]:
+        """
+        批量合成语音（异步），限制同时进行的请求数
+
+        Args:
+            items: (文本, 输出文件路径) 列表
+            max_concurrency: 最大并发请求数
+
+        Returns:
+            与 items 顺序一致的成功标志列表
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(text: str, output_path: str) -> bool:
+            async with semaphore:
+                try:
+                    return await self.synthesize(text, output_path)
+                except Exception as e:
+                    logger.error(f"批量合成失败 ({output_path}): {e}")
+                    return False
 
-        return loop.run_until_complete(self.synthesize(text, output_path))
+        return list(await asyncio.gather(*(run_one(text, path) for text, path in items)))
+
+    def synthesize_many_sync(
+        self,
+        items: Sequence[Tuple[str, str]],
+        max_concurrency: int = 4
+    ) -> List[bool]:
+        """
+        批量合成语音（同步）
+
+        整批请求在共享的后台事件循环中并发执行，多次调用复用同一个循环
+
+        Args:
+            items: (文本, 输出文件路径) 列表
+            max_concurrency: 最大并发请求数
+
+        Returns:
+            与 items 顺序一致的成功标志列表
+        """
+        return run_sync(self.synthesize_many(items, max_concurrency))
 
     @abstractmethod
     def get_available_voices(self) -> List[VoiceInfo]:
@@ -124,6 +284,15 @@ class BaseTTS(ABC):
         """设置音调"""
         self.config.pitch = max(0.5, min(2.0, pitch))
 
+    def close(self, wait: bool = True):
+        """
+        释放引擎占用的资源（连接、进程池等），之后的合成请求会按需重新创建
+
+        Args:
+            wait: 是否等待正在进行的请求结束
+        """
+        pass
+
     def get_info(self) -> Dict:
         """
         获取引擎信息
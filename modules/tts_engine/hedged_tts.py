@@ -0,0 +1,369 @@
+"""
+对冲请求TTS引擎
+请求耗时超过历史延迟的指定分位数时，向同一引擎或备用引擎发出重复请求，先成功的结果胜出；
+每个引擎独立维护健康评分和熔断器，失败的引擎会被自动绕过
+"""
+import asyncio
+import os
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+
+from core.latency_tracker import LatencyTracker
+from .base_tts import BaseTTS, VoiceInfo, WordBoundary
+
+
+class CircuitState(Enum):
+    """熔断器状态"""
+    CLOSED = "closed"  # 正常
+    OPEN = "open"  # 熔断，拒绝请求
+    HALF_OPEN = "half_open"  # 冷却结束，放行一个试探请求
+
+
+class EngineHealth:
+    """引擎健康评分与熔断器"""
+
+    def __init__(self, failure_threshold: int = 5, open_seconds: float = 30.0, smoothing: float = 0.1):
+        """
+        初始化健康状态
+
+        Args:
+            failure_threshold: 连续失败多少次后熔断
+            open_seconds: 熔断持续时间(秒)
+            smoothing: 指数滑动平均系数
+        """
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.smoothing = smoothing
+
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.open_count = 0
+        self.success_rate = 1.0
+        self.latency_ms: Optional[float] = None
+        self._probe_in_flight = False
+
+    def allow_request(self) -> bool:
+        """
+        判断是否允许向该引擎发送请求
+
+        Returns:
+            是否允许
+        """
+        if self.state == CircuitState.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self.state = CircuitState.HALF_OPEN
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+
+        return True
+
+    def record_success(self, latency_ms: float):
+        """记录一次成功"""
+        self._probe_in_flight = False
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.success_rate += self.smoothing * (1.0 - self.success_rate)
+        if self.latency_ms is None:
+            self.latency_ms = latency_ms
+        else:
+            self.latency_ms += self.smoothing * (latency_ms - self.latency_ms)
+
+    def record_failure(self):
+        """记录一次失败"""
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        self.success_rate -= self.smoothing * self.success_rate
+
+        if self.state == CircuitState.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CircuitState.OPEN:
+                self.open_count += 1
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """请求被取消（既未成功也未失败）时释放试探名额"""
+        self._probe_in_flight = False
+
+    @property
+    def score(self) -> float:
+        """健康评分：成功率越高、延迟越低分数越高"""
+        latency_s = (self.latency_ms or 0.0) / 1000.0
+        return self.success_rate / (1.0 + latency_s)
+
+    def to_dict(self) -> Dict:
+        """导出健康状态"""
+        return {
+            'state': self.state.value,
+            'score': round(self.score, 4),
+            'success_rate': round(self.success_rate, 4),
+            'latency_ms': self.latency_ms,
+            'consecutive_failures': self.consecutive_failures,
+            'circuit_opens': self.open_count
+        }
+
+
+class HedgedTTSEngine(BaseTTS):
+    """对冲请求引擎（包装一个主引擎和若干备用引擎）"""
+
+    def __init__(
+        self,
+        engines: List[BaseTTS],
+        hedge_percentile: float = 95.0,
+        initial_hedge_delay_ms: float = 5000.0,
+        min_samples: int = 20,
+        max_attempts: int = 3,
+        failure_threshold: int = 5,
+        open_seconds: float = 30.0
+    ):
+        """
+        初始化对冲引擎
+
+        Args:
+            engines: 引擎列表，第一个为主引擎，其余为备用引擎
+            hedge_percentile: 请求耗时超过该分位数时发出对冲请求
+            initial_hedge_delay_ms: 样本不足时使用的对冲等待时间(毫秒)
+            min_samples: 开始使用分位数前需要的样本数
+            max_attempts: 单个任务最多发出的请求数（含对冲和故障转移）
+            failure_threshold: 连续失败多少次后熔断
+            open_seconds: 熔断持续时间(秒)
+        """
+        self.engines = engines
+        if not self.SUPPORTED_FORMATS:
+            raise ValueError("对冲引擎没有共同支持的输出格式")
+        super().__init__(engines[0].config)
+        # 所有引擎输出同一格式，对冲/故障转移的结果才能互相替换
+        for engine in engines[1:]:
+            engine.config.output_format = self.config.output_format
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay_ms = initial_hedge_delay_ms
+        self.max_attempts = max(1, max_attempts)
+
+        self.health = [EngineHealth(failure_threshold, open_seconds) for _ in engines]
+        self.attempt_latency = [LatencyTracker(min_samples=min_samples) for _ in engines]
+        self.request_latency = LatencyTracker(min_samples=min_samples)
+
+        self.request_count = 0
+        self.failed_count = 0
+        self.hedge_count = 0
+        self.hedge_wins = 0
+        self.failover_count = 0
+        self._attempt_seq = 0
+
+        names = ", ".join(engine.get_engine_name() for engine in engines)
+        logger.info(f"对冲请求已启用 (引擎: {names}, 对冲分位: p{hedge_percentile:g})")
+
+    def __getattr__(self, name):
+        """未定义的属性转发给主引擎"""
+        if name == 'engines':
+            raise AttributeError(name)
+        return getattr(self.engines[0], name)
+
+    @property
+    def SUPPORTS_BOUNDARIES(self) -> bool:
+        """所有引擎都支持词边界时才支持"""
+        return all(engine.SUPPORTS_BOUNDARIES for engine in self.engines)
+
+    @property
+    def SUPPORTED_FORMATS(self) -> List[str]:
+        """所有引擎都支持的格式（按主引擎的优先顺序）"""
+        return [
+            audio_format for audio_format in self.engines[0].SUPPORTED_FORMATS
+            if all(audio_format in engine.SUPPORTED_FORMATS for engine in self.engines[1:])
+        ]
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        """
+        对冲合成语音
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            是否成功
+        """
+        return await self._race(text, output_path, with_boundaries=False) is not None
+
+    async def synthesize_with_boundaries(self, text: str, output_path: str) -> Optional[List[WordBoundary]]:
+        """
+        对冲合成语音并返回词边界
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            词边界列表，合成失败返回None
+        """
+        return await self._race(text, output_path, with_boundaries=True)
+
+    async def _race(self, text: str, output_path: str, with_boundaries: bool) -> Optional[List[WordBoundary]]:
+        """
+        发出请求，必要时发出对冲/故障转移请求，返回最先成功的结果
+
+        每个请求写入独立的临时文件，胜出者重命名为最终输出，其余请求被取消
+
+        Returns:
+            词边界列表（不需要时为空列表），全部失败返回None
+        """
+        self.request_count += 1
+        start = time.monotonic()
+        attempts: Dict[asyncio.Task, Tuple[int, Path, float]] = {}
+        launched = 0
+        result = None
+
+        def launch(hedge: bool) -> bool:
+            nonlocal launched
+            index = self._pick_engine(exclude_busy={i for i, _, _ in attempts.values()}, hedge=hedge)
+            if index is None:
+                return False
+            self._attempt_seq += 1
+            final = Path(output_path)
+            tmp_path = final.with_name(f"{final.stem}.attempt{self._attempt_seq}{final.suffix}")
+            task = asyncio.ensure_future(self._attempt(index, text, str(tmp_path), with_boundaries))
+            attempts[task] = (index, tmp_path, time.monotonic())
+            launched += 1
+            return True
+
+        if not launch(hedge=False):
+            logger.error("所有TTS引擎均处于熔断状态")
+            self.failed_count += 1
+            return None
+
+        pending = set(attempts)
+        try:
+            while pending and result is None:
+                can_hedge = launched < self.max_attempts
+                timeout = self._hedge_delay_seconds() if can_hedge else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # 超过延迟分位数仍未完成：发出对冲请求
+                    if launch(hedge=True):
+                        self.hedge_count += 1
+                        pending = {task for task in attempts if not task.done()}
+                        logger.debug(f"请求超过p{self.hedge_percentile:g}，发出对冲请求 ({len(text)} 字符)")
+                    continue
+
+                for task in done:
+                    index, tmp_path, started = attempts[task]
+                    boundaries = task.result() if not task.cancelled() else None
+                    if boundaries is not None and result is None:
+                        os.replace(tmp_path, output_path)
+                        result = boundaries
+                        if task is not next(iter(attempts)):
+                            self.hedge_wins += 1
+                    elif boundaries is None and launched < self.max_attempts:
+                        # 请求失败：立即转移到其他健康的引擎
+                        if launch(hedge=True):
+                            self.failover_count += 1
+                            pending = {t for t in attempts if not t.done()}
+
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*attempts, return_exceptions=True)
+            for task, (index, tmp_path, _) in attempts.items():
+                if task.cancelled():
+                    self.health[index].release()
+                if tmp_path.exists():
+                    tmp_path.unlink()
+
+        if result is None:
+            self.failed_count += 1
+            return None
+
+        self.request_latency.record((time.monotonic() - start) * 1000)
+        return result
+
+    async def _attempt(self, index: int, text: str, output_path: str, with_boundaries: bool):
+        """向指定引擎发出一次请求，并更新该引擎的健康状态"""
+        engine = self.engines[index]
+        start = time.monotonic()
+        try:
+            if with_boundaries:
+                boundaries = await engine.synthesize_with_boundaries(text, output_path)
+            else:
+                boundaries = [] if await engine.synthesize(text, output_path) else None
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{engine.get_engine_name()} 请求异常: {e}")
+            boundaries = None
+
+        latency_ms = (time.monotonic() - start) * 1000
+        if boundaries is None:
+            self.health[index].record_failure()
+        else:
+            self.health[index].record_success(latency_ms)
+            self.attempt_latency[index].record(latency_ms)
+        return boundaries
+
+    def _pick_engine(self, exclude_busy: set, hedge: bool) -> Optional[int]:
+        """
+        选择下一个请求的引擎
+
+        首个请求优先使用主引擎；对冲和故障转移优先选择尚未参与本任务的健康引擎，
+        没有其他可用引擎时向同一引擎重复请求
+        """
+        candidates = list(range(len(self.engines)))
+        if hedge:
+            candidates.sort(key=lambda i: (i in exclude_busy, -self.health[i].score))
+
+        for index in candidates:
+            if self.health[index].allow_request():
+                return index
+        return None
+
+    def _hedge_delay_seconds(self) -> float:
+        """计算对冲等待时间"""
+        delay = self.request_latency.percentile(self.hedge_percentile)
+        if delay is None:
+            delay = self.initial_hedge_delay_ms
+        return delay / 1000.0
+
+    def get_available_voices(self) -> List[VoiceInfo]:
+        """获取可用的音色列表（主引擎）"""
+        return self.engines[0].get_available_voices()
+
+    def get_engine_name(self) -> str:
+        """获取引擎名称"""
+        return f"{self.engines[0].get_engine_name()} (对冲)"
+
+    def close(self, wait: bool = True):
+        """释放所有引擎的资源"""
+        for engine in self.engines:
+            engine.close(wait)
+
+    def get_stats(self) -> Dict:
+        """
+        获取对冲统计
+
+        Returns:
+            统计信息字典，包含端到端延迟分位数、对冲次数和各引擎健康状态
+        """
+        return {
+            'requests': self.request_count,
+            'failed': self.failed_count,
+            'hedges': self.hedge_count,
+            'hedge_wins': self.hedge_wins,
+            'failovers': self.failover_count,
+            'latency_ms': self.request_latency.summary(),
+            'engines': [
+                {
+                    'name': engine.get_engine_name(),
+                    'health': health.to_dict(),
+                    'latency_ms': tracker.summary()
+                }
+                for engine, health, tracker in zip(self.engines, self.health, self.attempt_latency)
+            ]
+        }
@@ -2,5 +2,7 @@
 本地TTS引擎
 """
 from .edge_tts_engine import EdgeTTSEngine
+from .pyttsx3_engine import Pyttsx3Engine
+from .loopback_engine import LoopbackTTSEngine
 
-__all__ = ['EdgeTTSEngine']
+__all__ = ['EdgeTTSEngine', 'Pyttsx3Engine', 'LoopbackTTSEngine']
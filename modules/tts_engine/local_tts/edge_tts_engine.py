@@ -2,17 +2,38 @@
 Microsoft Edge TTS引擎
 基于edge-tts库，提供高质量免费TTS服务
 """
+import inspect
+import threading
 import edge_tts
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pathlib import Path
 from loguru import logger
 
-from ..base_tts import BaseTTS, TTSConfig, VoiceInfo
+from core.loop_runner import run_sync
+from core.metrics import record_cache
+from ..base_tts import BaseTTS, TTSConfig, VoiceInfo, WordBoundary, metered_synthesis
+from ..voice_catalog import VoiceCatalogCache
+
+
+# edge-tts 7.x 起默认只返回句子边界，需要显式请求词边界（6.x 无此参数且始终返回词边界）
+_BOUNDARY_KWARGS = (
+    {'boundary': 'WordBoundary'}
+    if 'boundary' in inspect.signature(edge_tts.Communicate.__init__).parameters
+    else {}
+)
+
+# edge-tts 时间单位为100纳秒
+_TICKS_PER_MS = 10000
 
 
 class EdgeTTSEngine(BaseTTS):
     """Microsoft Edge TTS引擎"""
 
+    SUPPORTS_BOUNDARIES = True
+
+    # edge-tts 固定请求 audio-24khz-48kbitrate-mono-mp3，不提供格式参数
+    SUPPORTED_FORMATS = ['mp3']
+
     # 推荐的中文音色
     RECOMMENDED_VOICES = {
         # 女声
@@ -30,18 +51,31 @@ class EdgeTTSEngine(BaseTTS):
         'yunxia': 'zh-CN-YunxiaNeural',      # 云夏 - 播音腔
     }
 
-    def __init__(self, config: Optional[TTSConfig] = None):
+    def __init__(
+        self,
+        config: Optional[TTSConfig] = None,
+        cache_dir: Optional[str] = None,
+        catalog_ttl_hours: float = 24.0,
+        offline: bool = False
+    ):
         """
         初始化Edge TTS引擎
 
         Args:
             config: TTS配置
+            cache_dir: 音色目录缓存目录（None则只缓存在内存中）
+            catalog_ttl_hours: 音色目录缓存有效期(小时)
+            offline: 离线模式，只使用缓存的音色目录，从不访问网络
         """
         if config is None:
             config = TTSConfig(voice=self.RECOMMENDED_VOICES['xiaoxiao'])
 
         super().__init__(config)
+        self.offline = offline
+        self._catalog = VoiceCatalogCache(cache_dir, name="edge_voices", ttl_hours=catalog_ttl_hours) if cache_dir else None
+        self._catalog_data: Optional[List[Dict]] = None
         self._voices_cache = None
+        self._refresh_lock = threading.Lock()
         logger.info(f"Edge TTS引擎初始化完成，当前音色: {self.config.voice}")
 
     async def synthesize(self, text: str, output_path: str) -> bool:
@@ -55,6 +89,20 @@ class EdgeTTSEngine(BaseTTS):
         Returns:
             是否成功
         """
+        return await self.synthesize_with_boundaries(text, output_path) is not None
+
+    @metered_synthesis
+    async def synthesize_with_boundaries(self, text: str, output_path: str) -> Optional[List[WordBoundary]]:
+        """
+        合成语音，同时收集服务端随音频流返回的词边界事件
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            词边界列表，合成失败返回None
+        """
         try:
             # 确保输出目录存在
             output_file = Path(output_path)
@@ -74,57 +122,149 @@ class EdgeTTSEngine(BaseTTS):
                 voice=self.config.voice,
                 rate=rate_str,
                 volume=volume_str,
-                pitch=pitch_str
+                pitch=pitch_str,
+                **_BOUNDARY_KWARGS
             )
 
-            # 保存音频文件
-            await communicate.save(str(output_file))
+            # 边接收边写入音频，同时记录词边界
+            boundaries = []
+            with open(output_file, 'wb') as f:
+                async for chunk in communicate.stream():
+                    if chunk['type'] == 'audio':
+                        f.write(chunk['data'])
+                    elif chunk['type'] == 'WordBoundary':
+                        boundaries.append(WordBoundary(
+                            offset_ms=chunk['offset'] / _TICKS_PER_MS,
+                            duration_ms=chunk['duration'] / _TICKS_PER_MS,
+                            text=chunk['text']
+                        ))
 
             logger.success(f"音频合成成功: {output_file}")
-            return True
+            return boundaries
 
         except Exception as e:
             logger.error(f"音频合成失败: {e}")
-            return False
+            return None
 
     def get_available_voices(self) -> List[VoiceInfo]:
         """
         获取可用的音色列表
 
+        优先使用磁盘缓存：缓存过期时立即返回旧列表并在后台刷新；
+        只有没有任何缓存且不是离线模式时才会同步访问网络
+
         Returns:
             音色信息列表
         """
         if self._voices_cache is not None:
             return self._voices_cache
 
+        catalog = self._load_catalog()
+        if catalog is None:
+            return []
+
+        # 只返回中文音色
+        voice_list = []
+        for voice in catalog:
+            if voice['Locale'].startswith('zh'):
+                voice_list.append(VoiceInfo(
+                    name=voice['ShortName'],
+                    language=voice['Locale'],
+                    gender=voice['Gender'],
+                    description=voice.get('FriendlyName', '')
+                ))
+
+        self._voices_cache = voice_list
+        logger.info(f"获取到 {len(voice_list)} 个中文音色")
+        return voice_list
+
+    def is_voice_available(self, voice: str) -> Optional[bool]:
+        """
+        使用缓存的音色目录校验音色（不访问网络）
+
+        Args:
+            voice: 音色完整ID
+
+        Returns:
+            音色是否存在，没有可用的音色目录时返回None
+        """
+        catalog = self._catalog_data
+        if catalog is None and self._catalog is not None:
+            data = self._catalog.load()
+            catalog = data['voices'] if data else None
+        if catalog is None:
+            return None
+        return any(item['ShortName'] == voice for item in catalog)
+
+    def refresh_voices(self) -> bool:
+        """
+        强制从网络刷新音色目录
+
+        Returns:
+            是否成功
+        """
+        if self.offline:
+            logger.warning("离线模式下无法刷新音色目录")
+            return False
+        return self._fetch_catalog() is not None
+
+    def _load_catalog(self) -> Optional[List[Dict]]:
+        """按 内存 -> 磁盘缓存 -> 网络 的顺序获取音色目录"""
+        if self._catalog_data is not None:
+            record_cache('voice_catalog', True)
+            return self._catalog_data
+
+        data = self._catalog.load() if self._catalog else None
+        record_cache('voice_catalog', data is not None)
+        if data is not None:
+            self._catalog_data = data['voices']
+            if not self._catalog.is_fresh(data) and not self.offline:
+                self._refresh_in_background()
+            return self._catalog_data
+
+        if self.offline:
+            logger.warning("离线模式且没有缓存的音色目录")
+            return None
+
+        return self._fetch_catalog()
+
+    def _fetch_catalog(self) -> Optional[List[Dict]]:
+        """从网络获取音色目录并写入缓存"""
         try:
-            import asyncio
-            try:
-                loop = asyncio.get_event_loop()
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            voices = loop.run_until_complete(edge_tts.list_voices())
-
-            # 只返回中文音色
-            voice_list = []
-            for voice in voices:
-                if voice['Locale'].startswith('zh'):
-                    voice_list.append(VoiceInfo(
-                        name=voice['ShortName'],
-                        language=voice['Locale'],
-                        gender=voice['Gender'],
-                        description=voice.get('FriendlyName', '')
-                    ))
-
-            self._voices_cache = voice_list
-            logger.info(f"获取到 {len(voice_list)} 个中文音色")
-            return voice_list
+            voices = run_sync(edge_tts.list_voices())
+            catalog = [
+                {
+                    'ShortName': voice['ShortName'],
+                    'Locale': voice['Locale'],
+                    'Gender': voice['Gender'],
+                    'FriendlyName': voice.get('FriendlyName', '')
+                }
+                for voice in voices
+            ]
+
+            if self._catalog:
+                self._catalog.save(catalog)
+            self._catalog_data = catalog
+            self._voices_cache = None
+            return catalog
 
         except Exception as e:
             logger.error(f"获取音色列表失败: {e}")
-            return []
+            return None
+
+    def _refresh_in_background(self):
+        """在后台线程刷新过期的音色目录"""
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def refresh():
+            try:
+                logger.debug("音色目录缓存已过期，后台刷新中...")
+                self._fetch_catalog()
+            finally:
+                self._refresh_lock.release()
+
+        threading.Thread(target=refresh, name="edge-voice-refresh", daemon=True).start()
 
     def get_engine_name(self) -> str:
         """获取引擎名称"""
@@ -212,8 +352,6 @@ class EdgeTTSEngine(BaseTTS):
 
 if __name__ == '__main__':
     # 测试代码
-    import asyncio
-
     async def test_edge_tts():
         # 初始化引擎
         config = TTSConfig(
@@ -243,4 +381,4 @@ if __name__ == '__main__':
             print(f"  - {name}: {voice_id}")
 
     # 运行测试
-    # asyncio.run(test_edge_tts())
+    # run_sync(test_edge_tts())
@@ -0,0 +1,227 @@
+"""
+回环(Loopback) TTS引擎
+离线生成确定性的音频，用于在不访问网络的情况下对整条流水线做基准测试
+
+- 音频时长与文本长度成正比
+- 请求延迟、长尾卡顿和失败按可配置的分布随机产生
+- 相同的种子和调用顺序产生完全相同的结果
+"""
+import asyncio
+import math
+import random
+import struct
+import wave
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+from ..base_tts import BaseTTS, TTSConfig, VoiceInfo, WordBoundary, metered_synthesis
+from ...audio_processor.mp3_frames import make_silence
+
+
+class LoopbackTTSEngine(BaseTTS):
+    """回环TTS引擎（基准测试用）"""
+
+    # 与Edge TTS输出一致: 24kHz 16bit 单声道
+    SAMPLE_RATE = 24000
+    MP3_BITRATE = 48
+
+    SUPPORTED_FORMATS = ['mp3', 'wav', 'pcm']
+
+    SUPPORTS_BOUNDARIES = True
+
+    def __init__(
+        self,
+        config: Optional[TTSConfig] = None,
+        ms_per_char: float = 220.0,
+        latency_ms: float = 50.0,
+        latency_per_char_ms: float = 0.5,
+        latency_jitter: float = 0.3,
+        tail_rate: float = 0.0,
+        tail_latency_ms: float = 10000.0,
+        failure_rate: float = 0.0,
+        failure_mode: str = "false",
+        seed: int = 0
+    ):
+        """
+        初始化回环引擎
+
+        Args:
+            config: TTS配置
+            ms_per_char: 每个字符对应的音频时长(毫秒)，按语速缩放
+            latency_ms: 每个请求的固定延迟(毫秒)
+            latency_per_char_ms: 每个字符增加的延迟(毫秒)
+            latency_jitter: 延迟的对数正态抖动系数(sigma)，0表示无抖动
+            tail_rate: 请求出现长尾卡顿的概率
+            tail_latency_ms: 长尾卡顿额外增加的延迟(毫秒)
+            failure_rate: 请求失败的概率
+            failure_mode: 失败方式，"false"返回False（与Edge引擎一致），"raise"抛出ConnectionError
+            seed: 随机种子
+        """
+        if config is None:
+            config = TTSConfig(voice="loopback")
+
+        super().__init__(config)
+        self.ms_per_char = ms_per_char
+        self.latency_ms = latency_ms
+        self.latency_per_char_ms = latency_per_char_ms
+        self.latency_jitter = latency_jitter
+        self.tail_rate = tail_rate
+        self.tail_latency_ms = tail_latency_ms
+        self.failure_rate = failure_rate
+        self.failure_mode = failure_mode
+        self.seed = seed
+
+        # 同一文本的第N次请求使用不同的随机序列，保证重试不会永远失败
+        self._attempts: Dict[int, int] = {}
+        self.request_count = 0
+        self.failure_count = 0
+        self.total_latency_ms = 0.0
+        logger.info(f"回环TTS引擎初始化完成 (失败率: {failure_rate:.1%}, 长尾率: {tail_rate:.1%})")
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        """
+        模拟合成语音
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径（扩展名决定格式: .mp3/.wav/.pcm）
+
+        Returns:
+            是否成功
+        """
+        return await self.synthesize_with_boundaries(text, output_path) is not None
+
+    @metered_synthesis
+    async def synthesize_with_boundaries(self, text: str, output_path: str) -> Optional[List[WordBoundary]]:
+        """
+        模拟合成语音，每个非空白字符产生一个词边界
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            词边界列表，合成失败返回None
+        """
+        rng = self._rng_for(text)
+        self.request_count += 1
+
+        latency_ms = self._sample_latency(text, rng)
+        self.total_latency_ms += latency_ms
+        await asyncio.sleep(latency_ms / 1000.0)
+
+        if rng.random() < self.failure_rate:
+            self.failure_count += 1
+            if self.failure_mode == "raise":
+                raise ConnectionError("回环引擎模拟失败")
+            logger.error(f"音频合成失败: 回环引擎模拟失败 ({len(text)} 字符)")
+            return None
+
+        output_file = Path(output_path)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        duration_ms = self.get_audio_duration_ms(text)
+        self._write_audio(text, output_file, duration_ms)
+
+        logger.debug(f"回环合成完成: {output_file} ({duration_ms:.0f}ms)")
+        char_ms = self.ms_per_char / self.config.rate
+        return [
+            WordBoundary(offset_ms=i * char_ms, duration_ms=char_ms, text=char)
+            for i, char in enumerate(text)
+            if not char.isspace()
+        ]
+
+    def get_audio_duration_ms(self, text: str) -> float:
+        """
+        计算文本对应的音频时长
+
+        Args:
+            text: 文本
+
+        Returns:
+            时长(毫秒)
+        """
+        return len(text) * self.ms_per_char / self.config.rate
+
+    def _rng_for(self, text: str) -> random.Random:
+        """为本次请求创建确定性的随机数生成器"""
+        key = zlib.crc32(text.encode('utf-8'))
+        attempt = self._attempts.get(key, 0)
+        self._attempts[key] = attempt + 1
+        return random.Random(f"{self.seed}:{key}:{attempt}")
+
+    def _sample_latency(self, text: str, rng: random.Random) -> float:
+        """按延迟分布采样本次请求的延迟(毫秒)"""
+        latency = self.latency_ms + self.latency_per_char_ms * len(text)
+        if self.latency_jitter > 0:
+            latency *= math.exp(rng.gauss(0.0, self.latency_jitter))
+        if rng.random() < self.tail_rate:
+            latency += self.tail_latency_ms
+        return latency
+
+    def _write_audio(self, text: str, output_file: Path, duration_ms: float):
+        """按输出格式写入音频文件"""
+        audio_format = output_file.suffix[1:].lower() or 'mp3'
+
+        if audio_format == 'mp3':
+            output_file.write_bytes(make_silence(duration_ms, self.SAMPLE_RATE, self.MP3_BITRATE))
+            return
+
+        pcm = self._render_tone(text, duration_ms)
+        if audio_format == 'pcm':
+            output_file.write_bytes(pcm)
+        else:
+            with wave.open(str(output_file), 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(self.SAMPLE_RATE)
+                wav_file.writeframes(pcm)
+
+    def _render_tone(self, text: str, duration_ms: float) -> bytes:
+        """
+        生成确定性的正弦音（16bit PCM），频率由文本内容决定
+
+        只计算一个周期，再重复拼接到目标长度
+        """
+        period = self.SAMPLE_RATE // (220 + zlib.crc32(text.encode('utf-8')) % 660)
+        cycle = b''.join(
+            struct.pack('<h', int(8000 * math.sin(2 * math.pi * i / period)))
+            for i in range(period)
+        )
+        total_samples = int(duration_ms * self.SAMPLE_RATE / 1000)
+        repeats, remainder = divmod(total_samples, period)
+        return cycle * repeats + cycle[:remainder * 2]
+
+    def get_available_voices(self) -> List[VoiceInfo]:
+        """获取可用的音色列表"""
+        return [VoiceInfo(name="loopback", language="zh-CN", gender="Female", description="回环测试音色")]
+
+    def get_engine_name(self) -> str:
+        """获取引擎名称"""
+        return "Loopback (基准测试)"
+
+    def get_stats(self) -> Dict:
+        """
+        获取请求统计
+
+        Returns:
+            统计信息字典
+        """
+        return {
+            'requests': self.request_count,
+            'failures': self.failure_count,
+            'average_latency_ms': self.total_latency_ms / self.request_count if self.request_count else 0.0
+        }
+
+
+if __name__ == '__main__':
+    # 测试代码
+    async def test_loopback():
+        engine = LoopbackTTSEngine(failure_rate=0.1, seed=42)
+        for i in range(5):
+            success = await engine.synthesize(f"测试文本{i}" * 10, f"output/loopback_{i}.wav")
+            print(f"任务{i}: {success}")
+        print(engine.get_stats())
+
+    # asyncio.run(test_loopback())
@@ -0,0 +1,225 @@
+"""
+pyttsx3 离线TTS引擎
+基于系统语音合成器（Linux: espeak-ng, Windows: SAPI5, macOS: NSSpeechSynthesizer），无需网络
+
+合成在进程池中执行：每个工作进程持有独立的pyttsx3实例，
+CPU密集的合成不会阻塞事件循环，并且可以利用全部CPU核心。
+"""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+from loguru import logger
+
+from ..base_tts import BaseTTS, TTSConfig, VoiceInfo, metered_synthesis
+
+
+# 工作进程内缓存的pyttsx3引擎（每个进程初始化一次）
+_worker_engine = None
+
+
+def _get_worker_engine():
+    """获取当前进程的pyttsx3引擎实例"""
+    global _worker_engine
+    if _worker_engine is None:
+        import pyttsx3
+        _worker_engine = pyttsx3.init()
+    return _worker_engine
+
+
+def _synthesize_in_worker(text: str, output_path: str, voice: str, rate: int, volume: float) -> bool:
+    """
+    在工作进程中合成语音
+
+    pyttsx3只能输出WAV，目标格式不是WAV时先写临时WAV再用pydub转码
+
+    Args:
+        text: 要合成的文本
+        output_path: 输出文件路径
+        voice: 系统音色ID（空字符串使用系统默认）
+        rate: 语速（每分钟词数）
+        volume: 音量 (0.0 - 1.0)
+
+    Returns:
+        是否成功
+    """
+    engine = _get_worker_engine()
+    if voice:
+        engine.setProperty('voice', voice)
+    engine.setProperty('rate', rate)
+    engine.setProperty('volume', volume)
+
+    output_file = Path(output_path)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # 先写入临时文件，避免中途失败留下残缺音频
+    wav_file = output_file.with_name(f"{output_file.name}.{os.getpid()}.wav")
+    try:
+        engine.save_to_file(text, str(wav_file))
+        engine.runAndWait()
+
+        if not wav_file.exists() or wav_file.stat().st_size == 0:
+            return False
+
+        target_format = output_file.suffix[1:].lower() or 'wav'
+        if target_format == 'wav':
+            os.replace(wav_file, output_file)
+        else:
+            from pydub import AudioSegment
+            AudioSegment.from_wav(str(wav_file)).export(str(output_file), format=target_format)
+        return True
+
+    finally:
+        if wav_file.exists():
+            wav_file.unlink()
+
+
+def _list_voices_in_worker() -> List[dict]:
+    """在工作进程中获取系统音色列表"""
+    engine = _get_worker_engine()
+    voices = []
+    for voice in engine.getProperty('voices'):
+        languages = [
+            lang.decode('utf-8', errors='ignore') if isinstance(lang, bytes) else str(lang)
+            for lang in (voice.languages or [])
+        ]
+        voices.append({
+            'id': voice.id,
+            'name': voice.name,
+            'language': languages[0] if languages else '',
+            'gender': voice.gender or '',
+        })
+    return voices
+
+
+class Pyttsx3Engine(BaseTTS):
+    """pyttsx3离线TTS引擎（多进程）"""
+
+    # pyttsx3的默认语速（每分钟词数），对应 TTSConfig.rate = 1.0
+    DEFAULT_WORDS_PER_MINUTE = 150
+
+    # 原生输出WAV，其他格式在工作进程中用pydub转码（需要ffmpeg）
+    SUPPORTED_FORMATS = ['wav', 'mp3', 'ogg', 'flac']
+
+    def __init__(
+        self,
+        config: Optional[TTSConfig] = None,
+        base_rate: int = DEFAULT_WORDS_PER_MINUTE,
+        max_processes: int = 0
+    ):
+        """
+        初始化pyttsx3引擎
+
+        Args:
+            config: TTS配置，voice为系统音色ID（空字符串使用系统默认）
+            base_rate: 语速倍数为1.0时的每分钟词数
+            max_processes: 合成进程数，0表示使用全部CPU核心
+        """
+        if config is None:
+            config = TTSConfig(voice="", output_format="wav")
+
+        super().__init__(config)
+        self.base_rate = base_rate
+        self.max_processes = max_processes or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._voices_cache = None
+        logger.info(f"pyttsx3离线引擎初始化完成 (进程数: {self.max_processes})")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """延迟创建进程池"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_processes)
+        return self._executor
+
+    @metered_synthesis
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        """
+        合成语音
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径（扩展名决定格式，如 .wav/.mp3）
+
+        Returns:
+            是否成功
+        """
+        try:
+            logger.info(f"开始离线合成: {len(text)} 字符")
+            rate = int(self.base_rate * self.config.rate)
+
+            loop = asyncio.get_running_loop()
+            success = await loop.run_in_executor(
+                self._get_executor(),
+                _synthesize_in_worker,
+                text,
+                output_path,
+                self.config.voice,
+                rate,
+                self.config.volume
+            )
+
+            if success:
+                logger.success(f"音频合成成功: {output_path}")
+            else:
+                logger.error(f"音频合成失败: 未生成音频 {output_path}")
+            return success
+
+        except Exception as e:
+            logger.error(f"音频合成失败: {e}")
+            return False
+
+    def get_available_voices(self) -> List[VoiceInfo]:
+        """
+        获取系统音色列表
+
+        Returns:
+            音色信息列表
+        """
+        if self._voices_cache is not None:
+            return self._voices_cache
+
+        try:
+            voices = self._get_executor().submit(_list_voices_in_worker).result()
+            self._voices_cache = [
+                VoiceInfo(
+                    name=voice['id'],
+                    language=voice['language'],
+                    gender=voice['gender'],
+                    description=voice['name']
+                )
+                for voice in voices
+            ]
+            logger.info(f"获取到 {len(self._voices_cache)} 个系统音色")
+            return self._voices_cache
+
+        except Exception as e:
+            logger.error(f"获取音色列表失败: {e}")
+            return []
+
+    def get_engine_name(self) -> str:
+        """获取引擎名称"""
+        return "pyttsx3 (离线)"
+
+    def close(self, wait: bool = True):
+        """
+        关闭进程池
+
+        Args:
+            wait: 是否等待正在合成的进程结束（False则取消排队中的请求并立即返回）
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+            logger.info("pyttsx3进程池已关闭")
+
+
+if __name__ == '__main__':
+    # 测试代码
+    async def test_pyttsx3():
+        engine = Pyttsx3Engine(TTSConfig(voice="", output_format="wav"))
+        success = await engine.synthesize("你好，这是离线语音合成测试。", "test_offline.wav")
+        print(f"合成结果: {success}")
+        engine.close()
+
+    # asyncio.run(test_pyttsx3())
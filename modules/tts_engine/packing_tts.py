@@ -0,0 +1,277 @@
+"""
+短段落打包TTS引擎
+把同一章节内连续的多个短段落合并为一次合成请求，再按词边界时间把音频切回每个段落的文件
+
+对话密集的章节会产生大量很短的段落，每个段落单独请求时往返开销远大于合成本身。
+打包后请求数可以减少数倍，而下游的文件命名和合并逻辑保持不变。
+"""
+import bisect
+import os
+import wave
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+from .base_tts import BaseTTS, VoiceInfo, WordBoundary
+from ..audio_processor.audio_splitter import AudioSplitter
+from ..audio_processor.mp3_frames import get_duration_ms
+from ..audio_processor.subtitle_writer import save_timing
+
+
+class PackingTTSEngine(BaseTTS):
+    """短段落打包引擎（包装其他TTS引擎）"""
+
+    def __init__(
+        self,
+        engine: BaseTTS,
+        max_request_bytes: int = 3000,
+        short_segment_chars: int = 80,
+        marker: str = "\n"
+    ):
+        """
+        初始化打包引擎
+
+        Args:
+            engine: 实际执行合成的引擎，需支持词边界（SUPPORTS_BOUNDARIES）
+            max_request_bytes: 单次请求文本的最大UTF-8字节数
+            short_segment_chars: 不超过该字数的段落才参与打包
+            marker: 段落之间的分隔标记
+        """
+        self.engine = engine
+        super().__init__(engine.config)
+        self.max_request_bytes = max_request_bytes
+        self.short_segment_chars = short_segment_chars
+        self.marker = marker
+
+        # 打包任务输出路径 -> 成员段落列表
+        self._packs: Dict[str, List[Dict]] = {}
+        logger.info(f"段落打包已启用 (短段落: ≤{short_segment_chars}字, 单次请求: ≤{max_request_bytes}字节)")
+
+    def __getattr__(self, name):
+        """未定义的属性（如 set_voice_by_name）转发给被包装的引擎"""
+        if name == 'engine':
+            raise AttributeError(name)
+        return getattr(self.engine, name)
+
+    @property
+    def SUPPORTED_FORMATS(self) -> List[str]:
+        """与被包装引擎一致（mp3/wav/pcm 切分无需解码）"""
+        return self.engine.SUPPORTED_FORMATS
+
+    def pack_tasks(self, tts_tasks: List[Dict]) -> List[Dict]:
+        """
+        把连续的短段落任务合并为打包任务
+
+        Args:
+            tts_tasks: 任务字典列表，需包含 text, output_path, chapter_index
+
+        Returns:
+            新的任务列表。打包任务使用第一个成员的 task_id 和 output_path，
+            text 为用分隔标记连接的成员文本，packed_segments 为成员任务列表
+        """
+        if not self.engine.SUPPORTS_BOUNDARIES:
+            logger.warning(f"{self.engine.get_engine_name()} 不支持词边界，跳过段落打包")
+            return tts_tasks
+
+        packed_tasks = []
+        group: List[Dict] = []
+        group_bytes = 0
+
+        def flush():
+            if len(group) == 1:
+                packed_tasks.append(group[0])
+            elif group:
+                packed_tasks.append(self._make_pack(group))
+
+        for task in tts_tasks:
+            task_bytes = len(task['text'].encode('utf-8'))
+            # 渐进分段的短段落是为了尽快出声，保持单独请求
+            is_short = len(task['text']) <= self.short_segment_chars and not task.get('progressive')
+            fits = (
+                group
+                and task['chapter_index'] == group[-1]['chapter_index']
+                and group_bytes + len(self.marker.encode('utf-8')) + task_bytes <= self.max_request_bytes
+            )
+
+            if is_short and fits:
+                group.append(task)
+                group_bytes += len(self.marker.encode('utf-8')) + task_bytes
+                continue
+
+            flush()
+            group, group_bytes = ([task], task_bytes) if is_short else ([], 0)
+            if not is_short:
+                packed_tasks.append(task)
+
+        flush()
+
+        if len(packed_tasks) < len(tts_tasks):
+            logger.info(f"段落打包: {len(tts_tasks)} 个段落 -> {len(packed_tasks)} 个请求")
+        return packed_tasks
+
+    def _make_pack(self, members: List[Dict]) -> Dict:
+        """创建打包任务并登记成员"""
+        pack = dict(members[0])
+        pack['text'] = self.marker.join(member['text'] for member in members)
+        pack['char_count'] = len(pack['text'])
+        pack['packed_segments'] = members
+        self._packs[pack['output_path']] = members
+        return pack
+
+    async def synthesize(self, text: str, output_path: str) -> bool:
+        """
+        合成语音，打包任务合成后切分为各成员文件
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            是否成功
+        """
+        members = self._packs.get(str(output_path))
+        if members is None:
+            return await self.engine.synthesize(text, output_path)
+        return await self._synthesize_pack(text, output_path, members, write_timing=False)
+
+    async def synthesize_with_timing(self, text: str, output_path: str) -> bool:
+        """
+        合成语音并保存时间轴文件，打包任务为每个成员分别保存（时间相对于成员音频开头）
+
+        Args:
+            text: 要合成的文本
+            output_path: 输出文件路径
+
+        Returns:
+            是否成功
+        """
+        members = self._packs.get(str(output_path))
+        if members is None:
+            return await self.engine.synthesize_with_timing(text, output_path)
+        return await self._synthesize_pack(text, output_path, members, write_timing=True)
+
+    async def _synthesize_pack(self, text: str, output_path: str, members: List[Dict], write_timing: bool) -> bool:
+        """合成打包任务并切分为各成员文件"""
+        pack_file = Path(output_path)
+        pack_file = pack_file.with_name(f"{pack_file.stem}.pack{pack_file.suffix}")
+        try:
+            boundaries = await self.engine.synthesize_with_boundaries(text, str(pack_file))
+            if boundaries is None:
+                return False
+
+            cut_points = self._compute_cut_points(members, boundaries, self._get_duration_ms(pack_file, boundaries))
+            success = AudioSplitter.split_file(
+                str(pack_file),
+                cut_points,
+                [member['output_path'] for member in members]
+            )
+            if success and write_timing:
+                self._save_member_timings(members, boundaries, cut_points)
+            if success:
+                # 成员文件已写出，不再需要登记（失败时保留，重试仍按打包任务合成）
+                self._packs.pop(str(output_path), None)
+                logger.success(f"打包合成成功: {len(members)} 个段落 -> {output_path}")
+            return success
+
+        except Exception as e:
+            logger.error(f"打包合成失败: {e}")
+            return False
+
+        finally:
+            if pack_file.exists():
+                os.remove(pack_file)
+
+    @staticmethod
+    def _save_member_timings(members: List[Dict], boundaries: List[WordBoundary], cut_points: List[float]):
+        """按切分点把词边界分配给各成员，并换算为相对成员开头的时间"""
+        starts = [0.0] + cut_points
+        for i, member in enumerate(members):
+            end = cut_points[i] if i < len(cut_points) else float('inf')
+            save_timing(member['output_path'], member['text'], [
+                WordBoundary(
+                    offset_ms=boundary.offset_ms - starts[i],
+                    duration_ms=boundary.duration_ms,
+                    text=boundary.text
+                )
+                for boundary in boundaries
+                if starts[i] <= boundary.offset_ms < end
+            ])
+
+    def _compute_cut_points(
+        self,
+        members: List[Dict],
+        boundaries: List[WordBoundary],
+        total_ms: float
+    ) -> List[float]:
+        """
+        根据词边界计算各成员之间的切分时间点
+
+        切分点取前一段最后一个词结束与后一段第一个词开始之间停顿的中点；
+        某一段没有任何词边界（如只有标点）时，按字符比例估算
+
+        Args:
+            members: 成员任务列表
+            boundaries: 词边界列表
+            total_ms: 打包音频总时长(毫秒)
+
+        Returns:
+            切分时间点列表（长度为成员数-1）
+        """
+        # 每个成员在打包文本中的起始字符位置
+        starts = []
+        pos = 0
+        for member in members:
+            starts.append(pos)
+            pos += len(member['text']) + len(self.marker)
+        text = self.marker.join(member['text'] for member in members)
+
+        first_ms: List[Optional[float]] = [None] * len(members)
+        last_ms: List[Optional[float]] = [None] * len(members)
+        cursor = 0
+        for boundary in boundaries:
+            found = text.find(boundary.text, cursor)
+            if found < 0:
+                continue
+            cursor = found + len(boundary.text)
+            index = bisect.bisect_right(starts, found) - 1
+            if first_ms[index] is None:
+                first_ms[index] = boundary.offset_ms
+            last_ms[index] = boundary.offset_ms + boundary.duration_ms
+
+        cut_points = []
+        previous = 0.0
+        for i in range(1, len(members)):
+            if last_ms[i - 1] is not None and first_ms[i] is not None:
+                cut = (last_ms[i - 1] + first_ms[i]) / 2
+            else:
+                cut = total_ms * starts[i] / len(text)
+            # 保证切分点单调递增
+            cut = max(cut, previous)
+            cut_points.append(cut)
+            previous = cut
+        return cut_points
+
+    @staticmethod
+    def _get_duration_ms(audio_file: Path, boundaries: List[WordBoundary]) -> float:
+        """获取打包音频时长，无法读取时用最后一个词边界估算"""
+        if audio_file.suffix.lower() == '.mp3':
+            return get_duration_ms(audio_file.read_bytes())
+        if audio_file.suffix.lower() == '.wav':
+            with wave.open(str(audio_file), 'rb') as wav_file:
+                return wav_file.getnframes() * 1000.0 / wav_file.getframerate()
+        if boundaries:
+            return boundaries[-1].offset_ms + boundaries[-1].duration_ms
+        return 0.0
+
+    def get_available_voices(self) -> List[VoiceInfo]:
+        """获取可用的音色列表"""
+        return self.engine.get_available_voices()
+
+    def get_engine_name(self) -> str:
+        """获取引擎名称"""
+        return self.engine.get_engine_name()
+
+    def close(self, wait: bool = True):
+        """释放被包装引擎的资源并清空打包登记"""
+        self._packs.clear()
+        self.engine.close(wait)
@@ -0,0 +1,76 @@
+"""
+音色目录磁盘缓存
+把在线获取的音色列表持久化到缓存目录，新进程启动时无需再访问网络
+"""
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+
+
+class VoiceCatalogCache:
+    """音色目录缓存"""
+
+    def __init__(self, cache_dir: str, name: str = "voices", ttl_hours: float = 24.0):
+        """
+        初始化音色目录缓存
+
+        Args:
+            cache_dir: 缓存目录
+            name: 缓存文件名（不含扩展名）
+            ttl_hours: 缓存有效期(小时)，过期后仍可使用，但应在后台刷新
+        """
+        self.path = Path(cache_dir) / f"{name}.json"
+        self.ttl_seconds = ttl_hours * 3600
+
+    def load(self) -> Optional[Dict]:
+        """
+        读取缓存
+
+        Returns:
+            {'fetched_at': 获取时间戳, 'voices': 音色字典列表}，缓存不存在或损坏时返回None
+        """
+        try:
+            if not self.path.exists():
+                return None
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if not isinstance(data.get('voices'), list):
+                return None
+            return data
+
+        except Exception as e:
+            logger.warning(f"音色缓存读取失败: {e}")
+            return None
+
+    def save(self, voices: List[Dict]):
+        """
+        写入缓存（先写临时文件再替换，避免并发读到半个文件）
+
+        Args:
+            voices: 音色字典列表
+        """
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'fetched_at': time.time(), 'voices': voices}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            logger.debug(f"音色缓存已更新: {self.path} ({len(voices)} 个)")
+
+        except Exception as e:
+            logger.warning(f"音色缓存写入失败: {e}")
+
+    def is_fresh(self, data: Dict) -> bool:
+        """
+        判断缓存是否在有效期内
+
+        Args:
+            data: load() 返回的缓存数据
+
+        Returns:
+            是否未过期
+        """
+        return time.time() - data.get('fetched_at', 0) < self.ttl_seconds
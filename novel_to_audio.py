@@ -3,14 +3,30 @@
 提供完整的TXT转MP3功能
 """
 import asyncio
+import os
 from pathlib import Path
 from typing import Optional
 from loguru import logger
 
 from modules.novel_reader import TextProcessor
-from modules.tts_engine import EdgeTTSEngine, TTSConfig
-from modules.audio_processor import AudioMerger, AudioPlayer
-from core import ConfigManager, TaskManager
+from modules.tts_engine import (
+    BaseTTS, EdgeTTSEngine, HedgedTTSEngine, LoopbackTTSEngine, PackingTTSEngine, Pyttsx3Engine, TTSConfig
+)
+from modules.audio_processor import (
+    AudioMerger, AudioNormalizer, AudioPlayer, AudioSplitter, AudioTagger, FormatConverter, SubtitleWriter
+)
+from core import ConfigManager, DeadlinePolicy, JobJournal, PlayAheadScheduler, RetryPolicy, TaskManager
+from core.distributed_queue import DistributedWorker, RedisWorkQueue
+from core.duration_model import DurationModel
+from core.fair_share import FairShareScheduler
+from core.pipeline import PipelineStage, StagedPipeline
+from core.progress_events import ProgressEventStream, Subscription
+from core.segment_calibration import DEFAULT_SIZES, CalibrationResult, calibrate, segment_length_key
+from core.sharding import (
+    ShardManifest, ordered_files, parse_shard_spec, plan_fingerprint, plan_shards, validate_shards
+)
+from core.task_manager import TaskStatus
+from core.metrics import get_registry, time_stage
 
 
 class NovelToAudio:
@@ -28,50 +44,173 @@ class NovelToAudio:
 
         # 初始化文本处理器
         text_config = self.config.get_text_config()
+        encoding = text_config.get('encoding')
+        progressive_config = text_config.get('progressive_segments', {})
         self.text_processor = TextProcessor(
-            encoding=text_config.get('encoding'),
+            encoding=None if encoding == 'auto' else encoding,
             remove_annotations=text_config.get('remove_annotations', True),
             remove_ads=text_config.get('remove_ads', True),
-            max_segment_length=text_config.get('max_segment_length', 500)
+            max_segment_length=text_config.get('max_segment_length', 500),
+            progressive=progressive_config.get('enable', False),
+            first_segment_length=progressive_config.get('first_length', 40),
+            segment_growth=progressive_config.get('growth', 2.0)
         )
+        self._base_segment_length = self.text_processor.max_segment_length
 
         # 初始化TTS引擎
         tts_config_data = self.config.get_tts_config()
-        engine_type = tts_config_data.get('default_engine', 'edge-tts')
-
-        if engine_type == 'edge-tts':
-            edge_config = tts_config_data.get('edge', {})
-            tts_config = TTSConfig(
-                voice=edge_config.get('default_voice', 'zh-CN-XiaoxiaoNeural'),
-                rate=edge_config.get('speech_rate', 1.0),
-                volume=edge_config.get('volume', 1.0),
-                pitch=edge_config.get('pitch', 1.0)
-            )
-            self.tts_engine = EdgeTTSEngine(tts_config)
-        else:
-            raise ValueError(f"不支持的TTS引擎: {engine_type}")
+        cache_dir = self.config.get('cache.cache_dir') if self.config.get('cache.enable', True) else None
+        self.tts_engine = self._create_tts_engine(tts_config_data, cache_dir=cache_dir)
 
-        # 初始化任务管理器
+        # 初始化任务管理器（多进程引擎至少为每个进程提供一个并发槽位）
         perf_config = self.config.get('performance', {})
+        max_workers = perf_config.get('max_workers', 4)
+        if isinstance(self.tts_engine, Pyttsx3Engine):
+            max_workers = max(max_workers, self.tts_engine.max_processes)
+        subtitle_config = self.config.get('output.subtitles', {})
+        retry_config = perf_config.get('retry', {})
+        deadline_config = perf_config.get('deadline', {})
+        speculation_config = perf_config.get('speculation', {})
+        duration_config = perf_config.get('duration_model', {})
+        # 未指定路径时保存在缓存目录下；缓存也未启用时只在内存中使用，不写文件
+        duration_path = duration_config.get('path') or (
+            str(Path(cache_dir) / "duration_model.json") if cache_dir else None
+        )
+        self.duration_model = DurationModel(
+            duration_path,
+            min_samples=duration_config.get('min_samples', 20)
+        ) if duration_config.get('enable', True) else None
         self.task_manager = TaskManager(
-            max_workers=perf_config.get('max_workers', 4)
+            max_workers=max_workers,
+            capture_timing=subtitle_config.get('enable', False),
+            retry_policy=RetryPolicy(
+                max_attempts=retry_config.get('max_attempts', 3),
+                base_delay=retry_config.get('base_delay', 0.5),
+                max_delay=retry_config.get('max_delay', 30.0),
+                budget_ratio=retry_config.get('budget_ratio', 0.2),
+                min_budget=retry_config.get('min_budget', 10)
+            ),
+            queue_size=perf_config.get('queue_size', 0),
+            deadline_policy=DeadlinePolicy(
+                base_seconds=deadline_config.get('base_seconds', 30.0),
+                seconds_per_char=deadline_config.get('seconds_per_char', 0.1),
+                speculate=speculation_config.get('enable', True),
+                straggler_percentile=speculation_config.get('percentile', 95),
+                straggler_factor=speculation_config.get('factor', 2.0),
+                min_samples=speculation_config.get('min_samples', 20),
+                max_speculative=speculation_config.get('max_in_flight', 2)
+            ),
+            events=ProgressEventStream(interval=perf_config.get('progress_interval', 0.5)),
+            duration_model=self.duration_model
         )
+        self.play_ahead: Optional[PlayAheadScheduler] = None
+        self.subtitle_writer = SubtitleWriter(
+            subtitle_config.get('formats', SubtitleWriter.SUPPORTED_FORMATS)
+        ) if subtitle_config.get('enable', False) else None
+
+        # 对冲请求与故障转移
+        hedging_config = self.config.get('tts.hedging', {})
+        if hedging_config.get('enable', False):
+            engines = [self.tts_engine]
+            secondary = hedging_config.get('secondary_engine')
+            if secondary:
+                engines.append(self._create_tts_engine(
+                    {**tts_config_data, 'default_engine': secondary},
+                    cache_dir=cache_dir
+                ))
+            self.tts_engine = HedgedTTSEngine(
+                engines,
+                hedge_percentile=hedging_config.get('percentile', 95),
+                initial_hedge_delay_ms=hedging_config.get('initial_delay_ms', 5000),
+                min_samples=hedging_config.get('min_samples', 20),
+                max_attempts=hedging_config.get('max_attempts', 3),
+                failure_threshold=hedging_config.get('failure_threshold', 5),
+                open_seconds=hedging_config.get('open_seconds', 30)
+            )
+
+        # 短段落打包
+        packing_config = self.config.get('tts.packing', {})
+        if packing_config.get('enable', False):
+            self.tts_engine = PackingTTSEngine(
+                self.tts_engine,
+                max_request_bytes=packing_config.get('max_request_bytes', 3000),
+                short_segment_chars=packing_config.get('short_segment_chars', 80)
+            )
 
         # 初始化音频处理器
         audio_config = self.config.get_audio_config()
         self.audio_merger = AudioMerger(
             add_silence=True,
-            silence_duration=audio_config.get('silence_between', 500)
+            silence_duration=audio_config.get('silence_between', 500),
+            stream_copy=audio_config.get('stream_copy', True),
+            streaming=audio_config.get('streaming_merge', True)
         )
 
         logger.success("小说转有声读物系统初始化完成")
 
+    @staticmethod
+    def _create_tts_engine(tts_config_data: dict, cache_dir: Optional[str] = None) -> BaseTTS:
+        """
+        根据配置创建TTS引擎
+
+        Args:
+            tts_config_data: tts配置段
+            cache_dir: 缓存目录（None则不使用磁盘缓存）
+
+        Returns:
+            TTS引擎实例
+        """
+        engine_type = tts_config_data.get('default_engine', 'edge-tts')
+
+        if engine_type == 'edge-tts':
+            edge_config = tts_config_data.get('edge', {})
+            tts_config = TTSConfig(
+                voice=edge_config.get('default_voice', 'zh-CN-XiaoxiaoNeural'),
+                rate=edge_config.get('speech_rate', 1.0),
+                volume=edge_config.get('volume', 1.0),
+                pitch=edge_config.get('pitch', 1.0),
+                output_format=edge_config.get('output_format', 'mp3')
+            )
+            return EdgeTTSEngine(
+                tts_config,
+                cache_dir=cache_dir,
+                catalog_ttl_hours=edge_config.get('voice_catalog_ttl_hours', 24),
+                offline=edge_config.get('offline', False)
+            )
+
+        if engine_type == 'pyttsx3':
+            local_config = tts_config_data.get('pyttsx3', {})
+            tts_config = TTSConfig(
+                voice=local_config.get('voice', ''),
+                volume=local_config.get('volume', 1.0),
+                output_format=local_config.get('output_format', 'wav')
+            )
+            return Pyttsx3Engine(
+                tts_config,
+                base_rate=local_config.get('rate', Pyttsx3Engine.DEFAULT_WORDS_PER_MINUTE),
+                max_processes=local_config.get('max_processes', 0)
+            )
+
+        if engine_type == 'loopback':
+            loopback_config = dict(tts_config_data.get('loopback', {}))
+            tts_config = TTSConfig(
+                voice='loopback',
+                output_format=loopback_config.pop('output_format', 'mp3')
+            )
+            return LoopbackTTSEngine(tts_config, **loopback_config)
+
+        raise ValueError(f"不支持的TTS引擎: {engine_type}")
+
     def convert(
         self,
         novel_path: str,
         output_dir: Optional[str] = None,
         merge: bool = False,
-        voice: Optional[str] = None
+        voice: Optional[str] = None,
+        resume: bool = True,
+        start_chapter: Optional[int] = None,
+        distributed: Optional[bool] = None,
+        shard: Optional[str] = None
     ) -> dict:
         """
         转换小说为有声读物
@@ -81,6 +220,11 @@ class NovelToAudio:
             output_dir: 输出目录（None则使用配置）
             merge: 是否合并所有章节
             voice: 指定音色（None则使用配置）
+            resume: 是否从任务日志恢复（跳过上次已完成的段落）
+            start_chapter: 阅读起始章节序号（设置后优先合成该章节之后的段落，
+                转换过程中可用 set_reading_position 调整）
+            distributed: 是否通过Redis任务队列交给工作进程合成（None则使用配置 distributed.enable）
+            shard: 静态分片 "i/n"，只合成按字数均衡划分的第i份章节并写出分片清单（之后用 assemble 合并）
 
         Returns:
             转换结果
@@ -90,92 +234,922 @@ class NovelToAudio:
             logger.info(f"开始转换小说: {novel_path}")
             logger.info(f"=" * 60)
 
-            # 1. 加载并处理小说
-            logger.info("【步骤1/4】 加载并处理小说文本...")
-            novel_data = self.text_processor.load_novel(novel_path)
-            chapters = novel_data['chapters']
-
-            logger.info(f"✓ 小说加载完成:")
-            logger.info(f"  - 书名: {Path(novel_path).stem}")
-            logger.info(f"  - 章节数: {len(chapters)}")
-            logger.info(f"  - 总字数: {novel_data['summary']['total_characters']:,}")
-
-            # 2. 准备TTS任务
-            logger.info("\n【步骤2/4】 准备TTS合成任务...")
-            tts_tasks = self.text_processor.prepare_for_tts(chapters)
-
-            # 设置输出目录
+            # 1-2. 加载小说并准备TTS任务
             if output_dir is None:
-                output_config = self.config.get_output_config()
-                output_dir = output_config.get('base_dir', './data/output')
-
-            output_path = Path(output_dir) / Path(novel_path).stem
-            output_path.mkdir(parents=True, exist_ok=True)
-
-            logger.info(f"✓ 任务准备完成:")
-            logger.info(f"  - 任务数: {len(tts_tasks)}")
-            logger.info(f"  - 输出目录: {output_path}")
-
-            # 设置音色
-            if voice:
-                if hasattr(self.tts_engine, 'set_voice_by_name'):
-                    self.tts_engine.set_voice_by_name(voice)
-                else:
-                    self.tts_engine.set_voice(voice)
+                output_dir = self.config.get_output_config().get('base_dir', './data/output')
+            self._apply_voice(voice)
+            chapters, tts_tasks, output_path = self._prepare_book(novel_path, output_dir, start_chapter)
 
             # 3. 批量合成音频
             logger.info("\n【步骤3/4】 批量合成音频...")
             self.task_manager.clear()
+            if distributed is None:
+                distributed = self.config.get('distributed.enable', False)
+            shard_info = None
+            if shard:
+                if distributed:
+                    raise ValueError("分片模式不能与分布式模式同时使用")
+                tts_tasks, shard_info = self._select_shard(tts_tasks, shard)
+            # 分布式模式由Redis队列记录进度，不使用本地任务日志
+            self.task_manager.journal = None if distributed else self._open_journal(output_path, resume)
+            tts_tasks = self._assign_output_paths(tts_tasks, output_path, pack=not distributed)
 
             # 添加任务
             for task in tts_tasks:
-                output_file = output_path / f"{task['chapter_index']:03d}_{task['segment_index']:02d}.mp3"
                 self.task_manager.add_task(
                     task_id=task['task_id'],
                     text=task['text'],
-                    output_path=str(output_file),
+                    output_path=task['output_path'],
                     chapter_title=task['chapter_title'],
                     metadata=task
                 )
 
+            # 按阅读位置调度
+            source = None
+            if start_chapter is not None:
+                play_ahead_config = self.config.get('performance.play_ahead', {})
+                self.play_ahead = PlayAheadScheduler(
+                    self.task_manager.tasks,
+                    window=play_ahead_config.get('window', 20)
+                )
+                self.play_ahead.set_reading_position(start_chapter)
+                source = self.play_ahead
+
+            # 章节后处理流水线：章节的段落全部完成后立即合并/标准化/转换/写标签，与后续章节的合成并行
+            book_name = Path(novel_path).stem
+            pipeline = None
+            if distributed or self.config.get('audio.pipeline.enable', False):
+                pipeline = self._build_post_pipeline(output_path, book_name)
+
+            # 最长优先：没有阅读位置优先级时，按时长模型预测的合成耗时从长到短执行，缩短整批完成时间
+            # （章节流水线需要章节按顺序完成，不重新排序）
+            if source is None and pipeline is None and self.duration_model is not None:
+                config = self.tts_engine.config
+                source = self.duration_model.order_longest_first(self.task_manager.tasks, config.voice, config.rate)
+
             # 执行合成
-            result = self.task_manager.execute_sync(self.tts_engine, show_progress=True)
+            try:
+                if distributed:
+                    result = self._execute_distributed(Path(output_dir), output_path, pipeline, resume)
+                else:
+                    progress_callback = self._chapter_progress_callback(pipeline) if pipeline else None
+                    result = self.task_manager.execute_sync(
+                        self.tts_engine, progress_callback=progress_callback, show_progress=True, source=source
+                    )
+            finally:
+                self.play_ahead = None
+                if self.task_manager.journal:
+                    self.task_manager.journal.close()
+                    self.task_manager.journal = None
+                # 等待最后几个章节的后处理完成
+                chapter_files = [item['path'] for item in pipeline.close()] if pipeline else []
+                chapter_failures = self._pipeline_failures(pipeline) if pipeline else []
+                if pipeline:
+                    logger.info(f"✓ 章节后处理完成: {len(chapter_files)} 个章节音频")
+                for failure in chapter_failures:
+                    logger.warning(
+                        f"  - 章节 {failure['chapter_index']} 后处理失败（{failure['stage']}）: {failure['error']}"
+                    )
+                self._update_duration_model()
 
             logger.info(f"\n✓ 音频合成完成:")
             logger.info(f"  - 成功: {result['completed']}/{result['total']}")
             logger.info(f"  - 失败: {result['failed']}")
+            if result.get('cancelled'):
+                logger.info(f"  - 已取消: {result['cancelled']}")
+            if result['resumed']:
+                logger.info(f"  - 断点续传: 跳过 {result['resumed']} 个已完成段落")
+            logger.info(f"  - 重试: {result['retries']} 次 (预算拒绝 {result['retries_denied']} 次)")
+            if result.get('deadline_exceeded') or result.get('speculative'):
+                logger.info(
+                    f"  - 慢任务: 超时 {result.get('deadline_exceeded', 0)} 次，"
+                    f"推测执行 {result.get('speculative', 0)} 次 (副本胜出 {result.get('speculative_wins', 0)} 次)"
+                )
+            logger.info(f"  - 耗时: {result['elapsed_seconds']:.1f}秒 (p99延迟: {result['latency_ms']['p99'] or 0:.0f}ms)")
+
+            # 写出分片清单
+            shard_manifest = None
+            if shard_info:
+                shard_manifest = self._write_shard_manifest(output_path, Path(novel_path).stem, shard_info, result)
+                logger.info(f"✓ 分片清单已写出: {shard_manifest}")
 
             # 4. 合并音频（如果需要）
             merged_file = None
-            if merge and result['completed'] > 0:
+            if shard_info:
+                logger.info("\n【步骤4/4】 分片模式跳过合并（全部分片完成后运行 assemble）")
+            elif result.get('cancelled'):
+                logger.info("\n【步骤4/4】 转换已取消，跳过音频合并")
+            elif merge and result['completed'] > 0:
                 logger.info("\n【步骤4/4】 合并音频文件...")
 
-                completed_tasks = self.task_manager.get_completed_tasks()
-                audio_files = [task.output_path for task in completed_tasks]
+                audio_files = self._get_completed_audio_files()
 
-                merged_file = output_path / f"{Path(novel_path).stem}_完整版.mp3"
-                self.audio_merger.merge_files(audio_files, str(merged_file))
+                # 段落为WAV/PCM且合并格式也是WAV/PCM时，合并过程不经过任何编解码
+                merge_format = self.config.get('audio.output_format', 'mp3')
+                merged_file = output_path / f"{Path(novel_path).stem}_完整版.{merge_format}"
+                self.audio_merger.merge_files(audio_files, str(merged_file), format=merge_format)
 
                 logger.info(f"✓ 音频已合并: {merged_file}")
             else:
                 logger.info("\n【步骤4/4】 跳过音频合并")
 
+            # 生成字幕（整书时间轴使用合并时的实际偏移，未合并时按文件头计算）
+            subtitle_files = []
+            if self.subtitle_writer and result['completed'] > 0:
+                offsets = self.audio_merger.last_offsets if merged_file else None
+                with time_stage('write_subtitles'):
+                    subtitle_files = self._write_subtitles(output_path, Path(novel_path).stem, offsets)
+                logger.info(f"✓ 字幕已生成: {len(subtitle_files)} 个文件")
+
             # 返回结果
             return {
-                'success': result['failed'] == 0,
+                'success': result['failed'] == 0 and not result.get('cancelled') and not chapter_failures,
                 'novel_path': novel_path,
                 'output_dir': str(output_path),
                 'chapters': len(chapters),
                 'tasks_total': result['total'],
                 'tasks_completed': result['completed'],
                 'tasks_failed': result['failed'],
+                'tasks_cancelled': result.get('cancelled', 0),
                 'merged_file': str(merged_file) if merged_file else None,
-                'audio_files': [task.output_path for task in self.task_manager.get_completed_tasks()]
+                'subtitle_files': subtitle_files,
+                'chapter_files': sorted(chapter_files),
+                'chapters_failed': chapter_failures,
+                'shard_manifest': str(shard_manifest) if shard_manifest else None,
+                'elapsed_seconds': result['elapsed_seconds'],
+                'latency_ms': result['latency_ms'],
+                'retries': result['retries'],
+                'resumed': result['resumed'],
+                'retries_denied': result['retries_denied'],
+                'engine_stats': self.tts_engine.get_stats() if hasattr(self.tts_engine, 'get_stats') else None,
+                'audio_files': self._get_completed_audio_files()
             }
 
         except Exception as e:
             logger.error(f"转换失败: {e}")
             raise
+        finally:
+            self._export_metrics()
+
+    def _prepare_book(self, novel_path: str, output_dir: str, start_chapter: Optional[int] = None) -> tuple:
+        """
+        加载小说并准备TTS任务（步骤1-2）
+
+        Args:
+            novel_path: 小说文件路径
+            output_dir: 输出根目录
+            start_chapter: 阅读起始章节序号（渐进分段从该章节开始）
+
+        Returns:
+            (章节列表, 段落任务列表, 书籍输出目录)
+        """
+        logger.info("【步骤1/4】 加载并处理小说文本...")
+        novel_data = self.text_processor.load_novel(novel_path)
+        chapters = novel_data['chapters']
+
+        logger.info(f"✓ 小说加载完成:")
+        logger.info(f"  - 书名: {Path(novel_path).stem}")
+        logger.info(f"  - 章节数: {len(chapters)}")
+        logger.info(f"  - 总字数: {novel_data['summary']['total_characters']:,}")
+
+        logger.info("\n【步骤2/4】 准备TTS合成任务...")
+        with time_stage('prepare_segments'):
+            tts_tasks = self.text_processor.prepare_for_tts(chapters, start_chapter)
+
+        output_path = Path(output_dir) / Path(novel_path).stem
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        logger.info(f"✓ 任务准备完成:")
+        logger.info(f"  - 任务数: {len(tts_tasks)}")
+        logger.info(f"  - 输出目录: {output_path}")
+        return chapters, tts_tasks, output_path
+
+    def _apply_voice(self, voice: Optional[str]):
+        """
+        设置并校验音色
+
+        Args:
+            voice: 指定音色（None则使用配置）
+        """
+        if voice:
+            if hasattr(self.tts_engine, 'set_voice_by_name'):
+                self.tts_engine.set_voice_by_name(voice)
+            else:
+                self.tts_engine.set_voice(voice)
+
+        # 使用缓存的音色目录校验音色，避免每个任务都以失败告终
+        if hasattr(self.tts_engine, 'is_voice_available'):
+            if self.tts_engine.is_voice_available(self.tts_engine.config.voice) is False:
+                raise ValueError(f"音色不存在: {self.tts_engine.config.voice}")
+
+        # 使用该引擎/音色校准过的段落长度（没有校准结果时使用 text.max_segment_length）
+        lengths = self.config.get('text.segment_lengths', {}) or {}
+        calibrated = lengths.get(self._segment_length_key())
+        self.text_processor.max_segment_length = int(calibrated) if calibrated else self._base_segment_length
+        if calibrated:
+            logger.info(f"使用校准的段落长度: {calibrated} 字 ({self._segment_length_key()})")
+
+    def _segment_length_key(self) -> str:
+        """当前引擎和音色的校准结果键"""
+        return segment_length_key(self.config.get('tts.default_engine', 'edge-tts'), self.tts_engine.config.voice)
+
+    def calibrate_segment_length(
+        self,
+        sizes: tuple = DEFAULT_SIZES,
+        repeats: int = 3,
+        max_latency: float = 10.0,
+        voice: Optional[str] = None,
+        save: bool = True
+    ) -> CalibrationResult:
+        """
+        测量当前引擎/音色在不同段落长度下的延迟，选出延迟上限内吞吐接近最优的段落长度
+
+        Args:
+            sizes: 测量的段落字数
+            repeats: 每个长度的请求次数
+            max_latency: 单个段落的延迟上限(秒)
+            voice: 指定音色（None则使用配置）
+            save: 是否把结果写入配置文件（text.segment_lengths）
+
+        Returns:
+            CalibrationResult
+        """
+        self._apply_voice(voice)
+        result = calibrate(
+            self.tts_engine, sizes=sizes, repeats=repeats, max_latency_ms=max_latency * 1000,
+            concurrency=self.task_manager.max_workers
+        )
+        key = self._segment_length_key()
+        lengths = dict(self.config.get('text.segment_lengths', {}) or {})
+        lengths[key] = result.segment_length
+        self.config.set('text.segment_lengths', lengths)
+        self.text_processor.max_segment_length = result.segment_length
+        if save:
+            self.config.save()
+        return result
+
+    def _assign_output_paths(self, tts_tasks: list, output_path: Path, pack: bool = True) -> list:
+        """
+        为段落任务分配输出文件，并按需合并连续的短段落
+
+        Args:
+            tts_tasks: 段落任务列表
+            output_path: 书籍输出目录
+            pack: 是否打包短段落（打包任务需要在本进程拆分，分布式模式下不打包）
+
+        Returns:
+            任务列表（打包后可能变少）
+        """
+        audio_ext = self.tts_engine.config.output_format or 'mp3'
+        for task in tts_tasks:
+            task['output_path'] = str(
+                output_path / f"{task['chapter_index']:03d}_{task['segment_index']:02d}.{audio_ext}"
+            )
+        if pack and isinstance(self.tts_engine, PackingTTSEngine):
+            tts_tasks = self.tts_engine.pack_tasks(tts_tasks)
+        return tts_tasks
+
+    def convert_many(
+        self,
+        novel_paths: list,
+        output_dir: Optional[str] = None,
+        merge: bool = False,
+        voice: Optional[str] = None,
+        resume: bool = True,
+        shares: Optional[dict] = None
+    ) -> dict:
+        """
+        同时转换多本小说，各书按份额公平地共享并发（赤字轮询）
+
+        Args:
+            novel_paths: 小说文件路径列表
+            output_dir: 输出目录（None则使用配置）
+            merge: 是否把每本书合并为单个文件
+            voice: 指定音色（None则使用配置）
+            resume: 是否从任务日志恢复
+            shares: 书名 -> 份额（None则使用配置 performance.fair_share.shares，未配置的书份额为1）
+
+        Returns:
+            转换结果，books 为各书的任务数、吞吐和排队等待统计
+        """
+        fair_share_config = self.config.get('performance.fair_share', {})
+        if output_dir is None:
+            output_dir = self.config.get_output_config().get('base_dir', './data/output')
+        scheduler = FairShareScheduler(
+            shares={**fair_share_config.get('shares', {}), **(shares or {})},
+            quantum=fair_share_config.get('quantum', 500)
+        )
+
+        try:
+            self.task_manager.clear()
+            self._apply_voice(voice)
+            book_dirs = {}
+            for novel_path in novel_paths:
+                book = Path(novel_path).stem
+                if book in book_dirs:
+                    raise ValueError(f"书名重复: {book}")
+                _, tts_tasks, output_path = self._prepare_book(novel_path, output_dir)
+                book_dirs[book] = output_path
+                tasks = [
+                    self.task_manager.add_task(
+                        task_id=task['task_id'],
+                        text=task['text'],
+                        output_path=task['output_path'],
+                        chapter_title=task['chapter_title'],
+                        metadata=task
+                    )
+                    for task in self._assign_output_paths(tts_tasks, output_path)
+                ]
+                scheduler.add_book(book, tasks)
+
+            # 所有书共用输出根目录下的一个任务日志（日志键包含输出路径）
+            logger.info(f"\n【步骤3/4】 合成 {len(book_dirs)} 本书...")
+            self.task_manager.journal = self._open_journal(Path(output_dir), resume)
+            try:
+                result = self.task_manager.execute_sync(self.tts_engine, show_progress=True, source=scheduler)
+            finally:
+                if self.task_manager.journal:
+                    self.task_manager.journal.close()
+                    self.task_manager.journal = None
+
+            segments = self._get_completed_segments()
+            books = {}
+            for book, book_dir in book_dirs.items():
+                stats = result['books'].get(book, {})
+                merged_file = None
+                files = [
+                    segment['output_path'] for segment in segments
+                    if Path(segment['output_path']).parent == book_dir
+                ]
+                if merge and files:
+                    merge_format = self.config.get('audio.output_format', 'mp3')
+                    merged_file = str(book_dir / f"{book}_完整版.{merge_format}")
+                    self.audio_merger.merge_files(files, merged_file, format=merge_format)
+                books[book] = {
+                    **stats,
+                    'share': scheduler.share_of(book),
+                    'output_dir': str(book_dir),
+                    'merged_file': merged_file
+                }
+                wait = stats.get('wait_ms', {})
+                logger.info(
+                    f"  - {book} (份额 {scheduler.share_of(book):g}): {stats.get('completed', 0)}/{stats.get('tasks', 0)} 成功, "
+                    f"{stats.get('chars_per_second', 0):.0f} 字/秒, 排队等待 p50 {wait.get('p50') or 0:.0f}ms / "
+                    f"max {wait.get('max') or 0:.0f}ms"
+                )
+
+            return {
+                'success': result['failed'] == 0,
+                'tasks_total': result['total'],
+                'tasks_completed': result['completed'],
+                'tasks_failed': result['failed'],
+                'elapsed_seconds': result['elapsed_seconds'],
+                'latency_ms': result['latency_ms'],
+                'books': books
+            }
+
+        except Exception as e:
+            logger.error(f"批量转换失败: {e}")
+            raise
+        finally:
+            self._export_metrics()
+
+    @staticmethod
+    def _select_shard(tts_tasks: list, spec: str) -> tuple:
+        """
+        选出本分片负责的章节的任务
+
+        Args:
+            tts_tasks: 全书的段落任务
+            spec: 分片参数 "i/n"
+
+        Returns:
+            (本分片的任务列表, 分片信息)
+        """
+        shard_index, shard_count = parse_shard_spec(spec)
+        chapter_chars = {}
+        for task in tts_tasks:
+            chapter_chars[task['chapter_index']] = chapter_chars.get(task['chapter_index'], 0) + len(task['text'])
+
+        chapters = plan_shards(chapter_chars, shard_count)[shard_index - 1]
+        selected = set(chapters)
+        shard_info = {
+            'index': shard_index,
+            'count': shard_count,
+            'plan': plan_fingerprint(chapter_chars, shard_count),
+            'chapters': chapters,
+            'total_chapters': len(chapter_chars),
+            'chars': sum(chapter_chars[chapter_index] for chapter_index in chapters)
+        }
+        logger.info(
+            f"✓ 分片 {shard_index}/{shard_count}: {len(chapters)}/{len(chapter_chars)} 个章节, "
+            f"{shard_info['chars']:,}/{sum(chapter_chars.values()):,} 字"
+        )
+        return [task for task in tts_tasks if task['chapter_index'] in selected], shard_info
+
+    def _write_shard_manifest(self, output_path: Path, book_name: str, shard_info: dict, result: dict) -> Path:
+        """
+        写出分片清单（记录本分片的段落音频及大小，供 assemble 校验）
+
+        Args:
+            output_path: 书籍输出目录
+            book_name: 书名
+            shard_info: _select_shard 返回的分片信息
+            result: 合成结果统计
+
+        Returns:
+            清单文件路径
+        """
+        files = []
+        for segment in self._get_completed_segments():
+            path = Path(segment['output_path'])
+            if path.exists():
+                files.append({
+                    'chapter_index': segment['chapter_index'],
+                    'segment_index': segment.get('segment_index', 0),
+                    'path': Path(os.path.relpath(path, output_path)).as_posix(),
+                    'size': path.stat().st_size
+                })
+        manifest = ShardManifest(
+            book=book_name,
+            shard_index=shard_info['index'],
+            shard_count=shard_info['count'],
+            plan=shard_info['plan'],
+            chapters=shard_info['chapters'],
+            total_chapters=shard_info['total_chapters'],
+            chars=shard_info['chars'],
+            completed=result['completed'],
+            failed=result['failed'],
+            files=files
+        )
+        return manifest.save(output_path)
+
+    def assemble(self, book_dir: str, output_file: Optional[str] = None) -> dict:
+        """
+        校验全部分片清单并按章节顺序合并各分片的音频
+
+        Args:
+            book_dir: 书籍输出目录（各分片的输出目录内容已复制到此处）
+            output_file: 合并后的文件路径（None则为 <书名>_完整版.<格式>）
+
+        Returns:
+            合并结果
+        """
+        manifests = validate_shards(book_dir)
+        audio_files = ordered_files(manifests, book_dir)
+
+        if output_file is None:
+            merge_format = self.config.get('audio.output_format', 'mp3')
+            output_file = str(Path(book_dir) / f"{manifests[0].book}_完整版.{merge_format}")
+        merge_format = Path(output_file).suffix.lstrip('.') or self.config.get('audio.output_format', 'mp3')
+
+        logger.info(f"合并 {len(manifests)} 个分片的 {len(audio_files)} 个音频文件...")
+        with time_stage('assemble'):
+            if not self.audio_merger.merge_files(audio_files, output_file, format=merge_format):
+                raise RuntimeError(f"合并失败: {output_file}")
+        logger.success(f"✓ 音频已合并: {output_file}")
+
+        return {
+            'merged_file': output_file,
+            'shards': len(manifests),
+            'chapters': sum(len(manifest.chapters) for manifest in manifests),
+            'audio_files': len(audio_files)
+        }
+
+    def _export_metrics(self):
+        """按配置写出运行指标（JSON快照 / Prometheus文本格式）"""
+        metrics_config = self.config.get('metrics', {})
+        if not metrics_config.get('enable', True):
+            return
+
+        registry = get_registry()
+        for key in ('json_path', 'prometheus_path'):
+            path = metrics_config.get(key)
+            if not path:
+                continue
+            try:
+                registry.write(path)
+                logger.debug(f"运行指标已写出: {path}")
+            except OSError as e:
+                logger.warning(f"运行指标写出失败: {e}")
+
+    def set_reading_position(self, chapter_index: int, segment_index: int = 0) -> bool:
+        """
+        调整正在进行的转换的阅读位置（线程安全）
+
+        Args:
+            chapter_index: 章节序号
+            segment_index: 章节内的段落序号
+
+        Returns:
+            是否生效（只有以 start_chapter 启动的转换可以调整）
+        """
+        play_ahead = self.play_ahead
+        if play_ahead is None:
+            return False
+        play_ahead.set_reading_position(chapter_index, segment_index)
+        return True
+
+    def pause(self) -> bool:
+        """
+        暂停正在进行的转换（线程安全），正在合成的段落完成后不再开始新段落
+
+        Returns:
+            是否有正在进行的转换
+        """
+        return self.task_manager.pause()
+
+    def resume(self) -> bool:
+        """
+        恢复已暂停的转换（线程安全）
+
+        Returns:
+            是否有正在进行的转换
+        """
+        return self.task_manager.resume()
+
+    def cancel(self, drain: bool = False) -> bool:
+        """
+        取消正在进行的转换（线程安全），已完成的段落保留在任务日志中，再次转换时跳过
+
+        Args:
+            drain: True则等正在合成的段落完成后结束，False则立即中断
+
+        Returns:
+            是否有正在进行的转换
+        """
+        return self.task_manager.cancel(drain)
+
+    def subscribe_progress(self, maxsize: int = 1000) -> Subscription:
+        """
+        订阅转换进度事件（任务开始/完成/失败、章节完成、批次统计），可在任意线程中读取
+
+        Args:
+            maxsize: 订阅缓冲区容量，读取跟不上时丢弃最旧的事件
+
+        Returns:
+            Subscription实例（用完后调用 close）
+        """
+        return self.task_manager.events.subscribe(maxsize)
+
+    def _open_work_queue(self, name: str) -> RedisWorkQueue:
+        """
+        连接配置中的Redis并打开任务队列
+
+        Args:
+            name: 队列名（书名）
+
+        Returns:
+            RedisWorkQueue实例
+        """
+        from utils.db_client import RedisClient
+
+        distributed_config = self.config.get('distributed', {})
+        redis_config = distributed_config.get('redis', {})
+        client = RedisClient(
+            host=redis_config.get('host', 'localhost'),
+            port=redis_config.get('port', 6379),
+            db=redis_config.get('db', 0),
+            password=redis_config.get('password')
+        )
+        client.connect()
+        return RedisWorkQueue(
+            client,
+            name,
+            visibility_timeout=distributed_config.get('visibility_timeout', 300),
+            max_attempts=self.task_manager.retry_policy.max_attempts
+        )
+
+    def _execute_distributed(self, output_root: Path, output_path: Path, pipeline: StagedPipeline,
+                             resume: bool = True) -> dict:
+        """
+        通过任务队列执行合成，每个章节的段落全部完成后立即交给后处理流水线
+
+        Args:
+            output_root: 共享输出根目录（工作进程使用相同的目录结构）
+            output_path: 书籍输出目录
+            pipeline: 章节后处理流水线
+            resume: 是否继续队列中上次的进度（False或合成参数、分段变化时清空队列重新合成）
+
+        Returns:
+            执行结果统计
+        """
+        work_queue = self._open_work_queue(output_path.name)
+        config = self.tts_engine.config
+        work_queue.start_job(
+            {'voice': config.voice, 'rate': config.rate, 'volume': config.volume, 'pitch': config.pitch},
+            self.task_manager.job_fingerprint(self.tts_engine),
+            resume=resume
+        )
+
+        def submit_chapter(chapter_index: int, tasks: list):
+            item = self._chapter_item(chapter_index, tasks)
+            if item:
+                pipeline.submit(item)
+
+        return self.task_manager.execute_distributed(
+            work_queue,
+            output_root=str(output_root),
+            chapter_callback=submit_chapter,
+            poll_interval=self.config.get('distributed.poll_interval', 1.0)
+        )
+
+    @staticmethod
+    def _pipeline_failures(pipeline: StagedPipeline) -> list:
+        """
+        后处理失败的章节
+
+        Args:
+            pipeline: 已关闭的章节后处理流水线
+
+        Returns:
+            [{chapter_index, title, stage, error}]，按章节序号排序
+        """
+        failures = [
+            {
+                'chapter_index': failure['item'].get('chapter_index'),
+                'title': failure['item'].get('title'),
+                'stage': failure['stage'],
+                'error': failure['error']
+            }
+            for failure in pipeline.failures
+        ]
+        return sorted(failures, key=lambda failure: failure['chapter_index'])
+
+    @staticmethod
+    def _chapter_item(chapter_index: int, tasks: list) -> Optional[dict]:
+        """
+        章节后处理条目
+
+        Args:
+            chapter_index: 章节序号
+            tasks: 章节的任务列表
+
+        Returns:
+            {chapter_index, title, files}，章节没有成功的段落时返回None
+        """
+        segments = []
+        for task in tasks:
+            if task.status != TaskStatus.COMPLETED:
+                continue
+            members = task.metadata.get('packed_segments')
+            segments.extend(members if members else [{**task.metadata, 'output_path': task.output_path}])
+        if not segments:
+            return None
+        segments.sort(key=lambda segment: segment.get('segment_index', 0))
+        return {
+            'chapter_index': chapter_index,
+            'title': tasks[0].chapter_title,
+            'files': [segment['output_path'] for segment in segments]
+        }
+
+    def _chapter_progress_callback(self, pipeline: StagedPipeline):
+        """
+        创建进度回调：章节的最后一个任务结束时把章节提交给流水线
+
+        流水线队列已满时只有提交章节的那个工作协程等待，其他任务继续合成
+
+        Args:
+            pipeline: 章节后处理流水线
+
+        Returns:
+            协程回调函数
+        """
+        chapters = {}
+        for task in self.task_manager.tasks:
+            chapters.setdefault(task.metadata.get('chapter_index', 0), []).append(task)
+        remaining = {chapter_index: len(tasks) for chapter_index, tasks in chapters.items()}
+
+        async def on_task_done(task):
+            chapter_index = task.metadata.get('chapter_index', 0)
+            remaining[chapter_index] -= 1
+            if remaining[chapter_index] == 0:
+                item = self._chapter_item(chapter_index, chapters[chapter_index])
+                if item:
+                    await asyncio.get_running_loop().run_in_executor(None, pipeline.submit, item)
+
+        return on_task_done
+
+    def _build_post_pipeline(self, output_path: Path, book_name: str) -> StagedPipeline:
+        """
+        创建章节后处理流水线：合并 -> 音量标准化 -> 格式转换 -> 写标签
+
+        Args:
+            output_path: 书籍输出目录
+            book_name: 书名（写入专辑标签）
+
+        Returns:
+            StagedPipeline实例
+        """
+        audio_config = self.config.get_audio_config()
+        pipeline_config = audio_config.get('pipeline', {})
+        output_config = self.config.get_output_config()
+        metadata = output_config.get('metadata', {})
+        quality = audio_config.get('quality', {})
+        chapter_format = pipeline_config.get('chapter_format') or audio_config.get('output_format', 'mp3')
+        convert_format = pipeline_config.get('convert_format')
+        chapter_dir = output_path / "chapters"
+        silence = audio_config.get('silence_between', 500)
+
+        def merge(item):
+            chapter_file = chapter_dir / f"{item['chapter_index']:03d}.{chapter_format}"
+            # 每个条目使用独立的合并器（合并器记录偏移量，不能跨线程共享）
+            merger = AudioMerger(add_silence=True, silence_duration=silence,
+                                 stream_copy=audio_config.get('stream_copy', True),
+                                 streaming=audio_config.get('streaming_merge', True))
+            if not merger.merge_files(item['files'], str(chapter_file), format=chapter_format, show_progress=False):
+                raise RuntimeError(f"章节 {item['chapter_index']} 合并失败")
+            return {**item, 'path': str(chapter_file)}
+
+        def normalize(item):
+            if audio_config.get('normalize', False) and chapter_format != 'pcm':
+                AudioNormalizer.normalize_volume(item['path'])
+            return item
+
+        def convert(item):
+            if convert_format and convert_format != chapter_format:
+                target = str(Path(item['path']).with_suffix(f".{convert_format}"))
+                if FormatConverter.convert(
+                    item['path'], target, convert_format,
+                    bitrate=quality.get('bitrate', '192k'),
+                    sample_rate=quality.get('sample_rate', 44100)
+                ):
+                    return {**item, 'path': target}
+            return item
+
+        def tag(item):
+            if output_config.get('add_metadata', False):
+                AudioTagger.write_tags(
+                    item['path'],
+                    title=item['title'],
+                    album=book_name,
+                    artist=metadata.get('artist'),
+                    genre=metadata.get('genre'),
+                    track=item['chapter_index']
+                )
+            return item
+
+        workers = pipeline_config.get('workers', 2)
+        return StagedPipeline(
+            [
+                PipelineStage("merge_chapter", merge, workers=workers),
+                PipelineStage("normalize", normalize, workers=workers),
+                PipelineStage("convert", convert, workers=workers),
+                PipelineStage("tag", tag),
+            ],
+            queue_size=pipeline_config.get('queue_size', 4),
+            name="post"
+        )
+
+    def run_worker(self, book_name: str, output_dir: Optional[str] = None, exit_when_empty: bool = False):
+        """
+        作为工作进程运行：从书籍的任务队列领取段落并合成
+
+        Args:
+            book_name: 书名（队列名）
+            output_dir: 共享输出根目录（None则使用配置）
+            exit_when_empty: 队列为空时退出
+        """
+        if output_dir is None:
+            output_dir = self.config.get_output_config().get('base_dir', './data/output')
+
+        worker = DistributedWorker(
+            self._open_work_queue(book_name),
+            self.tts_engine,
+            output_root=output_dir,
+            max_workers=self.task_manager.max_workers,
+            poll_interval=self.config.get('distributed.poll_interval', 1.0)
+        )
+        worker.run(exit_when_empty=exit_when_empty)
+
+    def _open_journal(self, output_path: Path, resume: bool) -> Optional[JobJournal]:
+        """
+        打开书籍输出目录中的任务日志
+
+        Args:
+            output_path: 书籍输出目录
+            resume: 是否保留上次的记录
+
+        Returns:
+            任务日志，未启用时返回None
+        """
+        journal_config = self.config.get('performance.journal', {})
+        if not journal_config.get('enable', True):
+            return None
+
+        journal = JobJournal(
+            str(output_path / ".journal.sqlite"),
+            verify_checksum=journal_config.get('verify_checksum', False)
+        )
+        if not resume:
+            journal.clear()
+        return journal
+
+    def _get_completed_segments(self) -> list:
+        """
+        获取已完成任务的段落（打包任务展开为各成员）
+
+        Returns:
+            段落任务字典列表，包含 output_path, text, chapter_index, chapter_title
+        """
+        segments = []
+        for task in self.task_manager.get_completed_tasks():
+            members = task.metadata.get('packed_segments')
+            if members:
+                segments.extend(members)
+            else:
+                segments.append({**task.metadata, 'output_path': task.output_path, 'text': task.text})
+        return segments
+
+    def _update_duration_model(self, max_audio_samples: int = 50):
+        """
+        用本次完成的段落更新时长模型并保存（合成延迟已由任务管理器记录，这里补充音频时长）
+
+        Args:
+            max_audio_samples: 最多读取多少个段落的音频时长（均匀抽样，只读文件头）
+        """
+        if self.duration_model is None:
+            return
+        segments = self._get_completed_segments()
+        step = max(1, len(segments) // max_audio_samples)
+        config = self.tts_engine.config
+        for segment in segments[::step][:max_audio_samples]:
+            try:
+                audio_ms = AudioSplitter.get_duration_ms(segment['output_path'])
+            except Exception as e:
+                logger.debug(f"读取音频时长失败: {segment['output_path']} ({e})")
+                continue
+            self.duration_model.observe(len(segment['text']), audio_seconds=audio_ms / 1000.0,
+                                        voice=config.voice, rate=config.rate)
+        try:
+            self.duration_model.save()
+        except OSError as e:
+            logger.warning(f"时长模型保存失败: {e}")
+
+    def _get_completed_audio_files(self) -> list:
+        """
+        获取已完成任务的段落音频文件（打包任务展开为各成员文件）
+
+        Returns:
+            音频文件路径列表
+        """
+        return [segment['output_path'] for segment in self._get_completed_segments()]
+
+    def _write_subtitles(self, output_path: Path, book_name: str, offsets: Optional[list] = None) -> list:
+        """
+        把各段落的时间轴文件拼接为章节级和整书级字幕
+
+        Args:
+            output_path: 输出目录
+            book_name: 书名
+            offsets: 合并时各文件的起始时间 [(文件, 偏移毫秒), ...]，None则按文件头计算
+
+        Returns:
+            生成的字幕文件路径列表
+        """
+        segments = self._get_completed_segments()
+        if offsets is None:
+            offsets = self.audio_merger.estimate_offsets([segment['output_path'] for segment in segments])
+        offset_map = dict(offsets)
+
+        timeline_segments = []
+        for segment in segments:
+            if segment['output_path'] not in offset_map:
+                continue
+            timeline_segments.append({
+                'audio_path': segment['output_path'],
+                'offset_ms': offset_map[segment['output_path']],
+                'text': segment['text'],
+                'chapter_index': segment.get('chapter_index', 0),
+                'chapter_title': segment.get('chapter_title', '')
+            })
+
+        written = []
+        chapters = []
+        for chapter_index in dict.fromkeys(segment['chapter_index'] for segment in timeline_segments):
+            chapter_segments = [s for s in timeline_segments if s['chapter_index'] == chapter_index]
+            chapter_start = chapter_segments[0]['offset_ms']
+            chapter_title = chapter_segments[0]['chapter_title']
+            chapters.append({'index': chapter_index, 'title': chapter_title, 'start_ms': chapter_start})
+
+            # 章节级时间轴相对于章节开头
+            timeline = self.subtitle_writer.build_timeline([
+                {**s, 'offset_ms': s['offset_ms'] - chapter_start} for s in chapter_segments
+            ])
+            written += self.subtitle_writer.write(
+                timeline, str(output_path / f"{chapter_index:03d}"), title=chapter_title
+            )
+
+        # 整书级时间轴不含逐词数据，避免文件过大
+        timeline = self.subtitle_writer.build_timeline(timeline_segments)
+        written += self.subtitle_writer.write(
+            timeline,
+            str(output_path / f"{book_name}_完整版"),
+            title=book_name,
+            chapters=chapters,
+            include_words=False
+        )
+        return written
 
     def convert_chapter(
         self,
@@ -243,8 +1217,16 @@ class NovelToAudio:
 
             player.cleanup()
 
-    def list_voices(self):
-        """列出可用音色"""
+    def list_voices(self, refresh: bool = False):
+        """
+        列出可用音色
+
+        Args:
+            refresh: 是否强制从网络刷新音色目录
+        """
+        if refresh and hasattr(self.tts_engine, 'refresh_voices'):
+            self.tts_engine.refresh_voices()
+
         voices = self.tts_engine.get_available_voices()
 
         logger.info(f"\n可用音色列表 (共 {len(voices)} 个):")
@@ -0,0 +1 @@
+"""核心模块测试用例模块"""
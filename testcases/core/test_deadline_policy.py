@@ -0,0 +1,69 @@
+"""
+截止时间与慢任务推测执行测试用例
+"""
+import allure
+
+from core.deadline_policy import DeadlinePolicy
+from core.retry_policy import RetryPolicy
+from core.task_manager import TaskManager, TaskStatus
+from modules.tts_engine import LoopbackTTSEngine
+
+
+def _run(tmp_path, policy, count=60, **engine_options):
+    """用带长尾延迟的回环引擎执行一批任务"""
+    engine = LoopbackTTSEngine(latency_ms=10, latency_per_char_ms=0, latency_jitter=0, **engine_options)
+    manager = TaskManager(
+        max_workers=4,
+        retry_policy=RetryPolicy(max_attempts=5, base_delay=0.01, min_budget=100),
+        deadline_policy=policy
+    )
+    for i in range(count):
+        manager.add_task(i, f"第{i}段文本", str(tmp_path / f"{i}.wav"))
+    return manager, manager.execute_sync(engine, show_progress=False)
+
+
+@allure.feature("核心模块")
+@allure.story("截止时间与慢任务")
+class TestDeadlinePolicy:
+    """截止时间与慢任务推测执行测试类"""
+
+    @allure.title("测试截止时间随字数增长，0表示不设截止时间")
+    def test_deadline(self):
+        """测试截止时间计算"""
+        assert DeadlinePolicy(base_seconds=10, seconds_per_char=0.5).deadline(100) == 60
+        assert DeadlinePolicy(base_seconds=0).deadline(100) is None
+
+    @allure.title("测试样本不足时不判定慢任务，短文本阈值不低于整体延迟分位数")
+    def test_straggler_threshold(self):
+        """测试慢任务阈值"""
+        detector = DeadlinePolicy(min_samples=5, straggler_factor=2.0).new_detector()
+        assert detector.threshold(100) is None
+
+        for chars in (100, 100, 100, 100, 100):
+            detector.record(1000.0, chars)
+        assert detector.threshold(100) == 2.0
+        assert detector.threshold(1000) == 20.0
+        assert detector.threshold(1) == 2.0
+
+    @allure.title("测试卡住的请求超过截止时间后被取消并重试")
+    def test_deadline_cancels_stuck_attempt(self, tmp_path):
+        """测试截止时间"""
+        policy = DeadlinePolicy(base_seconds=0.2, seconds_per_char=0, speculate=False)
+        manager, result = _run(tmp_path, policy, count=30, tail_rate=0.1, tail_latency_ms=60000, seed=3)
+
+        assert result['completed'] == 30
+        assert result['deadline_exceeded'] > 0
+        assert result['elapsed_seconds'] < 10
+        assert all(task.status == TaskStatus.COMPLETED for task in manager.tasks)
+
+    @allure.title("测试慢任务发出推测副本，副本胜出后文件移动到最终路径")
+    def test_speculative_execution(self, tmp_path):
+        """测试推测执行"""
+        policy = DeadlinePolicy(base_seconds=0, min_samples=10, straggler_factor=2.0)
+        manager, result = _run(tmp_path, policy, tail_rate=0.1, tail_latency_ms=60000, seed=3)
+
+        assert result['completed'] == 60
+        assert result['speculative_wins'] > 0
+        assert result['elapsed_seconds'] < 10
+        assert all((tmp_path / f"{i}.wav").exists() for i in range(60))
+        assert not list(tmp_path.glob("*.speculative*"))
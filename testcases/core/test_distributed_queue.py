@@ -0,0 +1,223 @@
+"""
+分布式任务队列测试用例
+"""
+import asyncio
+import threading
+import time
+
+import allure
+
+from core.distributed_queue import DistributedWorker, InMemoryRedis, RedisWorkQueue
+from core.task_manager import TaskManager, TaskStatus
+from modules.tts_engine import LoopbackTTSEngine
+
+
+def _make_manager(tmp_path, chapters=3, segments=4):
+    """构造按章节编号的任务"""
+    manager = TaskManager(max_workers=2)
+    for chapter in range(chapters):
+        for segment in range(segments):
+            manager.add_task(
+                chapter * segments + segment,
+                f"第{chapter}章第{segment}段",
+                str(tmp_path / "book" / f"{chapter:03d}_{segment:02d}.mp3"),
+                metadata={'chapter_index': chapter, 'segment_index': segment}
+            )
+    return manager
+
+
+def _start_workers(work_queue, output_root, count=2, **engine_kwargs):
+    """在后台线程中启动工作进程（各自拥有引擎和事件循环）"""
+    workers = []
+    for i in range(count):
+        engine = LoopbackTTSEngine(latency_ms=1, latency_per_char_ms=0, latency_jitter=0, **engine_kwargs)
+        worker = DistributedWorker(work_queue, engine, str(output_root), max_workers=2, poll_interval=0.01,
+                                   worker_id=f"worker-{i}")
+        thread = threading.Thread(target=asyncio.run, args=(worker.run_async(),), daemon=True)
+        thread.start()
+        workers.append((worker, thread))
+    return workers
+
+
+def _stop_workers(workers):
+    for worker, thread in workers:
+        worker.stop()
+    for worker, thread in workers:
+        thread.join(5)
+
+
+@allure.feature("核心模块")
+@allure.story("分布式任务队列")
+class TestDistributedQueue:
+    """分布式任务队列测试类"""
+
+    @allure.title("测试租约过期后任务重新入队，超过最多次数后记为失败")
+    def test_visibility_timeout(self):
+        """测试可见性超时"""
+        work_queue = RedisWorkQueue(InMemoryRedis(), "book", visibility_timeout=0.05, max_attempts=2)
+        work_queue.push([{'task_id': 1, 'text': "文本", 'output_path': "1.mp3"}])
+
+        assert work_queue.claim()['attempt'] == 1
+        assert work_queue.claim() is None
+        time.sleep(0.1)
+        assert work_queue.claim()['attempt'] == 2
+        time.sleep(0.1)
+
+        assert work_queue.claim() is None
+        results = work_queue.pop_results()
+        assert [r['status'] for r in results] == ['failed']
+        assert work_queue.complete(1) is False  # 迟到的结果不会覆盖最终结果
+
+    @allure.title("测试领取任务与登记租约是原子的，找回丢失任务时不会重复下发")
+    def test_claim_is_atomic(self):
+        """测试并发领取与 requeue_lost 同时进行"""
+        work_queue = RedisWorkQueue(InMemoryRedis(), "book", visibility_timeout=60)
+        work_queue.push({'task_id': i, 'text': "文本", 'output_path': f"{i}.mp3"} for i in range(2000))
+        claimed = []
+        stop = threading.Event()
+
+        def claimer():
+            task = work_queue.claim()
+            while task is not None:
+                claimed.append(task['task_id'])
+                task = work_queue.claim()
+
+        def rescuer():
+            while not stop.is_set():
+                work_queue.requeue_lost()
+
+        rescue = threading.Thread(target=rescuer)
+        rescue.start()
+        claimers = [threading.Thread(target=claimer) for _ in range(4)]
+        for thread in claimers:
+            thread.start()
+        for thread in claimers:
+            thread.join()
+        stop.set()
+        rescue.join()
+
+        assert sorted(claimed) == list(range(2000))
+        assert work_queue.stats()['leased'] == 2000
+
+    @allure.title("测试租约失效后工作进程放弃合成，不写输出文件也不回报结果")
+    def test_lost_lease_abandons_attempt(self, tmp_path):
+        """测试失去租约的工作进程"""
+        redis = InMemoryRedis()
+        work_queue = RedisWorkQueue(redis, "book", visibility_timeout=0.15)
+        work_queue.push([{'task_id': 1, 'text': "文本", 'output_path': "book/1.mp3"}])
+        engine = LoopbackTTSEngine(latency_ms=2000, latency_per_char_ms=0, latency_jitter=0)
+        worker = DistributedWorker(work_queue, engine, str(tmp_path), max_workers=1, poll_interval=0.01)
+        thread = threading.Thread(target=asyncio.run, args=(worker.run_async(exit_when_empty=True),), daemon=True)
+        thread.start()
+
+        # 等工作进程领取后模拟租约被协调进程收回
+        deadline = time.monotonic() + 5
+        while work_queue.stats()['leased'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        redis.zrem(work_queue._key('leases'), "1")
+        thread.join(5)
+
+        assert not thread.is_alive()
+        assert worker.completed_count == 0
+        assert work_queue.finished() == {}
+        assert list((tmp_path / "book").iterdir()) == []
+
+    @allure.title("测试多个工作进程合成，章节完成后立即回调")
+    def test_workers_and_chapter_callback(self, tmp_path):
+        """测试协调进程与工作进程"""
+        work_queue = RedisWorkQueue(InMemoryRedis(), "book")
+        manager = _make_manager(tmp_path)
+        ready = []
+
+        workers = _start_workers(work_queue, tmp_path)
+        try:
+            result = manager.execute_distributed(
+                work_queue,
+                output_root=str(tmp_path),
+                chapter_callback=lambda index, tasks: ready.append((index, len(tasks))),
+                show_progress=False,
+                poll_interval=0.01,
+                timeout=30
+            )
+        finally:
+            _stop_workers(workers)
+
+        assert result['completed'] == 12
+        assert sorted(ready) == [(0, 4), (1, 4), (2, 4)]
+        assert all((tmp_path / "book" / f"{c:03d}_{s:02d}.mp3").exists() for c in range(3) for s in range(4))
+        assert sum(worker.completed_count for worker, _ in workers) == 12
+
+    @allure.title("测试工作进程崩溃和协调进程重启")
+    def test_crash_recovery(self, tmp_path):
+        """测试崩溃恢复"""
+        redis = InMemoryRedis()
+        crashed_queue = RedisWorkQueue(redis, "book", visibility_timeout=0.1)
+        manager = _make_manager(tmp_path, chapters=1)
+        crashed_queue.push([{'task_id': task.task_id, 'text': task.text, 'output_path': f"book/{task.task_id}.mp3"}
+                            for task in manager.tasks[:2]])
+
+        # 一个工作进程领取任务后崩溃；另一个完成了一个任务，但协调进程还没读取结果就退出了
+        crashed_queue.claim()
+        finished = crashed_queue.claim()
+        crashed_queue.complete(finished['task_id'], {'elapsed': 0.01})
+
+        work_queue = RedisWorkQueue(redis, "book", visibility_timeout=0.1)
+        workers = _start_workers(work_queue, tmp_path, count=1)
+        try:
+            result = manager.execute_distributed(
+                work_queue, output_root=str(tmp_path), show_progress=False, poll_interval=0.01, timeout=30
+            )
+        finally:
+            _stop_workers(workers)
+
+        assert result['completed'] == 4
+        assert result['resumed'] == 1
+        assert all(task.status == TaskStatus.COMPLETED for task in manager.tasks)
+
+    @allure.title("测试不继续进度或批次指纹变化时清空队列，所有任务重新合成")
+    def test_start_job_resets_queue(self, tmp_path):
+        """测试 start_job 的继续与重置"""
+        work_queue = RedisWorkQueue(InMemoryRedis(), "book")
+        engine = LoopbackTTSEngine()
+        workers = _start_workers(work_queue, tmp_path)
+
+        def run(resume, rate=None):
+            manager = _make_manager(tmp_path)
+            if rate:
+                engine.config.rate = rate
+            work_queue.start_job({'voice': engine.config.voice}, manager.job_fingerprint(engine), resume=resume)
+            return manager.execute_distributed(
+                work_queue, output_root=str(tmp_path), show_progress=False, poll_interval=0.01, timeout=30
+            )
+
+        try:
+            first = run(resume=True)
+            resumed = run(resume=True)
+            rerun = run(resume=False)
+            changed = run(resume=True, rate="+20%")
+        finally:
+            _stop_workers(workers)
+
+        assert first['completed'] == 12 and first['resumed'] == 0
+        assert resumed['completed'] == 12 and resumed['resumed'] == 12
+        assert rerun['completed'] == 12 and rerun['resumed'] == 0
+        assert changed['completed'] == 12 and changed['resumed'] == 0
+        assert sum(worker.completed_count for worker, _ in workers) == 36
+        assert work_queue.get_job_info()['fingerprint'] == _make_manager(tmp_path).job_fingerprint(engine)
+
+    @allure.title("测试继续进度时最终失败的任务重新入队")
+    def test_start_job_requeues_failed(self):
+        """测试失败任务重试"""
+        work_queue = RedisWorkQueue(InMemoryRedis(), "book", max_attempts=1)
+        assert work_queue.start_job({}, "fp") is True
+        work_queue.push([{'task_id': 1, 'text': "文本", 'output_path': "1.mp3"},
+                         {'task_id': 2, 'text': "文本", 'output_path': "2.mp3"}])
+        work_queue.claim()
+        work_queue.fail(1, "合成失败")
+        work_queue.claim()
+        work_queue.complete(2)
+
+        assert work_queue.start_job({}, "fp") is False
+        assert list(work_queue.finished()) == ['2']
+        task = work_queue.claim()
+        assert task['task_id'] == 1 and task['attempt'] == 1
@@ -0,0 +1,96 @@
+"""
+段落时长模型测试用例
+"""
+import allure
+import pytest
+
+from core.duration_model import DEFAULT_LATENCY, DurationModel
+from core.task_manager import TaskManager, TTSTask
+from modules.novel_reader.chapter_parser import Chapter
+from modules.novel_reader.text_processor import TextProcessor
+from modules.tts_engine import LoopbackTTSEngine, TTSConfig
+
+
+@allure.feature("核心模块")
+@allure.story("段落时长模型")
+class TestDurationModel:
+    """段落时长模型测试类"""
+
+    @allure.title("测试按字数拟合合成延迟和音频时长")
+    def test_fit(self):
+        """测试线性拟合"""
+        model = DurationModel(min_samples=5)
+        for chars in range(10, 500, 20):
+            model.observe(chars, latency_ms=200 + 8 * chars, audio_seconds=0.22 * chars, voice="晓晓")
+
+        latency, audio = model.predict(1000, voice="晓晓")
+
+        assert latency == pytest.approx(8200)
+        assert audio == pytest.approx(220)
+
+    @allure.title("测试样本不足时使用汇总拟合（按语速折算音频时长），没有数据时使用默认值")
+    def test_fallback(self):
+        """测试回退"""
+        model = DurationModel(min_samples=5)
+        assert model.predict(100)[0] == DEFAULT_LATENCY[0] + DEFAULT_LATENCY[1] * 100
+
+        for chars in range(10, 200, 10):
+            model.observe(chars, latency_ms=100 + 5 * chars, audio_seconds=0.25 * chars, voice="晓晓")
+        model.observe(100, latency_ms=800, audio_seconds=12, voice="云希", rate=2.0)
+
+        latency, audio = model.predict(100, voice="云希", rate=2.0)
+        assert latency == pytest.approx(600, rel=0.1)
+        assert audio == pytest.approx(0.25 * 100 / 2, rel=0.2)
+
+    @allure.title("测试拟合结果保存后可以重新加载")
+    def test_save_and_load(self, tmp_path):
+        """测试持久化"""
+        path = tmp_path / "duration_model.json"
+        model = DurationModel(path, min_samples=2)
+        for chars in (10, 50, 100):
+            model.observe(chars, latency_ms=10 * chars, voice="晓晓", rate=1.2)
+        model.save()
+
+        loaded = DurationModel(path, min_samples=2)
+
+        assert loaded.samples("晓晓", 1.2) == 3
+        assert loaded.predict(200, "晓晓", 1.2) == model.predict(200, "晓晓", 1.2)
+
+    @allure.title("测试按预测耗时最长优先排序，任务管理器记录每个成功段落的延迟")
+    def test_longest_first(self, tmp_path):
+        """测试LPT排序与样本记录"""
+        model = DurationModel(min_samples=1)
+        tasks = [TTSTask(i, "字" * chars, f"{i}.wav") for i, chars in enumerate((30, 400, 5, 120, 30))]
+        assert [task.task_id for task in model.order_longest_first(tasks)] == [1, 3, 0, 4, 2]
+
+        engine = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="wav"),
+                                   latency_ms=1, latency_per_char_ms=0, latency_jitter=0)
+        manager = TaskManager(max_workers=2, duration_model=model)
+        for i in range(6):
+            manager.add_task(i, "字" * (10 * (i + 1)), str(tmp_path / f"{i}.wav"))
+        manager.execute_sync(engine, show_progress=False)
+
+        assert model.samples("loopback", 1.0) == 6
+
+    @allure.title("测试最长优先排序时渐进分段的短段落最先开始合成")
+    def test_progressive_segments_first(self, tmp_path):
+        """测试第一章的渐进分段段落不被排到队尾"""
+        paragraph = "他抬起头，看见远处的灯火一盏接一盏地亮了起来。" * 4
+        content = "\n".join([paragraph] * 12)
+        chapters = [Chapter(title=f"第{index}章", content=content, index=index, start_pos=0, end_pos=0) for index in (1, 2)]
+        processor = TextProcessor(max_segment_length=300, progressive=True, first_segment_length=30)
+        manager = TaskManager(max_workers=1)
+        for task in processor.prepare_for_tts(chapters):
+            manager.add_task(task['task_id'], task['text'], str(tmp_path / f"{task['task_id']}.wav"), metadata=task)
+        ramp_ids = [task.task_id for task in manager.tasks if task.metadata.get('progressive')]
+        assert ramp_ids
+
+        model = DurationModel(min_samples=1)
+        engine = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="wav"),
+                                   latency_ms=0, latency_per_char_ms=0, latency_jitter=0)
+        dispatched = []
+        manager.execute_sync(engine, progress_callback=lambda task: dispatched.append(task.task_id),
+                             show_progress=False, source=model.order_longest_first(manager.tasks))
+
+        assert dispatched[:len(ramp_ids)] == ramp_ids
+        assert len(dispatched) == len(manager.tasks)
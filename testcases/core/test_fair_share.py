@@ -0,0 +1,63 @@
+"""
+多书公平调度测试用例
+"""
+import allure
+
+from core.fair_share import FairShareScheduler
+from core.task_manager import TaskManager, TTSTask
+from modules.tts_engine import LoopbackTTSEngine
+
+
+def _tasks(prefix, count, chars=10):
+    return [TTSTask(i, "字" * chars, f"{prefix}{i}.mp3") for i in range(count)]
+
+
+@allure.feature("核心模块")
+@allure.story("多书公平调度")
+class TestFairShare:
+    """多书公平调度测试类"""
+
+    @allure.title("测试各书按份额分配字数，第一本书不会独占")
+    def test_shares_by_chars(self):
+        """测试赤字轮询按字数分配"""
+        scheduler = FairShareScheduler(shares={'A': 2, 'B': 1}, quantum=100)
+        scheduler.add_book('A', _tasks('a', 60))
+        # B 的段落是 A 的两倍长，按字数计份额
+        scheduler.add_book('B', _tasks('b', 60, chars=20))
+
+        first = [task.metadata['book'] for task in list(scheduler)[:60]]
+        chars = {'A': first.count('A') * 10, 'B': first.count('B') * 20}
+
+        assert 1.5 <= chars['A'] / chars['B'] <= 2.5
+        assert len(scheduler) == 120 and scheduler.remaining == 0
+
+    @allure.title("测试超过单轮额度的长段落会累积额度后执行，份额为0的书最后执行")
+    def test_large_task_and_zero_share(self):
+        """测试长段落与零份额"""
+        scheduler = FairShareScheduler(shares={'C': 0}, quantum=10)
+        scheduler.add_book('A', _tasks('a', 2, chars=35))
+        scheduler.add_book('B', _tasks('b', 4, chars=5))
+        scheduler.add_book('C', _tasks('c', 2))
+
+        order = [task.metadata['book'] for task in scheduler]
+
+        assert order.count('A') == 2
+        assert order[-2:] == ['C', 'C']
+
+    @allure.title("测试执行结果包含各书的吞吐和排队等待")
+    def test_per_book_stats(self, tmp_path):
+        """测试按书统计"""
+        engine = LoopbackTTSEngine(latency_ms=2, latency_per_char_ms=0, latency_jitter=0)
+        manager = TaskManager(max_workers=2)
+        scheduler = FairShareScheduler(quantum=20)
+        for book in ('A', 'B'):
+            tasks = [manager.add_task(i, "字" * 10, str(tmp_path / f"{book}{i}.mp3")) for i in range(10)]
+            scheduler.add_book(book, tasks)
+
+        result = manager.execute_sync(engine, show_progress=False, source=scheduler)
+
+        for book in ('A', 'B'):
+            stats = result['books'][book]
+            assert stats['completed'] == 10 and stats['chars'] == 100
+            assert stats['chars_per_second'] > 0
+            assert stats['wait_ms']['count'] == 10
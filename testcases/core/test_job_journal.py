@@ -0,0 +1,59 @@
+"""
+任务日志测试用例
+"""
+import allure
+
+from core.job_journal import JobJournal
+from core.retry_policy import RetryPolicy
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine
+
+
+def _make_manager(tmp_path, journal, count=20):
+    """构造带任务日志的任务管理器"""
+    manager = TaskManager(max_workers=4, retry_policy=RetryPolicy(max_attempts=1), journal=journal)
+    for i in range(count):
+        manager.add_task(i, f"第{i}段文本", str(tmp_path / f"{i:03d}.mp3"))
+    return manager
+
+
+@allure.feature("核心模块")
+@allure.story("任务日志")
+class TestJobJournal:
+    """任务日志测试类"""
+
+    @allure.title("测试中断后只重新合成未完成的任务")
+    def test_resume_skips_completed(self, tmp_path):
+        """测试断点续传"""
+        db_path = str(tmp_path / "journal.sqlite")
+
+        # 第一次运行：部分任务失败（相当于中途中断）
+        flaky = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=0.4, seed=5)
+        first = _make_manager(tmp_path, JobJournal(db_path, batch_size=7))
+        first_result = first.execute_sync(flaky, show_progress=False)
+        first.journal.close()
+        assert 0 < first_result['completed'] < 20
+
+        # 第二次运行：新进程重新打开日志
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        second = _make_manager(tmp_path, JobJournal(db_path))
+        result = second.execute_sync(engine, show_progress=False)
+
+        assert result['resumed'] == first_result['completed']
+        assert result['completed'] == 20
+        assert engine.get_stats()['requests'] == 20 - first_result['completed']
+
+    @allure.title("测试输出文件被修改或参数变化时重新合成")
+    def test_verify_and_fingerprint(self, tmp_path):
+        """测试校验失败与参数指纹"""
+        db_path = str(tmp_path / "journal.sqlite")
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        _make_manager(tmp_path, JobJournal(db_path), count=5).execute_sync(engine, show_progress=False)
+
+        (tmp_path / "002.mp3").write_bytes(b"broken")
+        result = _make_manager(tmp_path, JobJournal(db_path), count=5).execute_sync(engine, show_progress=False)
+        assert result['resumed'] == 4
+
+        engine.set_rate(1.5)
+        result = _make_manager(tmp_path, JobJournal(db_path), count=5).execute_sync(engine, show_progress=False)
+        assert result['resumed'] == 0
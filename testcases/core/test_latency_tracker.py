@@ -0,0 +1,62 @@
+"""
+延迟统计测试用例
+"""
+import random
+
+import allure
+import pytest
+
+from core.latency_tracker import LatencyHistogram, LatencyTracker
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine
+
+
+@allure.feature("核心模块")
+@allure.story("延迟统计")
+class TestLatencyStatistics:
+    """延迟统计测试类"""
+
+    @allure.title("测试全量统计的分位数覆盖所有样本，误差在精度范围内")
+    def test_histogram_percentiles(self):
+        """测试对数分桶分位数与精确分位数比较"""
+        rng = random.Random(1)
+        samples = [rng.uniform(800, 1200) for _ in range(4500)] + [rng.uniform(5, 20) for _ in range(500)]
+        histogram = LatencyHistogram(precision=0.01)
+        window = LatencyTracker(window=500)
+        for value in samples:
+            histogram.record(value)
+            window.record(value)
+
+        ordered = sorted(samples)
+        for p in (50, 90, 99):
+            exact = ordered[int(round(p / 100.0 * (len(ordered) - 1)))]
+            assert histogram.percentile(p) == pytest.approx(exact, rel=0.011)
+        summary = histogram.summary()
+        assert summary['count'] == 5000 and summary['max'] == max(samples)
+        # 滑动窗口只包含最后500个快速样本
+        assert window.summary()['p50'] < 20 < summary['p50']
+
+    @allure.title("测试没有样本和零延迟样本")
+    def test_histogram_edge_cases(self):
+        """测试边界情况"""
+        histogram = LatencyHistogram()
+        assert histogram.summary() == {'count': 0, 'p50': None, 'p90': None, 'p99': None, 'max': None}
+
+        for value in (0, 0, 0, 10):
+            histogram.record(value)
+        assert histogram.percentile(50) == 0.0
+        assert histogram.percentile(100) == 10
+
+    @allure.title("测试批次汇总的延迟分位数包含超过滑动窗口的早期任务")
+    def test_job_summary_covers_all_tasks(self, tmp_path):
+        """测试长批次的汇总延迟"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0.3, latency_jitter=0)
+        manager = TaskManager(max_workers=4)
+        for i in range(700):
+            text = "字" * 100 if i < 100 else "字"
+            manager.add_task(i, text, str(tmp_path / f"{i}.mp3"))
+
+        result = manager.execute_sync(engine, show_progress=False)
+
+        assert result['latency_ms']['count'] == 700
+        assert result['latency_ms']['p90'] >= 20
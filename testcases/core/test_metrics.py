@@ -0,0 +1,66 @@
+"""
+运行指标测试用例
+"""
+import allure
+
+from core.metrics import MetricsRegistry, get_registry, histogram_quantile, load_snapshot, summarize_snapshot
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine
+
+
+@allure.feature("核心模块")
+@allure.story("运行指标")
+class TestMetrics:
+    """运行指标测试类"""
+
+    @allure.title("测试计数器、仪表和直方图导出为Prometheus文本格式")
+    def test_prometheus_export(self):
+        """测试Prometheus导出"""
+        registry = MetricsRegistry()
+        requests = registry.counter('requests_total', '请求数', ('engine',))
+        in_flight = registry.gauge('in_flight', '进行中')
+        latency = registry.histogram('latency_seconds', '耗时', buckets=(0.1, 1.0))
+
+        requests.inc(engine='edge')
+        requests.inc(2, engine='edge')
+        with in_flight.track_inprogress():
+            assert in_flight.value() == 1
+        for value in (0.05, 0.5, 5.0):
+            latency.observe(value)
+
+        text = registry.to_prometheus()
+        assert 'requests_total{engine="edge"} 3' in text
+        assert 'in_flight 0' in text
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert 'latency_seconds_count 3' in text
+        assert registry.counter('requests_total', '请求数', ('engine',)) is requests
+
+    @allure.title("测试分桶分位数估算")
+    def test_histogram_quantile(self):
+        """测试分位数"""
+        buckets = [[0.1, 50], [1.0, 100], ['+Inf', 100]]
+
+        assert histogram_quantile(buckets, 0.5) == 0.1
+        assert abs(histogram_quantile(buckets, 0.75) - 0.55) < 1e-9
+        assert histogram_quantile([[0.1, 0], ['+Inf', 0]], 0.5) is None
+
+    @allure.title("测试任务执行后写出JSON快照并汇总")
+    def test_task_manager_snapshot(self, tmp_path):
+        """测试任务指标"""
+        registry = get_registry()
+        registry.reset()
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        manager = TaskManager(max_workers=2)
+        for i in range(6):
+            manager.add_task(i, "测试文本", str(tmp_path / f"{i}.mp3"))
+
+        manager.execute_sync(engine, show_progress=False)
+        summary = summarize_snapshot(load_snapshot(registry.write(tmp_path / "metrics.json")))
+
+        assert summary['tasks']['completed'] == 6
+        assert summary['tasks']['in_flight'] == 0
+        assert summary['stages']['synthesis']['count'] == 1
+        assert summary['engines'][engine.get_engine_name()]['success'] == 6
+        assert summary['engines'][engine.get_engine_name()]['characters'] == 6 * len("测试文本")
+        assert summary['bytes_written']['tts'] == sum((tmp_path / f"{i}.mp3").stat().st_size for i in range(6))
@@ -0,0 +1,110 @@
+"""
+分阶段流水线测试用例
+"""
+import asyncio
+import threading
+import time
+
+import allure
+
+from core.pipeline import PipelineStage, StagedPipeline
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine
+
+
+@allure.feature("核心模块")
+@allure.story("分阶段流水线")
+class TestStagedPipeline:
+    """分阶段流水线测试类"""
+
+    @allure.title("测试各阶段并行处理，总耗时接近最慢阶段")
+    def test_stages_overlap(self):
+        """测试阶段重叠"""
+        def slow(value):
+            time.sleep(0.05)
+            return value
+
+        pipeline = StagedPipeline([PipelineStage("a", slow), PipelineStage("b", slow), PipelineStage("c", slow)])
+        begin = time.perf_counter()
+        with pipeline:
+            for value in range(6):
+                pipeline.submit(value)
+        elapsed = time.perf_counter() - begin
+
+        assert sorted(pipeline.results) == list(range(6))
+        # 串行需要 6*3*0.05=0.9秒，流水线约 (6+2)*0.05=0.4秒
+        assert elapsed < 0.75
+        assert pipeline.stats['c']['processed'] == 6
+
+    @allure.title("测试下游阻塞时上游等待，积压的条目数有上限")
+    def test_backpressure(self):
+        """测试背压"""
+        release = threading.Event()
+        submitted = []
+
+        pipeline = StagedPipeline(
+            [PipelineStage("fast", lambda value: value), PipelineStage("blocked", lambda value: release.wait() and value)],
+            queue_size=1
+        )
+        producer = threading.Thread(
+            target=lambda: [submitted.append(pipeline.submit(value)) for value in range(10)], daemon=True
+        )
+        producer.start()
+        time.sleep(0.2)
+        # 阻塞阶段处理中1个 + 两个队列各1个 + fast 手上1个
+        assert len(submitted) <= 4
+
+        release.set()
+        producer.join(2)
+        pipeline.close()
+        assert len(pipeline.results) == 10
+
+    @allure.title("测试单个条目失败不影响其他条目")
+    def test_error_isolated(self):
+        """测试错误隔离"""
+        def check(value):
+            if value == 2:
+                raise ValueError("bad item")
+            return value
+
+        pipeline = StagedPipeline([PipelineStage("check", check, workers=2), PipelineStage("keep", lambda v: v)])
+        with pipeline:
+            for value in range(5):
+                pipeline.submit(value)
+
+        assert sorted(pipeline.results) == [0, 1, 3, 4]
+        assert pipeline.stats['check']['failed'] == 1
+        assert pipeline.failures == [{'stage': "check", 'item': 2, 'error': "bad item"}]
+        assert pipeline.stats['keep']['processed'] == 4
+
+    @allure.title("测试合成过程中章节完成即提交后处理")
+    def test_chapters_submitted_during_synthesis(self, tmp_path):
+        """测试异步进度回调提交章节"""
+        engine = LoopbackTTSEngine(latency_ms=5, latency_per_char_ms=0)
+        manager = TaskManager(max_workers=2)
+        for task_id in range(12):
+            manager.add_task(
+                task_id, f"段落{task_id}", str(tmp_path / f"{task_id}.mp3"),
+                metadata={'chapter_index': task_id // 4}
+            )
+        synthesized = []
+        processed = []
+        pipeline = StagedPipeline([PipelineStage("record", lambda chapter: processed.append(
+            (chapter, len(synthesized))) or chapter)])
+
+        remaining = {0: 4, 1: 4, 2: 4}
+
+        async def on_done(task):
+            synthesized.append(task.task_id)
+            chapter = task.metadata['chapter_index']
+            remaining[chapter] -= 1
+            if remaining[chapter] == 0:
+                await asyncio.get_running_loop().run_in_executor(None, pipeline.submit, chapter)
+
+        result = manager.execute_sync(engine, progress_callback=on_done, show_progress=False)
+        pipeline.close()
+
+        assert result['completed'] == 12
+        assert sorted(pipeline.results) == [0, 1, 2]
+        # 第一章在全部段落合成完成之前就已进入后处理
+        assert min(done_count for _, done_count in processed) < 12
@@ -0,0 +1,67 @@
+"""
+边听边合成调度测试用例
+"""
+import allure
+
+from core.play_ahead import PlayAheadScheduler
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine
+
+
+def _make_manager(tmp_path, chapters=20, segments=5):
+    """构造按章节/段落编号的任务"""
+    manager = TaskManager(max_workers=2, queue_size=1)
+    for chapter in range(chapters):
+        for segment in range(segments):
+            manager.add_task(
+                chapter * segments + segment,
+                f"第{chapter}章第{segment}段",
+                str(tmp_path / f"{chapter:03d}_{segment:02d}.mp3"),
+                metadata={'chapter_index': chapter, 'segment_index': segment}
+            )
+    return manager
+
+
+@allure.feature("核心模块")
+@allure.story("边听边合成")
+class TestPlayAhead:
+    """边听边合成调度测试类"""
+
+    @allure.title("测试优先合成阅读位置之后的段落，再补齐其余段落")
+    def test_window_first(self, tmp_path):
+        """测试阅读位置优先"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        manager = _make_manager(tmp_path)
+        scheduler = PlayAheadScheduler(manager.tasks, window=10)
+        scheduler.set_reading_position(15)
+        done = []
+
+        result = manager.execute_sync(
+            engine, progress_callback=lambda task: done.append(task.task_id), show_progress=False, source=scheduler
+        )
+
+        assert result['completed'] == 100
+        assert sorted(done[:10]) == list(range(75, 85))
+        assert sorted(done) == list(range(100))
+        assert scheduler.remaining == 0
+
+    @allure.title("测试执行过程中调整阅读位置")
+    def test_reposition_while_running(self, tmp_path):
+        """测试不重启任务即可重新排序"""
+        engine = LoopbackTTSEngine(latency_ms=2, latency_per_char_ms=0, latency_jitter=0)
+        manager = _make_manager(tmp_path)
+        scheduler = PlayAheadScheduler(manager.tasks, window=5)
+        scheduler.set_reading_position(2)
+        done = []
+
+        def on_done(task):
+            done.append(task.task_id)
+            if len(done) == 3:
+                # 回调在后台事件循环线程中执行，相当于播放器从其他线程跳转到第18章
+                scheduler.set_reading_position(18)
+
+        manager.execute_sync(engine, progress_callback=on_done, show_progress=False, source=scheduler)
+
+        # 跳转前已取出的任务最多为 工作协程数 + 队列长度 + 生产者手中的一个
+        assert done.index(94) < 3 + 5 + (2 + 1 + 1)
+        assert sorted(done) == list(range(100))
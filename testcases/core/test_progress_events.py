@@ -0,0 +1,92 @@
+"""
+进度事件流测试用例
+"""
+import asyncio
+import allure
+
+from core.progress_events import (
+    CHAPTER_COMPLETED, JOB_FINISHED, JOB_STARTED, JOB_STATS, TASK_FINISHED, TASK_STARTED, ProgressEventStream
+)
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine, TTSConfig
+
+
+@allure.feature("核心模块")
+@allure.story("进度事件流")
+class TestProgressEvents:
+    """进度事件流测试类"""
+
+    @allure.title("测试推送间隔内的高频事件合并为一条，其他事件逐条保留")
+    def test_coalesce(self):
+        """测试事件合并"""
+        stream = ProgressEventStream()
+        stream.set_stats_provider(lambda: {'completed': 100})
+        with stream.subscribe() as subscription:
+            stream.publish(JOB_STARTED, total=100)
+            for task_id in range(100):
+                stream.publish(TASK_FINISHED, task_id=task_id)
+            stream.publish(CHAPTER_COMPLETED, chapter_index=1)
+            stream.flush()
+
+            events = subscription.drain()
+
+        types = [event.type for event in events]
+        assert types.count(TASK_FINISHED) == 1 and types.count(CHAPTER_COMPLETED) == 1
+        finished = next(event for event in events if event.type == TASK_FINISHED)
+        assert finished.count == 100 and finished.data['task_id'] == 99
+        assert events[-1].type == JOB_STATS and events[-1].data == {'completed': 100}
+
+    @allure.title("测试订阅缓冲区满时丢弃最旧的事件，没有订阅者时发布不积累事件")
+    def test_bounded_subscription(self):
+        """测试有界缓冲区"""
+        stream = ProgressEventStream()
+        stream.publish(JOB_STARTED, total=1)
+        subscription = stream.subscribe(maxsize=3)
+        stream.flush()
+        assert subscription.get(timeout=0) is None
+
+        for chapter_index in range(5):
+            stream.publish(CHAPTER_COMPLETED, chapter_index=chapter_index)
+        stream.flush()
+
+        assert [event.data['chapter_index'] for event in subscription.drain()] == [2, 3, 4]
+        assert subscription.dropped == 2
+        subscription.close()
+        assert not stream.has_subscribers
+
+    @allure.title("测试 TaskManager 执行时发布任务、章节和批次事件，async for 在取消订阅后结束")
+    def test_task_manager_events(self, tmp_path):
+        """测试执行过程中的事件"""
+        engine = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="wav"),
+                                   latency_ms=2, latency_per_char_ms=0, latency_jitter=0)
+        manager = TaskManager(max_workers=2, events=ProgressEventStream(interval=0.01))
+        for chapter_index in range(3):
+            for segment in range(4):
+                manager.add_task(chapter_index * 4 + segment, "字" * 10,
+                                 str(tmp_path / f"{chapter_index}_{segment}.wav"),
+                                 metadata={'chapter_index': chapter_index})
+        subscription = manager.events.subscribe()
+
+        async def run():
+            received = []
+
+            async def consume():
+                async for event in subscription:
+                    received.append(event)
+
+            consumer = asyncio.ensure_future(consume())
+            result = await manager.execute_async(engine, show_progress=False)
+            subscription.close()
+            await consumer
+            return result, received
+
+        result, events = asyncio.run(run())
+
+        types = [event.type for event in events]
+        assert result['completed'] == 12
+        assert types[0] == JOB_STARTED and JOB_FINISHED in types
+        assert sorted(event.data['chapter_index'] for event in events if event.type == CHAPTER_COMPLETED) == [0, 1, 2]
+        assert sum(event.count for event in events if event.type == TASK_STARTED) == 12
+        assert sum(event.count for event in events if event.type == TASK_FINISHED) == 12
+        stats = [event for event in events if event.type == JOB_STATS]
+        assert stats[-1].data['completed'] == 12
@@ -0,0 +1,78 @@
+"""
+重试策略测试用例
+"""
+import allure
+
+from core.retry_policy import RetryPolicy
+from core.task_manager import TaskManager, TaskStatus
+from modules.tts_engine import LoopbackTTSEngine
+
+
+@allure.feature("核心模块")
+@allure.story("重试策略")
+class TestRetryPolicy:
+    """重试策略测试类"""
+
+    @allure.title("测试退避时间不超过指数上限")
+    def test_backoff_full_jitter(self):
+        """测试完全抖动"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, seed=1)
+
+        for attempt in range(1, 8):
+            ceiling = min(5.0, 2 ** (attempt - 1))
+            assert all(0 <= policy.backoff(attempt) <= ceiling for _ in range(50))
+
+    @allure.title("测试只重试可恢复的错误")
+    def test_retryable_errors(self):
+        """测试错误分类"""
+        policy = RetryPolicy(max_attempts=3)
+        budget = policy.new_budget()
+
+        assert policy.next_delay(1, ConnectionError(), budget) is not None
+        assert policy.next_delay(1, None, budget) is not None
+        assert policy.next_delay(1, ValueError(), budget) is None
+        assert policy.next_delay(3, None, budget) is None
+
+    @allure.title("测试任务内重试并统计重试次数")
+    def test_task_manager_retries(self, tmp_path):
+        """测试失败任务在执行过程中被重试"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=0.3, failure_mode="raise", seed=3)
+        manager = TaskManager(max_workers=4, retry_policy=RetryPolicy(max_attempts=5, base_delay=0.001, min_budget=100))
+        for i in range(30):
+            manager.add_task(i, f"文本{i}", str(tmp_path / f"{i}.mp3"))
+
+        result = manager.execute_sync(engine, show_progress=False)
+
+        assert result['completed'] == 30
+        assert result['retries'] == sum(task.attempts - 1 for task in manager.tasks) > 0
+        assert all(task.status == TaskStatus.COMPLETED and task.error is None for task in manager.tasks)
+
+    @allure.title("测试重试预算限制引擎故障时的重试总量")
+    def test_retry_budget(self, tmp_path):
+        """测试重试风暴保护"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=1.0)
+        policy = RetryPolicy(max_attempts=5, base_delay=0.001, budget_ratio=0.1, min_budget=2)
+        manager = TaskManager(max_workers=4, retry_policy=policy)
+        for i in range(50):
+            manager.add_task(i, f"文本{i}", str(tmp_path / f"{i}.mp3"))
+
+        result = manager.execute_sync(engine, show_progress=False)
+
+        assert result['failed'] == 50
+        assert result['retries'] <= 2 + 0.1 * 50
+        assert result['retries_denied'] > 0
+
+    @allure.title("测试重试预算随首次请求数增长")
+    def test_retry_budget_grows_with_requests(self, tmp_path):
+        """测试大批量任务中的零星失败都能得到重试令牌"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=0.05, seed=7)
+        policy = RetryPolicy(max_attempts=5, base_delay=0.001, budget_ratio=0.2, min_budget=1)
+        manager = TaskManager(max_workers=8, retry_policy=policy)
+        for i in range(400):
+            manager.add_task(i, f"文本{i}", str(tmp_path / f"{i}.mp3"))
+
+        result = manager.execute_sync(engine, show_progress=False)
+
+        assert result['retries'] > 1
+        assert result['retries_denied'] == 0
+        assert result['completed'] == 400
@@ -0,0 +1,72 @@
+"""
+任务调度测试用例
+"""
+import allure
+
+from core.retry_policy import RetryPolicy
+from core.task_manager import TaskManager, TaskStatus
+from modules.tts_engine import LoopbackTTSEngine
+
+
+@allure.feature("核心模块")
+@allure.story("任务调度")
+class TestScheduler:
+    """任务调度测试类"""
+
+    @allure.title("测试任务源被按需拉取，在途任务数有上限")
+    def test_lazy_source_bounded(self, tmp_path):
+        """测试生产者/消费者调度"""
+        engine = LoopbackTTSEngine(latency_ms=1, latency_per_char_ms=0, latency_jitter=0)
+        manager = TaskManager(max_workers=4)
+        produced = 0
+        finished = 0
+        peak_in_flight = 0
+
+        def source():
+            nonlocal produced, peak_in_flight
+            tasks = TaskManager.iter_tasks(
+                {'text': f"文本{i}", 'output_path': str(tmp_path / f"{i % 10}.mp3")} for i in range(500)
+            )
+            for task in tasks:
+                produced += 1
+                peak_in_flight = max(peak_in_flight, produced - finished)
+                yield task
+
+        def on_done(task):
+            nonlocal finished
+            finished += 1
+
+        result = manager.execute_sync(engine, progress_callback=on_done, show_progress=False, source=source())
+
+        assert result['total'] == result['completed'] == 500
+        assert manager.tasks == []
+        # 工作协程数 + 队列长度 + 生产者手中的一个
+        assert peak_in_flight <= 4 + 4 + 1
+
+    @allure.title("测试重试退避期间工作协程继续处理其他任务")
+    def test_retry_does_not_block_workers(self, tmp_path):
+        """测试重试任务重新入队"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=0.3, failure_mode="raise", seed=9)
+        manager = TaskManager(max_workers=2, retry_policy=RetryPolicy(max_attempts=10, base_delay=0.01, min_budget=1000))
+        for i in range(40):
+            manager.add_task(i, f"文本{i}", str(tmp_path / f"{i}.mp3"))
+
+        result = manager.execute_sync(engine, show_progress=False)
+
+        assert result['completed'] == 40 and result['retries'] > 0
+        assert all(task.status == TaskStatus.COMPLETED for task in manager.tasks)
+
+    @allure.title("测试进度回调异常不会中断任务")
+    def test_callback_error_isolated(self, tmp_path):
+        """测试回调异常隔离"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        manager = TaskManager(max_workers=2)
+        for i in range(5):
+            manager.add_task(i, f"文本{i}", str(tmp_path / f"{i}.mp3"))
+
+        def broken_callback(task):
+            raise RuntimeError("回调异常")
+
+        result = manager.execute_sync(engine, progress_callback=broken_callback, show_progress=False)
+
+        assert result['completed'] == 5
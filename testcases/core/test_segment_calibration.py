@@ -0,0 +1,53 @@
+"""
+段落长度校准测试用例
+"""
+import allure
+import pytest
+
+from core.segment_calibration import calibrate, choose_segment_length, sample_text
+from modules.tts_engine import LoopbackTTSEngine, TTSConfig
+
+
+def _samples(overhead_ms, per_char_ms, sizes=(50, 100, 200, 400, 800, 1200)):
+    return [(size, overhead_ms + per_char_ms * size) for size in sizes for _ in range(3)]
+
+
+@allure.feature("核心模块")
+@allure.story("段落长度校准")
+class TestSegmentCalibration:
+    """段落长度校准测试类"""
+
+    @allure.title("测试拟合固定开销和每字耗时，固定开销越大选出的段落越长")
+    def test_overhead_model(self):
+        """测试开销模型与长度选择"""
+        heavy = choose_segment_length(_samples(1500, 5), max_latency_ms=20000)
+        light = choose_segment_length(_samples(100, 5), max_latency_ms=20000)
+
+        assert heavy.overhead_ms == pytest.approx(1500)
+        assert heavy.per_char_ms == pytest.approx(5)
+        assert light.segment_length < heavy.segment_length <= 1200
+        assert heavy.chars_per_second >= 0.9 * 1200 * 1000 / (1500 + 5 * 1200)
+
+    @allure.title("测试选出的段落长度满足延迟上限，引擎对长文本变慢时不选更长的段落")
+    def test_bounds(self):
+        """测试延迟上限与吞吐下降"""
+        bounded = choose_segment_length(_samples(800, 5), max_latency_ms=2000)
+        assert bounded.predict_latency_ms(bounded.segment_length) <= 2000
+
+        # 超过400字后延迟急剧增加
+        samples = [(size, 800 + 5 * size + (0 if size <= 400 else 20 * (size - 400)))
+                   for size in (50, 100, 200, 400, 800, 1200) for _ in range(3)]
+        assert choose_segment_length(samples, max_latency_ms=60000).segment_length <= 400
+
+    @allure.title("测试对回环引擎实测校准，每次请求的文本不同")
+    def test_calibrate_loopback(self):
+        """测试实测校准"""
+        assert sample_text("甲乙丙", 5, offset=1) == "乙丙甲乙丙"
+        engine = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="wav"),
+                                   latency_ms=40, latency_per_char_ms=0.1, latency_jitter=0)
+
+        result = calibrate(engine, sizes=(20, 80, 320), repeats=2, max_latency_ms=5000, concurrency=3)
+
+        assert len(result.samples) == 6
+        assert result.overhead_ms > 20
+        assert 20 <= result.segment_length <= 320
@@ -0,0 +1,89 @@
+"""
+静态分片测试用例
+"""
+import allure
+import pytest
+
+from core.sharding import (
+    ShardManifest, ordered_files, parse_shard_spec, plan_fingerprint, plan_shards, validate_shards
+)
+
+
+CHAPTER_CHARS = {1: 9000, 2: 3000, 3: 3000, 4: 2500, 5: 500, 6: 8000, 7: 4000, 8: 1200}
+
+
+def _write_shards(book_dir, shard_count=3, skip=()):
+    """按分片方案写出每个分片的音频和清单"""
+    plan = plan_fingerprint(CHAPTER_CHARS, shard_count)
+    for index, chapters in enumerate(plan_shards(CHAPTER_CHARS, shard_count), 1):
+        if index in skip:
+            continue
+        files = []
+        for chapter_index in chapters:
+            for segment_index in range(2):
+                name = f"{chapter_index:03d}_{segment_index:02d}.wav"
+                (book_dir / name).write_bytes(b"x" * (chapter_index + segment_index))
+                files.append({
+                    'chapter_index': chapter_index, 'segment_index': segment_index,
+                    'path': name, 'size': chapter_index + segment_index
+                })
+        ShardManifest(
+            book="测试", shard_index=index, shard_count=shard_count, plan=plan, chapters=chapters,
+            total_chapters=len(CHAPTER_CHARS), completed=len(files), files=files
+        ).save(book_dir)
+
+
+@allure.feature("核心模块")
+@allure.story("静态分片")
+class TestSharding:
+    """静态分片测试类"""
+
+    @allure.title("测试分片参数解析")
+    def test_parse_shard_spec(self):
+        """测试 i/n 解析"""
+        assert parse_shard_spec("2/8") == (2, 8)
+        for spec in ("0/4", "5/4", "abc", "1/2/3"):
+            with pytest.raises(ValueError):
+                parse_shard_spec(spec)
+
+    @allure.title("测试按字数均衡分配章节，每个章节恰好属于一个分片")
+    def test_plan_balanced(self):
+        """测试LPT分配"""
+        shards = plan_shards(CHAPTER_CHARS, 3)
+        loads = [sum(CHAPTER_CHARS[chapter] for chapter in chapters) for chapters in shards]
+
+        assert sorted(chapter for chapters in shards for chapter in chapters) == sorted(CHAPTER_CHARS)
+        assert max(loads) - min(loads) <= max(CHAPTER_CHARS.values()) / 2
+        # 输入顺序不影响结果
+        assert plan_shards(dict(reversed(list(CHAPTER_CHARS.items()))), 3) == shards
+
+    @allure.title("测试分片齐全时校验通过，文件按章节/段落顺序排列")
+    def test_validate_and_order(self, tmp_path):
+        """测试校验与排序"""
+        _write_shards(tmp_path)
+
+        manifests = validate_shards(tmp_path)
+        files = ordered_files(manifests, tmp_path)
+
+        assert [manifest.shard_index for manifest in manifests] == [1, 2, 3]
+        assert [f.split('/')[-1] for f in files[:3]] == ["001_00.wav", "001_01.wav", "002_00.wav"]
+        assert len(files) == 2 * len(CHAPTER_CHARS)
+
+    @allure.title("测试缺少分片、文件损坏或分片方案不一致时校验失败")
+    def test_validate_rejects(self, tmp_path):
+        """测试校验失败"""
+        _write_shards(tmp_path, skip=(2,))
+        with pytest.raises(ValueError, match="缺少分片"):
+            validate_shards(tmp_path)
+
+        _write_shards(tmp_path)
+        (tmp_path / "001_00.wav").write_bytes(b"truncated")
+        with pytest.raises(ValueError, match="文件大小不一致"):
+            validate_shards(tmp_path)
+
+        _write_shards(tmp_path)
+        manifest = ShardManifest.load(ShardManifest.path_for(tmp_path, 1, 3))
+        manifest.shard_count = 4
+        manifest.save(tmp_path)
+        with pytest.raises(ValueError, match="不同的分片方案"):
+            validate_shards(tmp_path)
@@ -0,0 +1,89 @@
+"""
+任务暂停/恢复/取消测试用例
+"""
+import threading
+import time
+
+import allure
+
+from core.task_manager import TaskManager, TaskStatus
+from modules.tts_engine import LoopbackTTSEngine, TTSConfig
+
+
+def _make_manager(tmp_path, count=40):
+    manager = TaskManager(max_workers=2)
+    for i in range(count):
+        manager.add_task(i, f"第{i}段", str(tmp_path / f"{i}.wav"))
+    return manager
+
+
+def _engine():
+    return LoopbackTTSEngine(
+        TTSConfig(voice="loopback", output_format="wav"), latency_ms=40, latency_per_char_ms=0, latency_jitter=0
+    )
+
+
+@allure.feature("核心模块")
+@allure.story("任务控制")
+class TestTaskControl:
+    """任务暂停/恢复/取消测试类"""
+
+    @allure.title("测试没有正在执行的批次时控制操作返回False")
+    def test_idle(self):
+        """测试空闲时的控制操作"""
+        manager = TaskManager()
+        assert not manager.pause() and not manager.resume() and not manager.cancel()
+        assert not manager.paused
+
+    @allure.title("测试立即取消：正在合成的任务被中断，未完成的任务标记为已取消")
+    def test_cancel(self, tmp_path):
+        """测试立即取消"""
+        manager = _make_manager(tmp_path)
+        threading.Timer(0.15, manager.cancel).start()
+
+        result = manager.execute_sync(_engine(), show_progress=False)
+
+        assert 0 < result['completed'] < 40
+        assert result['cancelled'] == 40 - result['completed']
+        assert result['elapsed_seconds'] < 1.0
+        for task in manager.tasks:
+            assert task.status in (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+            # 被中断的任务不留下不完整的文件
+            if task.status == TaskStatus.CANCELLED:
+                assert not (tmp_path / f"{task.task_id}.wav").exists()
+
+    @allure.title("测试排空取消：正在合成的任务完成后结束")
+    def test_cancel_drain(self, tmp_path):
+        """测试排空取消"""
+        manager = _make_manager(tmp_path)
+        threading.Timer(0.15, manager.cancel, kwargs={'drain': True}).start()
+
+        result = manager.execute_sync(_engine(), show_progress=False)
+
+        assert result['cancelled'] == 40 - result['completed']
+        assert all(task.attempts == (1 if task.status == TaskStatus.COMPLETED else 0) for task in manager.tasks)
+
+    @allure.title("测试暂停期间不开始新任务，恢复后全部完成")
+    def test_pause_resume(self, tmp_path):
+        """测试暂停与恢复"""
+        manager = _make_manager(tmp_path, count=20)
+        observed = {}
+
+        def control():
+            time.sleep(0.1)
+            manager.pause()
+            time.sleep(0.1)  # 等正在合成的任务完成
+            observed['paused'] = manager.paused
+            observed['before'] = manager.completed_count
+            time.sleep(0.2)
+            observed['after'] = manager.completed_count
+            manager.resume()
+
+        thread = threading.Thread(target=control)
+        thread.start()
+        result = manager.execute_sync(_engine(), show_progress=False)
+        thread.join()
+
+        assert observed['paused']
+        assert observed['before'] == observed['after'] < 20
+        assert result['completed'] == 20 and result['cancelled'] == 0
@@ -0,0 +1 @@
+"""小说阅读器测试用例模块"""
@@ -0,0 +1,57 @@
+"""
+小说转有声读物测试用例
+"""
+import allure
+import yaml
+
+import novel_to_audio
+from novel_to_audio import NovelToAudio
+
+
+def _write_config(tmp_path):
+    """回环引擎、WAV段落并启用章节后处理流水线的配置"""
+    config = {
+        'tts': {
+            'default_engine': "loopback",
+            'loopback': {'output_format': "wav", 'latency_ms': 1, 'latency_per_char_ms': 0, 'latency_jitter': 0},
+        },
+        'audio': {'output_format': "wav", 'normalize': True, 'pipeline': {'enable': True}},
+        'cache': {'enable': False},
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config, allow_unicode=True), encoding='utf-8')
+    return str(path)
+
+
+def _write_novel(tmp_path, chapters=3):
+    """生成若干章节的小说文件"""
+    text = "\n\n".join(f"第{index}章 标题{index}\n\n夜色渐深，城外的风从山谷里吹来。\n她轻声问道。"
+                       for index in range(1, chapters + 1))
+    path = tmp_path / "测试书.txt"
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+
+@allure.feature("小说阅读器")
+@allure.story("小说转有声读物")
+class TestNovelToAudio:
+    """小说转有声读物测试类"""
+
+    @allure.title("测试章节后处理失败时转换结果列出失败章节且不报告成功")
+    def test_pipeline_failure_reported(self, tmp_path, monkeypatch):
+        """测试后处理阶段失败"""
+        converter = NovelToAudio(_write_config(tmp_path))
+        normalize = novel_to_audio.AudioNormalizer.normalize_volume
+
+        def failing_normalize(path, *args, **kwargs):
+            if path.endswith("001.wav"):
+                raise RuntimeError("标准化失败")
+            return normalize(path, *args, **kwargs)
+
+        monkeypatch.setattr(novel_to_audio.AudioNormalizer, 'normalize_volume', staticmethod(failing_normalize))
+        result = converter.convert(_write_novel(tmp_path), output_dir=str(tmp_path / "out"), resume=False)
+
+        assert result['tasks_failed'] == 0
+        assert result['success'] is False
+        assert [(f['chapter_index'], f['stage']) for f in result['chapters_failed']] == [(1, "normalize")]
+        assert len(result['chapter_files']) == result['chapters'] - 1
@@ -0,0 +1,68 @@
+"""
+文本分段测试用例
+"""
+import allure
+
+from modules.novel_reader import TextProcessor
+from modules.novel_reader.chapter_parser import Chapter
+from modules.novel_reader.text_processor import split_sentences
+
+
+SENTENCES = ["夜色渐深，城外的风从山谷里吹来，带着一丝凉意。", "“你真的要走吗？”", "她轻声问道。",
+             "马车在石板路上颠簸着，车轮发出单调的声响。", "雨水顺着屋檐滴落，在青石台阶上溅起细小的水花。"]
+
+
+def _chapters(count=3, paragraphs=12):
+    """生成每段由若干句子组成的章节"""
+    chapters = []
+    for index in range(1, count + 1):
+        content = "\n".join("".join(SENTENCES[(i + j) % len(SENTENCES)] for j in range(4)) for i in range(paragraphs))
+        chapters.append(Chapter(title=f"第{index}章", content=content, index=index, start_pos=0, end_pos=0))
+    return chapters
+
+
+@allure.feature("小说阅读器")
+@allure.story("渐进分段")
+class TestProgressiveSegments:
+    """渐进分段测试类"""
+
+    @allure.title("测试句子切分保留标点和引号，拼接后与原文相同")
+    def test_split_sentences(self):
+        """测试句子切分"""
+        text = "".join(SENTENCES) + "没有句号的结尾"
+        sentences = split_sentences(text)
+
+        assert "".join(sentences) == text
+        assert sentences[1] == "“你真的要走吗？”"
+        assert sentences[-1] == "没有句号的结尾"
+
+    @allure.title("测试起始章节的段落从短到长增长到最大长度，其他章节不受影响")
+    def test_ramp(self):
+        """测试段落长度递增"""
+        chapters = _chapters()
+        plain = TextProcessor(max_segment_length=300).prepare_for_tts(chapters)
+        processor = TextProcessor(max_segment_length=300, progressive=True, first_segment_length=30)
+        tasks = processor.prepare_for_tts(chapters, start_chapter=2)
+
+        assert processor.progressive_schedule() == [30, 60, 120, 240]
+        ramp = [task for task in tasks if task.get('progressive')]
+        assert [task['chapter_index'] for task in ramp] == [2] * 4
+        assert all(task['char_count'] <= limit for task, limit in zip(ramp, processor.progressive_schedule()))
+        assert ramp[0]['char_count'] < ramp[-1]['char_count']
+        # 起始章节的文本完整保留，其他章节与不启用时相同
+        chapter_text = "".join(task['text'] for task in tasks if task['chapter_index'] == 2)
+        assert chapter_text.replace("\n", "") == chapters[1].content.replace("\n", "")
+        def others(task_list):
+            return [(task['chapter_index'], task['segment_index'], task['text'])
+                    for task in task_list if task['chapter_index'] != 2]
+        assert others(tasks) == others(plain)
+
+    @allure.title("测试相同输入得到相同分段，未启用时与原分段方式一致")
+    def test_deterministic(self):
+        """测试分段确定性"""
+        chapters = _chapters()
+        processor = TextProcessor(max_segment_length=300, progressive=True)
+
+        assert processor.prepare_for_tts(chapters) == processor.prepare_for_tts(chapters)
+        assert processor.prepare_for_tts(chapters)[0]['chapter_index'] == 1
+        assert TextProcessor(max_segment_length=300).progressive_schedule() == []
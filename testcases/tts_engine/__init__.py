@@ -0,0 +1 @@
+"""TTS引擎测试用例模块"""
@@ -0,0 +1,164 @@
+"""
+音频拼接合并测试用例
+"""
+import asyncio
+import shutil
+import wave
+
+import allure
+import pytest
+
+from modules.audio_processor import AudioMerger
+from modules.audio_processor.mp3_frames import get_duration_ms, iter_frames, make_silence
+from modules.tts_engine import LoopbackTTSEngine, TTSConfig
+
+
+def _write_wav(path, channels: int, sample_width: int, sample_rate: int, seconds: float) -> str:
+    """写入测试用WAV文件（非静音的锯齿波）"""
+    frames = int(sample_rate * seconds)
+    with wave.open(str(path), 'wb') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(bytes((i * 7) % 200 + 20 for i in range(frames * channels * sample_width)))
+    return str(path)
+
+
+def _xing_frame() -> bytes:
+    """带 Xing 标记的VBR头帧（时长与普通帧相同）"""
+    frame = bytearray(make_silence(1))
+    frame[13:17] = b'Xing'
+    return bytes(frame)
+
+
+@allure.feature("TTS引擎")
+@allure.story("音频合并")
+class TestAudioMerge:
+    """音频拼接合并测试类"""
+
+    @allure.title("测试MP3段落按帧拼接，不需要解码器，去掉标签和VBR头帧")
+    def test_merge_mp3_frames(self, tmp_path):
+        """测试MP3按帧合并的时长与偏移"""
+        engine = LoopbackTTSEngine(
+            TTSConfig(voice="loopback", output_format="mp3"),
+            latency_ms=0, latency_per_char_ms=0, ms_per_char=96
+        )
+        files = [str(tmp_path / f"{i}.mp3") for i in range(3)]
+        for i, path in enumerate(files):
+            assert asyncio.run(engine.synthesize("测" * (i + 1) * 10, path))
+        # 第二个文件带ID3标签和VBR头帧
+        data = open(files[1], 'rb').read()
+        open(files[1], 'wb').write(b"ID3\x03\x00\x00\x00\x00\x00\x04TAG!" + _xing_frame() + data)
+
+        merger = AudioMerger(add_silence=True, silence_duration=480)
+        output = tmp_path / "merged.mp3"
+        assert merger.merge_files(files, str(output), format="mp3", show_progress=False)
+
+        merged = output.read_bytes()
+        assert b"Xing" not in merged and b"TAG!" not in merged
+        assert get_duration_ms(merged) == pytest.approx(960 + 1920 + 2880 + 2 * 480, abs=1)
+        assert [offset for _, offset in merger.last_offsets] == pytest.approx([0, 1440, 3840], abs=1)
+        assert len({header.sample_rate for _, header in iter_frames(merged)}) == 1
+
+    @allure.title("测试合并方式的选择顺序：直接拼接 -> 流式解码 -> pydub")
+    def test_merge_path_order(self, tmp_path, monkeypatch):
+        """测试各种输入下依次尝试的合并方式（需要ffmpeg的方式按不可用处理）"""
+        same_wav = [_write_wav(tmp_path / f"s{i}.wav", 1, 2, 16000, 0.2) for i in range(2)]
+        mixed_wav = [
+            _write_wav(tmp_path / "m0.wav", 1, 2, 16000, 0.2),
+            _write_wav(tmp_path / "m1.wav", 2, 2, 24000, 0.2),
+        ]
+        same_mp3 = [tmp_path / "s0.mp3", tmp_path / "s1.mp3"]
+        mixed_mp3 = [tmp_path / "m0.mp3", tmp_path / "m1.mp3"]
+        for path in same_mp3 + mixed_mp3[:1]:
+            path.write_bytes(make_silence(300))
+        mixed_mp3[1].write_bytes(make_silence(300, sample_rate=22050, bitrate=32))
+
+        def merge(files, format, **options):
+            merger = AudioMerger(silence_duration=100, **options)
+            calls = []
+            for name in ('_merge_pcm', '_merge_mp3', '_merge_pydub'):
+                real = getattr(merger, name)
+                monkeypatch.setattr(merger, name, lambda *args, _n=name, _r=real: calls.append(_n) or _r(*args))
+            for name in ('_merge_ffmpeg_concat', '_merge_streaming'):
+                monkeypatch.setattr(merger, name, lambda *args, _n=name: calls.append(_n))
+            output = tmp_path / f"out_{len(list(tmp_path.iterdir()))}.{format}"
+            return merger.merge_files([str(f) for f in files], str(output), format=format, show_progress=False), calls
+
+        assert merge(same_wav, "wav") == (True, ['_merge_pcm'])
+        assert merge(mixed_wav, "wav") == (True, ['_merge_ffmpeg_concat', '_merge_streaming', '_merge_pydub'])
+        assert merge(same_mp3, "mp3") == (True, ['_merge_mp3'])
+        assert merge(mixed_mp3, "mp3")[1] == ['_merge_mp3', '_merge_streaming', '_merge_pydub']
+        assert merge(same_wav, "pcm", stream_copy=False, streaming=False) == (True, ['_merge_pcm'])
+        assert merge(same_mp3, "mp3", stream_copy=False, streaming=False)[1] == ['_merge_pydub']
+
+    @allure.title("测试采样率不一致时不按帧拼接")
+    def test_mismatched_streams(self, tmp_path):
+        """测试参数不一致的MP3回退到解码合并"""
+        files = [tmp_path / "a.mp3", tmp_path / "b.mp3"]
+        files[0].write_bytes(make_silence(500, sample_rate=24000))
+        files[1].write_bytes(make_silence(500, sample_rate=22050, bitrate=32))
+
+        merger = AudioMerger()
+        assert merger._merge_mp3([str(f) for f in files], tmp_path / "merged.mp3", False) is None
+
+    @allure.title("测试其他格式使用ffmpeg concat拼接")
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要ffmpeg")
+    def test_merge_ffmpeg_concat(self, tmp_path):
+        """测试ffmpeg concat -c copy"""
+        import subprocess
+        files = []
+        for i in range(3):
+            path = tmp_path / f"{i}.m4a"
+            subprocess.run(['ffmpeg', '-v', 'error', '-y', '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=24000',
+                            '-t', str(i + 1), '-c:a', 'aac', str(path)], check=True)
+            files.append(str(path))
+
+        merger = AudioMerger(add_silence=True, silence_duration=500)
+        output = tmp_path / "merged.m4a"
+        assert merger.merge_files(files, str(output), format="m4a", show_progress=False)
+
+        assert merger._probe(str(output))['duration'] == pytest.approx(7.0, abs=0.2)
+        assert [offset for _, offset in merger.last_offsets] == pytest.approx([0, 1500, 4000], abs=100)
+
+    @allure.title("测试流式合并的采样参数与pydub拼接规则一致")
+    def test_stream_params(self):
+        """测试各项取最大值，插入静音时采样率不低于11025Hz"""
+        merger = AudioMerger()
+        sources = [(1, 2, 8000), (2, 1, 8000), (1, 3, 6000)]
+        assert merger._stream_params(sources, insert_silence=False) == (2, 3, 8000)
+        assert merger._stream_params(sources, insert_silence=True) == (2, 3, 11025)
+
+    @allure.title("测试参数与目标相同的WAV按块直接读取，不启动解码进程")
+    def test_iter_pcm_passthrough(self, tmp_path):
+        """测试按块读取的数据与整个文件的采样数据相同"""
+        path = _write_wav(tmp_path / "a.wav", 2, 2, 24000, 3.0)
+        chunks = list(AudioMerger._iter_pcm(path, (2, 2, 24000), (2, 2, 24000)))
+
+        assert len(chunks) > 1
+        assert max(len(chunk) for chunk in chunks) <= 64 * 1024
+        with wave.open(path, 'rb') as wav_file:
+            assert b"".join(chunks) == wav_file.readframes(wav_file.getnframes())
+
+    @allure.title("测试采样参数不同的段落流式合并，结果与pydub合并一致")
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要ffmpeg")
+    def test_merge_streaming(self, tmp_path):
+        """测试混合采样率/声道数/采样宽度的流式合并"""
+        files = [
+            _write_wav(tmp_path / "a.wav", 1, 2, 16000, 1.0),
+            _write_wav(tmp_path / "b.wav", 2, 2, 24000, 2.0),
+            _write_wav(tmp_path / "c.wav", 1, 1, 8000, 0.5),
+        ]
+        results = {}
+        for streaming in (True, False):
+            merger = AudioMerger(add_silence=True, silence_duration=300, streaming=streaming)
+            output = tmp_path / f"merged_{streaming}.wav"
+            assert merger.merge_files(files, str(output), format="wav", show_progress=False)
+            with wave.open(str(output), 'rb') as wav_file:
+                params = (wav_file.getnchannels(), wav_file.getsampwidth(), wav_file.getframerate())
+                results[streaming] = (params, wav_file.getnframes(), [round(o) for _, o in merger.last_offsets])
+
+        assert results[True][0] == results[False][0] == (2, 2, 24000)
+        # 重采样实现不同，长度允许相差几毫秒
+        assert results[True][1] == pytest.approx(results[False][1], abs=24 * 5)
+        assert results[True][2] == results[False][2] == [0, 1300, 3600]
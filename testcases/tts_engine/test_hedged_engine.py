@@ -0,0 +1,69 @@
+"""
+对冲请求引擎测试用例
+"""
+import asyncio
+from pathlib import Path
+
+import allure
+
+from modules.tts_engine import BaseTTS, HedgedTTSEngine, TTSConfig
+
+
+class ScriptedTTS(BaseTTS):
+    """按脚本返回延迟和结果的测试引擎"""
+
+    def __init__(self, name, script):
+        super().__init__(TTSConfig(voice="test"))
+        self.name = name
+        self.script = list(script)
+        self.calls = 0
+
+    async def synthesize(self, text, output_path):
+        delay, success = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        await asyncio.sleep(delay)
+        if success:
+            Path(output_path).write_text(self.name, encoding='utf-8')
+        return success
+
+    def get_available_voices(self):
+        return []
+
+    def get_engine_name(self):
+        return self.name
+
+
+@allure.feature("TTS引擎")
+@allure.story("对冲请求")
+class TestHedgedEngine:
+    """对冲请求测试类"""
+
+    @allure.title("测试慢请求触发对冲且先完成者胜出")
+    def test_slow_request_is_hedged(self, tmp_path):
+        """测试对冲请求"""
+        primary = ScriptedTTS("primary", [(5.0, True)])
+        secondary = ScriptedTTS("secondary", [(0.01, True)])
+        engine = HedgedTTSEngine([primary, secondary], initial_hedge_delay_ms=50)
+        output = tmp_path / "out.mp3"
+
+        assert asyncio.run(asyncio.wait_for(engine.synthesize("文本", str(output)), timeout=2))
+
+        assert output.read_text(encoding='utf-8') == "secondary"
+        stats = engine.get_stats()
+        assert stats['hedges'] == 1 and stats['hedge_wins'] == 1
+        assert list(tmp_path.iterdir()) == [output]
+
+    @allure.title("测试连续失败后熔断并转移到备用引擎")
+    def test_circuit_breaker_failover(self, tmp_path):
+        """测试熔断和故障转移"""
+        primary = ScriptedTTS("primary", [(0, False)])
+        secondary = ScriptedTTS("secondary", [(0, True)])
+        engine = HedgedTTSEngine([primary, secondary], failure_threshold=2, open_seconds=60)
+
+        async def run():
+            return [await engine.synthesize("文本", str(tmp_path / f"{i}.mp3")) for i in range(5)]
+
+        assert all(asyncio.run(run()))
+        assert primary.calls == 2
+        assert secondary.calls == 5
+        assert engine.get_stats()['engines'][0]['health']['state'] == "open"
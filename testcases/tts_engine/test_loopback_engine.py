@@ -0,0 +1,80 @@
+"""
+回环TTS引擎测试用例
+"""
+import asyncio
+import wave
+
+import allure
+import pytest
+
+from modules.audio_processor.mp3_frames import get_duration_ms, iter_frames, make_silence
+from modules.tts_engine import LoopbackTTSEngine, TTSConfig
+
+
+@allure.feature("TTS引擎")
+@allure.story("回环引擎")
+class TestLoopbackEngine:
+    """回环引擎测试类"""
+
+    @allure.title("测试音频时长与文本长度成正比")
+    @pytest.mark.parametrize("audio_format", ["mp3", "wav"])
+    def test_duration_proportional_to_text(self, tmp_path, audio_format):
+        """测试音频时长"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, ms_per_char=100)
+        output = tmp_path / f"segment.{audio_format}"
+
+        assert asyncio.run(engine.synthesize("测" * 30, str(output)))
+
+        if audio_format == "mp3":
+            duration = get_duration_ms(output.read_bytes())
+            assert 3000 <= duration < 3000 + 24
+        else:
+            with wave.open(str(output), 'rb') as wav_file:
+                duration = wav_file.getnframes() * 1000 / wav_file.getframerate()
+            assert duration == pytest.approx(3000, abs=1)
+
+    @allure.title("测试相同种子结果确定")
+    def test_deterministic_failures(self, tmp_path):
+        """测试失败分布可复现"""
+        def run_once():
+            engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=0.5, seed=7)
+            return [
+                asyncio.run(engine.synthesize(f"文本{i}", str(tmp_path / f"{i}.mp3")))
+                for i in range(20)
+            ]
+
+        first = run_once()
+        assert first == run_once()
+        assert 0 < sum(first) < 20
+
+    @allure.title("测试抛出异常的失败方式")
+    def test_failure_mode_raise(self, tmp_path):
+        """测试raise失败方式"""
+        engine = LoopbackTTSEngine(
+            TTSConfig(voice="loopback"),
+            latency_ms=0, latency_per_char_ms=0, failure_rate=1.0, failure_mode="raise"
+        )
+        with pytest.raises(ConnectionError):
+            asyncio.run(engine.synthesize("文本", str(tmp_path / "x.mp3")))
+
+
+@allure.feature("音频处理")
+@allure.story("MP3帧")
+class TestMP3Frames:
+    """MP3帧工具测试类"""
+
+    @allure.title("测试静音帧可被解析")
+    @pytest.mark.parametrize("sample_rate,bitrate,channels", [
+        (24000, 48, 1),
+        (44100, 128, 2),
+        (22050, 64, 1),
+    ])
+    def test_make_silence_round_trip(self, sample_rate, bitrate, channels):
+        """测试生成的静音帧"""
+        data = make_silence(1000, sample_rate, bitrate, channels)
+        frames = list(iter_frames(data))
+
+        assert sum(header.frame_length for _, header in frames) == len(data)
+        assert all(header.sample_rate == sample_rate for _, header in frames)
+        assert all(header.channels == channels for _, header in frames)
+        assert 1000 <= get_duration_ms(data) < 1000 + frames[0][1].duration_ms
@@ -0,0 +1,65 @@
+"""
+输出格式协商测试用例
+"""
+import asyncio
+import wave
+
+import allure
+import pytest
+
+from modules.audio_processor import AudioMerger
+from modules.tts_engine import EdgeTTSEngine, HedgedTTSEngine, LoopbackTTSEngine, PackingTTSEngine, TTSConfig
+
+
+class _WavOnlyEngine(LoopbackTTSEngine):
+    """只能输出WAV的引擎"""
+    SUPPORTED_FORMATS = ['wav']
+
+
+@allure.feature("TTS引擎")
+@allure.story("输出格式")
+class TestOutputFormats:
+    """输出格式测试类"""
+
+    @allure.title("测试不支持的格式回退为引擎首选格式")
+    def test_negotiate_format(self):
+        """测试格式协商"""
+        edge = EdgeTTSEngine(TTSConfig(voice="zh-CN-XiaoxiaoNeural", output_format="wav"))
+        loopback = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="PCM"))
+
+        assert edge.config.output_format == "mp3"
+        assert loopback.config.output_format == "pcm"
+        assert PackingTTSEngine(loopback).config.output_format == "pcm"
+
+    @allure.title("测试对冲引擎统一各引擎的输出格式")
+    def test_hedged_common_format(self):
+        """测试对冲引擎格式"""
+        primary = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="wav"))
+        secondary = LoopbackTTSEngine(TTSConfig(voice="loopback", output_format="mp3"))
+        HedgedTTSEngine([primary, secondary])
+
+        assert secondary.config.output_format == "wav"
+
+        with pytest.raises(ValueError):
+            HedgedTTSEngine([_WavOnlyEngine(), EdgeTTSEngine()])
+
+    @allure.title("测试WAV段落直接拼接合并")
+    @pytest.mark.parametrize("audio_format", ["wav", "pcm"])
+    def test_merge_pcm_without_codec(self, tmp_path, audio_format):
+        """测试WAV/PCM合并时长与偏移"""
+        engine = LoopbackTTSEngine(
+            TTSConfig(voice="loopback", output_format=audio_format),
+            latency_ms=0, latency_per_char_ms=0, ms_per_char=100
+        )
+        files = [str(tmp_path / f"{i}.{audio_format}") for i in range(3)]
+        for i, path in enumerate(files):
+            assert asyncio.run(engine.synthesize("测" * (i + 1) * 10, path))
+
+        merger = AudioMerger(add_silence=True, silence_duration=500)
+        output = tmp_path / "merged.wav"
+        assert merger.merge_files(files, str(output), format="wav", show_progress=False)
+
+        with wave.open(str(output), 'rb') as wav_file:
+            duration = wav_file.getnframes() * 1000 / wav_file.getframerate()
+        assert duration == pytest.approx(1000 + 2000 + 3000 + 2 * 500, abs=1)
+        assert [offset for _, offset in merger.last_offsets] == pytest.approx([0, 1500, 4000], abs=1)
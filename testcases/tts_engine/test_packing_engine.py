@@ -0,0 +1,100 @@
+"""
+短段落打包引擎测试用例
+"""
+import asyncio
+import wave
+from pathlib import Path
+
+import allure
+import pytest
+
+from modules.audio_processor.mp3_frames import get_duration_ms
+from modules.tts_engine import LoopbackTTSEngine, PackingTTSEngine
+
+
+def _make_tasks(tmp_path, texts, audio_format="mp3", chapter_index=1):
+    """构造段落任务"""
+    return [
+        {
+            'task_id': i,
+            'chapter_index': chapter_index,
+            'segment_index': i,
+            'text': text,
+            'output_path': str(tmp_path / f"{chapter_index:03d}_{i:02d}.{audio_format}"),
+        }
+        for i, text in enumerate(texts)
+    ]
+
+
+@allure.feature("TTS引擎")
+@allure.story("段落打包")
+class TestPackingEngine:
+    """段落打包测试类"""
+
+    @allure.title("测试连续短段落合并为一个请求")
+    def test_pack_short_segments(self, tmp_path):
+        """测试打包规划"""
+        engine = PackingTTSEngine(LoopbackTTSEngine(latency_ms=0), short_segment_chars=10)
+        texts = ["“好。”", "“等等！”", "这是一个明显超过十个字的长段落，不参与打包。", "“嗯。”", "“走吧。”"]
+        tasks = _make_tasks(tmp_path, texts) + _make_tasks(tmp_path, ["“在吗？”"], chapter_index=2)
+
+        packed = engine.pack_tasks(tasks)
+
+        assert [len(task.get('packed_segments', [task])) for task in packed] == [2, 1, 2, 1]
+        assert packed[0]['text'] == "“好。”\n“等等！”"
+
+    @allure.title("测试请求大小上限")
+    def test_pack_respects_request_limit(self, tmp_path):
+        """测试单次请求字节数上限"""
+        engine = PackingTTSEngine(LoopbackTTSEngine(latency_ms=0), max_request_bytes=30, short_segment_chars=10)
+        packed = engine.pack_tasks(_make_tasks(tmp_path, ["一二三四五"] * 6))
+
+        assert all(len(task['text'].encode('utf-8')) <= 30 for task in packed)
+        assert sum(len(task.get('packed_segments', [task])) for task in packed) == 6
+
+    @allure.title("测试打包音频按词边界切回各段落")
+    @pytest.mark.parametrize("audio_format", ["mp3", "wav"])
+    def test_split_by_boundaries(self, tmp_path, audio_format):
+        """测试切分后各段落时长"""
+        inner = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, ms_per_char=200)
+        engine = PackingTTSEngine(inner, short_segment_chars=20)
+        texts = ["一二三", "四五六七八九", "十"]
+        packed = engine.pack_tasks(_make_tasks(tmp_path, texts, audio_format))
+        assert len(packed) == 1
+
+        assert asyncio.run(engine.synthesize(packed[0]['text'], packed[0]['output_path']))
+        assert inner.request_count == 1
+
+        durations = []
+        for task in packed[0]['packed_segments']:
+            if audio_format == "mp3":
+                with open(task['output_path'], 'rb') as f:
+                    durations.append(get_duration_ms(f.read()))
+            else:
+                with wave.open(task['output_path'], 'rb') as wav_file:
+                    durations.append(wav_file.getnframes() * 1000 / wav_file.getframerate())
+
+        # 每个段落的音频 = 自身字数 + 半个分隔标记两侧的停顿
+        expected = [3.5 * 200, 7 * 200, 1.5 * 200]
+        for duration, target in zip(durations, expected):
+            assert duration == pytest.approx(target, abs=30)
+        assert not list(tmp_path.glob("*.pack.*"))
+
+    @allure.title("测试打包登记在合成成功后释放，失败时保留以便重试")
+    def test_pack_registry_released(self, tmp_path):
+        """测试打包登记的生命周期"""
+        inner = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, failure_rate=1.0)
+        engine = PackingTTSEngine(inner, short_segment_chars=20)
+        first, second = engine.pack_tasks(_make_tasks(tmp_path, ["一二三", "四五六"], chapter_index=1)
+                                          + _make_tasks(tmp_path, ["七八", "九十"], chapter_index=2))
+
+        assert not asyncio.run(engine.synthesize(first['text'], first['output_path']))
+        assert len(engine._packs) == 2
+
+        inner.failure_rate = 0.0
+        assert asyncio.run(engine.synthesize_with_timing(first['text'], first['output_path']))
+        assert all(Path(member['output_path']).exists() for member in first['packed_segments'])
+        assert list(engine._packs) == [second['output_path']]
+
+        engine.close()
+        assert engine._packs == {}
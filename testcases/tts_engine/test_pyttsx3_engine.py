@@ -0,0 +1,161 @@
+"""
+pyttsx3离线引擎测试用例
+"""
+import asyncio
+import shutil
+import sys
+import time
+import types
+import wave
+
+import allure
+import pytest
+
+from modules.tts_engine import Pyttsx3Engine, TTSConfig
+from modules.tts_engine.local_tts import pyttsx3_engine
+
+
+class _FakePyttsx3Engine:
+    """替代系统语音合成器：runAndWait 时为每个排队的请求写出一段静音WAV"""
+
+    def __init__(self, delay=0.0, empty=False):
+        self.delay = delay
+        self.empty = empty
+        self.properties = {}
+        self._queued = []
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def getProperty(self, name):
+        return self.properties.get(name)
+
+    def save_to_file(self, text, path):
+        self._queued.append((text, path))
+
+    def runAndWait(self):
+        time.sleep(self.delay)
+        for text, path in self._queued:
+            with wave.open(path, 'wb') as wav:
+                wav.setnchannels(1)
+                wav.setsampwidth(2)
+                wav.setframerate(16000)
+                if not self.empty:
+                    wav.writeframes(b"\0\0" * 160 * len(text))
+            if self.empty:
+                open(path, 'wb').close()
+        self._queued.clear()
+
+
+@pytest.fixture
+def fake_pyttsx3(monkeypatch):
+    """用假的 pyttsx3.init 替换系统语音合成器（进程池以fork启动，工作进程继承该替换）"""
+    module = types.ModuleType("pyttsx3")
+    module.options = {}
+    module.init = lambda: _FakePyttsx3Engine(**module.options)
+    monkeypatch.setitem(sys.modules, "pyttsx3", module)
+    monkeypatch.setattr(pyttsx3_engine, "_worker_engine", None)
+    return module
+
+
+def _leftovers(directory, output_name):
+    """输出目录中除目标文件外残留的临时文件"""
+    return [path.name for path in directory.iterdir() if path.name != output_name]
+
+
+@allure.feature("TTS引擎")
+@allure.story("pyttsx3离线引擎")
+class TestPyttsx3Engine:
+    """pyttsx3离线引擎测试类"""
+
+    @allure.title("测试WAV输出先写临时文件再原子替换，不留临时文件")
+    def test_wav_replaced_atomically(self, tmp_path, fake_pyttsx3):
+        """测试WAV输出"""
+        output = tmp_path / "book" / "0.wav"
+
+        assert pyttsx3_engine._synthesize_in_worker("你好", str(output), "zh", 180, 0.5)
+
+        with wave.open(str(output), 'rb') as wav:
+            assert wav.getnframes() == 320
+        assert _leftovers(output.parent, output.name) == []
+        assert pyttsx3_engine._worker_engine.properties == {'voice': "zh", 'rate': 180, 'volume': 0.5}
+
+    @allure.title("测试合成器没有写出音频时返回失败且不留下文件")
+    def test_empty_output_fails(self, tmp_path, fake_pyttsx3):
+        """测试空输出"""
+        fake_pyttsx3.options = {'empty': True}
+        output = tmp_path / "0.wav"
+
+        assert pyttsx3_engine._synthesize_in_worker("你好", str(output), "", 150, 1.0) is False
+        assert list(tmp_path.iterdir()) == []
+
+    @allure.title("测试转码失败时不留下残缺的目标文件和临时WAV")
+    def test_transcode_failure_cleans_up(self, tmp_path, fake_pyttsx3, monkeypatch):
+        """测试转码失败"""
+        from pydub import AudioSegment
+
+        def broken_export(self, out_f, format=None, **kwargs):
+            open(out_f, 'wb').close()
+            raise RuntimeError("转码失败")
+
+        monkeypatch.setattr(AudioSegment, "export", broken_export)
+        output = tmp_path / "0.mp3"
+
+        with pytest.raises(RuntimeError):
+            pyttsx3_engine._synthesize_in_worker("你好", str(output), "", 150, 1.0)
+        assert _leftovers(tmp_path, output.name) == []
+
+    @allure.title("测试非WAV格式由临时WAV转码得到")
+    @pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="需要ffmpeg")
+    def test_transcode(self, tmp_path, fake_pyttsx3):
+        """测试转码输出"""
+        output = tmp_path / "0.mp3"
+
+        assert pyttsx3_engine._synthesize_in_worker("你好", str(output), "", 150, 1.0)
+        assert output.stat().st_size > 0
+        assert _leftovers(tmp_path, output.name) == []
+
+    @allure.title("测试不支持的输出格式协商为WAV")
+    def test_negotiate_format(self):
+        """测试格式协商"""
+        assert Pyttsx3Engine(TTSConfig(voice="", output_format="m4a")).config.output_format == "wav"
+        assert Pyttsx3Engine(TTSConfig(voice="", output_format="MP3")).config.output_format == "mp3"
+        assert Pyttsx3Engine().config.output_format == "wav"
+
+    @allure.title("测试在进程池中合成，语速按倍数换算为每分钟词数")
+    def test_synthesize_in_process_pool(self, tmp_path, fake_pyttsx3):
+        """测试进程池合成"""
+        engine = Pyttsx3Engine(TTSConfig(voice="", output_format="wav", rate=1.5), max_processes=1)
+        output = tmp_path / "0.wav"
+        try:
+            assert asyncio.run(engine.synthesize("你好", str(output)))
+        finally:
+            engine.close()
+
+        with wave.open(str(output), 'rb') as wav:
+            assert wav.getnframes() == 320
+
+    @allure.title("测试 close(wait=False) 取消排队中的请求并立即返回")
+    def test_close_cancels_pending(self, tmp_path, fake_pyttsx3):
+        """测试不等待关闭"""
+        fake_pyttsx3.options = {'delay': 0.5}
+        engine = Pyttsx3Engine(TTSConfig(voice="", output_format="wav"), max_processes=1)
+
+        async def run():
+            requests = [asyncio.ensure_future(engine.synthesize("你好", str(tmp_path / f"{i}.wav")))
+                        for i in range(6)]
+            await asyncio.sleep(0.2)
+            begin = time.perf_counter()
+            engine.close(wait=False)
+            elapsed = time.perf_counter() - begin
+            return elapsed, await asyncio.gather(*requests, return_exceptions=True)
+
+        elapsed, results = asyncio.run(run())
+
+        assert elapsed < 0.5
+        assert engine._executor is None
+        # 已交给工作进程的请求（正在执行的和进程池预取的）照常完成，其余被取消
+        cancelled = [result for result in results if isinstance(result, asyncio.CancelledError)]
+        assert len(cancelled) >= 3
+        assert results[0] is True
+        assert len(list(tmp_path.glob("*.wav"))) == len(results) - len(cancelled)
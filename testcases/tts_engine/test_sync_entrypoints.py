@@ -0,0 +1,91 @@
+"""
+同步入口与批量合成测试用例
+"""
+import asyncio
+import threading
+
+import allure
+
+from core.loop_runner import get_loop_runner
+from core.task_manager import TaskManager
+from modules.tts_engine import LoopbackTTSEngine
+
+
+@allure.feature("TTS引擎")
+@allure.story("同步入口")
+class TestSyncEntrypoints:
+    """同步入口测试类"""
+
+    @allure.title("测试同步合成复用同一个后台事件循环")
+    def test_synthesize_sync_reuses_loop(self, tmp_path):
+        """测试多次同步调用共享事件循环"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        loops = []
+
+        original = engine.synthesize
+
+        async def recording_synthesize(text, output_path):
+            loops.append(asyncio.get_running_loop())
+            return await original(text, output_path)
+
+        engine.synthesize = recording_synthesize
+
+        for i in range(3):
+            assert engine.synthesize_sync(f"第{i}段", str(tmp_path / f"{i}.mp3"))
+
+        assert len(set(map(id, loops))) == 1
+        assert loops[0] is get_loop_runner().loop
+
+    @allure.title("测试在运行中的事件循环里调用同步入口")
+    def test_sync_inside_running_loop(self, tmp_path):
+        """测试GUI/Jupyter等已有事件循环的场景"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+
+        async def caller():
+            return engine.synthesize_sync("测试文本", str(tmp_path / "nested.mp3"))
+
+        assert asyncio.run(caller())
+        assert (tmp_path / "nested.mp3").exists()
+
+    @allure.title("测试批量合成保持顺序并限制并发")
+    def test_synthesize_many(self, tmp_path):
+        """测试批量合成"""
+        engine = LoopbackTTSEngine(latency_ms=20, latency_per_char_ms=0, latency_jitter=0)
+        items = [(f"文本{i}", str(tmp_path / f"{i}.mp3")) for i in range(10)]
+        in_flight = 0
+        peak = 0
+        lock = threading.Lock()
+
+        original = engine.synthesize
+
+        async def counting_synthesize(text, output_path):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            try:
+                if text == "文本3":
+                    raise RuntimeError("模拟异常")
+                return await original(text, output_path)
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        engine.synthesize = counting_synthesize
+
+        results = engine.synthesize_many_sync(items, max_concurrency=3)
+
+        assert results == [i != 3 for i in range(10)]
+        assert peak == 3
+
+    @allure.title("测试任务管理器同步执行")
+    def test_execute_sync(self, tmp_path):
+        """测试 execute_sync 可重复调用"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0)
+        manager = TaskManager(max_workers=2)
+        for i in range(4):
+            manager.add_task(i, f"文本{i}", str(tmp_path / f"{i}.mp3"))
+
+        for _ in range(2):
+            result = manager.execute_sync(engine, show_progress=False)
+            assert result['completed'] == 4
@@ -0,0 +1,73 @@
+"""
+词边界时间轴与字幕测试用例
+"""
+import asyncio
+import json
+
+import allure
+
+from modules.audio_processor.subtitle_writer import SubtitleWriter, load_timing, timing_path
+from modules.tts_engine import LoopbackTTSEngine, PackingTTSEngine
+
+
+@allure.feature("TTS引擎")
+@allure.story("时间轴")
+class TestTimingSidecars:
+    """时间轴测试类"""
+
+    @allure.title("测试合成时同时保存时间轴文件")
+    def test_synthesize_with_timing(self, tmp_path):
+        """测试单段落时间轴"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, ms_per_char=100)
+        output = tmp_path / "segment.mp3"
+
+        assert asyncio.run(engine.synthesize_with_timing("你好。再见。", str(output)))
+
+        timing = load_timing(str(output))
+        assert timing['text'] == "你好。再见。"
+        assert "".join(word['text'] for word in timing['words']) == "你好。再见。"
+
+    @allure.title("测试打包任务为每个成员保存相对时间轴")
+    def test_packed_members_rebased(self, tmp_path):
+        """测试打包成员时间轴从零开始"""
+        inner = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, ms_per_char=200)
+        engine = PackingTTSEngine(inner, short_segment_chars=20)
+        tasks = [
+            {'task_id': i, 'chapter_index': 1, 'text': text, 'output_path': str(tmp_path / f"001_{i:02d}.mp3")}
+            for i, text in enumerate(["一二三", "四五六七"])
+        ]
+        pack = engine.pack_tasks(tasks)[0]
+
+        assert asyncio.run(engine.synthesize_with_timing(pack['text'], pack['output_path']))
+
+        for task in tasks:
+            timing = load_timing(task['output_path'])
+            assert timing['text'] == task['text']
+            assert "".join(word['text'] for word in timing['words']) == task['text']
+            assert 0 <= timing['words'][0]['offset_ms'] < 200
+        assert not timing_path(pack['output_path'][:-4] + ".pack.mp3").exists()
+
+    @allure.title("测试按偏移量拼接时间轴并生成字幕")
+    def test_timeline_and_formats(self, tmp_path):
+        """测试LRC/SRT/JSON输出"""
+        engine = LoopbackTTSEngine(latency_ms=0, latency_per_char_ms=0, ms_per_char=100)
+        first, second = tmp_path / "a.mp3", tmp_path / "b.mp3"
+        asyncio.run(engine.synthesize_with_timing("第一句。第二句！", str(first)))
+        asyncio.run(engine.synthesize_with_timing("“第三句。”", str(second)))
+
+        writer = SubtitleWriter()
+        timeline = writer.build_timeline([
+            {'audio_path': str(first), 'offset_ms': 0.0},
+            {'audio_path': str(second), 'offset_ms': 60000.0},
+        ])
+
+        assert [cue.text for cue in timeline['cues']] == ["第一句。", "第二句！", "“第三句。”"]
+        assert timeline['cues'][2].start_ms >= 60000.0
+
+        files = writer.write(timeline, str(tmp_path / "book"), title="测试", chapters=[{'title': "第一章", 'start_ms': 0}])
+        lrc, srt, data = (open(path, encoding='utf-8').read() for path in files)
+
+        assert lrc.splitlines()[0] == "[ti:测试]"
+        assert lrc.splitlines()[-1].startswith("[01:00.") and lrc.splitlines()[-1].endswith("]“第三句。”")
+        assert srt.startswith("1\n00:00:00,")
+        assert json.loads(data)['chapters'][0]['title'] == "第一章"
@@ -0,0 +1,62 @@
+"""
+音色目录缓存测试用例
+"""
+import json
+import time
+
+import allure
+
+from modules.tts_engine import EdgeTTSEngine
+
+_CATALOG = [
+    {'ShortName': 'zh-CN-XiaoxiaoNeural', 'Locale': 'zh-CN', 'Gender': 'Female', 'FriendlyName': 'Xiaoxiao'},
+    {'ShortName': 'en-US-EmmaNeural', 'Locale': 'en-US', 'Gender': 'Female', 'FriendlyName': 'Emma'},
+]
+
+
+def _write_cache(cache_dir, fetched_at):
+    """写入音色缓存文件"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    with open(cache_dir / "edge_voices.json", 'w', encoding='utf-8') as f:
+        json.dump({'fetched_at': fetched_at, 'voices': _CATALOG}, f)
+
+
+@allure.feature("TTS引擎")
+@allure.story("音色目录缓存")
+class TestVoiceCatalog:
+    """音色目录缓存测试类"""
+
+    @allure.title("测试新鲜缓存不访问网络")
+    def test_fresh_cache_skips_network(self, tmp_path, monkeypatch):
+        """测试使用磁盘缓存"""
+        _write_cache(tmp_path, time.time())
+        engine = EdgeTTSEngine(cache_dir=str(tmp_path))
+        monkeypatch.setattr(engine, '_fetch_catalog', lambda: (_ for _ in ()).throw(AssertionError("不应访问网络")))
+
+        voices = engine.get_available_voices()
+
+        assert [voice.name for voice in voices] == ['zh-CN-XiaoxiaoNeural']
+
+    @allure.title("测试过期缓存立即返回并在后台刷新")
+    def test_stale_cache_refreshes_in_background(self, tmp_path, monkeypatch):
+        """测试后台刷新"""
+        _write_cache(tmp_path, time.time() - 48 * 3600)
+        engine = EdgeTTSEngine(cache_dir=str(tmp_path), catalog_ttl_hours=24)
+        refreshed = []
+        monkeypatch.setattr(engine, '_refresh_in_background', lambda: refreshed.append(True))
+
+        assert len(engine.get_available_voices()) == 1
+        assert refreshed == [True]
+
+    @allure.title("测试离线模式")
+    def test_offline_mode(self, tmp_path):
+        """测试离线模式只使用缓存"""
+        engine = EdgeTTSEngine(cache_dir=str(tmp_path), offline=True)
+        assert engine.get_available_voices() == []
+        assert engine.is_voice_available('zh-CN-XiaoxiaoNeural') is None
+
+        _write_cache(tmp_path, 0)
+        engine = EdgeTTSEngine(cache_dir=str(tmp_path), offline=True)
+        assert engine.is_voice_available('en-US-EmmaNeural') is True
+        assert engine.is_voice_available('zh-CN-NoSuchNeural') is False
+        assert len(engine.get_available_voices()) == 1